@@ -1,88 +1,173 @@
-import psutil
+import os
 import time
+import heapq
 import threading
+from collections import deque
+from typing import Dict, List, Optional
 from backend.services.ingestion_service import IngestionService
+from backend.orchestration.async_dispatcher import AsyncDispatcher
+from backend.adapters.infra_sampling import (
+    HostSampler, ProcessSampler, CgroupSampler, FileFeedSampler, WindowAggregator
+)
 from backend.utils.logger import log_error, log_info
 
+def _env_list(name: str) -> List[str]:
+    return [v.strip() for v in os.getenv(name, "").split(",") if v.strip()]
+
 class InfraCollector:
     """
     Adapter for Infrastructure Monitoring.
     Collects CPU, Memory, Disk, and Network I/O metrics.
     Runs in a non-blocking background thread.
+
+    A single scheduler thread drives every sampler at its own (sub-second) cadence
+    from a due-time heap; samples are computed from counter deltas, folded into
+    fixed windows, and each closed window is ingested as one infra event.
+
+    Config (env): INFRA_SAMPLE_INTERVAL (0.5s), INFRA_WINDOW_SECONDS (5s),
+    INFRA_PROCESS_PIDS, INFRA_CGROUPS (cgroup v2 dirs), INFRA_FEED_PATHS (JSON lines).
     """
-    
-    _instance = None
+
+    SAMPLE_INTERVAL = float(os.getenv("INFRA_SAMPLE_INTERVAL", "0.5"))
+    WINDOW_SECONDS = float(os.getenv("INFRA_WINDOW_SECONDS", "5"))
+
     _running = False
     _thread = None
     _app = None
+    _stop_event = threading.Event()
+    _samplers = []
+    _aggregator: Optional[WindowAggregator] = None
+    _inflight: Dict[float, int] = {}  # window end -> events dispatched (or shed) but not yet ingested
+    _inflight_lock = threading.Lock()
+    _shed = deque()                   # shed window events awaiting re-dispatch; collection thread only
+    _replay_floor: Optional[float] = None  # oldest window given up on; feed checkpoints stay behind it
+    MAX_SHED_WINDOWS = 1000
 
     @classmethod
-    def start_collector(cls, app=None):
+    def start_collector(cls, app=None, samplers=None):
         if cls._running:
             return
-        
+
         cls._app = app
+        cls._samplers = samplers if samplers is not None else cls._default_samplers()
+        cls._aggregator = WindowAggregator(cls.WINDOW_SECONDS)
+        cls._shed.clear()
+        cls._replay_floor = None
+        cls._stop_event.clear()
         cls._running = True
-        cls._thread = threading.Thread(target=cls._collection_loop, daemon=True)
+        cls._thread = threading.Thread(target=cls._collection_loop, name="InfraCollector", daemon=True)
         cls._thread.start()
-        log_info("InfraCollector started in background thread")
+        log_info(f"InfraCollector started in background thread ({len(cls._samplers)} samplers)")
 
     @classmethod
     def stop_collector(cls):
         cls._running = False
+        cls._stop_event.set()
         if cls._thread:
             cls._thread.join(timeout=2)
             log_info("InfraCollector stopped")
 
     @classmethod
-    def _collection_loop(cls):
-        while cls._running:
+    def _default_samplers(cls):
+        interval = cls.SAMPLE_INTERVAL
+        samplers = [HostSampler(interval=interval)]
+        for pid in _env_list("INFRA_PROCESS_PIDS"):
             try:
-                metrics = cls._collect_metrics()
-                
-                if cls._app:
-                    with cls._app.app_context():
-                        cls._emit_event(metrics)
-                else:
-                    cls._emit_event(metrics)
-                    
-                time.sleep(5) # 5 Second Interval
+                samplers.append(ProcessSampler(int(pid), interval=interval))
             except Exception as e:
-                log_error("InfraCollector Loop Error", str(e))
-                time.sleep(5) # Prevent tight loop on error
+                log_error("InfraCollector process sampler skipped", f"{pid}: {e}")
+        samplers.extend(CgroupSampler(path, interval=interval) for path in _env_list("INFRA_CGROUPS"))
+        samplers.extend(FileFeedSampler(path, interval=interval) for path in _env_list("INFRA_FEED_PATHS"))
+        return samplers
+
+    @classmethod
+    def _collection_loop(cls):
+        now = time.time()
+        due = [(now, i) for i in range(len(cls._samplers))]
+        heapq.heapify(due)
+
+        while cls._running:
+            now = time.time()
+            while due and due[0][0] <= now:
+                slot, i = heapq.heappop(due)
+                sampler = cls._samplers[i]
+                try:
+                    for source, metrics in sampler.sample(now):
+                        for event in cls._aggregator.add(source, metrics, now):
+                            cls._emit_event(event)
+                except Exception as e:
+                    log_error("InfraCollector Sampler Error", f"{sampler.source}: {e}")
+                # Fixed-rate schedule; skip missed slots instead of bursting to catch up
+                next_slot = slot + sampler.interval
+                if next_slot <= now:
+                    next_slot = now + sampler.interval
+                heapq.heappush(due, (next_slot, i))
+
+            for event in cls._aggregator.flush(now):
+                cls._emit_event(event)
+            cls._retry_shed()
+            cls._commit_feeds(now)
+
+            deadlines = [t for t in (due[0][0] if due else None, cls._aggregator.next_close()) if t is not None]
+            wake = min(deadlines, default=now + 1.0)
+            cls._stop_event.wait(max(0.0, wake - time.time()))
 
     @classmethod
-    def _collect_metrics(cls):
-        return {
-            "cpu_percent": psutil.cpu_percent(interval=1), # This blocks for 1s! But in thread it's fine.
-            "memory_percent": psutil.virtual_memory().percent,
-            "disk_usage": psutil.disk_usage('/').percent,
-            "net_io": psutil.net_io_counters()._asdict()
-        }
+    def _commit_feeds(cls, now: float):
+        """
+        Every window ending by window_start(now) has been closed; of those, only
+        windows still in flight (or shed and awaiting re-dispatch) hold back the
+        feed checkpoints. A window given up on holds them back for good, so a
+        restart replays its samples.
+        """
+        safe = cls._aggregator.window_start(now)
+        with cls._inflight_lock:
+            if cls._inflight:
+                safe = min(safe, min(cls._inflight) - cls._aggregator.window_seconds)
+        if cls._replay_floor is not None:
+            safe = min(safe, cls._replay_floor - cls._aggregator.window_seconds)
+        for sampler in cls._samplers:
+            if isinstance(sampler, FileFeedSampler):
+                sampler.commit_through(safe)
 
     @classmethod
-    def _emit_event(cls, metrics):
-        # Determine Severity
-        severity = "info"
-        if metrics["cpu_percent"] > 80 or metrics["memory_percent"] > 90:
-            severity = "medium"
-        if metrics["cpu_percent"] > 95:
-            severity = "high"
-
-        # Normalized Event Schema
-        event = {
-            "event_type": "infra",
-            "timestamp": time.time(),
-            "session_id": "sys_mon_01",
-            "severity": severity,
-            "features": {
-                "cpu_load": metrics["cpu_percent"],
-                "mem_usage": metrics["memory_percent"],
-                "disk_usage": metrics["disk_usage"],
-                "bytes_sent": metrics["net_io"].get("bytes_sent", 0),
-                "bytes_recv": metrics["net_io"].get("bytes_recv", 0)
-            }
-        }
-        
-        IngestionService.ingest_infra_event(event)
+    def _emit_event(cls, event):
+        # Ingestion (state update + inference) runs off the sampling thread.
+        # Not coalesced: every window's spike flags count towards cpu_spike_score.
+        with cls._inflight_lock:
+            cls._inflight[event["timestamp"]] = cls._inflight.get(event["timestamp"], 0) + 1
+        if cls._shed or not AsyncDispatcher.fire_and_forget("infra_window_ingest", cls._ingest, event):
+            # Shed (or behind earlier shed windows): stays in flight until re-dispatched
+            cls._shed.append(event)
+            if len(cls._shed) > cls.MAX_SHED_WINDOWS:
+                dropped = cls._shed.popleft()
+                floor = cls._replay_floor
+                cls._replay_floor = dropped["timestamp"] if floor is None else min(floor, dropped["timestamp"])
+                cls._done(dropped)
 
+    @classmethod
+    def _retry_shed(cls):
+        while cls._shed:
+            if not AsyncDispatcher.fire_and_forget("infra_window_ingest", cls._ingest, cls._shed[0]):
+                return
+            cls._shed.popleft()
+
+    @classmethod
+    def _ingest(cls, event):
+        try:
+            if cls._app:
+                with cls._app.app_context():
+                    IngestionService.ingest_infra_event(event)
+            else:
+                IngestionService.ingest_infra_event(event)
+        finally:
+            cls._done(event)
+
+    @classmethod
+    def _done(cls, event):
+        with cls._inflight_lock:
+            left = cls._inflight[event["timestamp"]] - 1
+            if left:
+                cls._inflight[event["timestamp"]] = left
+            else:
+                del cls._inflight[event["timestamp"]]
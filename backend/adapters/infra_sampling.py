@@ -0,0 +1,239 @@
+import os
+import json
+import psutil
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+from backend.adapters.log_tailer import LogTailer, OffsetCheckpointStore
+
+Sample = Tuple[str, Dict[str, float]]  # (source / session id, metrics)
+
+# Counter deltas are summed over a window; every other metric is averaged (+ a *_peak max)
+SUM_METRICS = {"bytes_sent", "bytes_recv", "disk_read_bytes", "disk_write_bytes"}
+
+CPU_SPIKE_THRESHOLD = 80.0
+MEM_SPIKE_THRESHOLD = 90.0
+
+
+def _cpu_busy_percent(prev, cur) -> float:
+    # Same math as psutil.cpu_percent(interval=None), on our own snapshots (no shared global state)
+    idle_prev = prev.idle + getattr(prev, "iowait", 0.0)
+    idle_cur = cur.idle + getattr(cur, "iowait", 0.0)
+    total = sum(cur) - sum(prev)
+    if total <= 0:
+        return 0.0
+    return max(0.0, min(100.0, (total - (idle_cur - idle_prev)) / total * 100.0))
+
+
+class HostSampler:
+    """
+    Whole-host CPU / memory / disk / network from cumulative counters. Never blocks.
+    """
+
+    def __init__(self, source: str = "sys_mon_01", interval: float = 0.5, disk_path: str = "/"):
+        self.source = source
+        self.interval = interval
+        self.disk_path = disk_path
+        self._prev = None
+
+    def sample(self, now: float) -> List[Sample]:
+        cpu, disk, net = psutil.cpu_times(), psutil.disk_io_counters(), psutil.net_io_counters()
+        prev, self._prev = self._prev, (cpu, disk, net)
+        metrics = {
+            "mem_usage": psutil.virtual_memory().percent,
+            "disk_usage": psutil.disk_usage(self.disk_path).percent
+        }
+        if prev is None:
+            return [(self.source, metrics)]  # first call only primes the counters
+
+        metrics["cpu_load"] = _cpu_busy_percent(prev[0], cpu)
+        if disk is not None and prev[1] is not None:
+            metrics["disk_read_bytes"] = max(0, disk.read_bytes - prev[1].read_bytes)
+            metrics["disk_write_bytes"] = max(0, disk.write_bytes - prev[1].write_bytes)
+        if net is not None and prev[2] is not None:
+            metrics["bytes_sent"] = max(0, net.bytes_sent - prev[2].bytes_sent)
+            metrics["bytes_recv"] = max(0, net.bytes_recv - prev[2].bytes_recv)
+        return [(self.source, metrics)]
+
+
+class ProcessSampler:
+    """
+    One process: CPU share (of the whole host) from cpu_times deltas, and memory percent.
+    """
+
+    def __init__(self, pid: int, interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self._proc = psutil.Process(pid)
+        self.source = f"proc_{pid}_{self._proc.name()}"
+        self._prev: Optional[Tuple[float, float]] = None
+        self._cpus = psutil.cpu_count() or 1
+
+    def sample(self, now: float) -> List[Sample]:
+        try:
+            times = self._proc.cpu_times()
+            metrics = {"mem_usage": self._proc.memory_percent()}
+        except psutil.Error:
+            return []  # exited or no longer visible
+        busy = times.user + times.system
+        prev, self._prev = self._prev, (now, busy)
+        if prev is not None and now > prev[0]:
+            metrics["cpu_load"] = min(100.0, (busy - prev[1]) / (now - prev[0]) / self._cpus * 100.0)
+        return [(self.source, metrics)]
+
+
+class CgroupSampler:
+    """
+    One container via its cgroup v2 directory (cpu.stat usage_usec, memory.current / memory.max).
+    """
+
+    def __init__(self, cgroup_path: str, interval: float = 0.5):
+        self.path = cgroup_path
+        self.interval = interval
+        self.source = f"container_{os.path.basename(cgroup_path.rstrip('/'))}"
+        self._prev: Optional[Tuple[float, int]] = None
+        self._cpus = psutil.cpu_count() or 1
+
+    def _read(self, name: str) -> str:
+        with open(os.path.join(self.path, name)) as f:
+            return f.read()
+
+    def sample(self, now: float) -> List[Sample]:
+        try:
+            stat = dict(line.split() for line in self._read("cpu.stat").splitlines() if line.strip())
+            usage_usec = int(stat["usage_usec"])
+            mem_current = int(self._read("memory.current"))
+            mem_max = self._read("memory.max").strip()
+        except (OSError, KeyError, ValueError):
+            return []
+        limit = int(mem_max) if mem_max.isdigit() else psutil.virtual_memory().total
+        metrics = {"mem_usage": mem_current / limit * 100.0 if limit else 0.0}
+        prev, self._prev = self._prev, (now, usage_usec)
+        if prev is not None and now > prev[0]:
+            metrics["cpu_load"] = min(100.0, (usage_usec - prev[1]) / 1e6 / (now - prev[0]) / self._cpus * 100.0)
+        return [(self.source, metrics)]
+
+
+class FileFeedSampler:
+    """
+    Remote-host stand-in: JSON lines appended to a file, e.g.
+    {"source": "edge-07", "cpu_load": 91.5, "mem_usage": 62.0}
+    Tailed with checkpointed offsets, drained on each scheduled pass.
+
+    Offsets are not checkpointed when lines are read: drained samples still
+    have to be windowed and ingested. The collector calls commit_through(t)
+    once every window holding samples drained before t was ingested, so a
+    crash re-reads unprocessed lines (at-least-once).
+    """
+
+    def __init__(self, path: str, interval: float = 0.5, checkpoint_path: Optional[str] = None):
+        self.path = path
+        self.interval = interval
+        self.source = f"feed:{path}"
+        self._buffer: List[Sample] = []
+        self._drained = deque()  # (drained at, file key, offset after the drained lines)
+        self._checkpoints = OffsetCheckpointStore(checkpoint_path or os.getenv(
+            "INFRA_FEED_OFFSETS_PATH", "data/infra_feed_offsets.json"))
+        self._tailer = LogTailer(path, self._on_lines, self._checkpoints, commit_on_deliver=False)
+
+    def _on_lines(self, lines: List[str]):
+        for line in lines:
+            try:
+                record = json.loads(line)
+                source = str(record.pop("source"))
+            except (ValueError, KeyError, AttributeError):
+                continue
+            metrics = {k: float(v) for k, v in record.items() if isinstance(v, (int, float)) and not isinstance(v, bool)}
+            if metrics:
+                self._buffer.append((source, metrics))
+
+    def sample(self, now: float) -> List[Sample]:
+        before = self._tailer.position()
+        self._tailer.step()
+        samples, self._buffer = self._buffer, []
+        position = self._tailer.position()
+        if position != before and position[0] is not None:
+            self._drained.append((now, *position))
+        return samples
+
+    def commit_through(self, until: float):
+        """
+        Checkpoints the offset after the last lines drained before `until`.
+        """
+        latest = None
+        while self._drained and self._drained[0][0] < until:
+            latest = self._drained.popleft()
+        if latest is not None:
+            self._checkpoints.commit(latest[1], latest[2])
+
+
+class WindowAggregator:
+    """
+    Folds samples into fixed, wall-clock-aligned windows per source.
+    A closed window becomes one infra event (means, peaks, summed counters, spike flags).
+    """
+
+    def __init__(self, window_seconds: float = 5.0):
+        self.window_seconds = window_seconds
+        self._windows: Dict[str, Dict[str, Any]] = {}
+
+    def window_start(self, ts: float) -> float:
+        return ts - (ts % self.window_seconds)
+
+    def add(self, source: str, metrics: Dict[str, float], now: float) -> List[Dict[str, Any]]:
+        closed = []
+        start = self.window_start(now)
+        window = self._windows.get(source)
+        if window is not None and window["start"] != start:
+            closed.append(self._to_event(source, self._windows.pop(source)))
+            window = None
+        if window is None:
+            window = self._windows[source] = {"start": start, "samples": 0, "sums": {}, "counts": {}, "peaks": {}}
+        window["samples"] += 1
+        for key, value in metrics.items():
+            window["sums"][key] = window["sums"].get(key, 0.0) + value
+            window["counts"][key] = window["counts"].get(key, 0) + 1
+            window["peaks"][key] = max(window["peaks"].get(key, value), value)
+        return closed
+
+    def flush(self, now: float) -> List[Dict[str, Any]]:
+        """
+        Closes every window that ended at or before `now`.
+        """
+        due = [s for s, w in self._windows.items() if w["start"] + self.window_seconds <= now]
+        return [self._to_event(s, self._windows.pop(s)) for s in due]
+
+    def next_close(self) -> Optional[float]:
+        if not self._windows:
+            return None
+        return min(w["start"] for w in self._windows.values()) + self.window_seconds
+
+    def _to_event(self, source: str, window: Dict[str, Any]) -> Dict[str, Any]:
+        features: Dict[str, Any] = {}
+        for key, total in window["sums"].items():
+            if key in SUM_METRICS:
+                features[key] = total
+            else:
+                features[key] = round(total / window["counts"][key], 2)
+                features[f"{key}_peak"] = round(window["peaks"][key], 2)
+
+        cpu_peak = features.get("cpu_load_peak", 0.0)
+        mem_peak = features.get("mem_usage_peak", 0.0)
+        features["cpu_spike"] = cpu_peak >= CPU_SPIKE_THRESHOLD
+        features["mem_spike"] = mem_peak >= MEM_SPIKE_THRESHOLD
+
+        # Determine Severity
+        severity = "info"
+        if cpu_peak > 80 or mem_peak > 90:
+            severity = "medium"
+        if features.get("cpu_load", 0.0) > 95:
+            severity = "high"
+
+        return {
+            "event_type": "infra",
+            "timestamp": window["start"] + self.window_seconds,
+            "session_id": source,
+            "severity": severity,
+            "window_seconds": self.window_seconds,
+            "samples": window["samples"],
+            "features": features
+        }
@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+READ_CHUNK_SIZE = 1 << 20  # 1 MiB per read() call
+IDLE_SLEEP = 0.25
+ROTATION_GRACE = 5.0  # seconds a rotated-away file's unfinished last line may take to complete
+
+class OffsetCheckpointStore:
+    """
+    Persists byte offsets per file identity (st_dev:st_ino) as a small JSON file.
+    Keyed by inode, not path, so a rotated file keeps its own position.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._offsets: Dict[str, int] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self._offsets = {k: int(v) for k, v in json.load(f).items()}
+            except Exception as e:
+                print(f"[LogTailer] Ignoring unreadable checkpoint file {path}: {e}")
+
+    @staticmethod
+    def file_key(st: os.stat_result) -> str:
+        return f"{st.st_dev}:{st.st_ino}"
+
+    def get(self, key: str) -> Optional[int]:
+        with self._lock:
+            return self._offsets.get(key)
+
+    def commit(self, key: str, offset: int, forget: Optional[str] = None):
+        with self._lock:
+            self._offsets[key] = offset
+            if forget is not None and forget != key:
+                # Fully drained rotated-away file: it is never read again
+                self._offsets.pop(forget, None)
+            tmp = f"{self.path}.tmp"
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp, "w") as f:
+                json.dump(self._offsets, f)
+            os.replace(tmp, self.path)  # atomic: a crash never leaves a half-written checkpoint
+
+
+class LogTailer:
+    """
+    Follows one log file: chunked binary reads, many lines per pass,
+    checkpointed offsets, rotation (rename + create) and copytruncate handling.
+
+    on_lines(lines) receives a list of decoded complete lines; the offset after
+    that batch is checkpointed only once the callback returns (at-least-once).
+    With commit_on_deliver=False the caller checkpoints later itself, using
+    position() and checkpoints.commit(), once the lines are actually processed.
+    """
+
+    def __init__(self, path: str, on_lines: Callable[[List[str]], None], checkpoints: OffsetCheckpointStore,
+                 batch_lines: int = 5000, start_at_end: bool = True, commit_on_deliver: bool = True):
+        self.path = path
+        self.on_lines = on_lines
+        self.checkpoints = checkpoints
+        self.batch_lines = batch_lines
+        self.start_at_end = start_at_end
+        self.commit_on_deliver = commit_on_deliver
+        self._stop_event = threading.Event()
+        self._file = None
+        self._key: Optional[str] = None
+        self._offset = 0
+        self._carry = b""
+        self._rotated_at: Optional[float] = None
+
+    def stop(self):
+        self._stop_event.set()
+
+    def position(self) -> Tuple[Optional[str], int]:
+        """
+        (file key, offset) just after the last delivered line.
+        """
+        return self._key, self._offset
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                if self.step() == 0:
+                    self._stop_event.wait(IDLE_SLEEP)
+            except Exception as e:
+                print(f"[LogTailer] Error tailing {self.path}: {e}")
+                self._close()
+                self._stop_event.wait(IDLE_SLEEP)
+        self._close()
+
+    def step(self) -> int:
+        """
+        One non-blocking pass for callers with their own scheduler: read, or check rotation when idle.
+        """
+        delivered = self.poll()
+        if delivered == 0 and self._file is not None:
+            self._check_rotation()
+        return delivered
+
+    def poll(self) -> int:
+        """
+        Reads everything currently available; returns the number of lines delivered.
+        """
+        if self._file is None and not self._open():
+            return 0
+        delivered = 0
+        pending: List[str] = []
+        while True:
+            chunk = self._file.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            data = self._carry + chunk
+            cut = data.rfind(b"\n")
+            if cut < 0:
+                self._carry = data
+                continue
+            self._carry = data[cut + 1:]
+            pending.extend(data[:cut].decode("utf-8", errors="replace").split("\n"))
+            end_offset = self._file.tell() - len(self._carry)
+            if len(pending) >= self.batch_lines:
+                delivered += self._deliver(pending, end_offset)
+                pending = []
+        if pending:
+            delivered += self._deliver(pending, self._file.tell() - len(self._carry))
+        return delivered
+
+    def _deliver(self, lines: List[str], end_offset: int) -> int:
+        self.on_lines(lines)
+        self._offset = end_offset
+        if self.commit_on_deliver:
+            self.checkpoints.commit(self._key, end_offset)
+        return len(lines)
+
+    def _open(self) -> bool:
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return False
+        st = os.fstat(f.fileno())
+        key = OffsetCheckpointStore.file_key(st)
+        saved = self.checkpoints.get(key)
+        if saved is not None and saved <= st.st_size:
+            offset = saved
+        elif saved is None and self.start_at_end and self._key is None:
+            offset = st.st_size  # first ever start: only new lines, like `tail -f`
+        else:
+            offset = 0  # rotated-in file, or truncated below the checkpoint
+        f.seek(offset)
+        self._file, self._key, self._offset, self._carry = f, key, offset, b""
+        return True
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+
+    def _check_rotation(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return  # rotated away, new file not created yet
+        current = os.fstat(self._file.fileno())
+        if (st.st_dev, st.st_ino) != (current.st_dev, current.st_ino):
+            # Rename rotation: drain what was appended to the old fd, then switch files
+            self.poll()
+            if self._carry:
+                # The writer may still finish its last line on the old inode
+                now = time.monotonic()
+                if self._rotated_at is None:
+                    self._rotated_at = now
+                if now - self._rotated_at < ROTATION_GRACE:
+                    return
+                # Never completed: deliver it as the old file's final line
+                self._deliver([self._carry.decode("utf-8", errors="replace")], self._offset + len(self._carry))
+                self._carry = b""
+            self._rotated_at = None
+            old_key = self._key
+            self._close()
+            self._open()
+            self.checkpoints.commit(self._key, self._offset, forget=old_key)
+        elif st.st_size < self._offset:
+            # copytruncate rotation: same inode, restarted from zero
+            self._file.seek(0)
+            self._offset, self._carry = 0, b""
+            self.checkpoints.commit(self._key, 0)
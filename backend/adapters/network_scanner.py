@@ -1,127 +1,232 @@
+import io
 import subprocess
+import tempfile
+import threading
 import xml.etree.ElementTree as ET
 import time
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+from flask import current_app, has_app_context
 from backend.services.ingestion_service import IngestionService
 from backend.utils.logger import log_error, log_info
 
+SCAN_TIMEOUT = 300
+CRITICAL_PORTS = {21, 22, 23, 3389, 445}
+
 class NetworkScanner:
     """
     Adapter for Nmap network scanning.
     Supports Fast, Port, and Full scan modes.
     Normalizes output for the Ingestion Service.
+
+    nmap's XML is parsed as a stream (iterparse) straight from the subprocess pipe:
+    each host is ingested as soon as its </host> closes and its elements are freed,
+    so memory stays bounded by one host even for subnet-wide -p- scans.
     """
-    
+
     @staticmethod
     def _check_nmap():
         return shutil.which("nmap") is not None
 
     @staticmethod
-    def scan_network(target, mode="fast"):
+    def _build_cmd(target, mode):
+        cmd = ["nmap", "-sS", "-oX", "-"]
+
+        if mode == "fast":
+            cmd.append("-F")
+        elif mode == "port":
+            cmd.extend(["-p", "1-10000"])
+        elif mode == "full":
+            cmd.append("-p-")
+        else:
+            cmd.append("-F") # Default to fast
+
+        cmd.append(target)
+        return cmd
+
+    @staticmethod
+    def scan_network(target: Union[str, List[str]], mode="fast", workers: int = 1,
+                     sink: Optional[Callable[[Dict[str, Any]], Any]] = None, app=None):
         """
-        Runs Nmap scan on target.
+        Runs Nmap scan on target (or several target ranges, `workers` subprocesses at a time).
         Modes:
         - fast: -F (Top 100 ports)
         - port: -p 1-10000 (Common range)
         - full: -p- (All 65535 ports - Slow)
+        Worker threads run in `app`'s context (default: the caller's current
+        app), so the default sink can persist.
         """
         if not NetworkScanner._check_nmap():
             log_error("Nmap not found", "Ensure nmap is installed and in PATH")
             return {"error": "Nmap not installed"}
 
-        cmd = ["nmap", "-sS", "-oX", "-"]
-        
-        if mode == "fast":
-            cmd.append("-F")
-        elif mode == "port":
-            cmd.extend(["-p", "1-10000"])
-        elif mode == "full":
-            cmd.append("-p-")
+        targets = [target] if isinstance(target, str) else list(target)
+        if len(targets) == 1 or workers <= 1:
+            results = [NetworkScanner._scan_one(t, mode, sink) for t in targets]
         else:
-            cmd.append("-F") # Default to fast
-            
-        cmd.append(target)
-        
+            if app is None and has_app_context():
+                app = current_app._get_current_object()
+
+            def _scan(t):
+                if app is None:
+                    return NetworkScanner._scan_one(t, mode, sink)
+                with app.app_context():
+                    return NetworkScanner._scan_one(t, mode, sink)
+
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="NmapScan") as pool:
+                results = list(pool.map(_scan, targets))
+
+        if len(results) == 1:
+            return results[0]
+        return NetworkScanner._merge_results(results)
+
+    @staticmethod
+    def scan_file(path: str, mode="fast", sink: Optional[Callable[[Dict[str, Any]], Any]] = None):
+        """
+        Ingests a recorded `nmap -oX` file through the same streaming parser (replays / tests).
+        """
+        try:
+            with open(path, "rb") as f:
+                return NetworkScanner._consume(f, mode, sink)
+        except OSError as e:
+            log_error("Nmap XML file error", str(e))
+            return {"error": str(e)}
+
+    @staticmethod
+    def _scan_one(target, mode, sink):
+        cmd = NetworkScanner._build_cmd(target, mode)
         log_info(f"Starting Nmap scan: {' '.join(cmd)}")
-        
+
         try:
-            # Run blocking for now, but in a real worker this is fine.
-            # For the UI non-blocking requirement, the Route that calls this MUST use a thread.
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-            
-            if result.returncode != 0:
-                log_error("Nmap failed", result.stderr)
-                return {"error": "Scan failed", "details": result.stderr}
-                
-            return NetworkScanner._parse_nmap_xml(result.stdout, mode, target)
-            
-        except subprocess.TimeoutExpired:
-            log_error("Nmap timeout", f"Scan mode {mode} timed out on {target}")
-            return {"error": "Scan timed out"}
+            with tempfile.TemporaryFile() as stderr:
+                proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr)
+                timed_out = threading.Event()
+                def _kill():
+                    timed_out.set()
+                    proc.kill()
+                timer = threading.Timer(SCAN_TIMEOUT, _kill)
+                timer.start()
+                try:
+                    summary = NetworkScanner._consume(proc.stdout, mode, sink)
+                    proc.stdout.close()
+                    returncode = proc.wait()
+                finally:
+                    timer.cancel()
+                    if proc.poll() is None:
+                        # The sink raised mid-stream: stop nmap and reap it rather than leak the process
+                        proc.kill()
+                        proc.stdout.close()
+                        proc.wait()
+
+                if timed_out.is_set():
+                    log_error("Nmap timeout", f"Scan mode {mode} timed out on {target}")
+                    return {"error": "Scan timed out", "partial": summary}
+                if returncode != 0:
+                    stderr.seek(0)
+                    details = stderr.read().decode(errors="replace")
+                    log_error("Nmap failed", details)
+                    return {"error": "Scan failed", "details": details, "partial": summary}
+                return summary
+
         except Exception as e:
             log_error("Nmap execution error", str(e))
             return {"error": str(e)}
 
     @staticmethod
-    def _parse_nmap_xml(xml_content, mode, target):
+    def _consume(stream, mode, sink) -> Dict[str, Any]:
+        sink = sink or IngestionService.ingest_network_event
+        hosts = []
         try:
-            root = ET.fromstring(xml_content)
-            events = []
-            
-            for host in root.findall("host"):
-                address = host.find("address").get("addr")
-                if not address: continue
-                
-                ports = []
-                open_ports = []
-                
-                ports_elem = host.find("ports")
-                if ports_elem:
-                    for port in ports_elem.findall("port"):
-                        portid = int(port.get("portid"))
-                        state = port.find("state").get("state")
-                        service_elem = port.find("service")
-                        service = service_elem.get("name") if service_elem is not None else "unknown"
-                        
-                        ports.append({"port": portid, "state": state, "service": service})
-                        if state == "open":
-                            open_ports.append(portid)
-                
-                # Determine Severity based on Open Ports
-                severity = "info"
-                if len(open_ports) > 0: severity = "low"
-                if len(open_ports) > 10: severity = "medium"
-                
-                # Check for critical ports
-                critical_ports = {21, 22, 23, 3389, 445}
-                if set(open_ports).intersection(critical_ports):
-                    severity = "high"
-
-                # Payload Construction
-                feature_payload = {
-                    "scan_type": mode,
-                    "target": address,
-                    "total_ports_scanned": "100" if mode == "fast" else ("10000" if mode == "port" else "65535"),
-                    "open_port_count": len(open_ports),
-                    "open_ports": open_ports,
-                    "details": ports
-                }
-                
-                # Ingest Event
-                event = {
-                    "event_type": "network",
-                    "timestamp": time.time(),
-                    "session_id": f"net_scan_{address}",
-                    "severity": severity,
-                    "features": feature_payload
-                }
-                
+            for event in NetworkScanner.iter_host_events(stream, mode):
                 # Emit
-                IngestionService.ingest_network_event(event) # This puts it into SessionState
-                events.append(event)
-                
-            return {"status": "success", "scanned_hosts": len(events), "events": events}
-
+                sink(event) # This puts it into SessionState
+                features = event["features"]
+                hosts.append({"target": features["target"], "severity": event["severity"],
+                              "open_ports": features["open_ports"]})
         except ET.ParseError as e:
             log_error("Nmap XML Parse Error", str(e))
-            return {"error": "Failed to parse Nmap output"}
+            return {"error": "Failed to parse Nmap output", "scanned_hosts": len(hosts), "hosts": hosts}
+        return {"status": "success", "scanned_hosts": len(hosts), "hosts": hosts}
+
+    @staticmethod
+    def iter_host_events(stream, mode) -> Iterator[Dict[str, Any]]:
+        """
+        Yields one network event per <host>, freeing parsed elements as it goes.
+        """
+        root = None
+        ports_elem = None
+        ports: List[Dict[str, Any]] = []
+        for kind, elem in ET.iterparse(stream, events=("start", "end")):
+            if kind == "start":
+                if root is None:
+                    root = elem
+                elif elem.tag == "ports":
+                    ports_elem = elem
+                continue
+
+            if elem.tag == "port":
+                state_elem = elem.find("state")
+                service_elem = elem.find("service")
+                ports.append({
+                    "port": int(elem.get("portid")),
+                    "state": state_elem.get("state") if state_elem is not None else "unknown",
+                    "service": service_elem.get("name") if service_elem is not None else "unknown"
+                })
+                if ports_elem is not None:
+                    ports_elem.remove(elem)
+            elif elem.tag == "host":
+                address_elem = elem.find("address")
+                address = address_elem.get("addr") if address_elem is not None else None
+                host_ports, ports, ports_elem = ports, [], None
+                # Drop the finished host (and any other completed top-level elements)
+                elem.clear()
+                root.clear()
+                if address:
+                    yield NetworkScanner._host_event(address, host_ports, mode)
+
+    @staticmethod
+    def _host_event(address, ports, mode) -> Dict[str, Any]:
+        open_ports = [p["port"] for p in ports if p["state"] == "open"]
+
+        # Determine Severity based on Open Ports
+        severity = "info"
+        if len(open_ports) > 0: severity = "low"
+        if len(open_ports) > 10: severity = "medium"
+
+        # Check for critical ports
+        if CRITICAL_PORTS.intersection(open_ports):
+            severity = "high"
+
+        # Payload Construction
+        feature_payload = {
+            "scan_type": mode,
+            "target": address,
+            "total_ports_scanned": "100" if mode == "fast" else ("10000" if mode == "port" else "65535"),
+            "open_port_count": len(open_ports),
+            "open_ports": open_ports,
+            "details": ports
+        }
+
+        # Ingest Event
+        return {
+            "event_type": "network",
+            "timestamp": time.time(),
+            "session_id": f"net_scan_{address}",
+            "severity": severity,
+            "features": feature_payload
+        }
+
+    @staticmethod
+    def _merge_results(results) -> Dict[str, Any]:
+        hosts = [h for r in results for h in r.get("hosts", r.get("partial", {}).get("hosts", []))]
+        errors = [r["error"] for r in results if "error" in r]
+        merged = {"status": "success" if not errors else "partial", "scanned_hosts": len(hosts), "hosts": hosts}
+        if errors:
+            merged["errors"] = errors
+        return merged
+
+    @staticmethod
+    def _parse_nmap_xml(xml_content, mode, target):
+        data = xml_content.encode() if isinstance(xml_content, str) else xml_content
+        return NetworkScanner._consume(io.BytesIO(data), mode, None)
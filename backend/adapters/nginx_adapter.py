@@ -1,75 +1,105 @@
-import time
 import re
 import os
 import threading
-from datetime import datetime
+from typing import Dict, Any, List, Optional
 from backend.services.ingestion_service import IngestionService
+from backend.adapters.log_tailer import LogTailer, OffsetCheckpointStore
 
 class NginxAdapter:
     """
     Tails NGINX access logs and converts them to Security Events.
     Run run() in a separate thread.
+
+    One LogTailer thread per file: chunked reads, per-inode offset checkpoints
+    (restarts resume where they stopped), rotation handling, and parsed events
+    handed to IngestionService in batches.
     """
-    
+
     # Combined Log Format Regex (Standard)
     # 127.0.0.1 - - [01/Feb/2026:10:00:00 +0000] "GET /path HTTP/1.1" 200 123 "referer" "user-agent"
     LOG_PATTERN = re.compile(
         r'(?P<ip>[\d\.]+) - - \[(?P<timestamp>.*?)\] "(?P<method>\w+) (?P<path>.*?) HTTP/.*?" (?P<status>\d+) (?P<bytes>\d+) "(?P<referer>.*?)" "(?P<ua>.*?)"'
     )
 
-    def __init__(self, log_path="/var/log/nginx/access.log"):
-        self.log_path = log_path
+    CHECKPOINT_PATH = os.getenv("NGINX_OFFSETS_PATH", "data/nginx_offsets.json")
+
+    def __init__(self, log_path="/var/log/nginx/access.log", log_paths: Optional[List[str]] = None,
+                 checkpoint_path: Optional[str] = None, batch_lines: int = 5000):
+        self.log_paths = list(log_paths) if log_paths else [log_path]
+        self.log_path = self.log_paths[0]
+        self.checkpoints = OffsetCheckpointStore(checkpoint_path or self.CHECKPOINT_PATH)
+        self.tailers = [
+            LogTailer(path, self._process_lines, self.checkpoints, batch_lines=batch_lines)
+            for path in self.log_paths
+        ]
         self._stop_event = threading.Event()
 
     def start(self):
-        """Starts the tailing thread."""
-        thread = threading.Thread(target=self._tail_log, daemon=True)
-        thread.start()
-        print(f"[NginxAdapter] Monitoring started: {self.log_path}")
+        """Starts one tailing thread per log file."""
+        for tailer in self.tailers:
+            thread = threading.Thread(target=tailer.run, name=f"NginxTail-{tailer.path}", daemon=True)
+            thread.start()
+        print(f"[NginxAdapter] Monitoring started: {', '.join(self.log_paths)}")
 
     def stop(self):
         self._stop_event.set()
+        for tailer in self.tailers:
+            tailer.stop()
 
-    def _tail_log(self):
-        # Open file. If not exists, wait.
-        while not os.path.exists(self.log_path) and not self._stop_event.is_set():
-            time.sleep(5)
-            
-        try:
-            with open(self.log_path, 'r') as f:
-                # Go to end of file
-                f.seek(0, 2)
-                
-                while not self._stop_event.is_set():
-                    line = f.readline()
-                    if not line:
-                        time.sleep(0.1)
-                        continue
-                        
-                    self._process_line(line)
-        except Exception as e:
-            print(f"[NginxAdapter] Error tailing log: {e}")
+    def _process_lines(self, lines: List[str]):
+        payloads = [p for p in map(self.parse_line, lines) if p is not None]
+        if payloads:
+            IngestionService.ingest_http_batch(payloads)
 
     def _process_line(self, line):
-        match = self.LOG_PATTERN.match(line)
-        if not match:
+        payload = self.parse_line(line)
+        if payload is None:
             return # Malformed or non-matching line (e.g. error log mixed in)
-            
+        IngestionService.ingest_http_event(payload)
+
+    @classmethod
+    def parse_line(cls, line: str) -> Optional[Dict[str, Any]]:
+        """
+        Fast path: str.partition/split over the fixed combined-format layout.
+        Anything unusual falls back to LOG_PATTERN.
+        """
+        try:
+            ip, sep, rest = line.partition(" - - [")
+            ts_end = rest.index('] "')
+            req_end = rest.index('" ', ts_end + 3)
+            method, _, target = rest[ts_end + 3:req_end].partition(" ")
+            path, http_sep, _ = target.rpartition(" HTTP/")
+            status, size, tail = rest[req_end + 2:].split(" ", 2)
+            referer, ua_sep, ua = tail.partition('" "')
+            ua = ua.rstrip()
+            if not (sep and http_sep and ua_sep and method.isalpha() and status.isdigit()
+                    and size.isdigit() and tail.startswith('"') and ua.endswith('"')):
+                return cls._parse_slow(line)
+            # Parse timestamp (e.g. 01/Feb/2026:10:00:00 +0000)
+            # For simplicity, we can trust system time or try to parse.
+            # Using ingestion service timestamp is safer for "arrival time".
+            return cls._to_payload(ip, method, path, status, size, referer[1:], ua[:-1])
+        except ValueError:
+            return cls._parse_slow(line)
+
+    @classmethod
+    def _parse_slow(cls, line: str) -> Optional[Dict[str, Any]]:
+        match = cls.LOG_PATTERN.match(line)
+        if not match:
+            return None
         data = match.groupdict()
-        
-        # Parse timestamp (e.g. 01/Feb/2026:10:00:00 +0000)
-        # For simplicity, we can trust system time or try to parse. 
-        # Using ingestion service timestamp is safer for "arrival time".
-        
-        payload = {
-            "method": data["method"],
-            "path": data["path"],
-            "status_code": int(data["status"]),
+        return cls._to_payload(data["ip"], data["method"], data["path"], data["status"],
+                               data["bytes"], data["referer"], data["ua"])
+
+    @staticmethod
+    def _to_payload(ip, method, path, status, size, referer, ua) -> Dict[str, Any]:
+        return {
+            "method": method,
+            "path": path,
+            "status_code": int(status),
             "response_time_ms": 0, # Not in std combined log, usually request_time in custom format
-            "payload_size": int(data["bytes"]),
-            "user_agent": data["ua"],
-            "ip_address": data["ip"],
-            "referer": data["referer"]
+            "payload_size": int(size),
+            "user_agent": ua,
+            "ip_address": ip,
+            "referer": referer
         }
-        
-        IngestionService.ingest_http_event(payload)
@@ -0,0 +1,68 @@
+import os
+import time
+import threading
+from collections import deque
+from typing import Dict, Any, Optional
+
+from backend.adaptive_policy.engine import AdaptivePolicyEngine
+from backend.ml.side_channel import SideChannelExecutor, PHASE4_LANE
+
+INTERVAL_SEC = float(os.getenv("POLICY_SIMULATION_INTERVAL_SEC", "60"))
+MAX_SAMPLES = int(os.getenv("POLICY_SIMULATION_MAX_SAMPLES", "1000"))
+
+class PolicySimulationBatcher:
+    """
+    Collects per-inference feature samples and runs the adaptive-policy
+    simulation over the whole batch at most once per INTERVAL_SEC, instead
+    of two full simulations (and a new proposal) per inference.
+    Only the newest MAX_SAMPLES samples are kept between runs.
+    """
+    _samples = deque(maxlen=MAX_SAMPLES)
+    _thresholds: Optional[tuple] = None
+    _last_scheduled = 0.0
+    _stats = {"samples": 0, "runs": 0}
+    _lock = threading.Lock()
+
+    @classmethod
+    def add(cls, features: Dict[str, Any], current: Dict[str, float], proposed: Dict[str, float],
+            now: Optional[float] = None) -> bool:
+        """
+        Buffers a sample. Returns True if this call scheduled a simulation run.
+        """
+        now = time.monotonic() if now is None else now
+        with cls._lock:
+            cls._samples.append(features)
+            cls._thresholds = (current, proposed)
+            cls._stats["samples"] += 1
+            if now - cls._last_scheduled < INTERVAL_SEC:
+                return False
+            cls._last_scheduled = now
+        return SideChannelExecutor.fire_and_forget(
+            "policy_simulation", cls.run, _priority=PHASE4_LANE, _coalesce_key=("policy_simulation",)
+        )
+
+    @classmethod
+    def run(cls):
+        with cls._lock:
+            batch = list(cls._samples)
+            cls._samples.clear()
+            thresholds = cls._thresholds
+        if not batch or thresholds is None:
+            return None
+        proposal = AdaptivePolicyEngine.create_proposal(thresholds[0], thresholds[1], batch)
+        with cls._lock:
+            cls._stats["runs"] += 1
+        return proposal
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        with cls._lock:
+            return dict(cls._stats, buffered=len(cls._samples))
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._samples.clear()
+            cls._thresholds = None
+            cls._last_scheduled = 0.0
+            cls._stats = {"samples": 0, "runs": 0}
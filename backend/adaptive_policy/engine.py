@@ -40,6 +40,14 @@ class AdaptivePolicyEngine:
         # 3. Estimate Impact
         impact = ImpactEstimator.estimate_impact(baseline_stats, proposed_stats)
         
+        # Same change still awaiting review: refresh its impact instead of stacking a duplicate
+        for p in cls._proposals:
+            if (p.status == ProposalStatus.PENDING and
+                p.current_value == current_thresholds and
+                p.proposed_value == proposed_thresholds):
+                p.simulated_impact = impact
+                return p
+        
         # 4. Generate Proposal
         proposal = PolicyProposal(
             change_type="threshold",
@@ -15,7 +15,9 @@ class Simulator:
         Returns stats on decisions under new policy.
         """
         # LAZY IMPORT to avoid circular dependency with inference_pipeline
-        from backend.ml.inference_pipeline import PolicyEngine
+        from backend.ml.decision.policy_engine import PolicyEngine
+        # Partial proposals (e.g. MONITOR/RESTRICT only) keep the live values for the rest
+        new_thresholds = {**PolicyEngine.THRESHOLDS, **new_thresholds}
 
         stats = {
             "ALLOW": 0,
@@ -1,6 +1,7 @@
 from typing import List, Literal, Optional
 from pydantic import BaseModel
 from backend.config import Config
+from backend.llm.advisory_service import AdvisoryService
 import os
 
 class AdvisoryOutput(BaseModel):
@@ -16,11 +17,7 @@ class LLMAdvisor:
     """
     
     @staticmethod
-    def get_advice(context: dict) -> AdvisoryOutput:
-        api_key = os.getenv("LLM_API_KEY")
-        
-    @staticmethod
-    def get_advice(context: dict) -> AdvisoryOutput:
+    def get_advice(context: dict, deadline: Optional[float] = None) -> AdvisoryOutput:
         api_key = os.getenv("LLM_API_KEY")
         
         # 🔴 BLOCKER 6 – LLM Guard Mode
@@ -41,12 +38,18 @@ class LLMAdvisor:
                 "advisory_only": True
             }
 
-        # 2. Call LLM (Stub for now, but strict schema enforcement)
+        # 2. Call LLM via the cached, deadline-bounded advisory service
         try:
-            # response = llm_client.chat(...)
-            # parsed = parser.parse(response)
-            # return AdvisoryOutput(**parsed)
-            raise NotImplementedError("LLM Integration Pending")
+            advice = AdvisoryService.get_advice(context, deadline=deadline)
+            if "reason" in advice:
+                # Service fell back (deadline / backend error / schema violation)
+                raise RuntimeError(advice["reason"])
+            return AdvisoryOutput(
+                summary=advice["risk_summary"],
+                recommended_actions=advice["recommended_actions"],
+                confidence=advice["confidence"],
+                source="LLM"
+            )
             
         except Exception:
             # 3. Fail Safe (Never crash)
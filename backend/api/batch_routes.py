@@ -6,6 +6,7 @@ from backend.core.recommendationEngine import RecommendationEngine
 from backend.extensions import socketio
 from backend.auth.decorators import require_access
 from backend.contracts.enums import Role
+from backend.platform_core.tenant_admission import TenantAdmission, resolve_tenant
 import pandas as pd
 import threading
 import uuid
@@ -15,7 +16,7 @@ import hashlib
 
 batch_bp = Blueprint('batch_v4', __name__)
 
-def process_batch_job(app, batch_id, user_id):
+def process_batch_job(app, batch_id, user_id, tenant_id="default"):
     """
     Background worker for processing a batch job.
     """
@@ -50,6 +51,8 @@ def process_batch_job(app, batch_id, user_id):
             all_results = []
 
             for sid, events in session_groups.items():
+                # Throttled to the tenant's ingestion rate so a large upload can't crowd out live traffic
+                TenantAdmission.acquire(tenant_id, cost=len(events))
                 print(f"[BATCH WORKER] Processing session {sid}")
                 # A. Feature Extraction
                 try:
@@ -236,7 +239,7 @@ def upload_batch():
         
         # Trigger Background Processing
         app_obj = current_app._get_current_object()
-        thread = threading.Thread(target=process_batch_job, args=(app_obj, job_id, user_id))
+        thread = threading.Thread(target=process_batch_job, args=(app_obj, job_id, user_id, resolve_tenant()))
         thread.start()
         
         return jsonify({
@@ -4,8 +4,8 @@ from backend.middleware.security_logger import log_security_event
 
 behavior_bp = Blueprint("behavior", __name__)
 
-import requests
 from backend.db.models import Session
+from backend.enforcement.termination_dispatcher import TerminationDispatcher
 from backend.extensions import db
 
 @behavior_bp.before_request
@@ -56,14 +56,10 @@ def mouse_behavior():
             session_id=session_id
         )
         try:
-            # Hit Target App's enforcement hook
-            requests.post(
-                "http://localhost:3001/api/terminate",
-                json={"session_id": session_id},
-                timeout=1.0
-            )
+            # Target App's enforcement hook, delivered by the outbox dispatcher
+            TerminationDispatcher.enqueue(session_id, reason=f"Bot behavior (p={bot_prob:.2f})")
         except Exception as e:
-            print(f"Failed to trigger Target App termination: {e}")
+            print(f"Failed to queue Target App termination: {e}")
 
     return jsonify({
         "status": "success",
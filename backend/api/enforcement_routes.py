@@ -3,15 +3,13 @@ from backend.auth.rbac import require_role
 from backend.db.models import Session
 from backend.extensions import db, socketio
 from backend.audit.audit_logger import AuditLogger
-import requests
+from backend.enforcement.termination_dispatcher import TerminationDispatcher
 import time
 import logging
 
 enforcement_bp = Blueprint('enforcement', __name__)
 logger = logging.getLogger(__name__)
 
-TARGET_APP_WEBHOOK = "http://localhost:3001/api/terminate"
-
 @enforcement_bp.route('/terminate_session', methods=['POST'])
 @require_role(['ADMIN', 'ANALYST'])
 def terminate_session():
@@ -72,23 +70,13 @@ def terminate_session():
         namespace="/"
     )
     
-    # 4. Resilience: Webhook to Target App
-    webhook_status = "pending"
+    # 4. Resilience: Webhook to Target App via the durable outbox (retried with backoff)
+    webhook_status = "queued"
     try:
-        # Circuit breaker / Timeout
-        resp = requests.post(
-            TARGET_APP_WEBHOOK,
-            json={"session_id": session_id},
-            timeout=3.0
-        )
-        if resp.status_code == 200:
-            webhook_status = "success"
-        else:
-            webhook_status = f"failed_with_{resp.status_code}"
-            logger.warning(f"Target app web hook failed: {resp.text}")
-    except requests.exceptions.RequestException as e:
-        webhook_status = "unreachable"
-        logger.error(f"Target App unreachable for termination webhook: {e}")
+        TerminationDispatcher.enqueue(session_id, reason="Manual SOC enforcement")
+    except Exception as e:
+        webhook_status = "not_queued"
+        logger.error(f"Failed to queue termination webhook: {e}")
         
     return jsonify({
         "status": "success",
@@ -133,7 +121,6 @@ def terminate_user(user_id):
         }), 200
 
     terminated_count = 0
-    failed_webhooks = 0
     
     # Collect all SIDs to terminate
     sids_to_terminate = set([s.session_id for s in session_records] + memory_sids + ui_targeted_sids)
@@ -151,25 +138,12 @@ def terminate_user(user_id):
             namespace="/"
         )
         
-        try:
-            resp = requests.post(
-                TARGET_APP_WEBHOOK,
-                json={"session_id": sid},
-                timeout=2.0
-            )
-            if resp.status_code != 200:
-                failed_webhooks += 1
-        except:
-            failed_webhooks += 1
-            
+        # Outbox rows commit together with the quarantine below
+        TerminationDispatcher.enqueue(sid, reason=f"User quarantine: {user_id}", commit=False)
         terminated_count += 1
 
-    from backend.db.models import User
-    user_record = User.query.filter_by(username=user_id).first() or \
-                  User.query.filter_by(user_id=user_id).first()
-    
-    if user_record:
-        user_record.password_reset_required = True
+    from backend.services.identity_cache import force_password_reset
+    force_password_reset([user_id])
 
     db.session.commit()
     
@@ -189,6 +163,27 @@ def terminate_user(user_id):
         "status": "success",
         "user_id": user_id,
         "sessions_terminated": terminated_count,
-        "failed_webhooks": failed_webhooks,
+        "webhooks_queued": terminated_count,
         "message": f"Global quarantine executed. {terminated_count} sessions terminated."
     }), 200
+
+@enforcement_bp.route('/outbox', methods=['GET'])
+@require_role(['ADMIN'])
+def termination_outbox():
+    """
+    Termination webhook outbox: counts by status and the latest dead letters.
+    """
+    return jsonify({
+        "counts": TerminationDispatcher.stats(),
+        "dead_letters": TerminationDispatcher.dead_letters(limit=int(request.args.get("limit", 100)))
+    }), 200
+
+@enforcement_bp.route('/outbox/retry', methods=['POST'])
+@require_role(['ADMIN'])
+def retry_termination_outbox():
+    """
+    Re-queues dead-lettered terminations (all, or {"ids": [...]}).
+    """
+    ids = (request.json or {}).get("ids") if request.is_json else None
+    requeued = TerminationDispatcher.retry_dead(ids)
+    return jsonify({"status": "success", "requeued": requeued}), 200
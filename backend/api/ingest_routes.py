@@ -44,11 +44,10 @@ def ingest(domain):
     db.session.add(new_event)
 
     update_session(event_contract.session_id, event_contract.actor_id)
-    
-    # Trigger Incident Engine (Phase 1)
+    db.session.commit()
+
+    # Trigger Incident Engine (Phase 1) once the session row is committed (Signal FK)
     from backend.incidents.incident_manager import IncidentManager
     IncidentManager.correlate(data)
-    
-    db.session.commit()
 
     return jsonify({"status": "accepted"}), 202
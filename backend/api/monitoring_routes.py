@@ -1,5 +1,8 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response
 from backend.monitoring.consumers.domain_consumer import DomainConsumer
+from backend.monitoring.stage_metrics import StageMetrics
+from backend.auth.decorators import require_access
+from backend.contracts.enums import Role
 
 monitoring_bp = Blueprint("monitoring", __name__)
 
@@ -25,21 +28,73 @@ def ingest_event():
     try:
         event = consumer.process_event(data)
         if event:
-             return jsonify({"status": "success", "event_id": str(event.id)}), 200
+             return jsonify({"status": "success", "event_id": event["id"]}), 200
         else:
              return jsonify({"error": "Processing failed"}), 500
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @monitoring_bp.route("/metrics", methods=["GET"])
 def metrics():
     """
-    Expose Prometheus metrics (Stub).
+    Prometheus text exposition: per-stage latency histograms, event/decision/error counters.
     """
-    # In a real app, use prometheus_client.generate_latest()
-    return jsonify({
-        "web_events": 100,
-        "api_events": 50,
-        "network_events": 200,
-        "system_events": 10
-    })
+    return Response(StageMetrics.render(), mimetype="text/plain; version=0.0.4")
+
+@monitoring_bp.route("/metrics/domains", methods=["GET"])
+def domain_metrics():
+    """
+    Stored monitoring events per domain (partition-aware cached counts) plus sink buffer stats.
+    """
+    from backend.monitoring.event_sink import MonitoringEventSink
+    counts = MonitoringEventSink.domain_counts()
+    counts["sink"] = MonitoringEventSink.stats()
+    return jsonify(counts)
+
+@monitoring_bp.route("/metrics/config", methods=["GET", "POST"])
+@require_access(role=Role.ADMIN)
+def metrics_config():
+    """
+    Sampling controls: {"enabled": bool, "sample_rate": 0..1}.
+    """
+    if request.method == "GET":
+        return jsonify(StageMetrics.configure())
+    data = request.get_json(silent=True) or {}
+    try:
+        sample_rate = data.get("sample_rate")
+        return jsonify(StageMetrics.configure(
+            enabled=data.get("enabled"),
+            sample_rate=float(sample_rate) if sample_rate is not None else None
+        ))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+@monitoring_bp.route("/tenants/admission", methods=["GET"])
+@require_access(role=Role.ADMIN)
+def tenant_admission_stats():
+    """
+    Per-tenant admission: accepted / shed / queued counts, queue depth, bucket tokens.
+    """
+    from backend.platform_core.tenant_admission import TenantAdmission
+    return jsonify(TenantAdmission.stats())
+
+@monitoring_bp.route("/side-channel", methods=["GET"])
+def side_channel_metrics():
+    """
+    Phase-3/4 side-channel executor: queue depth, shed/coalesced counts, policy-simulation batching.
+    """
+    from backend.ml.side_channel import SideChannelExecutor
+    from backend.adaptive_policy.batcher import PolicySimulationBatcher
+    metrics = SideChannelExecutor.get_metrics()
+    metrics["policy_simulation"] = PolicySimulationBatcher.stats()
+    return jsonify(metrics)
+
+@monitoring_bp.route("/orchestration", methods=["GET"])
+def orchestration_metrics():
+    """
+    Orchestration dispatcher health: per-lane queue depth, wait time, shed/coalesced counts.
+    """
+    from backend.orchestration.async_dispatcher import AsyncDispatcher
+    return jsonify(AsyncDispatcher.get_metrics())
@@ -7,126 +7,25 @@ session_bp = Blueprint("session", __name__)
 @session_bp.route("/", methods=["GET"])
 def list_sessions():
     from flask import request
+    from backend.services.session_listing_service import SessionListingService, DEFAULT_PAGE_SIZE
     try:
         # Filters
         source = request.args.get("source")
         decision = request.args.get("decision")
         search = request.args.get("search")
-        
-        query = Session.query
 
-        if source:
-            query = query.filter_by(source=source)
-        
-        if decision:
-            query = query.filter_by(final_decision=decision)
+        # Keyset pagination: pass back meta.next_cursor to fetch the next page
+        cursor = request.args.get("cursor")
+        limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
 
-        if search:
-            # Simple search by user_id or session_id
-            query = query.filter(
-                (Session.user_id.ilike(f"%{search}%")) | 
-                (Session.session_id.ilike(f"%{search}%"))
+        try:
+            page = SessionListingService.list_sessions(
+                source=source, decision=decision, search=search, cursor=cursor, limit=limit
             )
+        except ValueError as ve:
+            return error_response(str(ve), 400)
 
-        # Default sort by latest
-        sessions = query.order_by(Session.created_at.desc()).limit(100).all()
-        
-        # --- MERGE IN-MEMORY SESSIONS ---
-        from backend.services.observation_service import SessionStateEngine
-        
-        # 1. Convert DB sessions to dicts
-        results = []
-        for s in sessions:
-            d = s.to_dict()
-            if d.get("risk_score") == 0 and d.get("trust_score") is not None:
-                d["risk_score"] = 100.0 - d["trust_score"]
-            d["is_active"] = False # DB sessions are historical by default
-            results.append(d)
-        existing_ids = set(s.session_id for s in sessions)
-
-        # 2. Fetch In-Memory Sessions
-        mem_sessions = []
-        for sid, data in SessionStateEngine._sessions.items():
-            # Skip if already in DB results (simple de-dupe)
-            if sid in existing_ids:
-                # Update existing results to be 'active' if they are in memory
-                for r in results:
-                    if r["session_id"] == sid:
-                        r["is_active"] = True
-                continue
-                
-            # Apply Filters to In-Memory Sessions
-            # Source Filter
-            # (In-memory usually doesn't store source explicitly top-level, might need to infer or skip filter)
-            
-            # Search Filter
-            if search:
-                s_lower = search.lower()
-                if s_lower not in sid.lower() and s_lower not in str(data.get("user_id", "")).lower():
-                    continue
-
-            # Calculate current risk from history or fallback
-            risk_hist = list(data.get("risk_history", []))
-            if risk_hist:
-                current_risk = risk_hist[-1][1]
-            elif data.get("trust_score") is not None: # Corrected 's' to 'data' for in-memory session context
-                current_risk = 100.0 - data.get("trust_score")
-            else:
-                current_risk = data.get("current_risk_score", 0)
-            
-            # Determine dominant domain or use generic
-            # data.get("domain") isn't explicitly stored, infer from first event?
-            domain = "WEB"
-            events_seq = data.get("events", [])
-            if events_seq:
-                first_evt = events_seq[0]
-                etype = getattr(first_evt, 'event_type', 'http')
-                if etype == 'api': domain = 'API'
-                elif etype == 'network': domain = 'NETWORK'
-                elif etype == 'infra': domain = 'SYSTEM'
-            
-            mem_sessions.append({
-                "session_id": sid,
-                "user_id": data.get("user_id", "simulated-user"),
-                "ip_address": data.get("ip_address", "127.0.0.1"), 
-                "source": "LIVE", 
-                "risk_score": current_risk,
-                "created_at": data.get("created_at"), 
-                "event_count": len(events_seq),
-                "anomaly_count": len(events_seq), 
-                "signal_count": 0,
-                "status": "ACTIVE", 
-                "final_decision": "ALLOW",
-                "domain": domain,
-                "is_active": True
-            })
-            
-        # 3. Combine and Sort
-        # DB sessions start_time is usually ISO string or datetime object. 
-        # In-memory is float epoch.
-        # Ensure consistency for sorting? Frontend usually parses.
-        # Let's create a combined list and sort in Python.
-        
-        combined = results + mem_sessions
-        
-        # 3. Combine and Sort
-        combined = results + mem_sessions
-
-        def sort_key(x):
-            ls = x.get("created_at")
-            if not ls: return 0.0
-            if isinstance(ls, (int, float)): return float(ls)
-            try:
-                # Parse ISO string "2026-..."
-                from datetime import datetime
-                dt = datetime.fromisoformat(str(ls).replace('Z', '+00:00'))
-                return dt.timestamp()
-            except:
-                 return 0.0
-
-        combined.sort(key=sort_key, reverse=True)
-        
-        return success_response(combined[:100]) # Return top 100 merged
+        return success_response(page["items"], meta={"next_cursor": page["next_cursor"]})
     except Exception as e:
         return error_response(str(e), 500)
 
@@ -146,10 +45,14 @@ def cleanup_simulated_sessions():
         ).all()
         
         count = len(sim_sessions)
+        sim_ids = [s.session_id for s in sim_sessions]
+        # Metrics go through the ORM (not a bulk delete) so the dashboard rollups are decremented
+        for metric in SessionMetric.query.filter(SessionMetric.session_id.in_(sim_ids)).all():
+            db.session.delete(metric)
+        db.session.flush()
         for s in sim_sessions:
             # Delete associated records first (FK constraints)
             # Use filters specifically for session_id 
-            SessionMetric.query.filter_by(session_id=s.session_id).delete()
             Event.query.filter_by(session_id=s.session_id).delete()
             # AuditLog doesn't have a direct session_id FK in schema, but might be referenced in JSON
             # However, simpler is just deleting the session if nothing else blocks.
@@ -1,4 +1,4 @@
-from flask import Blueprint, jsonify, request, g
+from flask import Blueprint, jsonify, request, g, Response, stream_with_context
 from backend.db.models import Incident
 from backend.audit.models import AuditLog
 from backend.auth.decorators import require_access
@@ -7,21 +7,45 @@ from backend.incidents.enums import IncidentStatus, IncidentSeverity
 from backend.incidents.incident_manager import IncidentManager
 from backend.audit.service import AuditService
 from backend.services.observation_service import SessionStateEngine
+from backend.soc.queue_manager import QueueManager
 
 bp = Blueprint("soc", __name__)
 
+def _listing_filters(keys):
+    return {k: request.args.get(k) for k in keys if request.args.get(k)}
+
+def _paged(page):
+    # Body stays a plain list (dashboard clients); the next page is in X-Next-Cursor
+    response = jsonify(page["items"])
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    return response
+
+INCIDENT_FILTERS = ("tenant_id", "status", "severity", "since", "until")
+AUDIT_FILTERS = ("tenant_id", "action", "actor", "incident_id", "since", "until")
+
 @bp.route("/incidents", methods=["GET"])
 @require_access(role=Role.ANALYST) # Note: simplify to single role for now or update decorator
 def list_incidents():
-    incidents = Incident.query.all()
-    return jsonify([
-        {
-            "id": str(i.id),
-            "status": i.status.value,
-            "severity": i.severity.value,
-            "created_at": i.created_at.isoformat() + 'Z' if i.created_at else None
-        } for i in incidents
-    ])
+    from backend.services.incident_listing_service import IncidentListingService, DEFAULT_PAGE_SIZE
+    try:
+        page = IncidentListingService.list_incidents(
+            _listing_filters(INCIDENT_FILTERS),
+            cursor=request.args.get("cursor"),
+            limit=request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return _paged(page)
+
+@bp.route("/incidents/count", methods=["GET"])
+@require_access(role=Role.ANALYST)
+def count_incidents():
+    from backend.services.incident_listing_service import IncidentListingService
+    try:
+        return jsonify(IncidentListingService.count_incidents(_listing_filters(INCIDENT_FILTERS)))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
 @bp.route("/incidents/<incident_id>", methods=["GET"])
 @require_access(role=Role.ANALYST)
@@ -88,20 +112,117 @@ def recover_incident(incident_id):
 @bp.route("/audit", methods=["GET"])
 @require_access(role=Role.ANALYST)
 def list_audit_logs():
-    from backend.audit.models import AuditLog
-    logs = AuditLog.query.order_by(AuditLog.timestamp.desc()).limit(100).all()
-    return jsonify([
-        {
-            "action": l.action,
-            "actor": l.actor_id,
-            "timestamp": l.timestamp.isoformat() + 'Z',
-            "hash": l.entry_hash
-        } for l in logs
-    ])
+    from backend.services.incident_listing_service import IncidentListingService, DEFAULT_PAGE_SIZE
+    try:
+        page = IncidentListingService.list_audit_logs(
+            _listing_filters(AUDIT_FILTERS),
+            cursor=request.args.get("cursor"),
+            limit=request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return _paged(page)
+
+@bp.route("/audit/count", methods=["GET"])
+@require_access(role=Role.ANALYST)
+def count_audit_logs():
+    from backend.services.incident_listing_service import IncidentListingService
+    try:
+        return jsonify(IncidentListingService.count_audit_logs(_listing_filters(AUDIT_FILTERS)))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+# 🚦 ENFORCEMENT QUEUE (incrementally indexed; live changes via `soc_queue_update`)
+@bp.route("/queue", methods=["GET"])
+@require_access(role=Role.ANALYST)
+def get_enforcement_queue():
+    try:
+        limit = min(int(request.args.get("limit", 50)), 500)
+        page = QueueManager.get_page(
+            request.args.get("status", "PENDING"), limit=limit, cursor=request.args.get("cursor")
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(page), 200
+
+# 📦 COMPLIANCE EXPORTS (streamed NDJSON / gzip, resumable background jobs)
+def _export_filters():
+    keys = ("entity_id", "actor", "tenant_id", "incident_id", "since", "until")
+    source = (request.get_json(silent=True) or {}) if request.method == "POST" else request.args
+    return {k: source.get(k) for k in keys if source.get(k)}
+
+@bp.route("/compliance/export", methods=["GET"])
+@require_access(role=Role.ADMIN)
+def stream_compliance_export():
+    from backend.compliance.export_engine import ComplianceExportEngine, FORMATS
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in FORMATS:
+        return jsonify({"error": f"format must be one of {FORMATS}"}), 400
+    try:
+        filters = _export_filters()
+        ComplianceExportEngine.validate_filters(filters)  # fail before the stream starts
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return Response(
+        stream_with_context(ComplianceExportEngine.stream(filters, fmt=fmt)),
+        mimetype="application/gzip" if fmt == "gzip" else "application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename=compliance_export.{'ndjson.gz' if fmt == 'gzip' else 'ndjson'}"}
+    )
+
+@bp.route("/compliance/export/counts", methods=["GET"])
+@require_access(role=Role.ADMIN)
+def compliance_export_counts():
+    from backend.compliance.export_engine import ComplianceExportEngine
+    try:
+        return jsonify(ComplianceExportEngine.counts(_export_filters()))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@bp.route("/compliance/exports", methods=["POST"])
+@require_access(role=Role.ADMIN)
+def start_compliance_export():
+    from backend.compliance.export_engine import ComplianceExportEngine
+    body = request.get_json(silent=True) or {}
+    try:
+        filters = _export_filters()
+        ComplianceExportEngine.validate_filters(filters)
+        job = ComplianceExportEngine.start_job(filters, fmt=body.get("format", "ndjson"),
+                                               requested_by=getattr(g, "user_id", "SOC_ADMIN"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(job), 202
+
+@bp.route("/compliance/exports/<job_id>", methods=["GET"])
+@require_access(role=Role.ADMIN)
+def get_compliance_export(job_id):
+    from backend.compliance.export_engine import ComplianceExportEngine
+    job = ComplianceExportEngine.get_job(job_id)
+    if not job:
+        return jsonify({"error": "Export job not found"}), 404
+    return jsonify(job)
+
+@bp.route("/compliance/exports/<job_id>/resume", methods=["POST"])
+@require_access(role=Role.ADMIN)
+def resume_compliance_export(job_id):
+    from backend.compliance.export_engine import ComplianceExportEngine
+    job = ComplianceExportEngine.resume_job(job_id)
+    if not job:
+        return jsonify({"error": "Export job not found"}), 404
+    return jsonify(job), 202
+
+@bp.route("/compliance/exports/<job_id>/cancel", methods=["POST"])
+@require_access(role=Role.ADMIN)
+def cancel_compliance_export(job_id):
+    from backend.compliance.export_engine import ComplianceExportEngine
+    if not ComplianceExportEngine.cancel_job(job_id):
+        return jsonify({"error": "Export job not running"}), 404
+    return jsonify({"status": "Cancellation requested", "job_id": job_id}), 202
+
 @bp.route("/sessions/<session_id>/terminate", methods=["POST"])
 @require_access(role=Role.ANALYST)
 def terminate_session(session_id):
-    from backend.db.models import Session, User, db
+    from backend.db.models import Session, db
+    from backend.services.identity_cache import force_password_reset
     session = Session.query.filter_by(session_id=session_id).first()
     if not session:
         return jsonify({"error": "Session not found"}), 404
@@ -111,10 +232,7 @@ def terminate_session(session_id):
     
     # Force password reset for the terminated user
     if session.user_id:
-        user_record = User.query.filter_by(username=session.user_id).first() or \
-                      User.query.filter_by(user_id=session.user_id).first()
-        if user_record:
-            user_record.password_reset_required = True
+        force_password_reset([session.user_id])
 
     db.session.commit()
     
@@ -1,11 +1,13 @@
 from flask import Blueprint, request, jsonify
 from backend.middleware.platform_guard import PlatformGuard
 from backend.services.ingestion_service import IngestionService
+from backend.platform_core.tenant_admission import admit_tenant
 
 user_bp = Blueprint('user_platform', __name__, url_prefix='/platform/user')
 
 @user_bp.route('/events/<event_type>', methods=['POST'])
 @PlatformGuard.require_platform(PlatformGuard.PLATFORM_USER)
+@admit_tenant
 def ingest_event(event_type):
     """
     Single entry point for all user events (web, api, auth, system).
@@ -1,5 +1,6 @@
 from flask import Blueprint, request
 from backend.ingestion.event_ingestor import EventIngestor
+from backend.platform_core.tenant_admission import admit_tenant
 from backend.utils.response_builder import success_response, error_response
 from backend.auth.rbac import require
 from backend.auth.auth_context import Platform
@@ -9,6 +10,7 @@ user_bp = Blueprint("user", __name__)
 @user_bp.route("/event", methods=["POST"])
 # @require(platform=Platform.USER.value)
 # Strict separation: Users emit events here.
+@admit_tenant
 def emit_event():
     try:
         result = EventIngestor.ingest(request.json)
@@ -21,6 +21,8 @@ from backend.models.session_metric import SessionMetric
 from backend.models.event import Event
 from backend.db.models import Incident
 from backend.audit.models import AuditLog
+from backend.rollups.models import MetricsRollup
+import backend.rollups.engine  # registers rollup flush hooks
 from backend.security.password import hash_password
 from backend.middleware.security_logger import init_security_logger
 
@@ -59,6 +61,12 @@ def create_app(config_class=Config):
     with app.app_context():
         try:
             db.create_all() # Ensure tables exist
+            from backend.services.session_listing_service import SessionListingService
+            SessionListingService.ensure_indexes()
+            from backend.services.incident_listing_service import IncidentListingService
+            IncidentListingService.ensure_indexes()
+            from backend.audit.chain_verifier import AuditChainVerifier
+            AuditChainVerifier.ensure_indexes()
             db.session.execute(text("SELECT 1"))
             ensure_admin()
             print("[OK] PostgreSQL connection established and admin ensured")
@@ -117,6 +125,26 @@ def create_app(config_class=Config):
     app.register_blueprint(behavior_bp, url_prefix="/api/v1/behavior")
     app.register_blueprint(tenant_bp, url_prefix="/api")
     
+    # 🔗 INCIDENT CORRELATION INDEX: re-index OPEN incidents from the DB
+    try:
+        from backend.incidents.incident_manager import IncidentManager
+        with app.app_context():
+            IncidentManager.rebuild_index()
+    except Exception as e:
+        print(f"[WARN] Incident correlation index not rebuilt: {e}")
+
+    # 📤 TERMINATION OUTBOX: deliver target-app termination webhooks off the request path
+    from backend.enforcement.termination_dispatcher import TerminationDispatcher
+    TerminationDispatcher.start(app)
+
+    # 📊 METRICS ROLLUPS: committed deltas are upserted (and MINUTE buckets pruned) off the request path
+    from backend.rollups.engine import MetricsRollupEngine
+    MetricsRollupEngine.start(app)
+
+    # 🗄️ MONITORING EVENT SINK (bulk writes + daily partitions)
+    from backend.monitoring.event_sink import MonitoringEventSink
+    MonitoringEventSink.start(app)
+
     # 💥 DOMAIN KAFKA CONSUMER
     try:
         from backend.ingestion.domain_kafka_consumer import start_domain_consumer
@@ -1,4 +1,5 @@
 import uuid
+from datetime import datetime, timezone
 from backend.audit.hash_chain import compute_hash
 from backend.audit.audit_models import AuditLog
 from backend.audit.audit_contract import AuditContract
@@ -9,7 +10,7 @@ class AuditLogger(AuditContract):
     SOC-grade immutable audit logger with hash-chaining.
     """
     def append(self, payload: dict):
-        # 1. Fetch latest entry for chain linking
+        # 1. Fetch latest entry for chain linking (ix_audit_logs_created_at)
         last = (
             AuditLog.query.order_by(AuditLog.created_at.desc()).first()
         )
@@ -35,50 +36,22 @@ class AuditLogger(AuditContract):
             id=str(uuid.uuid4()),
             prev_hash=prev_hash,
             hash=new_hash,
+            # App-side microsecond timestamp: second-resolution server defaults tie and fork the chain
+            created_at=datetime.now(timezone.utc),
             **full_payload
         )
 
         db.session.add(entry)
         db.session.commit()
+        return entry
 
-    def verify_chain(self) -> bool:
+    def verify_chain(self, full: bool = False) -> bool:
         """
-        Validates the entire hash chain from root to tip.
-        Handles non-deterministic DB ordering by following hash links.
+        Validates the hash chain. Incremental by default: only entries after the
+        last signed checkpoint are re-hashed (see AuditChainVerifier).
         """
-        all_logs = AuditLog.query.all()
-        if not all_logs:
-            return True
-        
-        # 1. Map logs by their prev_hash for traversal
-        logs_by_prev = {log.prev_hash: log for log in all_logs}
-        
-        current_prev = "GENESIS"
-        verified_count = 0
-        
-        while current_prev in logs_by_prev:
-            log = logs_by_prev[current_prev]
-            
-            # Reconstruct identical payload for verification
-            payload = {
-                "actor": log.actor,
-                "role": log.role,
-                "platform": log.platform,
-                "tenant_id": log.tenant_id,
-                "request_id": log.request_id,
-                "action": log.action,
-                "incident_id": log.incident_id,
-                "details": log.details
-            }
-            
-            recomputed = compute_hash(log.prev_hash, payload)
-            if log.hash != recomputed:
-                return False
-            
-            current_prev = log.hash
-            verified_count += 1
-            
-        return verified_count == len(all_logs)
+        from backend.audit.chain_verifier import AuditChainVerifier
+        return AuditChainVerifier.verify(full=full)["valid"]
 
     # Legacy Compatibility Methods
     @classmethod
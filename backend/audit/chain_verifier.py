@@ -0,0 +1,200 @@
+import os
+import hmac
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List
+
+from sqlalchemy import select, func
+
+from backend.extensions import db
+from backend.db.models import AuditLog, AuditCheckpoint
+from backend.audit.hash_chain import compute_hash
+
+# Rows fetched per server-side cursor round trip
+CHUNK_SIZE = 5000
+# Rows sharing a timestamp may arrive out of chain order; this bounds the re-ordering buffer
+MAX_REORDER_WINDOW = 10000
+
+# Chain order ~ created_at order: the verifier range-scans this index,
+# and AuditLogger.append's "latest entry" lookup becomes an index probe.
+CREATED_AT_INDEX = db.Index("ix_audit_logs_created_at", AuditLog.created_at, AuditLog.id)
+
+_CHAIN_COLUMNS = (
+    AuditLog.id, AuditLog.prev_hash, AuditLog.hash, AuditLog.actor, AuditLog.role,
+    AuditLog.platform, AuditLog.tenant_id, AuditLog.request_id, AuditLog.action,
+    AuditLog.incident_id, AuditLog.details, AuditLog.created_at
+)
+
+
+def _payload(row) -> Dict[str, Any]:
+    # Must mirror the canonical payload built in AuditLogger.append
+    return {
+        "actor": row.actor,
+        "role": row.role,
+        "platform": row.platform,
+        "tenant_id": row.tenant_id,
+        "request_id": row.request_id,
+        "action": row.action,
+        "incident_id": row.incident_id,
+        "details": row.details
+    }
+
+
+# Rows written before every writer used compute_hash: a zero-hash genesis and two ad-hoc formulas
+LEGACY_GENESIS = "0" * 64
+
+
+def _hash_matches(row) -> bool:
+    if compute_hash(row.prev_hash, _payload(row)) == row.hash:
+        return True
+    legacy = (
+        f"{row.prev_hash}{row.id}{row.actor}{row.action}{json.dumps(row.details or {})}",  # AuditLogger.log_action
+        f"{row.prev_hash}{row.actor}{row.action}{row.created_at.isoformat() if row.created_at else ''}",  # AuditService.log
+    )
+    return any(hashlib.sha256(content.encode()).hexdigest() == row.hash for content in legacy)
+
+
+def _utc_iso(ts: datetime) -> str:
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts.isoformat()
+
+
+def sign_checkpoint(tip_hash: str, row_count: int, through_created_at: datetime) -> str:
+    key = os.getenv("AUDIT_CHECKPOINT_KEY") or os.getenv("SECRET_KEY", "dev-secret-key-change-in-prod")
+    message = f"{tip_hash}|{row_count}|{_utc_iso(through_created_at)}".encode()
+    return hmac.new(key.encode(), message, hashlib.sha256).hexdigest()
+
+
+class AuditChainVerifier:
+    """
+    Streaming, checkpointed verification of the audit hash chain.
+
+    Rows are read in (created_at, id) order through a server-side cursor and
+    re-linked through a small prev_hash buffer, so memory is bounded by the
+    number of rows sharing a timestamp, not by table size. Each successful run
+    stores a signed checkpoint (tip hash + row count); the next run verifies
+    only the suffix after it. A full run can verify the segments between
+    checkpoints in parallel.
+    """
+
+    @staticmethod
+    def ensure_indexes():
+        CREATED_AT_INDEX.create(bind=db.engine, checkfirst=True)
+
+    @classmethod
+    def verify(cls, full: bool = False, workers: int = 1, write_checkpoint: bool = True) -> Dict[str, Any]:
+        engine = db.engine
+        checkpoints = cls._load_checkpoints()
+        bad = next((c for c in checkpoints if not hmac.compare_digest(
+            c.signature, sign_checkpoint(c.tip_hash, c.row_count, c.through_created_at))), None)
+        if bad is not None:
+            return {"valid": False, "verified": 0, "reason": f"Checkpoint {bad.id} signature mismatch"}
+
+        anchors: List[Optional[AuditCheckpoint]] = [None] + checkpoints if full else checkpoints[-1:] or [None]
+        segments = [
+            (anchors[i], anchors[i + 1] if i + 1 < len(anchors) else None)
+            for i in range(len(anchors))
+        ]
+
+        # Snapshot first: rows appended while streaming are left for the next run
+        total, until = db.session.query(func.count(AuditLog.id), func.max(AuditLog.created_at)).one()
+
+        if workers > 1 and len(segments) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(lambda seg: cls._verify_segment(engine, *seg, until=until), segments))
+        else:
+            results = [cls._verify_segment(engine, *seg, until=until) for seg in segments]
+
+        failed = next((r for r in results if not r["valid"]), None)
+        if failed is not None:
+            return failed
+
+        base_count = anchors[0].row_count if anchors[0] is not None else 0
+        verified = sum(r["verified"] for r in results)
+        if base_count + verified != total:
+            return {"valid": False, "verified": verified,
+                    "reason": f"{total - base_count - verified} rows are not linked to the chain"}
+
+        tail = results[-1]
+        report = {"valid": True, "verified": verified, "total": total,
+                  "tip_hash": tail["tip_hash"], "checkpoint_id": None}
+        if write_checkpoint and tail["verified"] and tail["through_created_at"] is not None:
+            report["checkpoint_id"] = cls._write_checkpoint(tail["tip_hash"], total, tail["through_created_at"])
+        return report
+
+    @staticmethod
+    def _load_checkpoints() -> List[AuditCheckpoint]:
+        return AuditCheckpoint.query.order_by(AuditCheckpoint.row_count.asc(), AuditCheckpoint.id.asc()).all()
+
+    @staticmethod
+    def _write_checkpoint(tip_hash: str, row_count: int, through_created_at: datetime) -> int:
+        checkpoint = AuditCheckpoint(
+            tip_hash=tip_hash,
+            row_count=row_count,
+            through_created_at=through_created_at,
+            signature=sign_checkpoint(tip_hash, row_count, through_created_at)
+        )
+        db.session.add(checkpoint)
+        db.session.commit()
+        return checkpoint.id
+
+    @staticmethod
+    def _verify_segment(engine, start: Optional[AuditCheckpoint], end: Optional[AuditCheckpoint],
+                        until: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Verifies rows chained after `start` (GENESIS if None) up to `end`'s tip
+        (the `until` snapshot if None). Runs on its own connection so segments
+        can be verified from worker threads.
+        """
+        stmt = select(*_CHAIN_COLUMNS)
+        if start is not None:
+            stmt = stmt.where(AuditLog.created_at >= start.through_created_at)
+        if end is not None:
+            stmt = stmt.where(AuditLog.created_at <= end.through_created_at)
+        elif until is not None:
+            stmt = stmt.where(AuditLog.created_at <= until)
+        stmt = stmt.order_by(AuditLog.created_at.asc(), AuditLog.id.asc())
+
+        expected_prev = start.tip_hash if start is not None else "GENESIS"
+        through = start.through_created_at if start is not None else None
+        verified = 0
+        pending: Dict[str, Any] = {}
+        reached_end = False
+
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=CHUNK_SIZE).execute(stmt)
+            for row in result:
+                if row.prev_hash in pending:
+                    return {"valid": False, "verified": verified, "reason": f"Chain fork at entry {row.id}"}
+                pending[row.prev_hash] = row
+                if len(pending) > MAX_REORDER_WINDOW:
+                    return {"valid": False, "verified": verified, "reason": "Re-ordering window exceeded"}
+
+                if verified == 0 and start is None and expected_prev not in pending and LEGACY_GENESIS in pending:
+                    expected_prev = LEGACY_GENESIS
+                while expected_prev in pending:
+                    link = pending.pop(expected_prev)
+                    if not _hash_matches(link):
+                        return {"valid": False, "verified": verified, "reason": f"Hash mismatch at entry {link.id}"}
+                    expected_prev, through = link.hash, link.created_at
+                    verified += 1
+                    if end is not None and expected_prev == end.tip_hash:
+                        reached_end = True
+                        break
+                if reached_end:
+                    break
+            result.close()
+
+        if end is not None:
+            if not reached_end or verified != end.row_count - (start.row_count if start is not None else 0):
+                return {"valid": False, "verified": verified, "reason": f"Segment does not match checkpoint {end.id}"}
+        else:
+            # Unlinked rows only allowed on the anchor timestamp (already verified before the checkpoint)
+            stray = [r for r in pending.values() if start is None or r.created_at != start.through_created_at]
+            if stray:
+                return {"valid": False, "verified": verified, "reason": f"Entry {stray[0].id} is not linked to the chain"}
+
+        return {"valid": True, "verified": verified, "tip_hash": expected_prev, "through_created_at": through}
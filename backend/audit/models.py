@@ -1 +1 @@
-from backend.db.models import AuditLog
+from backend.db.models import AuditLog, AuditCheckpoint
@@ -0,0 +1,27 @@
+"""
+Scheduled audit chain verification (compliance runs this hourly).
+
+Usage:
+    python -m backend.audit.verify_chain                  # verify the suffix after the last checkpoint
+    python -m backend.audit.verify_chain --full --workers 4   # re-verify everything, segments in parallel
+"""
+import sys
+import argparse
+
+from backend.app import app
+from backend.audit.chain_verifier import AuditChainVerifier
+
+parser = argparse.ArgumentParser(description="Verify the audit log hash chain.")
+parser.add_argument("--full", action="store_true", help="Verify from GENESIS instead of the last checkpoint")
+parser.add_argument("--workers", type=int, default=1, help="Parallel segments (between checkpoints) for --full")
+parser.add_argument("--no-checkpoint", action="store_true", help="Do not record a checkpoint")
+args = parser.parse_args()
+
+with app.app_context():
+    report = AuditChainVerifier.verify(full=args.full, workers=args.workers,
+                                       write_checkpoint=not args.no_checkpoint)
+    if report["valid"]:
+        print(f"[OK] Audit chain valid: {report['verified']} entries verified, {report['total']} total.")
+    else:
+        print(f"[ERROR] Audit chain INVALID: {report['reason']}")
+        sys.exit(1)
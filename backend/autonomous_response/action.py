@@ -1,6 +1,6 @@
 
 from typing import Optional, Dict
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import uuid
 from enum import Enum
 
@@ -35,16 +35,22 @@ class AutonomousAction:
         self.reason = reason
         self.confidence = float(confidence)
         
-        self.created_at = datetime.utcnow().isoformat()
+        now = datetime.utcnow()
+        self.created_at = now.isoformat()
         
         # Mandatory Expiry (Final Patch Requirement)
-        expires_dt = datetime.utcnow() + timedelta(minutes=duration_minutes)
+        expires_dt = now + timedelta(minutes=duration_minutes)
         self.expires_at = expires_dt.isoformat()
+        # Same instant as epoch seconds, for cheap comparisons / heap ordering
+        self.expires_epoch = expires_dt.replace(tzinfo=timezone.utc).timestamp()
         
         self.is_active = True
         self.revoked_by: Optional[str] = None
         self.revocation_reason: Optional[str] = None
 
+    def is_expired(self, now: float) -> bool:
+        return self.expires_epoch <= now
+
     def revoke(self, user: str, reason: str):
         self.is_active = False
         self.revoked_by = user
@@ -63,3 +69,19 @@ class AutonomousAction:
             "revoked_by": self.revoked_by,
             "revocation_reason": self.revocation_reason
         }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "AutonomousAction":
+        action = cls.__new__(cls)
+        action.action_id = data["action_id"]
+        action.action_type = ActionType(data["action_type"])
+        action.target_entity = data["target_entity"]
+        action.reason = data["reason"]
+        action.confidence = float(data["confidence"])
+        action.created_at = data["created_at"]
+        action.expires_at = data["expires_at"]
+        action.expires_epoch = datetime.fromisoformat(data["expires_at"]).replace(tzinfo=timezone.utc).timestamp()
+        action.is_active = data.get("is_active", True)
+        action.revoked_by = data.get("revoked_by")
+        action.revocation_reason = data.get("revocation_reason")
+        return action
@@ -0,0 +1,71 @@
+import os
+import json
+import time
+import threading
+from typing import Dict, List
+
+from backend.autonomous_response.action import AutonomousAction
+
+class JsonlActionStore:
+    """
+    Optional durable backend for AutonomousResponseEngine: an append-only
+    JSON-lines journal of "propose" / "revoke" records.
+    Write-through: the engine stays the in-memory source of truth; the
+    journal only exists so active actions survive a restart. load_active()
+    compacts it down to the still-active actions.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _append(self, record: Dict):
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(line)
+                f.flush()
+
+    def save(self, action: AutonomousAction):
+        self._append({"op": "propose", "action": action.to_dict()})
+
+    def revoke(self, action: AutonomousAction):
+        self._append({
+            "op": "revoke",
+            "action_id": action.action_id,
+            "revoked_by": action.revoked_by,
+            "reason": action.revocation_reason
+        })
+
+    def load_active(self) -> List[AutonomousAction]:
+        """
+        Replays the journal; returns unrevoked, unexpired actions and rewrites
+        the file with only those (expired / revoked history is dropped).
+        """
+        if not os.path.exists(self.path):
+            return []
+        actions: Dict[str, AutonomousAction] = {}
+        with self._lock:
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue # torn final line after a crash
+                    if record.get("op") == "propose":
+                        action = AutonomousAction.from_dict(record["action"])
+                        actions[action.action_id] = action
+                    elif record.get("op") == "revoke":
+                        actions.pop(record.get("action_id"), None)
+
+            now = time.time()
+            active = [a for a in actions.values() if a.is_active and not a.is_expired(now)]
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                for action in active:
+                    f.write(json.dumps({"op": "propose", "action": action.to_dict()}, separators=(",", ":")) + "\n")
+            os.replace(tmp, self.path)
+        return active
@@ -1,26 +1,40 @@
 
-from typing import List, Optional, Dict
-from datetime import datetime
+import os
+import time
+import heapq
+import threading
+from collections import deque
+from typing import List, Optional, Dict, Tuple
 from backend.autonomous_response.action import AutonomousAction, ActionType
 
 class AutonomousResponseEngine:
     """
     Executes high-confidence actions with strict safeguards.
-    
+
     DEFINITION OF LOW-RISK:
     1. Risk Score < RESTRICT Threshold (60)
     2. Action is Fully Reversible (e.g. Rate Limit, Captcha)
     3. Confidence > 0.90 (Configured Minimum)
+
+    Active actions are indexed by action_id and by target entity; a min-heap
+    on expires_at retires expired ones lazily (amortized O(log n)), so the
+    store only ever holds what is currently in force. Recently retired
+    actions stay visible in a bounded history.
     """
-    
+
     MIN_CONFIDENCE = 0.90 # Mandatory Gate
-    
-    # In-memory log for simulation. In prod -> DB.
-    _action_log: List[AutonomousAction] = []
-    
+    HISTORY_SIZE = 1000
+
+    _actions: Dict[str, AutonomousAction] = {}      # action_id -> active action
+    _by_target: Dict[str, str] = {}                  # target_entity -> action_id (no stacking)
+    _expiry_heap: List[Tuple[float, str]] = []       # (expires_epoch, action_id); stale entries skipped
+    _history = deque(maxlen=HISTORY_SIZE)            # retired (expired / revoked) actions
+    _store = None
+    _lock = threading.Lock()
+
     @classmethod
     def propose_action(
-        cls, 
+        cls,
         action_type: ActionType,
         target_entity: str,
         reason: str,
@@ -31,52 +45,115 @@ class AutonomousResponseEngine:
         Attempts to execute an autonomous action.
         Returns Action if executed, None if safeguards block it.
         """
-        
+
         # 1. Confidence Gate
         if confidence < cls.MIN_CONFIDENCE:
             print(f"Action blocked: Confidence {confidence} < {cls.MIN_CONFIDENCE}")
             return None
-            
-        # 2. Cool-down / Rate Limit Safeguard
-        # Check if active action exists for this entity
-        active_actions = [
-            a for a in cls._action_log 
-            if a.target_entity == target_entity 
-            and a.is_active 
-            and a.expires_at > datetime.utcnow().isoformat()
-        ]
-        
-        if active_actions:
-            # Policy: Do not stack actions? Or escalate?
-            # For Phase 3 implementation: Simple safeguard -> No stacking.
-            print(f"Action blocked: Active action exists for {target_entity}")
-            return None
-            
-        # 3. Create & Execute
-        action = AutonomousAction(
-            action_type=action_type,
-            target_entity=target_entity,
-            reason=reason,
-            confidence=confidence,
-            duration_minutes=duration_minutes
-        )
-        
-        cls._action_log.append(action)
+
+        with cls._lock:
+            cls._retire_expired(time.time())
+
+            # 2. Cool-down / Rate Limit Safeguard
+            # Policy: Do not stack actions -> one active action per entity
+            if target_entity in cls._by_target:
+                print(f"Action blocked: Active action exists for {target_entity}")
+                return None
+
+            # 3. Create & Execute
+            action = AutonomousAction(
+                action_type=action_type,
+                target_entity=target_entity,
+                reason=reason,
+                confidence=confidence,
+                duration_minutes=duration_minutes
+            )
+            cls._index(action)
+            if cls._store:
+                cls._store.save(action)
+
         print(f"AUTONOMOUS ACTION: {action_type.value} on {target_entity} (Expires: {action.expires_at})")
         return action
 
     @classmethod
     def get_active_actions(cls) -> List[AutonomousAction]:
-        now = datetime.utcnow().isoformat()
-        return [
-            a for a in cls._action_log 
-            if a.is_active and a.expires_at > now
-        ]
+        with cls._lock:
+            cls._retire_expired(time.time())
+            return list(cls._actions.values())
+
+    @classmethod
+    def get_active_action(cls, target_entity: str) -> Optional[AutonomousAction]:
+        with cls._lock:
+            cls._retire_expired(time.time())
+            action_id = cls._by_target.get(target_entity)
+            return cls._actions.get(action_id) if action_id else None
+
+    @classmethod
+    def get_recent_history(cls, limit: int = 100) -> List[AutonomousAction]:
+        with cls._lock:
+            cls._retire_expired(time.time())
+            return list(cls._history)[-limit:][::-1]
 
     @classmethod
     def revoke_action(cls, action_id: str, user: str, reason: str):
-        for a in cls._action_log:
-            if a.action_id == action_id:
-                a.revoke(user, reason)
-                return True
-        return False
+        with cls._lock:
+            action = cls._actions.get(action_id)
+            if action is None:
+                return False
+            action.revoke(user, reason)
+            cls._unindex(action)
+            if cls._store:
+                cls._store.revoke(action)
+            return True
+
+    @classmethod
+    def configure_store(cls, store):
+        """
+        Attaches a durable store and reloads its still-active actions into memory.
+        """
+        with cls._lock:
+            cls._store = store
+            if store is None:
+                return
+            for action in store.load_active():
+                if action.action_id not in cls._actions and action.target_entity not in cls._by_target:
+                    cls._index(action)
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._actions = {}
+            cls._by_target = {}
+            cls._expiry_heap = []
+            cls._history = deque(maxlen=cls.HISTORY_SIZE)
+
+    @classmethod
+    def _index(cls, action: AutonomousAction):
+        # Caller holds cls._lock
+        cls._actions[action.action_id] = action
+        cls._by_target[action.target_entity] = action.action_id
+        heapq.heappush(cls._expiry_heap, (action.expires_epoch, action.action_id))
+
+    @classmethod
+    def _unindex(cls, action: AutonomousAction):
+        # Caller holds cls._lock; the heap entry is left behind and skipped later
+        cls._actions.pop(action.action_id, None)
+        if cls._by_target.get(action.target_entity) == action.action_id:
+            del cls._by_target[action.target_entity]
+        cls._history.append(action)
+
+    @classmethod
+    def _retire_expired(cls, now: float):
+        # Caller holds cls._lock
+        heap = cls._expiry_heap
+        while heap and heap[0][0] <= now:
+            _, action_id = heapq.heappop(heap)
+            action = cls._actions.get(action_id)
+            if action is None:
+                continue # already revoked
+            action.is_active = False # expiry reverts the action
+            cls._unindex(action)
+
+if os.getenv("AUTONOMOUS_ACTION_LOG"):
+    from backend.autonomous_response.action_store import JsonlActionStore
+    AutonomousResponseEngine.configure_store(JsonlActionStore(os.environ["AUTONOMOUS_ACTION_LOG"]))
@@ -0,0 +1,338 @@
+import os
+import json
+import gzip
+import uuid
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import select, func, and_, or_
+
+from backend.extensions import db
+from backend.db.models import AuditLog
+from backend.institutional_memory.storage import MemoryRecorder, MemoryRetriever
+
+PAGE_SIZE = 1000
+EXPORT_DIR = os.getenv("COMPLIANCE_EXPORT_DIR", "data/exports")
+FORMATS = ("ndjson", "gzip")
+
+_AUDIT_COLUMNS = (
+    AuditLog.id, AuditLog.created_at, AuditLog.actor, AuditLog.role, AuditLog.platform,
+    AuditLog.tenant_id, AuditLog.request_id, AuditLog.action, AuditLog.incident_id,
+    AuditLog.details, AuditLog.prev_hash, AuditLog.hash
+)
+
+
+def _iso(ts: Optional[datetime]) -> Optional[str]:
+    return ts.isoformat() if ts else None
+
+
+def _parse_ts(value: Optional[str], naive_utc: bool = False) -> Optional[datetime]:
+    if not value:
+        return None
+    ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if naive_utc and ts.tzinfo is not None:
+        # InstitutionalMemory.timestamp is a naive UTC isoformat string
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def _memory_bound(value: Optional[str]) -> Optional[str]:
+    ts = _parse_ts(value, naive_utc=True)
+    return ts.isoformat() if ts else None
+
+
+def _encode_page(lines: List[str], fmt: str) -> bytes:
+    payload = ("\n".join(lines) + "\n").encode()
+    # One gzip member per page: concatenated members are a valid .gz stream,
+    # and every page boundary is a safe resume point.
+    return gzip.compress(payload) if fmt == "gzip" else payload
+
+
+class ComplianceExportEngine:
+    """
+    Streams AuditLog + institutional memory as NDJSON (optionally gzip) in bounded pages.
+
+    Audit rows are read with keyset pagination on (created_at, id), memories by
+    position cursor, so no export ever holds more than one page in memory.
+    Memory positions are process-local (MemoryRecorder.STORE_ID): a job resumed
+    in another process restarts its memory phase on that process's store.
+    Long exports run as resumable background jobs writing to COMPLIANCE_EXPORT_DIR.
+    Only running jobs are held in memory; finished ones are read back from
+    their state file on demand.
+
+    Filters: entity_id (memory entity / audit actor), actor, tenant_id,
+    incident_id, since, until (ISO timestamps).
+    """
+
+    _jobs: Dict[str, Dict[str, Any]] = {}
+    _lock = threading.Lock()
+
+    # --- Sources -----------------------------------------------------------
+
+    @staticmethod
+    def iter_audit_pages(filters: Dict[str, Any], cursor: Optional[Tuple[str, str]] = None,
+                         page_size: int = PAGE_SIZE) -> Iterator[Tuple[Tuple[str, str], List[Dict[str, Any]]]]:
+        """
+        Yields (cursor_after_page, records) in (created_at, id) order.
+        """
+        base = select(*_AUDIT_COLUMNS).where(*ComplianceExportEngine._audit_conditions(filters))
+        while True:
+            stmt = base
+            if cursor is not None:
+                after_at, after_id = _parse_ts(cursor[0]), cursor[1]
+                stmt = stmt.where(or_(
+                    AuditLog.created_at > after_at,
+                    and_(AuditLog.created_at == after_at, AuditLog.id > after_id)
+                ))
+            rows = db.session.execute(
+                stmt.order_by(AuditLog.created_at.asc(), AuditLog.id.asc()).limit(page_size)
+            ).all()
+            if not rows:
+                return
+            cursor = (_iso(rows[-1].created_at), rows[-1].id)
+            yield cursor, [ComplianceExportEngine._audit_record(r) for r in rows]
+            if len(rows) < page_size:
+                return
+
+    @staticmethod
+    def iter_memory_pages(filters: Dict[str, Any], cursor: int = -1,
+                          page_size: int = PAGE_SIZE) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        page, last = [], cursor
+        for position, memory in MemoryRetriever.iter_memories(
+            entity_id=filters.get("entity_id"),
+            since=_memory_bound(filters.get("since")),
+            until=_memory_bound(filters.get("until")),
+            after=cursor
+        ):
+            page.append({"kind": "memory", **memory.to_dict()})
+            last = position
+            if len(page) >= page_size:
+                yield last, page
+                page = []
+        if page:
+            yield last, page
+
+    @staticmethod
+    def validate_filters(filters: Dict[str, Any]):
+        """
+        Raises ValueError for malformed since/until timestamps.
+        """
+        for key in ("since", "until"):
+            _parse_ts(filters.get(key))
+
+    @staticmethod
+    def _audit_conditions(filters: Dict[str, Any]) -> List[Any]:
+        conditions = []
+        actor = filters.get("actor") or filters.get("entity_id")
+        if actor:
+            conditions.append(AuditLog.actor == actor)
+        if filters.get("tenant_id"):
+            conditions.append(AuditLog.tenant_id == filters["tenant_id"])
+        if filters.get("incident_id"):
+            conditions.append(AuditLog.incident_id == filters["incident_id"])
+        if filters.get("since"):
+            conditions.append(AuditLog.created_at >= _parse_ts(filters["since"]))
+        if filters.get("until"):
+            conditions.append(AuditLog.created_at < _parse_ts(filters["until"]))
+        return conditions
+
+    @staticmethod
+    def _audit_record(row) -> Dict[str, Any]:
+        return {
+            "kind": "audit",
+            "id": row.id,
+            "created_at": _iso(row.created_at),
+            "actor": row.actor,
+            "role": row.role,
+            "platform": row.platform,
+            "tenant_id": row.tenant_id,
+            "request_id": row.request_id,
+            "action": row.action,
+            "incident_id": row.incident_id,
+            "details": row.details,
+            "prev_hash": row.prev_hash,
+            "hash": row.hash
+        }
+
+    # --- Aggregates --------------------------------------------------------
+
+    @classmethod
+    def counts(cls, filters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Record counts via aggregate queries / memory indexes (nothing is loaded).
+        """
+        by_action = dict(db.session.execute(
+            select(AuditLog.action, func.count(AuditLog.id))
+            .where(*cls._audit_conditions(filters))
+            .group_by(AuditLog.action)
+        ).all())
+        if filters.get("since") or filters.get("until"):
+            memories = sum(1 for _ in MemoryRetriever.iter_memories(
+                entity_id=filters.get("entity_id"),
+                since=_memory_bound(filters.get("since")), until=_memory_bound(filters.get("until"))))
+        else:
+            memories = MemoryRetriever.count_memories(entity_id=filters.get("entity_id"))
+        return {"audit": sum(by_action.values()), "audit_by_action": by_action, "memory": memories}
+
+    # --- Synchronous streaming (HTTP) --------------------------------------
+
+    @classmethod
+    def stream(cls, filters: Dict[str, Any], fmt: str = "ndjson") -> Iterator[bytes]:
+        for _, records in cls.iter_audit_pages(filters):
+            yield _encode_page([json.dumps(r, default=str) for r in records], fmt)
+        for _, records in cls.iter_memory_pages(filters):
+            yield _encode_page([json.dumps(r, default=str) for r in records], fmt)
+
+    # --- Background jobs ---------------------------------------------------
+
+    @classmethod
+    def start_job(cls, filters: Dict[str, Any], fmt: str = "ndjson", requested_by: str = "system") -> Dict[str, Any]:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        job_id = str(uuid.uuid4())
+        ext = "ndjson.gz" if fmt == "gzip" else "ndjson"
+        job = {
+            "job_id": job_id,
+            "filters": filters,
+            "format": fmt,
+            "requested_by": requested_by,
+            "status": "PENDING",
+            "phase": "audit",
+            "audit_cursor": None,
+            "memory_cursor": -1,
+            "memory_store_id": MemoryRecorder.STORE_ID,
+            "records_exported": 0,
+            "bytes_written": 0,
+            "total_estimate": None,
+            "output_path": os.path.join(EXPORT_DIR, f"compliance_{job_id}.{ext}"),
+            "error": None,
+            "created_at": datetime.utcnow().isoformat(),
+            "finished_at": None
+        }
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        open(job["output_path"], "wb").close()
+        cls._save(job)
+        cls._launch(job)
+        return cls.get_job(job_id)
+
+    @classmethod
+    def resume_job(cls, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Continues an interrupted/failed job from its last committed page (also after a restart).
+        """
+        job = cls._jobs.get(job_id) or cls._load(job_id)
+        if job is None:
+            return None
+        if job["status"] in ("RUNNING", "COMPLETED"):
+            return cls.get_job(job_id)
+        cls._launch(job)
+        return cls.get_job(job_id)
+
+    @classmethod
+    def cancel_job(cls, job_id: str) -> bool:
+        job = cls._jobs.get(job_id)
+        if job is None:
+            return False
+        job["cancel_requested"] = True
+        return True
+
+    @classmethod
+    def get_job(cls, job_id: str) -> Optional[Dict[str, Any]]:
+        job = cls._jobs.get(job_id) or cls._load(job_id)
+        if job is None:
+            return None
+        view = {k: v for k, v in job.items() if k != "cancel_requested"}
+        total = job.get("total_estimate")
+        view["progress"] = round(min(1.0, job["records_exported"] / total), 4) if total else (1.0 if job["status"] == "COMPLETED" else 0.0)
+        return view
+
+    @classmethod
+    def _launch(cls, job: Dict[str, Any]):
+        with cls._lock:
+            if job["status"] == "RUNNING":
+                return
+            job["status"] = "RUNNING"
+            job["cancel_requested"] = False
+            cls._jobs[job["job_id"]] = job
+        app = current_app._get_current_object()
+        thread = threading.Thread(target=cls._run_job, args=(app, job), name=f"ComplianceExport-{job['job_id'][:8]}", daemon=True)
+        thread.start()
+
+    @classmethod
+    def _run_job(cls, app, job: Dict[str, Any]):
+        with app.app_context():
+            try:
+                counts = cls.counts(job["filters"])
+                job["total_estimate"] = counts["audit"] + counts["memory"]
+                with open(job["output_path"], "r+b") as out:
+                    # Drop any partial page written after the last checkpoint
+                    out.truncate(job["bytes_written"])
+                    out.seek(job["bytes_written"])
+
+                    if job["phase"] == "audit":
+                        cursor = tuple(job["audit_cursor"]) if job["audit_cursor"] else None
+                        for cursor, records in cls.iter_audit_pages(job["filters"], cursor=cursor):
+                            if not cls._commit_page(job, out, records, audit_cursor=list(cursor)):
+                                return
+                        job["phase"] = "memory"
+                        cls._save(job)
+
+                    if job.get("memory_store_id") != MemoryRecorder.STORE_ID:
+                        # Saved by another process: its positions don't index this store
+                        job["memory_cursor"], job["memory_store_id"] = -1, MemoryRecorder.STORE_ID
+                    for cursor, records in cls.iter_memory_pages(job["filters"], cursor=job["memory_cursor"]):
+                        if not cls._commit_page(job, out, records, memory_cursor=cursor):
+                            return
+
+                job["status"] = "COMPLETED"
+                job["finished_at"] = datetime.utcnow().isoformat()
+                print(f"[COMPLIANCE] Export {job['job_id']} completed: {job['records_exported']} records")
+            except Exception as e:
+                job["status"] = "FAILED"
+                job["error"] = str(e)
+                print(f"[COMPLIANCE] Export {job['job_id']} failed (resumable): {e}")
+            finally:
+                db.session.remove()
+                cls._save(job)
+                with cls._lock:
+                    if cls._jobs.get(job["job_id"]) is job and job["status"] != "RUNNING":
+                        del cls._jobs[job["job_id"]]
+
+    @classmethod
+    def _commit_page(cls, job: Dict[str, Any], out, records: List[Dict[str, Any]], **cursor) -> bool:
+        if job.get("cancel_requested"):
+            job["status"] = "CANCELLED"
+            return False
+        out.write(_encode_page([json.dumps(r, default=str) for r in records], job["format"]))
+        out.flush()
+        job["bytes_written"] = out.tell()
+        job["records_exported"] += len(records)
+        job.update(cursor)
+        cls._save(job)
+        return True
+
+    @staticmethod
+    def _state_path(job_id: str) -> str:
+        return os.path.join(EXPORT_DIR, f"compliance_{job_id}.state.json")
+
+    @classmethod
+    def _save(cls, job: Dict[str, Any]):
+        state = {k: v for k, v in job.items() if k != "cancel_requested"}
+        tmp = cls._state_path(job["job_id"]) + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f, default=str)
+        os.replace(tmp, cls._state_path(job["job_id"]))
+
+    @classmethod
+    def _load(cls, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            uuid.UUID(job_id)
+            with open(cls._state_path(job_id)) as f:
+                job = json.load(f)
+        except (ValueError, OSError):
+            return None
+        if job["status"] == "RUNNING":
+            job["status"] = "INTERRUPTED"  # process died mid-export
+        return job
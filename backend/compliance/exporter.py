@@ -1,22 +1,23 @@
-
-from typing import List, Dict
+from typing import List, Dict, Iterator
 from backend.institutional_memory.storage import MemoryRetriever, MemoryType
+from backend.compliance.export_engine import ComplianceExportEngine
 import json
 
 class AuditExporter:
     """
     Generates compliance artifacts.
+    Large exports go through ComplianceExportEngine (streamed / background jobs).
     """
-    
+
     @staticmethod
     def export_decision_history(entity_id: str) -> str:
         """
         Exports full decision history for a user (GDPR Request).
-        Returns JSON string.
+        Returns JSON string. Prefer stream_decision_history for heavy users.
         """
         memories = MemoryRetriever.get_memories(entity_id=entity_id) # Memory connects loose events
         # Note: In real system, we'd also query AuditLog DB
-        
+
         export_data = {
             "entity": entity_id,
             "generated_at": "now",
@@ -24,14 +25,21 @@ class AuditExporter:
         }
         return json.dumps(export_data, indent=2)
 
+    @staticmethod
+    def stream_decision_history(entity_id: str, fmt: str = "ndjson") -> Iterator[bytes]:
+        """
+        Streams every AuditLog row and memory for the entity as NDJSON (or gzip) chunks.
+        """
+        return ComplianceExportEngine.stream({"entity_id": entity_id}, fmt=fmt)
+
     @staticmethod
     def generate_policy_report() -> str:
         """
         Exports policy changes and override stats.
         """
         # This would query proper tables. Mocking via Memory for phase 4.
-        overrides = MemoryRetriever.get_memories(memory_type=MemoryType.OVERRIDE, limit=1000)
+        sample = MemoryRetriever.get_memories(memory_type=MemoryType.OVERRIDE, limit=5)
         return json.dumps({
-            "total_overrides": len(overrides),
-            "sample": [m.to_dict() for m in overrides[:5]]
+            "total_overrides": MemoryRetriever.count_memories(memory_type=MemoryType.OVERRIDE),
+            "sample": [m.to_dict() for m in sample]
         }, indent=2)
@@ -198,6 +198,19 @@ def forbid_audit_update(mapper, connection, target):
 def forbid_audit_delete(mapper, connection, target):
     raise RuntimeError("Audit logs are immutable")
 
+class AuditCheckpoint(db.Model):
+    """
+    Signed "chain verified through here" marker written by AuditChainVerifier.
+    """
+    __tablename__ = "audit_checkpoints"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    tip_hash = db.Column(db.String, nullable=False)
+    row_count = db.Column(db.BigInteger, nullable=False)
+    through_created_at = db.Column(db.DateTime(timezone=True), nullable=False)
+    signature = db.Column(db.String(64), nullable=False)
+    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
+
 class SessionMetric(db.Model):
     __tablename__ = 'session_metrics'
     
@@ -296,12 +309,20 @@ class MonitoringEvent(db.Model):
     """
     High-volume events for Domain-Orchestrated Monitoring.
     Stores raw event data + ML risk score + Decision + Suggestion.
+
+    On PostgreSQL the table is range-partitioned by day on timestamp, so the
+    partition key is part of every unique constraint. Written in bulk by
+    MonitoringEventSink; partitions are created / expired by it too.
     """
     __tablename__ = 'monitoring_events'
+    __table_args__ = (
+        db.UniqueConstraint("event_id", "timestamp", name="uq_monitoring_events_event_id_ts"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
     
-    # Primary Key
+    # Primary Key (id, timestamp)
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    event_id = db.Column(db.String(36), unique=True, nullable=False)
+    event_id = db.Column(db.String(36), nullable=False)
     
     # Domain & Session Context
     domain = db.Column(db.String(20), nullable=False, index=True) # WEB, API, NETWORK, SYSTEM
@@ -316,7 +337,7 @@ class MonitoringEvent(db.Model):
     suggestion = db.Column(db.String(255), nullable=True)
     
     # Metadata
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, primary_key=True, index=True)
     payload = db.Column(JSONB, nullable=True) # Optional extra details
     
     def to_dict(self):
@@ -378,3 +399,39 @@ class AttackPath(db.Model):
             "likelihood": self.likelihood,
             "detected_at": self.detected_at.isoformat() + "Z" if self.detected_at else None
         }
+
+class TerminationOutbox(db.Model):
+    """
+    Durable outbox for target-app termination webhooks.
+    Written in the caller's transaction; delivered by TerminationDispatcher.
+    """
+    __tablename__ = 'termination_outbox'
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    session_id = db.Column(db.String(64), nullable=False, index=True)
+    reason = db.Column(db.String(255), nullable=True)
+    status = db.Column(db.String(16), default="PENDING", nullable=False) # PENDING, SENT, DEAD
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    last_error = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_termination_outbox_due", "status", "next_attempt_at"),
+        # Backs the enqueue() dedup: one waiting termination per session
+        db.Index("uq_termination_outbox_pending", "session_id", unique=True,
+                 postgresql_where=db.text("status = 'PENDING'"), sqlite_where=db.text("status = 'PENDING'")),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "session_id": self.session_id,
+            "reason": self.reason,
+            "status": self.status,
+            "attempts": self.attempts,
+            "next_attempt_at": self.next_attempt_at.isoformat() + "Z" if self.next_attempt_at else None,
+            "last_error": self.last_error,
+            "created_at": self.created_at.isoformat() + "Z" if self.created_at else None,
+            "sent_at": self.sent_at.isoformat() + "Z" if self.sent_at else None
+        }
@@ -139,15 +139,8 @@ class EnforcementEngine:
              context.session_id, suggested_action, context.risk_score
         )
         
-        # Check active proposals
-        active_props = ProposalRegistry.list_proposals()
-        existing_pid = next(
-            (p['id'] for p in active_props 
-             if p["session_id"] == context.session_id 
-             and p["suggested_action"] == suggested_action
-             and p["status"] not in [EnforcementState.COMPLETED, EnforcementState.FAILED, "ROLLED_BACK"]),
-            None
-        )
+        # Check active proposals (session index, not a full registry scan)
+        existing_pid = ProposalRegistry.find_active(context.session_id, suggested_action)
         if existing_pid:
             AuditLogger.log_enforcement(existing_pid, suggested_action, "DUPLICATE_SKIPPED", "Idempotency Check")
             return
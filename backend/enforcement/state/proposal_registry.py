@@ -1,18 +1,43 @@
+import os
 import time
 import uuid
-import hashlib
-from typing import Dict, Any, Optional, List
+import heapq
+import threading
+from typing import Dict, Any, Optional, List, Set, Tuple, Callable
 from backend.orchestration.execution_context import ExecutionContext
 
 from backend.enforcement.state_machine.enforcement_state_machine import EnforcementState, EnforcementStateMachine
 
+# Statuses after which a proposal no longer blocks a new one for the same session/action
+INACTIVE_STATUSES = {EnforcementState.COMPLETED.value, EnforcementState.FAILED.value, EnforcementState.ROLLED_BACK.value}
+
+def _status_key(status) -> str:
+    return getattr(status, "value", status)
+
+def _dedup_key(session_id, decision, risk_score, ts: float) -> Tuple:
+    # Same proposal if session + decision + integer risk match within a 5 min window
+    return (session_id, _status_key(decision), int(risk_score), int(ts / 300))
+
 class ProposalRegistry:
     """
     In-memory registry for Enforcement Proposals.
     Tracks state, prevents duplicates (idempotency), handles TTL.
+
+    - Expiry is a min-heap of (expires_at, pid): cleanup pops only what has expired.
+    - Secondary indexes by status / session_id / user_id keep lookups O(matches).
+    - Optional write-through durable store: set PROPOSAL_STORE_URL (sqlite:/// or postgresql://).
+    - Change listeners (subscribe) see every register / status / expire / reset, so
+      derived views such as the SOC queue stay incrementally up to date.
     """
-    _proposals: Dict[str, Dict[str, Any]] = {} 
-    _dedup_index: Dict[str, str] = {} # hash -> proposal_id
+    _proposals: Dict[str, Dict[str, Any]] = {}
+    _dedup_index: Dict[Tuple, str] = {} # (session, decision, risk, bucket) -> proposal_id
+    _by_status: Dict[str, Dict[str, None]] = {} # insertion-ordered pid sets
+    _by_session: Dict[str, Set[str]] = {}
+    _by_user: Dict[str, Set[str]] = {}
+    _expiry_heap: List[Tuple[float, str]] = []
+    _lock = threading.RLock()
+    _store = None
+    _listeners: List[Callable[[str, Dict[str, Any], Any], None]] = []
 
     PROPOSAL_TTL = 3600 # 1 hour
 
@@ -22,69 +47,206 @@ class ProposalRegistry:
         Creates a new proposal if one doesn't exist for this decision hash.
         Returns proposal_id if created, or existing ID if dup.
         """
-        # 1. Clean expired
-        cls._cleanup()
+        with cls._lock:
+            # 1. Clean expired
+            cls._cleanup()
 
-        # 2. Compute Dedup Hash (Session + Decision + Risk Score bucket + Time Window)
-        # We allow re-proposal after 5 mins if same risk
-        time_bucket = int(time.time() / 300) 
-        raw_key = f"{context.session_id}:{context.decision}:{int(context.risk_score)}:{time_bucket}"
-        dedup_hash = hashlib.sha256(raw_key.encode()).hexdigest()
+            # 2. Dedup Key (Session + Decision + Risk Score bucket + Time Window)
+            # We allow re-proposal after 5 mins if same risk
+            now = time.time()
+            dedup_key = _dedup_key(context.session_id, context.decision, context.risk_score, now)
 
-        if dedup_hash in cls._dedup_index:
-            pid = cls._dedup_index[dedup_hash]
-            if pid in cls._proposals:
-                return pid
-            # Found in index but missing in storage? Stale. Remove and continue.
-            del cls._dedup_index[dedup_hash]
-
-        # 3. Create Proposal
-        pid = str(uuid.uuid4())
-        proposal = {
-            "id": pid,
-            "session_id": context.session_id,
-            "user_id": context.user_id, # Flattened for Indexing
-            "decision": context.decision,
-            "risk_score": context.risk_score,
-            "suggested_action": suggested_action,
-            "context": context.to_dict(),
-            "status": EnforcementState.CREATED,
-            "created_at": time.time(),
-            "expires_at": time.time() + cls.PROPOSAL_TTL,
-            "auto_rollback_at": time.time() + cls.PROPOSAL_TTL + 3600, # Default auto-rollback window
-            "dedup_hash": dedup_hash,
-            "execution_lock": False
-        }
-        
-        cls._proposals[pid] = proposal
-        cls._dedup_index[dedup_hash] = pid
-        
-        return pid
+            pid = cls._dedup_index.get(dedup_key)
+            if pid is not None:
+                if pid in cls._proposals:
+                    return pid
+                # Found in index but missing in storage? Stale. Remove and continue.
+                del cls._dedup_index[dedup_key]
+
+            # 3. Create Proposal
+            pid = str(uuid.uuid4())
+            proposal = {
+                "id": pid,
+                "session_id": context.session_id,
+                "user_id": context.user_id, # Flattened for Indexing
+                "decision": context.decision,
+                "risk_score": context.risk_score,
+                "suggested_action": suggested_action,
+                "context": context.to_dict(),
+                "status": EnforcementState.CREATED,
+                "created_at": now,
+                "expires_at": now + cls.PROPOSAL_TTL,
+                "auto_rollback_at": now + cls.PROPOSAL_TTL + 3600, # Default auto-rollback window
+                "dedup_hash": ":".join(str(k) for k in dedup_key),
+                "execution_lock": False
+            }
+
+            cls._index(proposal)
+            if cls._store:
+                cls._store.save(proposal)
+
+            return pid
 
     @classmethod
     def get_proposal(cls, pid: str) -> Optional[Dict[str, Any]]:
-        return cls._proposals.get(pid)
+        with cls._lock:
+            proposal = cls._proposals.get(pid)
+            if proposal and proposal["expires_at"] < time.time():
+                cls._cleanup()
+                return None
+            return proposal
 
     @classmethod
     def update_status(cls, pid: str, status: str):
-        if pid in cls._proposals:
-            current = cls._proposals[pid]["status"]
-            # Validate transition using State Machine
-            EnforcementStateMachine.validate_transition(current, status)
-            cls._proposals[pid]["status"] = status
-            
+        with cls._lock:
+            if pid in cls._proposals:
+                proposal = cls._proposals[pid]
+                current = proposal["status"]
+                # Validate transition using State Machine
+                EnforcementStateMachine.validate_transition(current, status)
+                cls._by_status.get(_status_key(current), {}).pop(pid, None)
+                cls._by_status.setdefault(_status_key(status), {})[pid] = None
+                proposal["status"] = status
+                if cls._store:
+                    cls._store.save(proposal)
+                cls._notify("status", proposal, current)
+
     @classmethod
     def list_proposals(cls, status_filter: str = None) -> List[Dict[str, Any]]:
-        if status_filter:
-            return [v for v in cls._proposals.values() if v["status"] == status_filter]
-        return list(cls._proposals.values())
+        with cls._lock:
+            cls._cleanup()
+            if status_filter:
+                pids = cls._by_status.get(_status_key(status_filter), {})
+                return [cls._proposals[pid] for pid in pids]
+            return list(cls._proposals.values())
+
+    @classmethod
+    def list_by_session(cls, session_id: str) -> List[Dict[str, Any]]:
+        with cls._lock:
+            cls._cleanup()
+            return [cls._proposals[pid] for pid in cls._by_session.get(session_id, ())]
+
+    @classmethod
+    def list_by_user(cls, user_id: str) -> List[Dict[str, Any]]:
+        with cls._lock:
+            cls._cleanup()
+            return [cls._proposals[pid] for pid in cls._by_user.get(user_id, ())]
+
+    @classmethod
+    def find_active(cls, session_id: str, suggested_action: str) -> Optional[str]:
+        """
+        Returns the id of a non-terminal proposal for this session + action, if any.
+        """
+        for p in cls.list_by_session(session_id):
+            if p["suggested_action"] == suggested_action and _status_key(p["status"]) not in INACTIVE_STATUSES:
+                return p["id"]
+        return None
+
+    @classmethod
+    def expire_due(cls):
+        """
+        Drops expired proposals now (normally done lazily on reads/writes).
+        """
+        cls._cleanup()
+
+    @classmethod
+    def subscribe(cls, listener: Callable[[str, Dict[str, Any], Any], None], replay: bool = False):
+        """
+        listener(event, proposal, previous_status) with event in
+        "registered" / "status" / "expired" / "reset". Called under the registry lock.
+        With replay=True the listener first gets a "replayed" event per live proposal.
+        """
+        with cls._lock:
+            if listener in cls._listeners:
+                return
+            cls._listeners.append(listener)
+            if replay:
+                cls._cleanup()
+                for proposal in cls._proposals.values():
+                    listener("replayed", proposal, None)
+
+    @classmethod
+    def unsubscribe(cls, listener):
+        with cls._lock:
+            if listener in cls._listeners:
+                cls._listeners.remove(listener)
+
+    @classmethod
+    def configure_store(cls, store):
+        """
+        Attaches a durable store and reloads its non-expired proposals into memory.
+        """
+        with cls._lock:
+            cls._store = store
+            if store is None:
+                return
+            for proposal in store.load_active():
+                proposal["status"] = EnforcementState(proposal["status"])
+                if proposal["id"] not in cls._proposals:
+                    cls._index(proposal)
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._proposals = {}
+            cls._dedup_index = {}
+            cls._by_status = {}
+            cls._by_session = {}
+            cls._by_user = {}
+            cls._expiry_heap = []
+            cls._notify("reset", {}, None)
+
+    @classmethod
+    def _index(cls, proposal: Dict[str, Any]):
+        # Caller holds cls._lock
+        pid = proposal["id"]
+        cls._proposals[pid] = proposal
+        cls._dedup_index[cls._key_of(proposal)] = pid
+        cls._by_status.setdefault(_status_key(proposal["status"]), {})[pid] = None
+        cls._by_session.setdefault(proposal["session_id"], set()).add(pid)
+        cls._by_user.setdefault(proposal["user_id"], set()).add(pid)
+        heapq.heappush(cls._expiry_heap, (proposal["expires_at"], pid))
+        cls._notify("registered", proposal, None)
+
+    @classmethod
+    def _notify(cls, event: str, proposal: Dict[str, Any], previous):
+        # Caller holds cls._lock; a failing listener must not break enforcement
+        for listener in cls._listeners:
+            try:
+                listener(event, proposal, previous)
+            except Exception as e:
+                print(f"[ProposalRegistry] Listener error on {event}: {e}")
+
+    @staticmethod
+    def _key_of(proposal: Dict[str, Any]) -> Tuple:
+        return _dedup_key(proposal["session_id"], proposal["decision"], proposal["risk_score"], proposal["created_at"])
 
     @classmethod
     def _cleanup(cls):
         now = time.time()
-        expired_ids = [pid for pid, p in cls._proposals.items() if p["expires_at"] < now]
-        for pid in expired_ids:
-            h = cls._proposals[pid]["dedup_hash"]
-            if h in cls._dedup_index:
-                del cls._dedup_index[h]
-            del cls._proposals[pid]
+        expired_ids = []
+        with cls._lock:
+            heap = cls._expiry_heap
+            while heap and heap[0][0] < now:
+                _, pid = heapq.heappop(heap)
+                proposal = cls._proposals.pop(pid, None)
+                if proposal is None:
+                    continue
+                expired_ids.append(pid)
+                for index, key in ((cls._by_session, proposal["session_id"]), (cls._by_user, proposal["user_id"])):
+                    bucket = index.get(key)
+                    if bucket is not None:
+                        bucket.discard(pid)
+                        if not bucket:
+                            del index[key]
+                cls._by_status.get(_status_key(proposal["status"]), {}).pop(pid, None)
+                dedup_key = cls._key_of(proposal)
+                if cls._dedup_index.get(dedup_key) == pid:
+                    del cls._dedup_index[dedup_key]
+                cls._notify("expired", proposal, proposal["status"])
+            if expired_ids and cls._store:
+                cls._store.delete(expired_ids)
+
+if os.getenv("PROPOSAL_STORE_URL"):
+    from backend.enforcement.state.proposal_store import SqlProposalStore
+    ProposalRegistry.configure_store(SqlProposalStore(os.environ["PROPOSAL_STORE_URL"]))
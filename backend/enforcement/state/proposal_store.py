@@ -0,0 +1,66 @@
+import json
+import time
+from typing import Dict, Any, List
+
+from sqlalchemy import create_engine, MetaData, Table, Column, String, Float, Text, Index, select, delete
+from sqlalchemy.dialects import postgresql, sqlite
+
+class SqlProposalStore:
+    """
+    Optional durable backend for ProposalRegistry (SQLite or PostgreSQL URL).
+    Write-through: the registry stays the in-memory source of truth for reads;
+    this store only exists so open proposals survive a restart.
+    """
+
+    def __init__(self, url: str):
+        self.engine = create_engine(url)
+        self.metadata = MetaData()
+        self.table = Table(
+            "enforcement_proposals", self.metadata,
+            Column("id", String(36), primary_key=True),
+            Column("session_id", String(64)),
+            Column("user_id", String(64)),
+            Column("status", String(20), nullable=False),
+            Column("expires_at", Float, nullable=False),
+            Column("payload", Text, nullable=False),
+            Index("ix_enforcement_proposals_expires_at", "expires_at"),
+        )
+        self.metadata.create_all(self.engine)
+
+    def _insert(self):
+        dialect = self.engine.dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert(self.table)
+        if dialect == "sqlite":
+            return sqlite.insert(self.table)
+        raise ValueError(f"Unsupported proposal store dialect: {dialect}")
+
+    def save(self, proposal: Dict[str, Any]):
+        row = {
+            "id": proposal["id"],
+            "session_id": proposal.get("session_id"),
+            "user_id": proposal.get("user_id"),
+            "status": str(getattr(proposal["status"], "value", proposal["status"])),
+            "expires_at": proposal["expires_at"],
+            "payload": json.dumps(proposal, default=str),
+        }
+        stmt = self._insert().values(**row)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={k: stmt.excluded[k] for k in ("status", "expires_at", "payload")}
+        )
+        with self.engine.begin() as conn:
+            conn.execute(stmt)
+
+    def delete(self, pids: List[str]):
+        if not pids:
+            return
+        with self.engine.begin() as conn:
+            conn.execute(delete(self.table).where(self.table.c.id.in_(pids)))
+
+    def load_active(self, now: float = None) -> List[Dict[str, Any]]:
+        now = now if now is not None else time.time()
+        with self.engine.begin() as conn:
+            conn.execute(delete(self.table).where(self.table.c.expires_at < now))
+            rows = conn.execute(select(self.table.c.payload)).all()
+        return [json.loads(r[0]) for r in rows]
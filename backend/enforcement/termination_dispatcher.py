@@ -0,0 +1,282 @@
+import os
+import uuid
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from sqlalchemy import event, func, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session as OrmSession
+
+from backend.extensions import db
+from backend.db.models import TerminationOutbox
+from backend.monitoring.stage_metrics import StageMetrics
+
+TARGET_APP_WEBHOOK = os.getenv("TARGET_APP_WEBHOOK", "http://localhost:3001/api/terminate")
+BATCH_WEBHOOK = os.getenv("TARGET_APP_WEBHOOK_BATCH", "1") == "1" # target accepts {"session_ids": [...]}
+WORKER_COUNT = int(os.getenv("TERMINATION_WORKERS", "2"))
+REQUEST_TIMEOUT_SEC = float(os.getenv("TERMINATION_WEBHOOK_TIMEOUT", "2.0"))
+MAX_ATTEMPTS = int(os.getenv("TERMINATION_MAX_ATTEMPTS", "8"))
+BATCH_SIZE = 50
+BACKOFF_BASE_SEC = 1.0
+BACKOFF_MAX_SEC = 300.0
+# A claimed row is invisible to other workers this long (crash recovery). It must outlive the
+# slowest batch: the per-id fallback sends up to BATCH_SIZE requests after the rejected batch
+# request, each bounded by connect + read timeout.
+LEASE_SEC = (BATCH_SIZE + 1) * REQUEST_TIMEOUT_SEC * 2 + 30.0
+POLL_INTERVAL_SEC = 5.0  # picks up retries and rows committed by other processes
+
+_WAKE_FLAG = "termination_outbox"
+
+# Delivery outcome per session id: None = delivered, else (retryable, error)
+Outcome = Optional[Tuple[bool, str]]
+
+def backoff_seconds(attempts: int) -> float:
+    return min(BACKOFF_MAX_SEC, BACKOFF_BASE_SEC * (2 ** max(0, attempts - 1)))
+
+class TerminationDispatcher:
+    """
+    Outbox-based delivery of target-app termination webhooks.
+
+    enqueue() only adds a TerminationOutbox row to the caller's transaction,
+    so no request thread ever waits on the target app. Once that transaction
+    commits, a small worker pool claims due rows (FOR UPDATE SKIP LOCKED plus
+    a lease), sends them over a pooled keep-alive HTTP session - many session
+    ids per request when the target supports it - and settles each row:
+    SENT, back to PENDING with exponential backoff, or DEAD after
+    MAX_ATTEMPTS / a non-retryable 4xx.
+    """
+    _app = None
+    _workers: List[threading.Thread] = []
+    _wake = threading.Event()
+    _lock = threading.Lock()
+    _batch_supported = BATCH_WEBHOOK
+
+    # --- Producer side ---------------------------------------------------------
+
+    @classmethod
+    def enqueue(cls, session_id: str, reason: Optional[str] = None, commit: bool = True) -> Optional[str]:
+        """
+        Queues a termination for session_id. With commit=False the row rides on
+        the caller's open transaction (atomic with its own writes).
+        A session already waiting in the outbox is not queued twice; the
+        uq_termination_outbox_pending index settles concurrent enqueues.
+        """
+        if not session_id or session_id == "anonymous":
+            return None
+        existing = cls._pending_id(session_id)
+        if existing is not None:
+            return existing
+
+        row_id = str(uuid.uuid4())
+        result = db.session.execute(cls._insert_pending().values(
+            id=row_id, session_id=session_id, reason=(reason or "")[:255] or None,
+            status="PENDING", attempts=0, next_attempt_at=datetime.utcnow(), created_at=datetime.utcnow(),
+        ))
+        if result.rowcount == 0:
+            # Another transaction queued this session first
+            return cls._pending_id(session_id)
+        db.session.info[_WAKE_FLAG] = True
+        if commit:
+            db.session.commit()
+        return row_id
+
+    @staticmethod
+    def _insert_pending():
+        table = TerminationOutbox.__table__
+        dialect = db.engine.dialect.name
+        if dialect not in ("postgresql", "sqlite"):
+            return insert(table) # the unique index still rejects a duplicate
+        stmt = (postgresql if dialect == "postgresql" else sqlite).insert(table)
+        return stmt.on_conflict_do_nothing(index_elements=["session_id"], index_where=table.c.status == "PENDING")
+
+    @staticmethod
+    def _pending_id(session_id: str) -> Optional[str]:
+        existing = (
+            db.session.query(TerminationOutbox.id)
+            .filter(TerminationOutbox.session_id == session_id, TerminationOutbox.status == "PENDING")
+            .first()
+        )
+        return existing.id if existing is not None else None
+
+    # --- Workers -----------------------------------------------------------------
+
+    @classmethod
+    def start(cls, app, workers: int = WORKER_COUNT):
+        with cls._lock:
+            if cls._workers:
+                return
+            cls._app = app
+            for i in range(workers):
+                worker = threading.Thread(target=cls._worker_loop, name=f"TerminationDispatcher-{i}", daemon=True)
+                worker.start()
+                cls._workers.append(worker)
+        cls._wake.set() # deliver anything left over from before a restart
+
+    @classmethod
+    def _worker_loop(cls):
+        http = cls._http_session()
+        while True:
+            try:
+                with cls._app.app_context():
+                    claimed = cls.dispatch_once(http)
+            except Exception as e:
+                print(f"[TerminationDispatcher] Dispatch failed: {e}")
+                claimed = 0
+            if not claimed:
+                cls._wake.wait(POLL_INTERVAL_SEC)
+                cls._wake.clear()
+
+    @staticmethod
+    def _http_session() -> requests.Session:
+        http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=0)
+        http.mount("http://", adapter)
+        http.mount("https://", adapter)
+        return http
+
+    @classmethod
+    def dispatch_once(cls, http, now: Optional[datetime] = None) -> int:
+        """
+        Claims, sends and settles one batch of due rows. Needs an app context.
+        Returns the number of rows claimed (0 = nothing due).
+        """
+        now = now or datetime.utcnow()
+        claimed = cls._claim(now)
+        if not claimed:
+            return 0
+        session_ids = list(dict.fromkeys(session_id for _, session_id in claimed))
+        with StageMetrics.timer("termination_webhook"):
+            outcomes = cls._send(http, session_ids)
+        cls._settle(claimed, outcomes, datetime.utcnow())
+        return len(claimed)
+
+    @staticmethod
+    def _claim(now: datetime) -> List[Tuple[str, str]]:
+        rows = (
+            TerminationOutbox.query
+            .filter(TerminationOutbox.status == "PENDING", TerminationOutbox.next_attempt_at <= now)
+            .order_by(TerminationOutbox.next_attempt_at)
+            .limit(BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        lease_until = now + timedelta(seconds=LEASE_SEC)
+        claimed = []
+        for row in rows:
+            row.attempts += 1
+            row.next_attempt_at = lease_until
+            claimed.append((row.id, row.session_id))
+        db.session.commit()
+        return claimed
+
+    @classmethod
+    def _send(cls, http, session_ids: List[str]) -> Dict[str, Outcome]:
+        if cls._batch_supported and len(session_ids) > 1:
+            outcome = cls._post(http, {"session_ids": session_ids})
+            if outcome is None or outcome[0]:
+                return {sid: outcome for sid in session_ids}
+            # Non-retryable rejection of the batch form: fall back to one id per request
+            print(f"[TerminationDispatcher] Batch webhook rejected ({outcome[1]}); sending individually")
+            cls._batch_supported = False
+        return {sid: cls._post(http, {"session_id": sid}) for sid in session_ids}
+
+    @staticmethod
+    def _post(http, body: Dict[str, Any]) -> Outcome:
+        try:
+            resp = http.post(TARGET_APP_WEBHOOK, json=body, timeout=REQUEST_TIMEOUT_SEC)
+        except Exception as e:
+            return True, f"unreachable: {e}"
+        if 200 <= resp.status_code < 300:
+            return None
+        retryable = resp.status_code >= 500 or resp.status_code in (408, 429)
+        return retryable, f"HTTP {resp.status_code}"
+
+    @staticmethod
+    def _settle(claimed: List[Tuple[str, str]], outcomes: Dict[str, Outcome], now: datetime):
+        rows = TerminationOutbox.query.filter(TerminationOutbox.id.in_([row_id for row_id, _ in claimed])).all()
+        counts = {"sent": 0, "retry": 0, "dead": 0}
+        for row in rows:
+            outcome = outcomes.get(row.session_id)
+            if outcome is None:
+                row.status = "SENT"
+                row.sent_at = now
+                row.last_error = None
+                counts["sent"] += 1
+                continue
+            retryable, error = outcome
+            row.last_error = error[:255]
+            if retryable and row.attempts < MAX_ATTEMPTS:
+                row.next_attempt_at = now + timedelta(seconds=backoff_seconds(row.attempts))
+                counts["retry"] += 1
+            else:
+                row.status = "DEAD"
+                counts["dead"] += 1
+                print(f"[TerminationDispatcher] Dead-lettered termination for {row.session_id}: {error}")
+        db.session.commit()
+        for outcome, n in counts.items():
+            if n:
+                StageMetrics.inc("termination_webhooks", n, outcome=outcome)
+
+    # --- Operations ----------------------------------------------------------------
+
+    @staticmethod
+    def stats() -> Dict[str, int]:
+        rows = db.session.query(TerminationOutbox.status, func.count()).group_by(TerminationOutbox.status).all()
+        return {status: n for status, n in rows}
+
+    @staticmethod
+    def dead_letters(limit: int = 100) -> List[Dict[str, Any]]:
+        rows = (
+            TerminationOutbox.query.filter_by(status="DEAD")
+            .order_by(TerminationOutbox.created_at.desc())
+            .limit(limit)
+            .all()
+        )
+        return [row.to_dict() for row in rows]
+
+    @classmethod
+    def retry_dead(cls, ids: Optional[List[str]] = None) -> int:
+        """
+        Moves dead-lettered rows (all, or the given ids) back to PENDING.
+        At most one row per session is revived, and none for a session that
+        is already pending again.
+        """
+        query = TerminationOutbox.query.filter_by(status="DEAD")
+        if ids:
+            query = query.filter(TerminationOutbox.id.in_(ids))
+        rows = query.order_by(TerminationOutbox.created_at.desc()).all()
+        pending = set()
+        if rows:
+            pending_rows = (
+                db.session.query(TerminationOutbox.session_id)
+                .filter(TerminationOutbox.status == "PENDING",
+                        TerminationOutbox.session_id.in_(list({row.session_id for row in rows})))
+                .all()
+            )
+            pending = {session_id for session_id, in pending_rows}
+        now = datetime.utcnow()
+        n = 0
+        for row in rows:
+            if row.session_id in pending:
+                continue
+            pending.add(row.session_id)
+            row.status = "PENDING"
+            row.attempts = 0
+            row.next_attempt_at = now
+            n += 1
+        db.session.info[_WAKE_FLAG] = True
+        db.session.commit()
+        return n
+
+@event.listens_for(OrmSession, "after_commit")
+def _wake_on_commit(session):
+    # Rows are only visible to workers once committed
+    if session.info.pop(_WAKE_FLAG, False):
+        TerminationDispatcher._wake.set()
+
+@event.listens_for(OrmSession, "after_rollback")
+def _clear_on_rollback(session):
+    session.info.pop(_WAKE_FLAG, None)
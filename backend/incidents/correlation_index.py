@@ -0,0 +1,256 @@
+import os
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple, List, Optional, Any, Iterable
+
+from backend.incidents.enums import IncidentSeverity
+
+# A correlation key stops matching once it has been quiet this long
+CORRELATION_WINDOW_SEC = int(os.getenv("INCIDENT_CORRELATION_WINDOW_SEC", "1800"))
+
+# (kind, signal fields that carry it), in match priority order
+KEY_FIELDS = (
+    ("session", ("session_id",)),
+    ("actor", ("actor_id",)),
+    ("user", ("user_id",)),
+    ("ip", ("ip_address", "source_ip", "ip")),
+)
+
+SEVERITY_RANK = {
+    IncidentSeverity.LOW: 0,
+    IncidentSeverity.MEDIUM: 1,
+    IncidentSeverity.HIGH: 2,
+    IncidentSeverity.CRITICAL: 3,
+}
+
+CorrelationKey = Tuple[str, str]
+
+class _OpenIncident:
+    __slots__ = ("incident_id", "tenant_id", "severity", "keys", "signal_count", "last_seen")
+
+    def __init__(self, incident_id: str, tenant_id: str, severity: IncidentSeverity, now: float):
+        self.incident_id = incident_id
+        self.tenant_id = tenant_id
+        self.severity = severity
+        self.keys = set()
+        self.signal_count = 0
+        self.last_seen = now
+
+class CorrelationIndex:
+    """
+    In-memory index of OPEN incidents, per tenant, keyed by session / actor /
+    user / IP. Attaching a signal is a handful of dict lookups; keys expire
+    after CORRELATION_WINDOW_SEC of silence (oldest-first via an ordered dict,
+    so expiry is O(expired)).
+
+    Writes are not done here: every change is accumulated per incident in a
+    pending buffer that IncidentManager drains into one DB transaction, so a
+    burst of signals for the same incident becomes a single update.
+    """
+    WINDOW_SEC = CORRELATION_WINDOW_SEC
+
+    _tenants: Dict[str, Dict[CorrelationKey, str]] = {}
+    _incidents: Dict[str, _OpenIncident] = {}
+    _expiry: "OrderedDict[Tuple[str, CorrelationKey], float]" = OrderedDict()
+    _pending: Dict[str, Dict[str, Any]] = {}
+    _lock = threading.RLock()
+
+    @staticmethod
+    def keys_for(signal: Dict[str, Any]) -> List[CorrelationKey]:
+        keys = []
+        for kind, fields in KEY_FIELDS:
+            for field in fields:
+                value = signal.get(field)
+                if value:
+                    keys.append((kind, str(value)))
+                    break
+        return keys
+
+    @classmethod
+    def attach(cls, signal: Dict[str, Any], severity: IncidentSeverity, now: Optional[float] = None) -> Tuple[str, bool]:
+        """
+        Attaches a signal to the open incident sharing any of its keys, or
+        opens a new one. Returns (incident_id, created).
+        Signals without any identifying key share one per-tenant incident.
+        """
+        now = time.time() if now is None else now
+        tenant_id = signal.get("tenant_id") or "default"
+        keys = cls.keys_for(signal) or [("tenant", tenant_id)]
+
+        with cls._lock:
+            cls._expire(now)
+            index = cls._tenants.setdefault(tenant_id, {})
+
+            incident = None
+            for key in keys:
+                incident_id = index.get(key)
+                if incident_id is not None:
+                    incident = cls._incidents[incident_id]
+                    break
+
+            created = incident is None
+            if created:
+                incident = _OpenIncident(str(uuid.uuid4()), tenant_id, severity, now)
+                cls._incidents[incident.incident_id] = incident
+            pending = cls._pending.setdefault(incident.incident_id, {
+                "tenant_id": tenant_id, "created": created, "severity": None, "keys": [], "signals": 0
+            })
+
+            if created or SEVERITY_RANK[severity] > SEVERITY_RANK[incident.severity]:
+                incident.severity = severity
+                pending["severity"] = severity
+
+            for key in keys:
+                owner = index.get(key)
+                if owner != incident.incident_id:
+                    if owner is not None:
+                        cls._release(owner, key)
+                    index[key] = incident.incident_id
+                    incident.keys.add(key)
+                    pending["keys"].append(key)
+                slot = (tenant_id, key)
+                cls._expiry[slot] = now
+                cls._expiry.move_to_end(slot)
+
+            incident.signal_count += 1
+            incident.last_seen = now
+            pending["signals"] += 1
+            return incident.incident_id, created
+
+    @classmethod
+    def find(cls, tenant_id: str, key: CorrelationKey) -> Optional[str]:
+        with cls._lock:
+            return cls._tenants.get(tenant_id or "default", {}).get(key)
+
+    @classmethod
+    def get(cls, incident_id: str) -> Optional[Dict[str, Any]]:
+        with cls._lock:
+            incident = cls._incidents.get(incident_id)
+            if incident is None:
+                return None
+            return {
+                "incident_id": incident.incident_id,
+                "tenant_id": incident.tenant_id,
+                "severity": incident.severity.value,
+                "keys": sorted(incident.keys),
+                "signal_count": incident.signal_count,
+                "last_seen": incident.last_seen
+            }
+
+    @classmethod
+    def close(cls, incident_id: str):
+        """
+        Incident left OPEN: stop correlating new signals into it.
+        """
+        with cls._lock:
+            incident = cls._incidents.pop(incident_id, None)
+            if incident is None:
+                return
+            index = cls._tenants.get(incident.tenant_id, {})
+            for key in incident.keys:
+                if index.get(key) == incident_id:
+                    del index[key]
+                cls._expiry.pop((incident.tenant_id, key), None)
+
+    @classmethod
+    def _expire(cls, now: float):
+        # Caller holds cls._lock
+        horizon = now - cls.WINDOW_SEC
+        while cls._expiry:
+            (tenant_id, key), last_seen = next(iter(cls._expiry.items()))
+            if last_seen >= horizon:
+                break
+            cls._expiry.popitem(last=False)
+            index = cls._tenants.get(tenant_id, {})
+            incident_id = index.pop(key, None)
+            if incident_id is not None:
+                cls._release(incident_id, key)
+            if not index:
+                cls._tenants.pop(tenant_id, None)
+
+    @classmethod
+    def _release(cls, incident_id: str, key: CorrelationKey):
+        # Caller holds cls._lock. An incident with no live keys can no longer be matched.
+        incident = cls._incidents.get(incident_id)
+        if incident is not None:
+            incident.keys.discard(key)
+            if not incident.keys:
+                del cls._incidents[incident_id]
+
+    # --- Write-behind buffer -------------------------------------------------
+
+    @classmethod
+    def drain(cls) -> Dict[str, Dict[str, Any]]:
+        with cls._lock:
+            pending, cls._pending = cls._pending, {}
+            return pending
+
+    @classmethod
+    def requeue(cls, pending: Dict[str, Dict[str, Any]]):
+        """
+        Puts back a drained batch whose write failed (merged with anything newer).
+        """
+        with cls._lock:
+            for incident_id, change in pending.items():
+                current = cls._pending.get(incident_id)
+                if current is None:
+                    cls._pending[incident_id] = change
+                    continue
+                current["created"] = current["created"] or change["created"]
+                if current["severity"] is None:
+                    current["severity"] = change["severity"]
+                current["keys"] = change["keys"] + current["keys"]
+                current["signals"] += change["signals"]
+                current["attempts"] = max(current.get("attempts", 0), change.get("attempts", 0))
+
+    # --- Lifecycle -------------------------------------------------------------
+
+    @classmethod
+    def load(cls, incidents: Iterable[Tuple[str, str, IncidentSeverity, Iterable[Tuple[CorrelationKey, float]]]],
+             now: Optional[float] = None) -> int:
+        """
+        Rebuilds the index from persisted state:
+        (incident_id, tenant_id, severity, [(key, last_seen), ...]).
+        Keys already outside the window are skipped. Returns incidents indexed.
+        """
+        now = time.time() if now is None else now
+        horizon = now - cls.WINDOW_SEC
+        slots = []
+        with cls._lock:
+            cls._reset_locked()
+            for incident_id, tenant_id, severity, keys in incidents:
+                incident = _OpenIncident(incident_id, tenant_id, severity, horizon)
+                index = cls._tenants.setdefault(tenant_id, {})
+                cls._incidents[incident_id] = incident
+                for key, last_seen in keys:
+                    if last_seen < horizon:
+                        continue
+                    owner = index.get(key)
+                    if owner is not None and owner != incident_id:
+                        cls._release(owner, key)
+                    index[key] = incident_id
+                    incident.keys.add(key)
+                    incident.last_seen = max(incident.last_seen, last_seen)
+                    slots.append((last_seen, (tenant_id, key)))
+                if not incident.keys:
+                    del cls._incidents[incident_id]
+                    if not index:
+                        cls._tenants.pop(tenant_id, None)
+            for last_seen, slot in sorted(slots):
+                cls._expiry[slot] = last_seen
+                cls._expiry.move_to_end(slot)
+            return len(cls._incidents)
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._reset_locked()
+            cls._pending = {}
+
+    @classmethod
+    def _reset_locked(cls):
+        cls._tenants = {}
+        cls._incidents = {}
+        cls._expiry = OrderedDict()
@@ -1,74 +1,261 @@
-from backend.db.models import Incident
+import uuid
+import threading
+from collections import deque
+from datetime import timezone
+from flask import current_app, has_app_context
+from backend.db.models import Incident, Signal, Session
 from backend.incidents.enums import IncidentStatus, IncidentSeverity
+from backend.incidents.correlation_index import CorrelationIndex, SEVERITY_RANK
 from backend.extensions import db
 
+CORRELATION_SIGNAL = "CORRELATION"
+MAX_FLUSH_ATTEMPTS = 5     # per incident change before it is dead-lettered
+RETRY_DELAY_SEC = 2.0
+
 class IncidentManager:
+    _flush_lock = threading.Lock() # flushes are serialized so a creation always commits before its updates
+    _dead_letters = deque(maxlen=500)
+    _retry_timer = None
+
+    @staticmethod
+    def severity_for(risk_score) -> IncidentSeverity:
+        if risk_score >= 90: return IncidentSeverity.CRITICAL
+        if risk_score >= 70: return IncidentSeverity.HIGH
+        return IncidentSeverity.MEDIUM
+
     @staticmethod
     def correlate(signal):
         """
         Rules:
-        - Same session_id OR same actor_id within time window
+        - Same session_id / actor_id / user_id / IP within the correlation window
         - If open incident exists → attach
         - Else create new incident
+
+        Matching is in-memory (CorrelationIndex); the DB write is coalesced
+        into the next flush(). Returns the incident_id.
         """
-        tenant_id = signal.get("tenant_id") or "default"
-        risk_score = signal.get("risk_score", 0)
-        
-        # Determine Severity
-        severity = IncidentSeverity.MEDIUM
-        if risk_score >= 90: severity = IncidentSeverity.CRITICAL
-        elif risk_score >= 70: severity = IncidentSeverity.HIGH
-
-        # Find open incident (mock logic for now as simplified in prompt)
-        incident = Incident.query.filter(
-            Incident.status == IncidentStatus.OPEN,
-            Incident.tenant_id == tenant_id
-        ).first()
+        severity = IncidentManager.severity_for(signal.get("risk_score", 0) or 0)
+        incident_id, created = CorrelationIndex.attach(signal, severity)
+        if created:
+            print(f"[OK] Created new Incident: {incident_id}")
+        IncidentManager._schedule_flush()
+        return incident_id
 
-        if not incident:
-            incident = Incident(
-                tenant_id=tenant_id,
-                status=IncidentStatus.OPEN,
-                severity=severity
-            )
-            db.session.add(incident)
+    @staticmethod
+    def _schedule_flush():
+        """
+        One pending flush at a time: signals arriving before it runs ride along.
+        Without an app context the caller is expected to flush() itself.
+        """
+        if not has_app_context():
+            return
+        IncidentManager._dispatch_flush(current_app._get_current_object())
+
+    @staticmethod
+    def _dispatch_flush(app):
+        from backend.orchestration.async_dispatcher import AsyncDispatcher
+        from backend.orchestration.soc_priority import SOCQueuePriority
+
+        def run(app_obj):
+            with app_obj.app_context():
+                IncidentManager.flush()
+
+        AsyncDispatcher.fire_and_forget(
+            "incident_flush", run, app,
+            _priority=SOCQueuePriority.P0,
+            _coalesce_key=("incident_flush",)
+        )
+
+    @staticmethod
+    def _schedule_retry():
+        """
+        Requeued changes get another flush after RETRY_DELAY_SEC (one timer at a time).
+        """
+        if not has_app_context():
+            return
+        app = current_app._get_current_object()
+        timer = IncidentManager._retry_timer
+        if timer is not None and timer.is_alive():
+            return
+        timer = threading.Timer(RETRY_DELAY_SEC, IncidentManager._dispatch_flush, args=(app,))
+        timer.daemon = True
+        IncidentManager._retry_timer = timer
+        timer.start()
+
+    @staticmethod
+    def flush() -> int:
+        """
+        Writes all pending correlation changes in one transaction:
+        new incidents, severity escalations, and one CORRELATION signal row per
+        incident carrying newly bound keys (what rebuild_index() reads back).
+        Returns the number of incidents touched.
+        """
+        with IncidentManager._flush_lock:
+            return IncidentManager._flush_locked()
+
+    @staticmethod
+    def _flush_locked() -> int:
+        pending = CorrelationIndex.drain()
+        if not pending:
+            return 0
+        try:
+            existing_ids = [iid for iid, change in pending.items() if not change["created"]]
+            existing = {}
+            if existing_ids:
+                existing = {
+                    inc.incident_id: inc
+                    for inc in Incident.query.filter(Incident.incident_id.in_(existing_ids)).all()
+                }
+            # Signal.session_id is a FK: only bind sessions that are already committed
+            session_ids = {value for change in pending.values() for kind, value in change["keys"] if kind == "session"}
+            persisted = set()
+            if session_ids:
+                persisted = {sid for (sid,) in db.session.query(Session.session_id)
+                             .filter(Session.session_id.in_(session_ids)).all()}
+
+            retry, written = {}, 0
+            for incident_id, change in pending.items():
+                sessions = [value for kind, value in change["keys"] if kind == "session"]
+                bound = next((sid for sid in sessions if sid in persisted), None)
+                try:
+                    # One savepoint per incident: a bad row only fails its own change
+                    with db.session.begin_nested():
+                        IncidentManager._write_change(incident_id, change, existing.get(incident_id), bound)
+                except Exception as e:
+                    print(f"[ERROR] Incident {incident_id} flush failed: {e}")
+                    retry[incident_id] = change
+                    continue
+                written += 1
+                if sessions and bound is None:
+                    # Session not committed yet: the incident is written, its keys follow later
+                    retry[incident_id] = dict(change, created=False, severity=None, deferred=True)
             db.session.commit()
-            print(f"[OK] Created new Incident: {incident.incident_id}")
-        else:
-            # Optionally upgrade severity if new signal is higher
-            if severity == IncidentSeverity.CRITICAL and incident.severity != IncidentSeverity.CRITICAL:
-                incident.severity = IncidentSeverity.CRITICAL
-                db.session.commit()
-        
+        except Exception as e:
+            # Whole flush failed (e.g. database unavailable): keep everything, retry later
+            db.session.rollback()
+            CorrelationIndex.requeue(pending)
+            print(f"[ERROR] Incident correlation flush failed: {e}")
+            IncidentManager._schedule_retry()
+            return 0
+
+        if retry:
+            IncidentManager._requeue_or_dead_letter(retry)
+        return written
+
+    @staticmethod
+    def _write_change(incident_id, change, incident, session_id):
+        if change["created"]:
+            db.session.add(Incident(
+                incident_id=incident_id,
+                tenant_id=change["tenant_id"],
+                status=IncidentStatus.OPEN,
+                severity=change["severity"] or IncidentSeverity.MEDIUM
+            ))
+        elif change["severity"] is not None and incident is not None:
+            if SEVERITY_RANK[change["severity"]] > SEVERITY_RANK.get(incident.severity, 0):
+                incident.severity = change["severity"]
+
+        if session_id:
+            # Signal rows hang off a session; keyless correlations stay in memory only
+            db.session.add(Signal(
+                signal_id=str(uuid.uuid4()),
+                session_id=session_id,
+                incident_id=incident_id,
+                signal_type=CORRELATION_SIGNAL,
+                severity=(change["severity"] or IncidentSeverity.MEDIUM).value,
+                signal_metadata={"keys": [list(key) for key in change["keys"]], "signals": change["signals"]}
+            ))
+
+    @staticmethod
+    def _requeue_or_dead_letter(changes):
+        requeue = {}
+        for incident_id, change in changes.items():
+            attempts = change.get("attempts", 0) + 1
+            if attempts >= MAX_FLUSH_ATTEMPTS:
+                if change.get("deferred"):
+                    # Session never persisted (live-only): its keys stay in memory only
+                    continue
+                IncidentManager._dead_letters.append({"incident_id": incident_id, **change})
+                print(f"[ERROR] Incident {incident_id} change dead-lettered after {attempts} attempts")
+                continue
+            requeue[incident_id] = dict(change, attempts=attempts)
+        if requeue:
+            CorrelationIndex.requeue(requeue)
+            IncidentManager._schedule_retry()
+
+    @staticmethod
+    def dead_letters():
+        return list(IncidentManager._dead_letters)
+
+    @staticmethod
+    def rebuild_index() -> int:
+        """
+        Startup: re-index OPEN incidents from their persisted correlation keys.
+        """
+        open_incidents = Incident.query.filter(Incident.status == IncidentStatus.OPEN).all()
+        if not open_incidents:
+            return CorrelationIndex.load([])
+        keys = {inc.incident_id: {} for inc in open_incidents}
+        rows = Signal.query.filter(
+            Signal.incident_id.in_(list(keys)),
+            Signal.signal_type == CORRELATION_SIGNAL
+        ).all()
+        for row in rows:
+            seen = row.created_at.replace(tzinfo=timezone.utc).timestamp() if row.created_at else 0.0
+            for kind, value in (row.signal_metadata or {}).get("keys", []):
+                key = (kind, value)
+                keys[row.incident_id][key] = max(seen, keys[row.incident_id].get(key, 0.0))
+
+        count = CorrelationIndex.load(
+            (inc.incident_id, inc.tenant_id, inc.severity, keys[inc.incident_id].items())
+            for inc in open_incidents
+        )
+        print(f"[OK] Incident correlation index rebuilt: {count} open incidents")
+        return count
+
     @staticmethod
     def transition_state(incident_id, new_status):
-        import uuid
         try:
             uuid.UUID(str(incident_id))
         except ValueError:
             return False
 
         from backend.incidents.lifecycle import transition_status
-        incident = Incident.query.filter_by(id=incident_id).first()
+        incident = Incident.query.filter_by(incident_id=str(incident_id)).first()
         if not incident:
             return False
         transition_status(incident, new_status)
         db.session.commit()
+        if new_status != IncidentStatus.OPEN:
+            CorrelationIndex.close(str(incident_id))
         return True
 
-    _ACTIVE_GROUPS = {}
+    @staticmethod
+    def find_incident(session_id=None, user_id=None, tenant_id="default"):
+        """
+        Open incident currently correlated with a session or user, if any.
+        """
+        for key in (("session", session_id), ("user", user_id)):
+            if key[1]:
+                incident_id = CorrelationIndex.find(tenant_id, (key[0], str(key[1])))
+                if incident_id:
+                    return incident_id
+        return None
 
     @staticmethod
     def link_proposal_to_incident(proposal: dict) -> str:
-        import uuid
-        incident_id = str(uuid.uuid4())
-        session_id = proposal.get("session_id")
-        user_id = proposal.get("user_id")
-
-        if session_id:
-             IncidentManager._ACTIVE_GROUPS[session_id] = incident_id
-        if user_id:
-             IncidentManager._ACTIVE_GROUPS[user_id] = incident_id
-
+        """
+        Enforcement proposals join the same correlation index as signals.
+        """
+        context = proposal.get("context") or {}
+        try:
+            severity = IncidentSeverity(str(proposal.get("severity", "")).upper())
+        except ValueError:
+            severity = IncidentManager.severity_for(proposal.get("risk_score") or 0)
+        incident_id, _ = CorrelationIndex.attach({
+            "tenant_id": context.get("tenant_id"),
+            "session_id": proposal.get("session_id") or context.get("session_id"),
+            "user_id": proposal.get("user_id") or context.get("user_id")
+        }, severity)
+        IncidentManager._schedule_flush()
         return incident_id
-
@@ -1,8 +1,9 @@
 import os
 import json
 import threading
-from confluent_kafka import Consumer, KafkaException, KafkaError
+from confluent_kafka import Consumer, KafkaException, KafkaError, TopicPartition
 from backend.ingestion.event_ingestor import EventIngestor
+from backend.platform_core.tenant_admission import TenantAdmission
 import time
 import logging
 
@@ -10,6 +11,7 @@ logger = logging.getLogger(__name__)
 
 KAFKA_BROKER = os.environ.get('KAFKA_BROKER', 'localhost:9092')
 TOPICS = ['web-events', 'api-events', 'network-events', 'system-events']
+PAUSE_SEC = 1.0 # how long a partition stays paused after its tenant queue was full
 
 class DomainKafkaConsumer:
     def __init__(self):
@@ -17,23 +19,60 @@ class DomainKafkaConsumer:
             'bootstrap.servers': KAFKA_BROKER,
             'group.id': 'trust_engine_domain_consumer',
             'auto.offset.reset': 'latest',
-            'enable.auto.commit': True
+            # Offsets are committed only once an event is handed off (see start)
+            'enable.auto.commit': False
         })
         self.running = False
+        self._paused = {} # (topic, partition) -> resume at (monotonic)
         
-    def _validate_and_ingest(self, msg_value):
+    def _validate_and_ingest(self, msg_value) -> bool:
+        """
+        Returns False when the event could not be queued (tenant queue full)
+        and must be redelivered; malformed events are consumed (True).
+        """
         try:
             raw_data = json.loads(msg_value.decode('utf-8'))
             logger.info(f"Received event on domain [{raw_data.get('domain')}]: {raw_data.get('event_id')}")
             
-            # Use strict pipeline (Blocker 1 - EventValidator, Blocker 2 - Hash Integrity)
-            result = EventIngestor.ingest(raw_data)
-            logger.info(f"Successfully ingrained event: {result}")
+            # Per-tenant fair queue ahead of the strict pipeline: a noisy tenant's
+            # backlog waits in its own queue instead of delaying everyone else
+            tenant_id = raw_data.get("tenant_id") or "default"
+            if not TenantAdmission.submit(tenant_id, self._ingest, raw_data):
+                logger.warning(f"Tenant {tenant_id} queue full; pausing on event {raw_data.get('event_id')}")
+                return False
             
         except json.JSONDecodeError:
             logger.error("Malformed JSON in Kafka message.", exc_info=True)
         except Exception as e:
             logger.error(f"Event ingestion failed: {e}", exc_info=True)
+        return True
+
+    def _pause(self, msg):
+        """
+        Backpressure: stop fetching from the message's partition and rewind to
+        it, so the event is redelivered once the partition resumes.
+        """
+        partition = TopicPartition(msg.topic(), msg.partition(), msg.offset())
+        self.consumer.pause([partition])
+        self.consumer.seek(partition)
+        self._paused[(msg.topic(), msg.partition())] = time.monotonic() + PAUSE_SEC
+
+    def _resume_due(self):
+        now = time.monotonic()
+        due = [key for key, resume_at in self._paused.items() if resume_at <= now]
+        if due:
+            self.consumer.resume([TopicPartition(topic, partition) for topic, partition in due])
+            for key in due:
+                del self._paused[key]
+
+    @staticmethod
+    def _ingest(raw_data):
+        try:
+            # Use strict pipeline (Blocker 1 - EventValidator, Blocker 2 - Hash Integrity)
+            result = EventIngestor.ingest(raw_data)
+            logger.info(f"Successfully ingrained event: {result}")
+        except Exception as e:
+            logger.error(f"Event ingestion failed: {e}", exc_info=True)
 
     def start(self):
         self.running = True
@@ -42,6 +81,7 @@ class DomainKafkaConsumer:
             logger.info(f"Subscribed to specific domain topics: {TOPICS}")
             
             while self.running:
+                self._resume_due()
                 msg = self.consumer.poll(timeout=1.0)
                 if msg is None:
                     continue
@@ -51,7 +91,10 @@ class DomainKafkaConsumer:
                     else:
                         raise KafkaException(msg.error())
                 
-                self._validate_and_ingest(msg.value())
+                if self._validate_and_ingest(msg.value()):
+                    self.consumer.commit(message=msg, asynchronous=True)
+                else:
+                    self._pause(msg)
                 
         except Exception as e:
             logger.error(f"Kafka Consumer Loop crashed: {e}")
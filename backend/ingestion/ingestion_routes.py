@@ -2,11 +2,13 @@ from flask import Blueprint, request, jsonify
 from backend.services.ingestion_service import IngestionService
 from backend.auth.rbac import require_api_key
 from backend.extensions import limiter
+from backend.platform_core.tenant_admission import admit_tenant
 
 ingestion_bp = Blueprint('ingestion', __name__)
 
 @ingestion_bp.route('/web', methods=['POST'])
 @require_api_key
+@admit_tenant
 @limiter.exempt
 def ingest_web():
     """
@@ -33,6 +35,7 @@ def ingest_web():
 
 @ingestion_bp.route('/api', methods=['POST'])
 @require_api_key
+@admit_tenant
 @limiter.exempt
 def ingest_api():
     """
@@ -58,6 +61,7 @@ def ingest_api():
 
 @ingestion_bp.route('/system', methods=['POST'])
 @require_api_key
+@admit_tenant
 @limiter.exempt
 def ingest_system():
     """
@@ -83,6 +87,7 @@ def ingest_system():
 
 @ingestion_bp.route('/network', methods=['POST'])
 @require_api_key
+@admit_tenant
 @limiter.exempt
 def ingest_network():
     """
@@ -1,5 +1,8 @@
 
-from typing import List, Dict, Any, Optional
+import bisect
+import uuid
+import threading
+from typing import List, Dict, Any, Optional, Iterator, Tuple, Sequence
 from datetime import datetime
 from backend.institutional_memory.models import InstitutionalMemory, MemoryType, MemoryOutcome
 
@@ -11,15 +14,27 @@ class MemoryRecorder:
     
     # In-memory storage for now (Simulating a Time-Series DB or Append-Only Log)
     _memory_store: List[InstitutionalMemory] = []
+    # Secondary indexes: ascending positions in _memory_store (append order == time order)
+    _by_entity: Dict[str, List[int]] = {}
+    _by_type: Dict[MemoryType, List[int]] = {}
+    # Positions are process-local: they index this in-memory store only, so a
+    # saved position cursor is meaningful only together with the STORE_ID it came from
+    STORE_ID = str(uuid.uuid4())
+    _lock = threading.Lock()
     
     @classmethod
-    def record(cls, memory: InstitutionalMemory):
+    def record(cls, memory: InstitutionalMemory, log: bool = True):
         """
         Commit a memory to the store.
         """
         # In a real system, this would write to Elastic/TimescaleDB
-        cls._memory_store.append(memory)
-        print(f"[MEMORY] Recorded {memory.entity_type} for {memory.entity_id}")
+        with cls._lock: # concurrent side-channel writers must not share a position
+            position = len(cls._memory_store)
+            cls._memory_store.append(memory)
+            cls._by_entity.setdefault(memory.entity_id, []).append(position)
+            cls._by_type.setdefault(memory.entity_type, []).append(position)
+        if log:
+            print(f"[MEMORY] Recorded {memory.entity_type} for {memory.entity_id}")
 
     @classmethod
     def record_decision(cls, session_id: str, decision: str, risk_score: float, context_summary: Dict):
@@ -30,7 +45,8 @@ class MemoryRecorder:
             outcome=MemoryOutcome.UNKNOWN, # Outcome known later
             confidence=risk_score / 100.0
         )
-        cls.record(mem)
+        # One per inference: too hot to print
+        cls.record(mem, log=False)
         
     @classmethod
     def record_override(cls, session_id: str, original: str, override: str, analyst_id: str):
@@ -53,14 +69,55 @@ class MemoryRetriever:
         """
         Query the memory store.
         """
-        results = MemoryRecorder._memory_store # Access shared store
-        
+        store = MemoryRecorder._memory_store # Access shared store
+        results = []
+        # Latest first: walk the narrowest index backwards instead of sorting the store
+        for position in reversed(cls._positions(entity_id, memory_type)):
+            memory = store[position]
+            if memory_type and memory.entity_type != memory_type:
+                continue
+            if entity_id and memory.entity_id != entity_id:
+                continue
+            results.append(memory)
+            if len(results) >= limit:
+                break
+        return results
+
+    @classmethod
+    def iter_memories(cls, entity_id: Optional[str] = None, memory_type: Optional[MemoryType] = None,
+                      since: Optional[str] = None, until: Optional[str] = None,
+                      after: int = -1) -> Iterator[Tuple[int, InstitutionalMemory]]:
+        """
+        Oldest-first (position, memory) stream resuming after a position cursor.
+        since/until are ISO timestamps, compared like InstitutionalMemory.timestamp.
+        """
+        store = MemoryRecorder._memory_store
+        positions = cls._positions(entity_id, memory_type)
+        for position in positions[bisect.bisect_right(positions, after):]:
+            memory = store[position]
+            if memory_type and memory.entity_type != memory_type:
+                continue
+            if entity_id and memory.entity_id != entity_id:
+                continue
+            if since and memory.timestamp < since:
+                continue
+            if until and memory.timestamp >= until:
+                break
+            yield position, memory
+
+    @classmethod
+    def count_memories(cls, entity_id: Optional[str] = None, memory_type: Optional[MemoryType] = None) -> int:
+        if entity_id and memory_type:
+            return sum(1 for _ in cls.iter_memories(entity_id=entity_id, memory_type=memory_type))
+        return len(cls._positions(entity_id, memory_type))
+
+    @staticmethod
+    def _positions(entity_id: Optional[str], memory_type: Optional[MemoryType]) -> Sequence[int]:
+        candidates = []
         if entity_id:
-            results = [m for m in results if m.entity_id == entity_id]
-        
+            candidates.append(MemoryRecorder._by_entity.get(entity_id, []))
         if memory_type:
-            results = [m for m in results if m.entity_type == memory_type]
-            
-        # Sort by latest
-        results.sort(key=lambda x: x.timestamp, reverse=True)
-        return results[:limit]
+            candidates.append(MemoryRecorder._by_type.get(memory_type, []))
+        if not candidates:
+            return range(len(MemoryRecorder._memory_store))
+        return min(candidates, key=len)
@@ -1,27 +1,19 @@
 import os
-from backend.llm.contract import LLMAdvisory
+from typing import Optional
+from backend.llm.advisory_service import AdvisoryService
 from backend.llm.guard import guarded_fallback
 
-def generate_advice(context: dict) -> dict:
+def generate_advice(context: dict, deadline: Optional[float] = None) -> dict:
     """
     Generates security advice with schema enforcement and guard fallbacks.
+    Served through AdvisoryService (cached, coalesced, deadline-bounded).
     """
     # 1. API Key Check (Guard Mode)
     if not os.getenv("OPENAI_API_KEY"):
         return guarded_fallback("API key missing")
 
-    # 2. Logic Execution (Placeholder for actual API call)
+    # 2. Backend call; schema is enforced inside the service
     try:
-        # In a real scenario, this would call an LLM API.
-        # Here we enforce the contract even on mocks.
-        raw = {
-            "risk_summary": "Simulated analysis based on input risk.",
-            "recommended_actions": ["Investigate trace", "Rotate tokens"],
-            "confidence": 0.85,
-            "advisory_only": True
-        }
-        
-        return LLMAdvisory.model_validate(raw).model_dump()
-        
+        return AdvisoryService.get_advice(context, deadline=deadline)
     except Exception as e:
         return guarded_fallback(f"LLM Processing Error: {str(e)}")
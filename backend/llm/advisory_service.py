@@ -0,0 +1,187 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from backend.llm.contract import LLMAdvisory
+from backend.llm.guard import guarded_fallback
+from backend.llm.backends import AdvisoryBackend, LocalAdvisoryBackend
+from backend.monitoring.stage_metrics import StageMetrics
+
+CACHE_SIZE = int(os.getenv("ADVICE_CACHE_SIZE", "1024"))
+CACHE_TTL_SEC = float(os.getenv("ADVICE_CACHE_TTL_SEC", "600"))
+DEADLINE_SEC = float(os.getenv("ADVICE_DEADLINE_SEC", "2.0"))
+BATCH_WINDOW_SEC = float(os.getenv("ADVICE_BATCH_WINDOW_MS", "20")) / 1000.0
+CONCURRENCY = int(os.getenv("ADVICE_CONCURRENCY", "4"))
+
+# Per-request noise that must not split the cache
+VOLATILE_KEYS = frozenset(("timestamp", "request_id", "event_id", "trace_id", "received_at"))
+
+class _Request:
+    __slots__ = ("fingerprint", "context", "done", "result")
+
+    def __init__(self, fingerprint: str, context: Dict[str, Any]):
+        self.fingerprint = fingerprint
+        self.context = context
+        self.done = threading.Event()
+        self.result = None
+
+class AdvisoryService:
+    """
+    Front door for LLM advice on incident contexts.
+
+    - Cache: contexts are fingerprinted (canonical JSON minus volatile keys)
+      and validated advice is kept in an LRU with TTL.
+    - Coalescing: concurrent requests for the same fingerprint share one
+      backend call.
+    - Batching: distinct misses arriving within BATCH_WINDOW_SEC go to the
+      backend as one advise() call (up to backend.max_batch).
+    - Deadline: callers wait at most `deadline` seconds and then get the
+      guarded fallback; the late result still lands in the cache.
+
+    Fallbacks (timeout, backend error, schema violation) are never cached.
+    """
+    _backend: AdvisoryBackend = LocalAdvisoryBackend()
+    _cache: "OrderedDict[str, tuple]" = OrderedDict() # fingerprint -> (expires_at, advice)
+    _inflight: Dict[str, _Request] = {}
+    _queue = deque()
+    _stats: Dict[str, int] = {}
+    _cond = threading.Condition()
+    _executor: Optional[ThreadPoolExecutor] = None
+    _batcher: Optional[threading.Thread] = None
+
+    @staticmethod
+    def fingerprint(context: Dict[str, Any]) -> str:
+        stable = {k: v for k, v in context.items() if k not in VOLATILE_KEYS}
+        raw = json.dumps(stable, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    @classmethod
+    def get_advice(cls, context: Dict[str, Any], deadline: Optional[float] = None) -> Dict[str, Any]:
+        deadline = DEADLINE_SEC if deadline is None else deadline
+        fingerprint = cls.fingerprint(context)
+        now = time.monotonic()
+
+        with cls._cond:
+            hit = cls._cache.get(fingerprint)
+            if hit is not None and hit[0] > now:
+                cls._cache.move_to_end(fingerprint)
+                cls._count("hit")
+                return dict(hit[1])
+
+            request = cls._inflight.get(fingerprint)
+            if request is not None:
+                cls._count("coalesced")
+            else:
+                cls._count("miss")
+                request = cls._inflight[fingerprint] = _Request(fingerprint, dict(context))
+                cls._queue.append(request)
+                cls._ensure_started()
+                cls._cond.notify()
+
+        if not request.done.wait(deadline):
+            cls._count("timeout")
+            return guarded_fallback(f"LLM deadline exceeded ({deadline}s)")
+        return dict(request.result)
+
+    # --- Batching ----------------------------------------------------------------
+
+    @classmethod
+    def _batch_loop(cls):
+        while True:
+            with cls._cond:
+                while not cls._queue:
+                    cls._cond.wait()
+                # Give concurrent misses a short window to join this batch
+                max_batch = max(1, cls._backend.max_batch)
+                window_end = time.monotonic() + BATCH_WINDOW_SEC
+                while len(cls._queue) < max_batch:
+                    remaining = window_end - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    cls._cond.wait(remaining)
+                batch = [cls._queue.popleft() for _ in range(min(max_batch, len(cls._queue)))]
+                backend = cls._backend
+            cls._executor.submit(cls._run_batch, backend, batch)
+
+    @classmethod
+    def _run_batch(cls, backend: AdvisoryBackend, batch: List[_Request]):
+        cacheable = True
+        try:
+            with StageMetrics.timer("llm_advice", backend=backend.name):
+                raw = backend.advise([r.context for r in batch])
+            if len(raw) != len(batch):
+                raise ValueError(f"backend returned {len(raw)} results for {len(batch)} contexts")
+        except Exception as e:
+            print(f"[AdvisoryService] Backend {backend.name} failed: {e}")
+            raw = [None] * len(batch)
+            cacheable = False
+
+        results = []
+        for request, advice in zip(batch, raw):
+            if advice is None:
+                results.append((guarded_fallback("LLM backend error"), False))
+                continue
+            try:
+                results.append((LLMAdvisory.model_validate(advice).model_dump(), cacheable))
+            except Exception as e:
+                results.append((guarded_fallback(f"LLM schema violation: {e}"), False))
+
+        expires_at = time.monotonic() + CACHE_TTL_SEC
+        with cls._cond:
+            cls._count("batch")
+            for request, (result, store) in zip(batch, results):
+                request.result = result
+                if cls._inflight.get(request.fingerprint) is request:
+                    del cls._inflight[request.fingerprint]
+                if store:
+                    cls._cache[request.fingerprint] = (expires_at, result)
+                    cls._cache.move_to_end(request.fingerprint)
+                else:
+                    cls._count("fallback")
+            while len(cls._cache) > CACHE_SIZE:
+                cls._cache.popitem(last=False)
+        for request in batch:
+            request.done.set()
+
+    @classmethod
+    def _ensure_started(cls):
+        # Caller holds cls._cond
+        if cls._batcher is not None:
+            return
+        cls._executor = ThreadPoolExecutor(max_workers=CONCURRENCY, thread_name_prefix="AdvisoryBackend")
+        cls._batcher = threading.Thread(target=cls._batch_loop, name="AdvisoryBatcher", daemon=True)
+        cls._batcher.start()
+
+    @classmethod
+    def _count(cls, outcome: str):
+        # Caller holds cls._cond
+        cls._stats[outcome] = cls._stats.get(outcome, 0) + 1
+        StageMetrics.inc("llm_advice_requests", outcome=outcome)
+
+    # --- Configuration -------------------------------------------------------------
+
+    @classmethod
+    def configure(cls, backend: AdvisoryBackend):
+        """
+        Swaps the backend. Cached advice came from the old one, so it is dropped.
+        """
+        with cls._cond:
+            cls._backend = backend
+            cls._cache.clear()
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        with cls._cond:
+            return dict(cls._stats, cache_size=len(cls._cache), inflight=len(cls._inflight),
+                        backend=cls._backend.name)
+
+    @classmethod
+    def reset(cls):
+        with cls._cond:
+            cls._cache.clear()
+            cls._stats = {}
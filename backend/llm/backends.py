@@ -0,0 +1,62 @@
+import time
+from typing import List, Dict, Any
+
+class AdvisoryBackend:
+    """
+    Pluggable advisory model. advise() takes a batch of incident contexts and
+    returns one raw advisory dict per context, in order (LLMAdvisory shape).
+    Raising fails the whole batch over to the guarded fallback.
+    """
+    name = "base"
+    max_batch = 8
+
+    def advise(self, contexts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+class LocalAdvisoryBackend(AdvisoryBackend):
+    """
+    Deterministic stand-in for a hosted LLM: same context -> same advice.
+    Used until a real model is wired in, and in tests (delay_sec simulates
+    model latency per batch).
+    """
+    name = "local"
+
+    def __init__(self, delay_sec: float = 0.0):
+        self.delay_sec = delay_sec
+        self.calls = 0
+
+    def advise(self, contexts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        self.calls += 1
+        if self.delay_sec:
+            time.sleep(self.delay_sec)
+        return [self._advise_one(context) for context in contexts]
+
+    @staticmethod
+    def _advise_one(context: Dict[str, Any]) -> Dict[str, Any]:
+        risk = str(context.get("risk") or context.get("severity") or "").upper()
+        try:
+            score = float(context.get("risk_score") or 0)
+        except (TypeError, ValueError):
+            score = 0.0
+        signals = {str(s).upper() for s in context.get("signals") or []}
+
+        if risk in ("HIGH", "CRITICAL") or score > 80 or "ATTACK_DETECTED" in signals:
+            return {
+                "risk_summary": "High-confidence attack pattern in incident context.",
+                "recommended_actions": ["Terminate affected sessions", "Review IP reputation logs", "Rotate tokens"],
+                "confidence": 0.85,
+                "advisory_only": True
+            }
+        if "CREDENTIAL_STUFFING" in signals:
+            return {
+                "risk_summary": "Potential credential stuffing against the affected accounts.",
+                "recommended_actions": ["Require CAPTCHA on next login", "Temporarily block source IPs"],
+                "confidence": 0.8,
+                "advisory_only": True
+            }
+        return {
+            "risk_summary": "Simulated analysis based on input risk.",
+            "recommended_actions": ["Investigate trace", "Continue monitoring"],
+            "confidence": 0.6,
+            "advisory_only": True
+        }
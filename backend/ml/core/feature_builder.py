@@ -5,12 +5,94 @@ Version: v1.0
 
 This module transforms a SessionState object into a feature vector according to the strict schema.
 It enforces time-gating to prevent data leakage.
+All features are computed in one fused pass; replay() emits vectors at many
+cutoffs from running prefix aggregates for training-set generation.
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 import math
+import numpy as np
 from backend.ml.core.session_state import SessionState
 from backend.ml.core.feature_schema import FEATURE_ORDER, FEATURE_SCHEMA_VERSION
 
+class _FeatureAccumulator:
+    """
+    Running aggregates for every FEATURE_ORDER feature, fed one event at a time
+    (events in timestamp order). Shared by build_features and replay so both
+    produce identical vectors.
+    """
+    __slots__ = ("count", "start_time", "end_time", "paths", "endpoints", "errors_4xx", "errors_5xx",
+                 "rate_limit_hits", "payload_total", "token_reuses", "login_attempts", "auth_failures",
+                 "captcha_fails", "headless", "bot_prob")
+
+    def __init__(self):
+        self.count = 0
+        self.start_time = self.end_time = 0.0
+        self.paths = set()
+        self.endpoints = set()
+        self.errors_4xx = self.errors_5xx = self.rate_limit_hits = 0
+        self.payload_total = 0
+        self.token_reuses = self.login_attempts = self.auth_failures = self.captcha_fails = 0
+        self.headless = 0
+        self.bot_prob = 0.0
+
+    def add(self, e: Dict[str, Any]):
+        if self.count == 0:
+            self.start_time = e['timestamp']
+        self.end_time = e['timestamp']
+        self.count += 1
+
+        # --- Domain: Web ---
+        self.paths.add(e.get('path', e.get('url', '')))
+        status = e.get('status_code', 200)
+        if 400 <= status < 500: self.errors_4xx += 1
+        if status >= 500: self.errors_5xx += 1
+        if status == 429: self.rate_limit_hits += 1
+        self.payload_total += e.get('content_length', 0)
+
+        # --- Domain: API ---
+        if e.get('token_reused', False): self.token_reuses += 1
+        self.endpoints.add(e.get('path', ''))
+
+        # --- Domain: Auth ---
+        event_type = e.get('event_type')
+        if event_type == 'LOGIN_ATTEMPT':
+            self.login_attempts += 1
+            if e.get('auth_status') == 'failed':
+                self.auth_failures += 1
+        elif event_type == 'CAPTCHA_FAIL':
+            self.captcha_fails += 1
+
+        # --- Domain: Network/System ---
+        if e.get('headless_browser', False): self.headless = 1
+        bot_prob = e.get('bot_probability', 0)
+        if bot_prob > self.bot_prob: self.bot_prob = bot_prob
+
+    def vector(self) -> List[float]:
+        n = self.count
+        if n == 0:
+            return [0.0] * len(FEATURE_ORDER)
+        duration = max(1.0, self.end_time - self.start_time)
+        feats = {
+            'request_rate_per_min': (n / duration) * 60,
+            'path_entropy': len(self.paths) / n,
+            'error_4xx_ratio': self.errors_4xx / n,
+            'error_5xx_ratio': self.errors_5xx / n,
+            'payload_size_mean': self.payload_total / n,
+            'token_reuse_count': self.token_reuses,
+            'endpoint_variance': len(self.endpoints),
+            'rate_limit_hits': self.rate_limit_hits,
+            'auth_failure_ratio': self.auth_failures / self.login_attempts if self.login_attempts > 0 else 0,
+            'failed_login_attempts': self.auth_failures,
+            'login_velocity': self.login_attempts / duration,
+            'captcha_failures': self.captcha_fails,
+            'distinct_paths_count': len(self.paths),
+            'headless_browser_flag': self.headless,
+            'bot_probability_score': self.bot_prob,
+            'session_duration_sec': duration
+        }
+        # Return strictly ordered vector
+        return [feats[name] for name in FEATURE_ORDER]
+
 class FeatureBuilder:
     def __init__(self, schema_version: str = FEATURE_SCHEMA_VERSION):
         if schema_version != FEATURE_SCHEMA_VERSION:
@@ -21,82 +103,52 @@ class FeatureBuilder:
         Extracts features from the session state up to the decision timestamp.
         Returns a list of floats corresponding exactly to FEATURE_ORDER.
         """
-        # Strict time cutoff
+        # Strict time cutoff (bisect over timestamp-sorted events)
         events = session.get_events_before_cutoff(decision_timestamp)
-        
-        # Initialize features map
-        feats = {name: 0.0 for name in FEATURE_ORDER}
-
-        if not events:
-            return [feats[name] for name in FEATURE_ORDER]
-
-        # --- Aggregate Raw Counts ---
-        # Domain Models Integration (Option A)
-        # We integrate the logic from Web, API, Auth, Network, System domains.
 
-        # --- Domain: Web ---
-        total_requests = len(events)
-        paths = set()
-        status_codes = []
-        payload_sizes = []
-        for e in events:
-            paths.add(e.get('path', e.get('url', '')))
-            status_codes.append(e.get('status_code', 200))
-            payload_sizes.append(e.get('content_length', 0))
-            
-        start_time = events[0]['timestamp']
-        end_time = events[-1]['timestamp']
-        duration = max(1.0, end_time - start_time)
-
-        feats['request_rate_per_min'] = (total_requests / duration) * 60
-        feats['path_entropy'] = len(paths) / total_requests if total_requests > 0 else 0
-        feats['error_4xx_ratio'] = len([s for s in status_codes if 400 <= s < 500]) / total_requests if total_requests > 0 else 0
-        feats['error_5xx_ratio'] = len([s for s in status_codes if s >= 500]) / total_requests if total_requests > 0 else 0
-        feats['payload_size_mean'] = sum(payload_sizes) / total_requests if total_requests > 0 else 0
-
-        # --- Domain: API ---
-        token_reuses = 0
-        endpoints = []
+        acc = _FeatureAccumulator()
         for e in events:
-            if e.get('token_reused', False): token_reuses += 1
-            endpoints.append(e.get('path', ''))
-            
-        feats['token_reuse_count'] = token_reuses
-        feats['endpoint_variance'] = len(set(endpoints))
-        feats['rate_limit_hits'] = len([s for s in status_codes if s == 429])
-        # auth_failure_ratio calculation below
+            acc.add(e)
+        return acc.vector()
 
-        # --- Domain: Auth ---
-        auth_failures = 0
-        login_attempts = 0
-        captcha_fails = 0
-        for e in events:
-             if e.get('event_type') == 'LOGIN_ATTEMPT':
-                login_attempts += 1
-                if e.get('auth_status') == 'failed':
-                    auth_failures += 1
-             if e.get('event_type') == 'CAPTCHA_FAIL':
-                captcha_fails += 1
-
-        feats['failed_login_attempts'] = auth_failures
-        feats['login_velocity'] = login_attempts / duration if duration > 0 else 0
-        feats['captcha_failures'] = captcha_fails
-        feats['auth_failure_ratio'] = auth_failures / login_attempts if login_attempts > 0 else 0
-
-        # --- Domain: Network/System ---
-        headless = 0
-        bot_prob = 0.0
-        for e in events:
-            if e.get('headless_browser', False): headless = 1
-            if e.get('bot_probability', 0) > bot_prob: bot_prob = e.get('bot_probability', 0)
+    def replay(self, session: SessionState, cutoffs: Optional[Sequence[float]] = None,
+               out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Leakage-safe training replay: row i == build_features(session, cutoffs[i]).
+        Cutoffs default to every event timestamp. Events are folded into running
+        prefix aggregates once, so the whole replay is O(events + cutoffs log cutoffs).
+        Rows are written into `out` (shape (len(cutoffs), len(FEATURE_ORDER))) if given.
+        """
+        events = session.events
+        if cutoffs is None:
+            cutoffs = [e['timestamp'] for e in events]
+        cutoffs = np.asarray(cutoffs, dtype=np.float64)
+        if out is None:
+            out = np.zeros((len(cutoffs), len(FEATURE_ORDER)), dtype=np.float64)
+        elif out.shape != (len(cutoffs), len(FEATURE_ORDER)):
+            raise ValueError(f"Output shape {out.shape} does not match {(len(cutoffs), len(FEATURE_ORDER))}")
 
-        feats['distinct_paths_count'] = len(paths)
-        feats['headless_browser_flag'] = headless
-        feats['bot_probability_score'] = bot_prob
-        feats['session_duration_sec'] = duration
+        acc = _FeatureAccumulator()
+        i, n = 0, len(events)
+        for row in np.argsort(cutoffs, kind="stable"):
+            cutoff = cutoffs[row]
+            while i < n and events[i]['timestamp'] <= cutoff:
+                acc.add(events[i])
+                i += 1
+            out[row] = acc.vector()
+        return out
 
-        # Return strictly ordered vector
-        return [feats[name] for name in FEATURE_ORDER]
+    def build_training_matrix(self, samples: Sequence[Tuple[SessionState, Sequence[float]]]) -> np.ndarray:
+        """
+        Stacks replay() for many (session, cutoffs) pairs into one preallocated matrix.
+        """
+        counts = [len(cutoffs) for _, cutoffs in samples]
+        matrix = np.zeros((sum(counts), len(FEATURE_ORDER)), dtype=np.float64)
+        offset = 0
+        for (session, cutoffs), count in zip(samples, counts):
+            self.replay(session, cutoffs, out=matrix[offset:offset + count])
+            offset += count
+        return matrix
 
     def _calculate_entropy(self, items):
         # Placeholder if strict Shannon entropy is needed later
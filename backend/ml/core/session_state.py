@@ -7,6 +7,7 @@ This module is responsible for aggregating raw events into a session state.
 It enforces the strict definition of a session:
 Session ID = SHA256(user_id + ip + user_agent + time_window_start)
 """
+import bisect
 import hashlib
 import time
 from typing import List, Dict, Any, Optional
@@ -15,7 +16,8 @@ class SessionState:
     def __init__(self, session_id: str, start_time: float):
         self.session_id = session_id
         self.start_time = start_time
-        self.events: List[Dict[str, Any]] = []
+        self.events: List[Dict[str, Any]] = [] # kept sorted by timestamp (stable for ties)
+        self._timestamps: List[float] = []
         self.metadata: Dict[str, Any] = {}
         self.last_update = start_time
 
@@ -27,7 +29,15 @@ class SessionState:
         if 'timestamp' not in event:
             event['timestamp'] = time.time()
             
-        self.events.append(event)
+        ts = event['timestamp']
+        if not self._timestamps or ts >= self._timestamps[-1]:
+            self.events.append(event)
+            self._timestamps.append(ts)
+        else:
+            # Late / out-of-order event: insert after any equal timestamps
+            i = bisect.bisect_right(self._timestamps, ts)
+            self.events.insert(i, event)
+            self._timestamps.insert(i, ts)
         self.last_update = max(self.last_update, event['timestamp'])
         
         # Merge metadata if present (but prioritize existing fixed fields)
@@ -57,5 +67,11 @@ class SessionState:
         """
         if cutoff_timestamp is None:
             return self.events
-            
-        return [e for e in self.events if e['timestamp'] <= cutoff_timestamp]
+
+        return self.events[:self.cutoff_index(cutoff_timestamp)]
+
+    def cutoff_index(self, cutoff_timestamp: float) -> int:
+        """
+        Number of events with timestamp <= cutoff (binary search over the sorted events).
+        """
+        return bisect.bisect_right(self._timestamps, cutoff_timestamp)
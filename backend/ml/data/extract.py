@@ -1,45 +1,56 @@
-
 import json
 import pandas as pd
-from datetime import datetime
-from backend.app import app
-from backend.database.models import TrainingSample
+from datetime import datetime, timezone
+from sqlalchemy import and_, or_
+from backend.ml.data.feature_store import FeatureStore, CHUNK_ROWS
 
-def load_training_data(start_date=None, end_date=None):
+def sync_feature_store(store: FeatureStore = None, batch_size: int = CHUNK_ROWS) -> int:
     """
-    Extracts labeled training data from DB.
-    Returns X (DataFrame) and y (Series).
+    Appends TrainingSample rows newer than the store watermark to the feature store.
+    Rows are streamed from the DB in batches; returns the number of rows added.
     """
+    from backend.app import app
+    from backend.database.models import TrainingSample
+
+    store = store or FeatureStore()
+    mark = store.watermark()
     with app.app_context():
         query = TrainingSample.query
-        if start_date:
-            query = query.filter(TrainingSample.timestamp >= start_date)
-        if end_date:
-            query = query.filter(TrainingSample.timestamp <= end_date)
-            
-        samples = query.all()
-        
-        data = []
-        labels = []
-        
-        for s in samples:
-            # Parse features
-            try:
-                features = json.loads(s.feature_vector)
-                data.append(features)
-                labels.append(s.label)
-            except Exception as e:
-                print(f"Skipping sample {s.sample_id}: {e}")
-                
-        if not data:
-            print("No training data found.")
-            return pd.DataFrame(), pd.Series()
-            
-        X = pd.DataFrame(data)
-        y = pd.Series(labels)
-        
-        # Ensure correct types
-        return X, y
+        if mark:
+            after_ts = datetime.fromtimestamp(mark[0], tz=timezone.utc).replace(tzinfo=None)
+            query = query.filter(or_(
+                TrainingSample.timestamp > after_ts,
+                and_(TrainingSample.timestamp == after_ts, TrainingSample.sample_id > mark[1])
+            ))
+        query = query.order_by(TrainingSample.timestamp, TrainingSample.sample_id).yield_per(batch_size)
+        added = store.append(_parsed_samples(query), chunk_rows=batch_size)
+    print(f"Feature store sync: {added} new samples.")
+    return added
+
+def _parsed_samples(rows):
+    for s in rows:
+        # Parse features
+        try:
+            features = json.loads(s.feature_vector)
+        except Exception as e:
+            print(f"Skipping sample {s.sample_id}: {e}")
+            continue
+        yield {"sample_id": s.sample_id, "timestamp": s.timestamp, "label": s.label, "features": features}
+
+def load_training_data(start_date=None, end_date=None, columns=None, store: FeatureStore = None, sync: bool = True):
+    """
+    Loads labeled training data from the local feature store (synced from DB first).
+    Returns X (DataFrame, float32, only `columns` if given) and y (Series).
+    """
+    store = store or FeatureStore()
+    if sync:
+        sync_feature_store(store)
+
+    X, y = store.load(columns=columns, start_date=start_date, end_date=end_date)
+    if X.empty:
+        print("No training data found.")
+        return pd.DataFrame(), pd.Series()
+    return X, y
 
 if __name__ == "__main__":
     X, y = load_training_data()
@@ -0,0 +1,214 @@
+"""
+Local Feature Store (Columnar)
+Version: v1.0
+
+Materializes labeled training samples into date-partitioned Parquet files:
+
+    <root>/date=YYYY-MM-DD/part-<ns>-<id>.parquet
+
+One float32 column per FEATURE_ORDER feature plus sample_id / timestamp / label.
+New samples are appended as new part files (never rewriting old ones), and a
+small manifest keeps the schema hash and the ingestion watermark so DB syncs
+are incremental. Readers stream record batches with partition pruning and
+column projection, so training never holds more than the projected columns.
+"""
+import os
+import json
+import time
+import uuid
+import threading
+from datetime import datetime, timezone, date
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from backend.ml.core.feature_schema import FEATURE_ORDER, FEATURE_SCHEMA_HASH
+
+DEFAULT_ROOT = os.getenv("ML_FEATURE_STORE_DIR", "data/feature_store")
+CHUNK_ROWS = 50_000
+
+SCHEMA = pa.schema(
+    [("sample_id", pa.string()), ("timestamp", pa.float64()), ("label", pa.int8())]
+    + [(name, pa.float32()) for name in FEATURE_ORDER]
+)
+
+DateLike = Union[str, date, datetime, None]
+
+
+def _epoch(ts: Union[float, int, datetime, str]) -> float:
+    if isinstance(ts, (int, float)):
+        return float(ts)
+    if isinstance(ts, str):
+        ts = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc) # DB timestamps are naive UTC
+    return ts.timestamp()
+
+
+def _partition_of(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _date_bound(value: DateLike) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return _partition_of(_epoch(value))
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)[:10]
+
+
+def _feature_values(features: Union[str, Dict[str, Any], Sequence[float]]) -> List[float]:
+    if isinstance(features, str):
+        features = json.loads(features)
+    if isinstance(features, dict):
+        return [float(features.get(name) or 0.0) for name in FEATURE_ORDER]
+    if len(features) != len(FEATURE_ORDER):
+        raise ValueError(f"Feature vector has {len(features)} values, schema expects {len(FEATURE_ORDER)}")
+    return [float(v) for v in features]
+
+
+class FeatureStore:
+    """
+    Date-partitioned Parquet store for training samples.
+    """
+
+    MANIFEST = "_manifest.json"
+
+    def __init__(self, root: str = DEFAULT_ROOT):
+        self.root = root
+        self._lock = threading.Lock()
+
+    # --- Write ---------------------------------------------------------------
+
+    def append(self, samples: Iterable[Dict[str, Any]], chunk_rows: int = CHUNK_ROWS) -> int:
+        """
+        Appends samples ({sample_id, timestamp, label, features}) in bounded chunks.
+        `features` may be a FEATURE_ORDER list, a name->value dict or its JSON string.
+        Returns the number of rows written.
+        """
+        written = 0
+        chunk: Dict[str, Dict[str, list]] = {}
+        pending = 0
+        for sample in samples:
+            epoch = _epoch(sample["timestamp"])
+            cols = chunk.setdefault(_partition_of(epoch), {name: [] for name in SCHEMA.names})
+            cols["sample_id"].append(str(sample["sample_id"]))
+            cols["timestamp"].append(epoch)
+            cols["label"].append(int(sample["label"]))
+            for name, value in zip(FEATURE_ORDER, _feature_values(sample["features"])):
+                cols[name].append(value)
+            pending += 1
+            if pending >= chunk_rows:
+                written += self._flush(chunk)
+                chunk, pending = {}, 0
+        if pending:
+            written += self._flush(chunk)
+        return written
+
+    def _flush(self, chunk: Dict[str, Dict[str, list]]) -> int:
+        rows = 0
+        watermark = None
+        with self._lock:
+            for partition, cols in sorted(chunk.items()):
+                table = pa.table(cols, schema=SCHEMA)
+                directory = os.path.join(self.root, f"date={partition}")
+                os.makedirs(directory, exist_ok=True)
+                name = f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+                tmp = os.path.join(directory, f".{name}.tmp")
+                pq.write_table(table, tmp)
+                os.replace(tmp, os.path.join(directory, name)) # readers never see partial files
+                rows += table.num_rows
+                top = max(zip(cols["timestamp"], cols["sample_id"]))
+                watermark = top if watermark is None else max(watermark, top)
+
+            manifest = self.manifest()
+            manifest["rows"] = manifest.get("rows", 0) + rows
+            previous = manifest.get("watermark")
+            if previous is None or tuple(previous) < watermark:
+                manifest["watermark"] = list(watermark)
+            self._write_manifest(manifest)
+        return rows
+
+    # --- Metadata --------------------------------------------------------------
+
+    def manifest(self) -> Dict[str, Any]:
+        path = os.path.join(self.root, self.MANIFEST)
+        if not os.path.exists(path):
+            return {"schema_hash": FEATURE_SCHEMA_HASH, "rows": 0, "watermark": None}
+        with open(path) as f:
+            manifest = json.load(f)
+        if manifest.get("schema_hash") != FEATURE_SCHEMA_HASH:
+            raise ValueError("Feature store was written with a different feature schema; rebuild it")
+        return manifest
+
+    def _write_manifest(self, manifest: Dict[str, Any]):
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, self.MANIFEST)
+        with open(path + ".tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(path + ".tmp", path)
+
+    def watermark(self) -> Optional[Tuple[float, str]]:
+        """
+        (timestamp, sample_id) of the newest stored sample, for incremental syncs.
+        """
+        mark = self.manifest().get("watermark")
+        return tuple(mark) if mark else None
+
+    def partitions(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d[5:] for d in os.listdir(self.root) if d.startswith("date="))
+
+    # --- Read ----------------------------------------------------------------
+
+    def _dataset(self) -> Optional[ds.Dataset]:
+        if not self.partitions():
+            return None
+        return ds.dataset(self.root, format="parquet", partitioning="hive",
+                          schema=SCHEMA.append(pa.field("date", pa.string())),
+                          exclude_invalid_files=False, ignore_prefixes=[".", "_"])
+
+    @staticmethod
+    def _filter(start_date: DateLike, end_date: DateLike):
+        # Partition pruning: whole date=... directories outside the range are skipped
+        expr = None
+        start, end = _date_bound(start_date), _date_bound(end_date)
+        if start is not None:
+            expr = ds.field("date") >= start
+        if end is not None:
+            cond = ds.field("date") <= end
+            expr = cond if expr is None else expr & cond
+        return expr
+
+    def iter_batches(self, columns: Optional[Sequence[str]] = None, start_date: DateLike = None,
+                     end_date: DateLike = None, batch_size: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        """
+        Streams DataFrames of at most batch_size rows, reading only `columns`
+        from partitions within [start_date, end_date] (inclusive, by UTC date).
+        """
+        dataset = self._dataset()
+        if dataset is None:
+            return
+        columns = list(columns) if columns else list(SCHEMA.names)
+        for batch in dataset.to_batches(columns=columns, filter=self._filter(start_date, end_date),
+                                        batch_size=batch_size):
+            if batch.num_rows:
+                yield batch.to_pandas()
+
+    def load(self, columns: Optional[Sequence[str]] = None, start_date: DateLike = None,
+             end_date: DateLike = None) -> Tuple[pd.DataFrame, pd.Series]:
+        """
+        Returns (X, y): projected float32 feature columns and int labels.
+        """
+        features = list(columns) if columns else list(FEATURE_ORDER)
+        dataset = self._dataset()
+        if dataset is None:
+            return pd.DataFrame(columns=features), pd.Series(dtype="int8")
+        table = dataset.to_table(columns=features + ["label"], filter=self._filter(start_date, end_date))
+        return table.select(features).to_pandas(), table.column("label").to_pandas()
@@ -33,7 +33,8 @@ class RiskFusionEngine:
         
         # 2. Signal Dominance (Anti-Dilution)
         # If any single model is very confident (> 0.7), it pulls the whole score up.
-        max_prob = max(probs.values())
+        # The anomaly model is unsupervised and has its own floor (step 4), so it is left out.
+        max_prob = max([p for domain, p in probs.items() if domain != "anomaly"] or [0.0])
         if max_prob > 0.7:
              # Map 0.7-1.0 to 70-100 linear
              dominance_score = max_prob * 100
@@ -30,6 +30,7 @@ from backend.ml.recovery.recovery_engine import RecoveryEngine
 
 # Registry
 from backend.ml.registry.model_registry import ModelRegistry
+from backend.monitoring.stage_metrics import StageMetrics
 
 # --- Initialization ---
 def initialize_registry():
@@ -40,6 +41,7 @@ def initialize_registry():
         ModelRegistry.register_model("auth", AuthAbuseModel(), AuthAbuseModel.MODEL_VERSION)
         ModelRegistry.register_model("network", NetworkAttackModel(), NetworkAttackModel.MODEL_VERSION)
         ModelRegistry.register_model("system", SystemAttackModel(), SystemAttackModel.MODEL_VERSION)
+        # Baselines persist only when ANOMALY_STATS_PATH is set
         ModelRegistry.register_model("anomaly", GenericAnomalyModel(), GenericAnomalyModel.MODEL_VERSION)
 
 # Ensure initialized on import if possible, or lazy load
@@ -54,12 +56,13 @@ def evaluate_session(session_state: Dict[str, Any], context: Dict[str, Any] = No
     
     # 1. Feature Extraction & Assembly
     # We extract partials and merge into one FeatureSet
-    f_web = extract_web_features(session_state)
-    f_api = extract_api_features(session_state)
-    f_auth = extract_auth_features(session_state)
-    f_net = extract_network_features(session_state)
-    f_sys = extract_system_features(session_state)
-    f_meta = extract_meta_features(session_state)
+    with StageMetrics.timer("feature_extraction"):
+        f_web = extract_web_features(session_state)
+        f_api = extract_api_features(session_state)
+        f_auth = extract_auth_features(session_state)
+        f_net = extract_network_features(session_state)
+        f_sys = extract_system_features(session_state)
+        f_meta = extract_meta_features(session_state)
     
     # Combine all
     combined_features = {
@@ -72,7 +75,8 @@ def evaluate_session(session_state: Dict[str, Any], context: Dict[str, Any] = No
     }
     
     # Validation via Pydantic
-    feature_set = FeatureSet(**combined_features)
+    with StageMetrics.timer("feature_validation"):
+        feature_set = FeatureSet(**combined_features)
     
     # 2. Model Inference
     # Get Champions
@@ -86,25 +90,34 @@ def evaluate_session(session_state: Dict[str, Any], context: Dict[str, Any] = No
     }
     
     probs = {}
+    tenant_id = context.get("tenant_id") or session_state.get("tenant_id")
     for domain, model in models.items():
-        if model:
-            probs[domain] = model.predict(feature_set)
+        if isinstance(model, GenericAnomalyModel):
+            # Anomaly baselines are per tenant
+            with StageMetrics.timer("model", model=domain):
+                probs[domain] = model.predict(feature_set, tenant_id=tenant_id)
+        elif model:
+            with StageMetrics.timer("model", model=domain):
+                probs[domain] = model.predict(feature_set)
         else:
             probs[domain] = 0.0 # Fail safe
             
     # 3. Risk Fusion
-    fusion_result = RiskFusionEngine.compute_risk(probs, combined_features)
+    with StageMetrics.timer("fusion"):
+        fusion_result = RiskFusionEngine.compute_risk(probs, combined_features)
     risk_score = fusion_result["risk_score"]
     
     # 4. Decision Engine
-    decision_result = DecisionEngine.decide(risk_score, combined_features, context)
+    with StageMetrics.timer("decision"):
+        decision_result = DecisionEngine.decide(risk_score, combined_features, context)
     final_decision = decision_result["final_decision"]
     audit_trail = decision_result["audit_trail"]
     
     # 5. Explanation & Intelligence
-    explanation = ExplanationEngine.explain(probs, combined_features, final_decision)
-    suggestions = SuggestionEngine.suggest(probs, combined_features)
-    recovery_steps = RecoveryEngine.recommend_recovery(combined_features)
+    with StageMetrics.timer("explanation"):
+        explanation = ExplanationEngine.explain(probs, combined_features, final_decision)
+        suggestions = SuggestionEngine.suggest(probs, combined_features)
+        recovery_steps = RecoveryEngine.recommend_recovery(combined_features)
     
     # 6. Final Response Construction
     # STRICT CONTRACT: Return InferenceResult object
@@ -1,31 +1,223 @@
-from typing import Dict, Any
+import os
+import json
+import time
+import atexit
+import threading
+from typing import Dict, Any, Optional, Sequence
+import numpy as np
 from backend.ml.models.base_model import BaseModel
 from backend.ml.schema.feature_schema import FeatureSet
 
+_FIELDS = getattr(FeatureSet, "model_fields", None) or FeatureSet.__fields__
+# Fixed scoring order: every numeric / boolean FeatureSet field
+ANOMALY_FEATURES = tuple(name for name in _FIELDS if name not in ("session_id", "timestamp"))
+
+def _annotation(name):
+    field = _FIELDS[name]
+    return getattr(field, "annotation", None) or getattr(field, "outer_type_", None)
+
+HALF_LIFE = 500        # samples until an observation's weight halves
+MIN_SAMPLES = 30       # per-tenant warm-up before scores are trusted
+MIN_STD = 0.05         # std floor for continuous features (counts / flags use 1.0)
+Z_CAP = 10.0           # per-feature z clip (also clips the update, keeping stats robust)
+TOP_K = 3              # anomaly = mean of the k most deviant features
+BASELINE_SCORE = 0.1   # "baseline noise" while warming up
+CORROBORATION_Z = 3.0  # a feature counts as deviant from this z
+SINGLE_SIGNAL_CAP = 0.5  # score ceiling unless >= 2 features are deviant (below fusion's 0.6 / 0.7 gates)
+CHECKPOINT_INTERVAL_SEC = 300
+
+# Natural unit of each feature: one login / port / flag for counts, MIN_STD for continuous ones.
+# A count that is constant in the baseline then needs a whole unit of change per sigma.
+FEATURE_UNITS = np.array([1.0 if _annotation(name) in (int, bool) else MIN_STD for name in ANOMALY_FEATURES])
+
+class StreamingStats:
+    """
+    Exponentially weighted per-feature mean / variance (Welford-style EW update).
+    Observations are winsorized at Z_CAP before updating, so a burst of attack
+    traffic cannot drag the baseline along with it.
+    """
+    __slots__ = ("n", "mean", "var")
+
+    def __init__(self, dims: int):
+        self.n = 0
+        self.mean = np.zeros(dims)
+        self.var = np.zeros(dims)
+
+    def std(self) -> np.ndarray:
+        return np.maximum(np.sqrt(self.var), FEATURE_UNITS + 0.05 * np.abs(self.mean))
+
+    def z_scores(self, x: np.ndarray) -> np.ndarray:
+        return np.minimum(np.abs(x - self.mean) / self.std(), Z_CAP)
+
+    def update(self, x: np.ndarray):
+        if self.n == 0:
+            self.mean = x.astype(float)
+        else:
+            alpha = max(1.0 - 0.5 ** (1.0 / HALF_LIFE), 1.0 / (self.n + 1))
+            delta = x - self.mean
+            if self.n >= MIN_SAMPLES:
+                # Winsorize only once the baseline is established
+                limit = Z_CAP * self.std()
+                delta = np.clip(delta, -limit, limit)
+            self.mean = self.mean + alpha * delta
+            self.var = (1.0 - alpha) * (self.var + alpha * delta * delta)
+        self.n += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"n": self.n, "mean": self.mean.tolist(), "var": self.var.tolist()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StreamingStats":
+        stats = cls(len(data["mean"]))
+        stats.n = int(data["n"])
+        stats.mean = np.asarray(data["mean"], dtype=float)
+        stats.var = np.asarray(data["var"], dtype=float)
+        return stats
+
 class GenericAnomalyModel(BaseModel):
     """
     Safety Net: Unsupervised Anomaly Detection.
+
+    Streaming per-tenant baselines (EW mean/variance over ANOMALY_FEATURES);
+    a vector is scored by its most deviant robust z-scores, so the score is
+    "how unusual is this session for this tenant" rather than a count of
+    non-zero fields. Tenants still warming up are scored against the global
+    baseline. A single deviant feature is capped at SINGLE_SIGNAL_CAP; higher
+    scores need corroboration from a second feature.
+
+    With a stats_path (or ANOMALY_STATS_PATH) the baselines are loaded on
+    start, checkpointed every CHECKPOINT_INTERVAL_SEC while scoring and saved
+    again at exit. Without one they live in memory only.
     """
-    MODEL_NAME = "generic_anomaly_v1"
-    MODEL_VERSION = "1.0.0"
-    REQUIRED_FEATURES = [] 
-
-    def predict(self, features: Dict[str, Any] | FeatureSet) -> float:
-        # Heuristic: If multiple counters are non-zero, assume anomaly
-        # In real training, this would map feature vector to distance from centroid
-        
-        count = 0
+    MODEL_NAME = "generic_anomaly_v2"
+    MODEL_VERSION = "2.0.0"
+    REQUIRED_FEATURES = []
+
+    GLOBAL = "__global__"
+
+    def __init__(self, stats_path: Optional[str] = None):
+        super().__init__()
+        self._stats: Dict[str, StreamingStats] = {}
+        self._lock = threading.Lock()
+        self.stats_path = stats_path or os.getenv("ANOMALY_STATS_PATH")
+        self._next_checkpoint = time.monotonic() + CHECKPOINT_INTERVAL_SEC
+        if self.stats_path:
+            if os.path.exists(self.stats_path):
+                self.load(self.stats_path)
+            atexit.register(self.checkpoint)
+
+    # --- Scoring -------------------------------------------------------------
+
+    def predict(self, features: Dict[str, Any] | FeatureSet, tenant_id: Optional[str] = None) -> float:
+        """
+        Scores one session, then folds it into the tenant and global baselines.
+        """
+        x = self.to_vector(features)
+        with self._lock:
+            stats = self._baseline(tenant_id)
+            score = BASELINE_SCORE if stats is None else float(self._score(stats.z_scores(x[None, :]))[0])
+            self._observe(x, tenant_id)
+        self._maybe_checkpoint()
+        return score
+
+    def score_batch(self, vectors: np.ndarray | Sequence[Any], tenant_id: Optional[str] = None,
+                    update: bool = False) -> np.ndarray:
+        """
+        Vectorized scoring of many sessions (rows in ANOMALY_FEATURES order, or
+        FeatureSets / dicts) against the current baseline. update=True also
+        learns from them afterwards.
+        """
+        matrix = vectors if isinstance(vectors, np.ndarray) else np.vstack([self.to_vector(v) for v in vectors])
+        matrix = np.atleast_2d(np.asarray(matrix, dtype=float))
+        with self._lock:
+            stats = self._baseline(tenant_id)
+            if stats is None:
+                scores = np.full(len(matrix), BASELINE_SCORE)
+            else:
+                scores = self._score(stats.z_scores(matrix))
+            if update:
+                for x in matrix:
+                    self._observe(x, tenant_id)
+        if update:
+            self._maybe_checkpoint()
+        return scores
+
+    @staticmethod
+    def _score(z: np.ndarray) -> np.ndarray:
+        k = min(TOP_K, z.shape[1])
+        top = np.partition(z, z.shape[1] - k, axis=1)[:, -k:].mean(axis=1)
+        # ~0 up to 2 sigma, ~0.39 at 3, ~0.63 at 4, -> 1.0
+        scores = 1.0 - np.exp(-np.maximum(0.0, top - 2.0) / 2.0)
+        corroborated = (z >= CORROBORATION_Z).sum(axis=1) >= 2
+        return np.where(corroborated, scores, np.minimum(scores, SINGLE_SIGNAL_CAP))
+
+    @staticmethod
+    def to_vector(features: Dict[str, Any] | FeatureSet | np.ndarray) -> np.ndarray:
+        if isinstance(features, np.ndarray):
+            return features.astype(float, copy=False)
         if isinstance(features, FeatureSet):
-            # Scan fields via dict dump
-            data = features.dict()
+            values = (getattr(features, name) for name in ANOMALY_FEATURES)
         else:
-            data = features
-            
-        # Count non-zero numerical signals
-        for k, v in data.items():
-            if isinstance(v, (int, float)) and v > 0 and "timestamp" not in k and "session_id" not in k:
-               count += 1
-               
-        if count > 5:
-            return 0.4
-        return 0.1 # Baseline noise
+            values = (features.get(name) or 0.0 for name in ANOMALY_FEATURES)
+        return np.fromiter((float(v) for v in values), dtype=float, count=len(ANOMALY_FEATURES))
+
+    def _baseline(self, tenant_id: Optional[str]) -> Optional[StreamingStats]:
+        # Caller holds self._lock
+        for key in (tenant_id, self.GLOBAL):
+            stats = self._stats.get(key) if key is not None else None
+            if stats is not None and stats.n >= MIN_SAMPLES:
+                return stats
+        return None
+
+    def _observe(self, x: np.ndarray, tenant_id: Optional[str]):
+        # Caller holds self._lock
+        for key in {tenant_id or self.GLOBAL, self.GLOBAL}:
+            self._stats.setdefault(key, StreamingStats(len(ANOMALY_FEATURES))).update(x)
+
+    def reset(self):
+        """
+        Forgets every learned baseline (in memory only; stats_path is untouched).
+        """
+        with self._lock:
+            self._stats = {}
+
+    # --- Persistence ---------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "model_version": self.MODEL_VERSION,
+                "features": list(ANOMALY_FEATURES),
+                "tenants": {key: stats.to_dict() for key, stats in self._stats.items()}
+            }
+
+    def restore(self, snapshot: Dict[str, Any]):
+        if list(snapshot.get("features", [])) != list(ANOMALY_FEATURES):
+            raise ValueError("Anomaly snapshot feature order does not match this FeatureSet schema")
+        restored = {key: StreamingStats.from_dict(data) for key, data in snapshot["tenants"].items()}
+        with self._lock:
+            self._stats = restored
+
+    def _maybe_checkpoint(self):
+        if not self.stats_path or time.monotonic() < self._next_checkpoint:
+            return
+        self._next_checkpoint = time.monotonic() + CHECKPOINT_INTERVAL_SEC
+        threading.Thread(target=self.checkpoint, name="AnomalyCheckpoint", daemon=True).start()
+
+    def checkpoint(self):
+        try:
+            self.save()
+        except Exception as e:
+            print(f"[GenericAnomalyModel] Checkpoint to {self.stats_path} failed: {e}")
+
+    def save(self, path: Optional[str] = None):
+        path = path or self.stats_path
+        snapshot = self.snapshot()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path + ".tmp", "w") as f:
+            json.dump(snapshot, f)
+        os.replace(path + ".tmp", path)
+
+    def load(self, path: str):
+        with open(path) as f:
+            self.restore(json.load(f))
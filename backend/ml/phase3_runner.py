@@ -1,10 +1,10 @@
 
-import concurrent.futures
 from typing import Dict, Any
 from backend.trust_intelligence.engine import TrustIntelligenceEngine
-from backend.adaptive_policy.engine import AdaptivePolicyEngine
+from backend.adaptive_policy.batcher import PolicySimulationBatcher
 from backend.autonomous_response.engine import AutonomousResponseEngine, ActionType
 from backend.resilience.monitor import ResilienceMonitor
+from backend.ml.side_channel import SideChannelExecutor, PHASE3_LANE
 
 """
 PHASE 3 INTEGRATION CONTRACT:
@@ -13,8 +13,9 @@ PHASE 3 INTEGRATION CONTRACT:
 - Latency safety is preserved.
 """
 
-# ThreadPool for non-blocking execution
-executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+# Thresholds compared by the periodic policy simulation
+CURRENT_THRESHOLDS = {"MONITOR": 40, "RESTRICT": 60}
+PROPOSED_THRESHOLDS = {"MONITOR": 45, "RESTRICT": 65} # Slightly stricter test
 
 def run_phase3_logic_async(
     session_id: str,
@@ -24,9 +25,13 @@ def run_phase3_logic_async(
     context: Dict[str, Any]
 ):
     """
-    Fire-and-forget wrapper.
+    Fire-and-forget wrapper. Bounded and coalesced per session: a newer
+    inference replaces this session's pending Phase-3 work. Returns False if shed.
     """
-    executor.submit(_execute_phase3, session_id, features, risk_score, phase2_decision, context)
+    return SideChannelExecutor.fire_and_forget(
+        "phase3", _execute_phase3, session_id, features, risk_score, phase2_decision, context,
+        _priority=PHASE3_LANE, _coalesce_key=("phase3", session_id)
+    )
 
 def _execute_phase3(session_id: str, features: Dict[str, Any], risk_score: float, phase2_decision: str, context: Dict[str, Any]):
     try:
@@ -37,12 +42,9 @@ def _execute_phase3(session_id: str, features: Dict[str, Any], risk_score: float
         TrustIntelligenceEngine.update_trust(user_id, risk_score)
         
         # 2. Adaptive Policy (Simulation)
-        # Simulate "Online Learning" by comparing current vs proposed thresholds
-        current_mock = {"MONITOR": 40, "RESTRICT": 60}
-        proposed_mock = {"MONITOR": 45, "RESTRICT": 65} # Slightly stricter test
-        
-        # Fire and forget simulation
-        AdaptivePolicyEngine.create_proposal(current_mock, proposed_mock, [features])
+        # Simulate "Online Learning" by comparing current vs proposed thresholds.
+        # Samples are batched; the simulation runs periodically over all of them.
+        PolicySimulationBatcher.add(features, CURRENT_THRESHOLDS, PROPOSED_THRESHOLDS)
 
         # 3. Autonomous Response
         # DEFINITION (Phase 3 Final Patch): "Low-Risk" Action
@@ -1,18 +1,19 @@
 
-import concurrent.futures
 from typing import Dict, Any
 from backend.institutional_memory.storage import MemoryRecorder
 from backend.governance_intelligence.analyzer import OverrideAnalyzer
 from backend.continuous_improvement.engine import RecommenderEngine
-
-# ThreadPool for non-blocking execution
-executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+from backend.ml.side_channel import SideChannelExecutor, PHASE4_LANE
 
 def run_phase4_learning_async(session_id: str, decision: str, risk_score: float, features: Dict[str, Any]):
     """
-    Fire-and-forget Phase 4 Learning Loop.
+    Fire-and-forget Phase 4 Learning Loop. Bounded and coalesced per
+    session (latest decision wins). Returns False if shed.
     """
-    executor.submit(_execute_phase4, session_id, decision, risk_score, features)
+    return SideChannelExecutor.fire_and_forget(
+        "phase4", _execute_phase4, session_id, decision, risk_score, features,
+        _priority=PHASE4_LANE, _coalesce_key=("phase4", session_id)
+    )
 
 def _execute_phase4(session_id: str, decision: str, risk_score: float, features: Dict[str, Any]):
     try:
@@ -0,0 +1,45 @@
+import os
+import threading
+from collections import deque
+
+from backend.orchestration.async_dispatcher import AsyncDispatcher, LANE_COUNT
+
+# Lanes used by the side channel (lower = served first)
+PHASE3_LANE = 3  # trust / autonomous response follow-up
+PHASE4_LANE = 4  # institutional memory, periodic policy simulation
+
+class SideChannelExecutor(AsyncDispatcher):
+    """
+    Shared pool for Phase-3 / Phase-4 work that runs after inference.
+
+    Same bounded lanes, load shedding and per-key coalescing as
+    AsyncDispatcher, but with its own queues and workers so heavy learning
+    work never delays orchestration tasks. Submit with
+    _coalesce_key=("phase3", session_id) etc. so a session's latest state
+    replaces its older pending work.
+
+    Tunables (env): SIDE_CHANNEL_WORKERS (default 4), SIDE_CHANNEL_LANE_CAPACITY (default 2000).
+    """
+    WORKER_COUNT = int(os.getenv("SIDE_CHANNEL_WORKERS", "4"))
+    LANE_CAPACITY = int(os.getenv("SIDE_CHANNEL_LANE_CAPACITY", "2000"))
+    WORKER_NAME = "SideChannel"
+
+    # Own state; nothing is shared with AsyncDispatcher
+    _lanes = [deque() for _ in range(LANE_COUNT)]
+    _live_counts = [0] * LANE_COUNT
+    _pending = {}
+    _cond = threading.Condition()
+    _workers = []
+    _running = False
+    _in_flight = 0
+
+    _stats = {
+        "submitted": 0,
+        "completed": 0,
+        "failed": 0,
+        "dropped": 0,
+        "coalesced": 0,
+        "wait_seconds_total": 0.0,
+        "wait_seconds_max": 0.0
+    }
+    _lane_dropped = [0] * LANE_COUNT
@@ -0,0 +1,51 @@
+"""
+Feature Replay Equivalence Test
+Version: v1.0
+
+replay() must reproduce build_features() exactly at every cutoff,
+including for events that arrive out of timestamp order.
+"""
+import random
+import numpy as np
+from backend.ml.core.session_state import SessionState
+from backend.ml.core.feature_builder import FeatureBuilder
+from backend.ml.core.feature_schema import FEATURE_ORDER
+
+def _session(seed: int, n: int = 60) -> SessionState:
+    rng = random.Random(seed)
+    session = SessionState(f"s{seed}", 1000.0)
+    for _ in range(n):
+        session.add_event({
+            "timestamp": 1000.0 + rng.randint(0, 300),
+            "path": rng.choice(["/", "/login", "/api/a", "/api/b"]),
+            "status_code": rng.choice([200, 200, 401, 429, 500]),
+            "content_length": rng.randint(0, 2048),
+            "event_type": rng.choice(["HTTP", "LOGIN_ATTEMPT", "CAPTCHA_FAIL"]),
+            "auth_status": rng.choice(["ok", "failed"]),
+            "token_reused": rng.random() < 0.1,
+            "bot_probability": rng.random()
+        })
+    return session
+
+def test_cutoff_uses_sorted_events():
+    session = _session(1)
+    timestamps = [e["timestamp"] for e in session.events]
+    assert timestamps == sorted(timestamps)
+    assert session.get_events_before_cutoff(1150.0) == [e for e in session.events if e["timestamp"] <= 1150.0]
+
+def test_replay_matches_build_features():
+    builder = FeatureBuilder()
+    session = _session(2)
+    cutoffs = [1300.0, 999.0, 1100.0, 1100.5, 1050.0]
+
+    matrix = builder.replay(session, cutoffs)
+    assert matrix.shape == (len(cutoffs), len(FEATURE_ORDER))
+    for row, cutoff in zip(matrix, cutoffs):
+        assert row.tolist() == builder.build_features(session, cutoff)
+
+    per_event = builder.replay(session)
+    assert per_event[-1].tolist() == builder.build_features(session)
+
+    stacked = builder.build_training_matrix([(session, cutoffs), (_session(3), [1200.0])])
+    assert np.array_equal(stacked[:len(cutoffs)], matrix)
+    assert stacked.shape == (len(cutoffs) + 1, len(FEATURE_ORDER))
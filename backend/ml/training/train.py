@@ -7,12 +7,14 @@ from sklearn.calibration import CalibratedClassifierCV
 from sklearn.metrics import roc_auc_score, confusion_matrix, precision_score, recall_score
 from sklearn.model_selection import train_test_split
 from backend.ml.data.extract import load_training_data
+from backend.ml.core.feature_schema import FEATURE_ORDER
 
 MODEL_PATH = "e:/project/backend/ml/models/champion.pkl"
 
 def train_pipeline():
     print("Loading data...")
-    X, y = load_training_data()
+    # Columnar feature store: only the model's feature columns are read (float32)
+    X, y = load_training_data(columns=list(FEATURE_ORDER))
     
     if X.empty:
         print("No training data available. Skipping.")
@@ -44,7 +44,18 @@ class ReproducibleTrainer:
         with open(output_path, 'w') as f:
             json.dump(metadata, f, indent=2)
 
-    def train(self, data_path: str):
-        # Placeholder for actual training logic
+    def train(self, data_path: str) -> Dict[str, Any]:
+        """
+        Streams the feature store at data_path chunk by chunk (bounded memory).
+        """
+        # Placeholder for actual training logic (an incremental learner would partial_fit per chunk)
+        from backend.ml.data.feature_store import FeatureStore
         print(f"Training with seed {self.RANDOM_SEED} on {data_path}")
-        pass
+        columns = self.config.get("features")
+        rows, positives = 0, 0
+        for chunk in FeatureStore(data_path).iter_batches(columns=(columns or []) + ["label"],
+                                                          start_date=self.config.get("start_date"),
+                                                          end_date=self.config.get("end_date")):
+            rows += len(chunk)
+            positives += int((chunk["label"] >= 2).sum())
+        return {"rows": rows, "positives": positives}
@@ -4,6 +4,7 @@ from backend.session.session_snapshot import SessionSnapshot
 from backend.ml.guards import enforce_ml_input
 from backend.ml.inference_pipeline import evaluate_session as ml_evaluate # Renaming to avoid conflict
 from typing import Dict, Any
+from backend.monitoring.stage_metrics import StageMetrics
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +35,7 @@ class InferenceAdapter:
         try:
             inference_result = ml_evaluate(model_input)
             duration_ms = (time.perf_counter() - start_time) * 1000
+            StageMetrics.observe("ml_evaluate", duration_ms / 1000)
             
             # Enforce Contract
             result_dict = inference_result.to_dict()
@@ -50,6 +52,7 @@ class InferenceAdapter:
             
         except Exception as e:
             # Fallback for ML failure
+            StageMetrics.inc("errors", stage="ml_evaluate")
             logger.error(f"ML Inference Failure: {e}")
             return {
                 "session_id": str(snapshot.session_id),
@@ -1,8 +1,8 @@
 import logging
 import json
 from datetime import datetime
-from backend.extensions import db, socketio
-from backend.db.models import MonitoringEvent, AuditLog
+from backend.extensions import socketio
+from backend.monitoring.event_sink import MonitoringEventSink
 from backend.monitoring.feature_builder import FeatureBuilder
 from backend.core.recommendationEngine import RecommendationEngine
 from backend.core.trustDecisionEngine import TrustDecisionEngine
@@ -31,19 +31,38 @@ class DomainConsumer:
         self.logger = logging.getLogger(f"{domain}_Consumer")
         self.decision_engine = TrustDecisionEngine() # Session passed later? No, it's static-ish
 
+    @staticmethod
+    def validate(event):
+        """
+        Checks the columns MonitoringEvent requires, so a bad event fails here
+        instead of being dropped by the sink after the caller got a success.
+        Returns the parsed payload timestamp (None if absent).
+        """
+        event_id = event.get("event_id")
+        if not isinstance(event_id, str) or not event_id or len(event_id) > 36:
+            raise ValueError("event_id is required (string, at most 36 characters)")
+        ts = event.get("timestamp")
+        if not ts:
+            return None
+        try:
+            return datetime.fromisoformat(str(ts).replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError(f"timestamp is not ISO 8601: {ts!r}")
+
     def process_event(self, event):
         """
         Standard Pipeline:
-        1. Validate Schema (Implied by getting here)
+        1. Validate Schema (required columns; raises ValueError)
         2. Session Ingest (Skipped for now, assuming stateless or simple session lookup)
         3. Feature Build
         4. ML Evaluate
         5. Decision
         6. Suggestion
-        7. DB Save
+        7. DB Save (buffered)
         8. Audit
         9. Broadcast
         """
+        timestamp = self.validate(event)
         try:
             # 3. Feature Build
             features = FeatureBuilder.build(event, None)
@@ -62,22 +81,23 @@ class DomainConsumer:
             # 6. Suggestion
             suggestion = RecommendationEngine.recommend(decision, features)
             
-            # 7. DB Save
-            new_event = MonitoringEvent(
-                event_id=event.get("event_id"),
-                domain=self.domain,
-                session_id=event.get("session_id"),
-                actor_id=event.get("actor_id"),
-                ip=event.get("ip"),
-                route=event.get("route"),
-                risk_score=risk_score,
-                decision=decision,
-                suggestion=suggestion,
-                timestamp=datetime.fromisoformat(event.get("timestamp")),
-                payload=event.get("payload")
-            )
-            db.session.add(new_event)
-            db.session.commit()
+            # 7. DB Save (buffered; MonitoringEventSink writes in bulk)
+            row = {
+                "event_id": event.get("event_id"),
+                "session_id": event.get("session_id"),
+                "actor_id": event.get("actor_id"),
+                "ip": event.get("ip"),
+                "route": event.get("route"),
+                "risk_score": risk_score,
+                "decision": decision,
+                "suggestion": suggestion,
+                "timestamp": timestamp or datetime.utcnow(),
+                "payload": event.get("payload")
+            }
+            event_id = MonitoringEventSink.add(self.domain, row)
+            if event_id is None:
+                self.logger.warning(f"Dropped {self.domain} event: sink buffer full")
+                return None
             
             # 8. Audit (Simplified)
             # 9. Broadcast
@@ -89,9 +109,14 @@ class DomainConsumer:
             }, namespace="/live")
             
             self.logger.info(f"Processed {self.domain} event: {decision}")
-            return new_event
+            return {
+                "id": event_id,
+                "event_id": row["event_id"],
+                "risk_score": risk_score,
+                "decision": decision,
+                "suggestion": suggestion
+            }
 
         except Exception as e:
             self.logger.error(f"Error processing event: {e}")
-            db.session.rollback()
             return None
@@ -0,0 +1,380 @@
+import os
+import re
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from datetime import datetime, date, timedelta, timezone
+from typing import Dict, List, Any, Optional, Tuple
+
+from sqlalchemy import text, insert
+from sqlalchemy.exc import OperationalError
+
+from backend.extensions import db
+from backend.db.models import MonitoringEvent
+from backend.monitoring.stage_metrics import StageMetrics
+
+FLUSH_SIZE = int(os.getenv("MONITORING_SINK_FLUSH_SIZE", "500"))           # rows per multi-row INSERT
+FLUSH_INTERVAL_SEC = float(os.getenv("MONITORING_SINK_FLUSH_INTERVAL", "0.5"))
+MAX_BUFFERED = int(os.getenv("MONITORING_SINK_MAX_BUFFERED", "50000"))      # beyond this new events are shed
+RETENTION_DAYS = int(os.getenv("MONITORING_EVENT_RETENTION_DAYS", "14"))
+PREMAKE_DAYS = 2                  # daily partitions created ahead of time
+MAX_FUTURE_SKEW = timedelta(days=1)  # payload timestamps beyond this (or past retention) are clamped to now
+MAINTENANCE_INTERVAL_SEC = 3600
+COUNT_CACHE_TTL = 30              # seconds the open partitions' counts may lag
+RECENT_EVENT_IDS = int(os.getenv("MONITORING_SINK_RECENT_IDS", "50000"))  # event_ids remembered for redelivery dedupe
+
+TABLE = MonitoringEvent.__tablename__
+PARTITION_PREFIX = f"{TABLE}_p"
+DEFAULT_PARTITION = f"{TABLE}_default"
+_PARTITION_RE = re.compile(rf"^{PARTITION_PREFIX}(\d{{8}})$")
+
+class MonitoringEventSink:
+    """
+    Write path for MonitoringEvent rows.
+
+    DomainConsumer hands events to add(), which only buffers them per domain.
+    A flusher thread writes each domain's buffer with one multi-row INSERT
+    per FLUSH_SIZE rows (duplicates skipped on PostgreSQL), so a burst costs
+    a handful of commits instead of one per event.
+
+    On PostgreSQL the table is partitioned by day: maintain() keeps
+    PREMAKE_DAYS partitions ahead (plus a DEFAULT catch-all) and drops whole
+    partitions older than RETENTION_DAYS. Unpartitioned tables (existing
+    installs, sqlite) fall back to DELETE-based retention.
+
+    Partitioning means event_id can only be unique together with timestamp.
+    That rejects a redelivery carrying the same in-window timestamp, but a
+    missing or clamped timestamp is replaced with "now", which differs per
+    delivery. add() therefore also remembers the last RECENT_EVENT_IDS
+    event_ids and answers a redelivered one with the row id it already got.
+    """
+    _buffers: Dict[str, List[Dict[str, Any]]] = {}
+    _buffered = 0
+    _lock = threading.Lock()
+    _flush_lock = threading.Lock()
+    _wake = threading.Event()
+    _app = None
+    _thread: Optional[threading.Thread] = None
+    _stats = {"buffered": 0, "written": 0, "dropped": 0, "failed_flushes": 0, "clamped": 0, "duplicates": 0}
+    _recent_ids: "OrderedDict[str, str]" = OrderedDict()  # event_id -> row id, oldest first
+
+    # Per-domain counts: closed partitions never change, so they are cached until dropped
+    _closed_counts: Dict[str, Dict[str, int]] = {}
+    _open_counts: Tuple[float, Dict[str, int]] = (0.0, {})
+
+    # --- Buffering ---------------------------------------------------------------
+
+    @classmethod
+    def add(cls, domain: str, row: Dict[str, Any]) -> Optional[str]:
+        """
+        Buffers one event row (MonitoringEvent column names). Returns its id,
+        or None if the buffer is full and the event was shed. A recently
+        added event_id is not buffered again; its first row id is returned.
+        """
+        now = datetime.utcnow()
+        row.setdefault("id", uuid.uuid4())
+        ts = row.get("timestamp")
+        if ts is not None and ts.tzinfo is not None:
+            # Stored timestamps are naive UTC
+            ts = row["timestamp"] = ts.astimezone(timezone.utc).replace(tzinfo=None)
+        clamped = ts is not None and not (now - timedelta(days=RETENTION_DAYS) <= ts <= now + MAX_FUTURE_SKEW)
+        if ts is None or clamped:
+            # Payload clocks are untrusted: keep every row inside a premade daily partition
+            row["timestamp"] = now
+        row["domain"] = domain
+        event_id = row.get("event_id")
+        with cls._lock:
+            seen = cls._recent_ids.get(event_id)
+            if seen is not None:
+                cls._stats["duplicates"] += 1
+                return seen
+            if clamped:
+                cls._stats["clamped"] += 1
+            if cls._buffered >= MAX_BUFFERED:
+                cls._stats["dropped"] += 1
+                StageMetrics.inc("monitoring_events_dropped", domain=domain)
+                return None
+            cls._recent_ids[event_id] = str(row["id"])
+            if len(cls._recent_ids) > RECENT_EVENT_IDS:
+                cls._recent_ids.popitem(last=False)
+            cls._buffers.setdefault(domain, []).append(row)
+            cls._buffered += 1
+            cls._stats["buffered"] += 1
+            full = cls._buffered >= FLUSH_SIZE
+        if full:
+            cls._wake.set()
+        return str(row["id"])
+
+    @classmethod
+    def flush(cls) -> int:
+        """
+        Writes everything buffered. Needs an app context. Returns rows written.
+        A failed batch is put back (space permitting) and retried next flush.
+        """
+        with cls._flush_lock:
+            with cls._lock:
+                buffers, cls._buffers = cls._buffers, {}
+                cls._buffered = 0
+            written = 0
+            for domain, rows in buffers.items():
+                for start in range(0, len(rows), FLUSH_SIZE):
+                    chunk = rows[start:start + FLUSH_SIZE]
+                    try:
+                        with StageMetrics.timer("monitoring_sink_flush"):
+                            db.session.execute(cls._insert_statement(), chunk)
+                            db.session.commit()
+                        stored = len(chunk)
+                    except OperationalError as e:
+                        # Database unavailable: keep the rows for the next flush
+                        db.session.rollback()
+                        print(f"[MonitoringEventSink] Flush of {len(chunk)} {domain} events failed: {e}")
+                        cls._stats["failed_flushes"] += 1
+                        cls._requeue(domain, rows[start:])
+                        break
+                    except Exception as e:
+                        # A bad row poisons the whole statement: isolate it
+                        db.session.rollback()
+                        print(f"[MonitoringEventSink] Bulk insert rejected ({e}); retrying {domain} rows individually")
+                        cls._stats["failed_flushes"] += 1
+                        stored = cls._insert_individually(domain, chunk)
+                    written += stored
+                    StageMetrics.inc("monitoring_events_written", stored, domain=domain)
+            cls._stats["written"] += written
+            return written
+
+    @classmethod
+    def _insert_individually(cls, domain: str, rows: List[Dict[str, Any]]) -> int:
+        stored = 0
+        for row in rows:
+            try:
+                db.session.execute(cls._insert_statement(), [row])
+                db.session.commit()
+                stored += 1
+            except Exception:
+                db.session.rollback()
+                cls._forget([row])
+                cls._stats["dropped"] += 1
+                StageMetrics.inc("monitoring_events_dropped", domain=domain)
+        return stored
+
+    @classmethod
+    def _forget(cls, rows: List[Dict[str, Any]]):
+        # A dropped row was never stored: its redelivery must be accepted
+        for row in rows:
+            cls._recent_ids.pop(row.get("event_id"), None)
+
+    @staticmethod
+    def _insert_statement():
+        if db.engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as pg_insert
+            return pg_insert(MonitoringEvent.__table__).on_conflict_do_nothing()
+        return insert(MonitoringEvent.__table__)
+
+    @classmethod
+    def _requeue(cls, domain: str, rows: List[Dict[str, Any]]):
+        with cls._lock:
+            room = max(0, MAX_BUFFERED - cls._buffered)
+            kept = rows[:room]
+            cls._buffers[domain] = kept + cls._buffers.get(domain, [])
+            cls._buffered += len(kept)
+            if len(rows) > room:
+                cls._forget(rows[room:])
+                cls._stats["dropped"] += len(rows) - room
+                StageMetrics.inc("monitoring_events_dropped", len(rows) - room, domain=domain)
+
+    # --- Background flusher --------------------------------------------------------
+
+    @classmethod
+    def start(cls, app):
+        with cls._lock:
+            if cls._thread is not None:
+                return
+            cls._app = app
+            cls._thread = threading.Thread(target=cls._run, name="MonitoringEventSink", daemon=True)
+            cls._thread.start()
+
+    @classmethod
+    def _run(cls):
+        next_maintenance = 0.0
+        while True:
+            cls._wake.wait(FLUSH_INTERVAL_SEC)
+            cls._wake.clear()
+            with cls._app.app_context():
+                # Maintenance failures must never stop the flushing below
+                if time.monotonic() >= next_maintenance:
+                    next_maintenance = time.monotonic() + MAINTENANCE_INTERVAL_SEC
+                    try:
+                        cls.maintain()
+                    except Exception as e:
+                        db.session.rollback()
+                        print(f"[MonitoringEventSink] Partition maintenance failed: {e}")
+                try:
+                    cls.flush()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"[MonitoringEventSink] Flusher error: {e}")
+                db.session.remove()
+
+    # --- Partitions ------------------------------------------------------------------
+
+    @staticmethod
+    def is_partitioned() -> bool:
+        if db.engine.dialect.name != "postgresql":
+            return False
+        return bool(db.session.execute(
+            text("SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = :t"),
+            {"t": TABLE}
+        ).scalar())
+
+    @staticmethod
+    def partition_name(day: date) -> str:
+        return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+    @staticmethod
+    def list_partitions() -> Dict[date, str]:
+        names = db.session.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :t"
+        ), {"t": TABLE}).scalars()
+        partitions = {}
+        for name in names:
+            match = _PARTITION_RE.match(name)
+            if match:
+                partitions[datetime.strptime(match.group(1), "%Y%m%d").date()] = name
+        return partitions
+
+    @classmethod
+    def maintain(cls, today: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Creates upcoming daily partitions and expires old data. Idempotent.
+        """
+        today = today or datetime.utcnow().date()
+        cutoff = today - timedelta(days=RETENTION_DAYS)
+        if not cls.is_partitioned():
+            # Unpartitioned table: row-level retention
+            deleted = MonitoringEvent.query.filter(
+                MonitoringEvent.timestamp < datetime.combine(cutoff, datetime.min.time())
+            ).delete(synchronize_session=False)
+            db.session.commit()
+            return {"partitioned": False, "deleted": deleted}
+
+        created = []
+        existing = cls.list_partitions()
+        has_default = db.session.execute(text("SELECT to_regclass(:t)"), {"t": DEFAULT_PARTITION}).scalar() is not None
+        for offset in range(PREMAKE_DAYS + 1):
+            day = today + timedelta(days=offset)
+            if day not in existing:
+                cls._create_partition(day, has_default)
+                created.append(cls.partition_name(day))
+        db.session.execute(text(f'CREATE TABLE IF NOT EXISTS "{DEFAULT_PARTITION}" PARTITION OF "{TABLE}" DEFAULT'))
+
+        dropped = []
+        for day, name in sorted(existing.items()):
+            if day < cutoff:
+                db.session.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+                with cls._lock:
+                    cls._closed_counts.pop(name, None)
+                dropped.append(name)
+        # The catch-all only holds out-of-range stragglers
+        db.session.execute(
+            text(f'DELETE FROM "{DEFAULT_PARTITION}" WHERE timestamp < :cutoff'),
+            {"cutoff": datetime.combine(cutoff, datetime.min.time())}
+        )
+        db.session.commit()
+        if created or dropped:
+            print(f"[MonitoringEventSink] Partitions created={created} dropped={dropped}")
+        return {"partitioned": True, "created": created, "dropped": dropped}
+
+    @classmethod
+    def _create_partition(cls, day: date, has_default: bool):
+        """
+        Postgres refuses to create a partition while the DEFAULT partition
+        holds rows in its range, so those rows are moved into it.
+        """
+        name = cls.partition_name(day)
+        lo, hi = day.isoformat(), (day + timedelta(days=1)).isoformat()
+        in_range = f"timestamp >= '{lo}' AND timestamp < '{hi}'"
+        if has_default:
+            db.session.execute(text(
+                f'CREATE TEMP TABLE "_moved_{name}" ON COMMIT DROP AS '
+                f'SELECT * FROM "{DEFAULT_PARTITION}" WHERE {in_range}'
+            ))
+            db.session.execute(text(f'DELETE FROM "{DEFAULT_PARTITION}" WHERE {in_range}'))
+        db.session.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{TABLE}" FOR VALUES FROM (\'{lo}\') TO (\'{hi}\')'
+        ))
+        if has_default:
+            db.session.execute(text(f'INSERT INTO "{TABLE}" SELECT * FROM "_moved_{name}"'))
+
+    # --- Counts -----------------------------------------------------------------------
+
+    @staticmethod
+    def _count_by_domain(table: str = TABLE) -> Dict[str, int]:
+        rows = db.session.execute(text(f'SELECT domain, COUNT(*) FROM "{table}" GROUP BY domain')).all()
+        return {domain: n for domain, n in rows}
+
+    @classmethod
+    def domain_counts(cls) -> Dict[str, Any]:
+        """
+        Stored events per domain. Past-day partitions are counted once and
+        cached until dropped; today's / future / default partitions are
+        re-counted at most every COUNT_CACHE_TTL seconds.
+        """
+        now = time.monotonic()
+        partitioned = cls.is_partitioned()
+        if partitioned:
+            today = datetime.utcnow().date()
+            partitions = cls.list_partitions()
+            closed = {name for day, name in partitions.items() if day < today}
+            with cls._lock:
+                known = set(cls._closed_counts)
+            fresh = {name: cls._count_by_domain(name) for name in closed - known}
+            with cls._lock:
+                cls._closed_counts.update(fresh)
+                for name in set(cls._closed_counts) - closed:
+                    del cls._closed_counts[name]
+            open_tables = [name for day, name in partitions.items() if day >= today] + [DEFAULT_PARTITION]
+        else:
+            open_tables = [TABLE]
+
+        expires, open_counts = cls._open_counts
+        if expires <= now:
+            open_counts = {}
+            for table in open_tables:
+                try:
+                    for domain, n in cls._count_by_domain(table).items():
+                        open_counts[domain] = open_counts.get(domain, 0) + n
+                except Exception:
+                    db.session.rollback() # e.g. DEFAULT partition not created yet
+            cls._open_counts = (now + COUNT_CACHE_TTL, open_counts)
+
+        totals = dict(open_counts)
+        with cls._lock:
+            for counts in cls._closed_counts.values():
+                for domain, n in counts.items():
+                    totals[domain] = totals.get(domain, 0) + n
+            pending = {domain: len(rows) for domain, rows in cls._buffers.items() if rows}
+        return {
+            "domains": totals,
+            "total": sum(totals.values()),
+            "pending_flush": pending,
+            "partitioned": partitioned,
+            "retention_days": RETENTION_DAYS
+        }
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        with cls._lock:
+            return dict(cls._stats, queued=cls._buffered)
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._buffers = {}
+            cls._buffered = 0
+            cls._stats = {"buffered": 0, "written": 0, "dropped": 0, "failed_flushes": 0, "clamped": 0, "duplicates": 0}
+            cls._recent_ids = OrderedDict()
+            cls._closed_counts = {}
+            cls._open_counts = (0.0, {})
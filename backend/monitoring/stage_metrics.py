@@ -0,0 +1,224 @@
+import os
+import time
+import random
+import bisect
+import threading
+from functools import wraps
+from typing import Dict, Tuple, List, Optional
+
+# Latency buckets (seconds) sized for a 200ms end-to-end budget
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.5, 1.0, 2.5)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(key: LabelKey, le: Optional[str] = None) -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in key]
+    if le is not None:
+        parts.append(f'le="{le}"')
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _format_value(value: float) -> str:
+    # Exact integers (a %g of a big counter would round it), full precision otherwise
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _bucket_quantile(q: float, counts: List[int], count: int) -> float:
+    if not count:
+        return 0.0
+    rank = q * count
+    cumulative = 0
+    for i, n in enumerate(counts):
+        if n and cumulative + n >= rank:
+            if i == len(BUCKETS): # +Inf bucket: best we can say is "above the top bound"
+                return BUCKETS[-1]
+            lower = BUCKETS[i - 1] if i else 0.0
+            return lower + (BUCKETS[i] - lower) * (rank - cumulative) / n
+        cumulative += n
+    return BUCKETS[-1]
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1) # last slot = +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+class _Timer:
+    __slots__ = ("stage", "labels", "sampled", "start")
+
+    def __init__(self, stage: str, labels: Dict[str, str], sampled: bool):
+        self.stage = stage
+        self.labels = labels
+        self.sampled = sampled
+
+    def __enter__(self):
+        if self.sampled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.sampled:
+            StageMetrics.observe(self.stage, time.perf_counter() - self.start, **self.labels)
+        if exc_type is not None:
+            StageMetrics.inc("errors", stage=self.stage) # errors are counted even when unsampled
+        return False
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP = _NoopTimer()
+
+class StageMetrics:
+    """
+    Low-overhead per-stage latency histograms + counters for the ingest/inference
+    hot path, rendered in Prometheus text format (GET /api/v1/monitoring/metrics).
+
+    Timers are sampled (METRICS_SAMPLE_RATE, default 1.0) so the cost on a hot
+    path can be dialled down; counters are always exact. METRICS_ENABLED=0
+    turns everything into no-ops.
+    """
+    PREFIX = "trust"
+    ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+    SAMPLE_RATE = float(os.getenv("METRICS_SAMPLE_RATE", "1.0"))
+
+    _histograms: Dict[LabelKey, _Histogram] = {}
+    _counters: Dict[Tuple[str, LabelKey], float] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def timer(cls, stage: str, **labels):
+        """
+        with StageMetrics.timer("fusion"): ...
+        Exceptions escaping the block also count as errors{stage=...}.
+        """
+        if not cls.ENABLED:
+            return _NOOP
+        return _Timer(stage, labels, cls.SAMPLE_RATE >= 1.0 or random.random() < cls.SAMPLE_RATE)
+
+    @classmethod
+    def timed(cls, stage: str):
+        """
+        Decorator form of timer().
+        """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with cls.timer(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @classmethod
+    def observe(cls, stage: str, seconds: float, **labels):
+        if not cls.ENABLED:
+            return
+        key = _label_key({"stage": stage, **labels})
+        with cls._lock:
+            hist = cls._histograms.get(key)
+            if hist is None:
+                hist = cls._histograms[key] = _Histogram()
+            hist.observe(seconds)
+
+    @classmethod
+    def inc(cls, name: str, value: float = 1, **labels):
+        """
+        Counters: events{type}, decisions{decision}, errors{stage}.
+        """
+        if not cls.ENABLED:
+            return
+        key = (name, _label_key(labels))
+        with cls._lock:
+            cls._counters[key] = cls._counters.get(key, 0) + value
+
+    @classmethod
+    def configure(cls, enabled: Optional[bool] = None, sample_rate: Optional[float] = None):
+        if enabled is not None:
+            cls.ENABLED = bool(enabled)
+        if sample_rate is not None:
+            if not 0.0 <= sample_rate <= 1.0:
+                raise ValueError("sample_rate must be between 0 and 1")
+            cls.SAMPLE_RATE = float(sample_rate)
+        return {"enabled": cls.ENABLED, "sample_rate": cls.SAMPLE_RATE}
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._histograms = {}
+            cls._counters = {}
+
+    @classmethod
+    def summary(cls, quantiles: Tuple[float, ...] = (0.5, 0.95, 0.99)) -> Dict[str, Dict[str, float]]:
+        """
+        Per-series {count, mean, p50, ...} in seconds, keyed "stage" or
+        "stage{label=value}". Quantiles are interpolated within buckets, the same
+        estimate Prometheus' histogram_quantile() gives.
+        """
+        with cls._lock:
+            histograms = {k: (list(h.counts), h.total, h.count) for k, h in cls._histograms.items()}
+
+        result = {}
+        for key, (counts, total, count) in sorted(histograms.items()):
+            labels = dict(key)
+            stage = labels.pop("stage", "")
+            name = stage + ("{" + ",".join(f"{k}={v}" for k, v in sorted(labels.items())) + "}" if labels else "")
+            row = {"count": count, "mean": total / count if count else 0.0}
+            for q in quantiles:
+                row[f"p{q * 100:g}"] = _bucket_quantile(q, counts, count)
+            result[name] = row
+        return result
+
+    @classmethod
+    def render(cls) -> str:
+        """
+        Prometheus text exposition format 0.0.4.
+        """
+        with cls._lock:
+            histograms = {k: (list(h.counts), h.total, h.count) for k, h in cls._histograms.items()}
+            counters = dict(cls._counters)
+
+        name = f"{cls.PREFIX}_stage_latency_seconds"
+        lines: List[str] = [
+            f"# HELP {name} Latency of each ingest/inference stage (sampled).",
+            f"# TYPE {name} histogram"
+        ]
+        for key in sorted(histograms):
+            counts, total, count = histograms[key]
+            cumulative = 0
+            for bound, n in zip(BUCKETS, counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{_format_labels(key, str(bound))} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(key, '+Inf')} {count}")
+            lines.append(f"{name}_sum{_format_labels(key)} {total:.9f}")
+            lines.append(f"{name}_count{_format_labels(key)} {count}")
+
+        by_name: Dict[str, List[Tuple[LabelKey, float]]] = {}
+        for (counter, key), value in counters.items():
+            by_name.setdefault(counter, []).append((key, value))
+        for counter in sorted(by_name):
+            full = f"{cls.PREFIX}_{counter}_total"
+            lines.append(f"# TYPE {full} counter")
+            for key, value in sorted(by_name[counter]):
+                lines.append(f"{full}{_format_labels(key)} {_format_value(value)}")
+
+        lines.append(f"# TYPE {cls.PREFIX}_metrics_sample_rate gauge")
+        lines.append(f"{cls.PREFIX}_metrics_sample_rate {_format_value(cls.SAMPLE_RATE)}")
+        return "\n".join(lines) + "\n"
@@ -1,33 +1,208 @@
+import os
 import threading
-import concurrent.futures
+import time
 import logging
-from typing import Callable, Any
+from collections import deque
+from typing import Callable, Any, Dict, Hashable, Optional
 
 logger = logging.getLogger(__name__)
 
+# Lanes mirror SOCQueuePriority (P0 = most urgent). Lower lane number is always served first.
+LANE_COUNT = 5
+DEFAULT_LANE = 3
+
+class _Task:
+    __slots__ = ("name", "func", "args", "kwargs", "lane", "coalesce_key", "enqueued_at", "superseded")
+
+    def __init__(self, name, func, args, kwargs, lane, coalesce_key):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.lane = lane
+        self.coalesce_key = coalesce_key
+        self.enqueued_at = time.monotonic()
+        self.superseded = False
+
 class AsyncDispatcher:
     """
-    Manages background thread pool for orchestration tasks.
+    Bounded, priority-laned background pool for orchestration tasks.
     Ensures main request thread returns immediately.
+
+    - One bounded FIFO per priority lane; workers always drain the most urgent
+      non-empty lane first, so HIGH_PRIORITY_ENFORCEMENT never waits behind
+      MONITORING_ONLY noise.
+    - Backpressure: a submit to a full lane is shed (fire_and_forget returns False).
+    - Coalescing: a pending task with the same coalesce_key is replaced by the
+      newer submission (latest session state wins) instead of queueing twice.
+      A less urgent submission never replaces a more urgent pending one
+      (an ALLOW must not overwrite a queued ESCALATE).
+
+    Tunables (env): ORCHESTRATION_WORKERS (default 5), ORCHESTRATION_LANE_CAPACITY (default 1000).
     """
-    _executor = concurrent.futures.ThreadPoolExecutor(max_workers=5, thread_name_prefix="Orchestrator")
+    WORKER_COUNT = int(os.getenv("ORCHESTRATION_WORKERS", "5"))
+    LANE_CAPACITY = int(os.getenv("ORCHESTRATION_LANE_CAPACITY", "1000"))
+    WORKER_NAME = "Orchestrator"
+
+    _lanes = [deque() for _ in range(LANE_COUNT)]
+    _live_counts = [0] * LANE_COUNT  # queued tasks per lane, excluding superseded tombstones
+    _pending: Dict[Hashable, _Task] = {}
+    _cond = threading.Condition()
+    _workers = []
+    _running = False
+    _in_flight = 0
+
+    _stats = {
+        "submitted": 0,
+        "completed": 0,
+        "failed": 0,
+        "dropped": 0,
+        "coalesced": 0,
+        "wait_seconds_total": 0.0,
+        "wait_seconds_max": 0.0
+    }
+    _lane_dropped = [0] * LANE_COUNT
 
     @classmethod
-    def fire_and_forget(cls, task_name: str, func: Callable, *args, **kwargs):
+    def fire_and_forget(cls, task_name: str, func: Callable, *args,
+                        _priority: int = DEFAULT_LANE, _coalesce_key: Optional[Hashable] = None, **kwargs) -> bool:
         """
         Submits a task to the background pool.
-        Log errors if they occur (via future callback).
+        Dispatcher options are underscore-prefixed so `priority` / `coalesce_key`
+        stay free to be passed through to func as ordinary kwargs.
+        Returns False if the lane is full and the task was shed.
+        Errors inside the task are logged, never raised to the caller.
         """
-        def wrapper():
+        lane = min(max(int(_priority), 0), LANE_COUNT - 1)
+        coalesce_key = _coalesce_key
+        with cls._cond:
+            cls._ensure_started()
+            cls._stats["submitted"] += 1
+
+            if coalesce_key is not None:
+                existing = cls._pending.get(coalesce_key)
+                if existing is not None:
+                    cls._stats["coalesced"] += 1
+                    if lane > existing.lane:
+                        # Less urgent: never downgrade, the pending urgent task runs as queued
+                        return True
+                    if lane == existing.lane:
+                        # Same urgency: keep its queue position, take the newest payload
+                        existing.name, existing.func, existing.args, existing.kwargs = task_name, func, args, kwargs
+                        return True
+                    # More urgent now: retire the old entry and re-queue in the higher lane
+                    existing.superseded = True
+                    cls._live_counts[existing.lane] -= 1
+                    del cls._pending[coalesce_key]
+
+            if cls._live_counts[lane] >= cls.LANE_CAPACITY:
+                cls._stats["dropped"] += 1
+                cls._lane_dropped[lane] += 1
+                logger.warning(f"{cls.WORKER_NAME} lane P{lane} full, shedding task: {task_name}")
+                return False
+
+            task = _Task(task_name, func, args, kwargs, lane, coalesce_key)
+            cls._lanes[lane].append(task)
+            cls._live_counts[lane] += 1
+            if coalesce_key is not None:
+                cls._pending[coalesce_key] = task
+            # notify_all: wait_idle() callers share this condition with the workers
+            cls._cond.notify_all()
+            return True
+
+    @classmethod
+    def _ensure_started(cls):
+        # Caller holds cls._cond
+        if cls._running:
+            return
+        cls._running = True
+        cls._workers = [
+            threading.Thread(target=cls._worker_loop, name=f"{cls.WORKER_NAME}-{i}", daemon=True)
+            for i in range(max(1, cls.WORKER_COUNT))
+        ]
+        for w in cls._workers:
+            w.start()
+
+    @classmethod
+    def _next_task(cls) -> Optional[_Task]:
+        # Caller holds cls._cond
+        for lane, queue in enumerate(cls._lanes):
+            while queue:
+                task = queue.popleft()
+                if task.superseded:
+                    continue
+                cls._live_counts[lane] -= 1
+                if task.coalesce_key is not None and cls._pending.get(task.coalesce_key) is task:
+                    del cls._pending[task.coalesce_key]
+                return task
+        return None
+
+    @classmethod
+    def _worker_loop(cls):
+        while True:
+            with cls._cond:
+                task = cls._next_task()
+                while task is None:
+                    if not cls._running:
+                        return
+                    cls._cond.wait()
+                    task = cls._next_task()
+                cls._in_flight += 1
+                waited = time.monotonic() - task.enqueued_at
+                cls._stats["wait_seconds_total"] += waited
+                cls._stats["wait_seconds_max"] = max(cls._stats["wait_seconds_max"], waited)
+
             try:
-                logger.info(f"Starting async task: {task_name}")
-                func(*args, **kwargs)
-                logger.info(f"Completed async task: {task_name}")
+                logger.info(f"Starting async task: {task.name}")
+                task.func(*task.args, **task.kwargs)
+                logger.info(f"Completed async task: {task.name}")
+                outcome = "completed"
             except Exception as e:
-                logger.error(f"Error in async task {task_name}: {str(e)}", exc_info=True)
+                logger.error(f"Error in async task {task.name}: {str(e)}", exc_info=True)
+                outcome = "failed"
+
+            with cls._cond:
+                cls._in_flight -= 1
+                cls._stats[outcome] += 1
+                cls._cond.notify_all()
+
+    @classmethod
+    def get_metrics(cls) -> Dict[str, Any]:
+        with cls._cond:
+            started = cls._stats["completed"] + cls._stats["failed"] + cls._in_flight
+            return {
+                "workers": len(cls._workers),
+                "lane_capacity": cls.LANE_CAPACITY,
+                "queue_depth": {f"P{i}": cls._live_counts[i] for i in range(LANE_COUNT)},
+                "in_flight": cls._in_flight,
+                "dropped_by_lane": {f"P{i}": cls._lane_dropped[i] for i in range(LANE_COUNT)},
+                "avg_wait_seconds": (cls._stats["wait_seconds_total"] / started) if started else 0.0,
+                **cls._stats
+            }
 
-        cls._executor.submit(wrapper)
+    @classmethod
+    def wait_idle(cls, timeout: float = 5.0) -> bool:
+        """
+        Blocks until all queued and running tasks finished (tests / graceful stop).
+        """
+        deadline = time.monotonic() + timeout
+        with cls._cond:
+            while sum(cls._live_counts) or cls._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                cls._cond.wait(remaining)
+        return True
 
     @classmethod
     def shutdown(cls):
-        cls._executor.shutdown(wait=True)
+        """
+        Drains the queues, then stops workers. The pool restarts lazily on the next submit.
+        """
+        cls.wait_idle(timeout=30.0)
+        with cls._cond:
+            cls._running = False
+            cls._cond.notify_all()
+            workers, cls._workers = cls._workers, []
+        for w in workers:
+            w.join(timeout=5.0)
@@ -3,6 +3,7 @@ from backend.orchestration.execution_context import ExecutionContext
 from backend.orchestration.async_dispatcher import AsyncDispatcher
 from backend.audit.audit_log import AuditLogger
 from backend.orchestration.decision_router import DecisionRouter
+from backend.orchestration.soc_priority import SOCPriorityManager
 
 # Placeholder for Enforcement (Phase 3)
 # from backend.enforcement.state.proposal_registry import ProposalRegistry 
@@ -17,12 +18,17 @@ class OrchestrationEngine:
     def process_inference_result(ml_result: Dict[str, Any]):
         """
         Entry point from Inference Pipeline.
-        Dispatches to background thread.
+        Dispatches to background thread, on the lane matching the SOC priority
+        of the decision (ESCALATE -> P0 ... ALLOW -> P4). Pending work for the
+        same session is coalesced so only its latest result is processed.
         """
-        AsyncDispatcher.fire_and_forget(
+        priority = SOCPriorityManager.calculate_priority(ml_result.get("decision", "ALLOW"), ml_result.get("severity"))
+        return AsyncDispatcher.fire_and_forget(
             "process_inference",
             OrchestrationEngine._process_sync,
-            ml_result
+            ml_result,
+            _priority=priority,
+            _coalesce_key=("process_inference", ml_result.get("session_id"))
         )
         
     @staticmethod
@@ -41,8 +47,11 @@ class OrchestrationEngine:
                 # TODO: Populate user_id, history etc.
             )
             
+            # Serialize once; reused by every audit entry below
+            context_str = str(context.to_dict())
+
             # 2. Log Decision
-            AuditLogger.log_system_event("RECEIVED", f"Processing ml result: {context.to_dict()}", "INFO")
+            AuditLogger.log_system_event("RECEIVED", f"Processing ml result: {context_str}", "INFO")
             
             # 3. Route
             workflow = DecisionRouter.route_decision(context.decision)
@@ -50,15 +59,15 @@ class OrchestrationEngine:
             # 4. Handle Workflow
             if workflow == "MONITORING_ONLY":
                 # Just log, maybe update trust metric stats
-                AuditLogger.log_system_event("MONITORED", f"No action needed: {context.to_dict()}", "INFO")
+                AuditLogger.log_system_event("MONITORED", f"No action needed: {context_str}", "INFO")
                 
             elif workflow == "SOC_ALERT":
-                AuditLogger.log_system_event("ALERTED", f"Sent to SOC Alert Stream: {context.to_dict()}", "WARNING")
+                AuditLogger.log_system_event("ALERTED", f"Sent to SOC Alert Stream: {context_str}", "WARNING")
                 
             elif workflow in ["ENFORCEMENT_PROPOSAL", "HIGH_PRIORITY_ENFORCEMENT"]:
                 # Check for Staleness before proposing
                 if context.is_expired():
-                    AuditLogger.log_system_event("REJECTED_STALE", f"Context expired before orchestration: {context.to_dict()}", "WARNING")
+                    AuditLogger.log_system_event("REJECTED_STALE", f"Context expired before orchestration: {context_str}", "WARNING")
                     return
 
                 # Blast Radius Guard
@@ -84,7 +93,7 @@ class OrchestrationEngine:
                 from backend.enforcement.enforcement_engine import EnforcementEngine
                 EnforcementEngine.handle_enforcement_request(context)
                 
-                AuditLogger.log_system_event("PROPOSED", f"Enforcement Proposal Handed Off ({workflow}): {context.to_dict()}", "INFO")
+                AuditLogger.log_system_event("PROPOSED", f"Enforcement Proposal Handed Off ({workflow}): {context_str}", "INFO")
                 
         except Exception as e:
             AuditLogger.log_system_event("ORCHESTRATION_ERROR", str(e), "ERROR")
@@ -1,6 +1,5 @@
 from typing import Dict, Any, List
 from datetime import datetime
-from backend.enforcement.state.proposal_registry import ProposalRegistry
 from backend.ml.decision.prevention_modes import DecisionType
 from backend.threat_model.threat_taxonomy import ThreatSeverity
 
@@ -46,13 +45,7 @@ class SOCPriorityManager:
         return 0
 
     @staticmethod
-    def get_prioritized_queue(status_filter: str = "PENDING_APPROVAL") -> List[Dict[str, Any]]:
-        proposals = ProposalRegistry.list_proposals(status_filter)
-        # Sort by priority desc
-        # Note: proposals is a dict {id: prop}
-        sorted_props = sorted(
-            proposals.values(), 
-            key=lambda p: SocPriority.calculate_priority(p), 
-            reverse=True
-        )
-        return sorted_props
+    def get_prioritized_queue(status_filter: str = "PENDING") -> List[Dict[str, Any]]:
+        # Served from the incrementally maintained SOC queue index
+        from backend.soc.queue_manager import QueueManager
+        return QueueManager.get_prioritized_queue(status_filter)
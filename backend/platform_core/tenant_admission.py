@@ -0,0 +1,293 @@
+import os
+import time
+import threading
+from collections import OrderedDict, deque
+from functools import wraps
+from typing import Dict, Callable, Optional, Any, Tuple
+
+from backend.platform_core.tenant_manager import TenantManager, TenantContext
+from backend.monitoring.stage_metrics import StageMetrics
+
+QUEUE_CAPACITY = int(os.getenv("TENANT_QUEUE_CAPACITY", "5000"))   # per tenant
+WORKER_COUNT = int(os.getenv("TENANT_ADMISSION_WORKERS", "2"))
+MAX_TENANTS = int(os.getenv("TENANT_ADMISSION_MAX_TENANTS", "10000")) # buckets kept; least recently used go first
+QUANTUM = 10 # events a weight-1 tenant may dequeue per round-robin turn
+
+class TokenBucket:
+    """
+    rate tokens/sec, up to burst. Refilled lazily on each call.
+    """
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, cost: float = 1.0, now: Optional[float] = None) -> bool:
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True
+        return False
+
+    def wait_time(self, cost: float = 1.0, now: Optional[float] = None) -> float:
+        """
+        Seconds until `cost` tokens are available.
+        """
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+class _TenantQueue:
+    __slots__ = ("items", "deficit", "weight")
+
+    def __init__(self, weight: float):
+        self.items = deque()
+        self.deficit = 0.0
+        self.weight = weight
+
+class TenantAdmission:
+    """
+    Tenant-aware admission ahead of IngestionService / EventIngestor.
+
+    - Request paths (ingest routes): admit() checks the tenant's token bucket
+      and sheds over-rate events (HTTP 429) so one tenant's flood never reaches
+      the scoring pipeline.
+    - Background sources (Kafka consumer): submit() enqueues into a bounded
+      per-tenant queue; workers dequeue by weighted deficit round robin, still
+      gated by each tenant's bucket, so a backlog from one tenant cannot delay
+      another's events. A full queue sheds.
+    - Long-running jobs (batch): acquire() blocks until the tenant has tokens.
+
+    Limits / weights come from TenantManager.get_limits(). Every tenant id
+    gets its own bucket and queue; unconfigured ids get the default tier's
+    limits. At most MAX_TENANTS buckets are kept: the least recently used
+    idle tenant (nothing queued) is evicted together with its counters.
+    Counters: trust_tenant_events_total{tenant, outcome=accepted|shed|queued},
+    labelled by TenantManager.tier() so unconfigured ids share a label.
+    """
+    _buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+    _queues: Dict[str, _TenantQueue] = {}
+    _active = deque() # tenants with queued work, in round-robin order
+    _stats: Dict[str, Dict[str, int]] = {}
+    _cond = threading.Condition()
+    _workers = []
+    _running = False
+
+    # --- Buckets ---------------------------------------------------------------
+
+    @classmethod
+    def _bucket(cls, tenant_id: str) -> TokenBucket:
+        # Caller holds cls._cond
+        bucket = cls._buckets.get(tenant_id)
+        if bucket is None:
+            limits = TenantManager.get_limits(tenant_id)
+            bucket = cls._buckets[tenant_id] = TokenBucket(limits["rate_per_sec"], limits["burst"])
+            if len(cls._buckets) > MAX_TENANTS:
+                cls._evict()
+        else:
+            cls._buckets.move_to_end(tenant_id)
+        return bucket
+
+    @classmethod
+    def _evict(cls):
+        # Caller holds cls._cond. Oldest first; tenants with queued work are kept.
+        for tenant_id in list(cls._buckets):
+            if len(cls._buckets) <= MAX_TENANTS:
+                return
+            queue = cls._queues.get(tenant_id)
+            if queue is not None and queue.items:
+                continue
+            del cls._buckets[tenant_id]
+            cls._queues.pop(tenant_id, None)
+            cls._stats.pop(tenant_id, None)
+
+    @classmethod
+    def _count(cls, tenant_id: str, outcome: str, n: int = 1):
+        # Caller holds cls._cond
+        stats = cls._stats.setdefault(tenant_id, {"accepted": 0, "shed": 0, "queued": 0})
+        stats[outcome] += n
+        StageMetrics.inc("tenant_events", n, tenant=TenantManager.tier(tenant_id), outcome=outcome)
+
+    @classmethod
+    def admit(cls, tenant_id: Optional[str], cost: float = 1.0) -> bool:
+        tenant_id = tenant_id or "default"
+        with cls._cond:
+            accepted = cls._bucket(tenant_id).take(cost)
+            cls._count(tenant_id, "accepted" if accepted else "shed")
+            return accepted
+
+    @classmethod
+    def retry_after(cls, tenant_id: Optional[str], cost: float = 1.0) -> float:
+        with cls._cond:
+            return cls._bucket(tenant_id or "default").wait_time(cost)
+
+    @classmethod
+    def acquire(cls, tenant_id: Optional[str], cost: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        Blocking admit for background jobs. Cost is capped at the bucket's burst
+        so a large unit of work is throttled rather than refused forever.
+        """
+        tenant_id = tenant_id or "default"
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with cls._cond:
+            bucket = cls._bucket(tenant_id)
+            cost = min(cost, bucket.burst)
+            while not bucket.take(cost):
+                wait = bucket.wait_time(cost)
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        cls._count(tenant_id, "shed")
+                        return False
+                    wait = min(wait, remaining)
+                cls._cond.wait(min(wait, 1.0))
+            cls._count(tenant_id, "accepted")
+            return True
+
+    # --- Fair queue ------------------------------------------------------------
+
+    @classmethod
+    def submit(cls, tenant_id: Optional[str], func: Callable, *args, **kwargs) -> bool:
+        """
+        Queues func(*args, **kwargs) on the tenant's queue.
+        Returns False (shed) if that tenant's queue is full.
+        """
+        tenant_id = tenant_id or "default"
+        with cls._cond:
+            cls._ensure_started()
+            queue = cls._queues.get(tenant_id)
+            if queue is None:
+                queue = cls._queues[tenant_id] = _TenantQueue(TenantManager.get_limits(tenant_id)["weight"])
+            if len(queue.items) >= QUEUE_CAPACITY:
+                cls._count(tenant_id, "shed")
+                return False
+            if not queue.items:
+                cls._active.append(tenant_id)
+            queue.items.append((func, args, kwargs))
+            cls._count(tenant_id, "queued")
+            cls._cond.notify()
+            return True
+
+    @classmethod
+    def _next(cls) -> Optional[Tuple[str, Tuple]]:
+        """
+        Weighted deficit round robin over tenants with queued work, skipping
+        tenants whose bucket is empty. Caller holds cls._cond.
+        Returns (tenant_id, item) or None if everyone queued is rate limited.
+        """
+        for _ in range(len(cls._active)):
+            tenant_id = cls._active[0]
+            queue = cls._queues[tenant_id]
+            if queue.deficit < 1:
+                queue.deficit += QUANTUM * queue.weight
+            if not cls._bucket(tenant_id).take():
+                queue.deficit = 0.0
+                cls._active.rotate(-1)
+                continue
+            item = queue.items.popleft()
+            queue.deficit -= 1
+            if not queue.items:
+                queue.deficit = 0.0
+                cls._active.popleft()
+            elif queue.deficit < 1:
+                cls._active.rotate(-1)
+            cls._count(tenant_id, "accepted")
+            return tenant_id, item
+        return None
+
+    @classmethod
+    def _worker_loop(cls):
+        while True:
+            with cls._cond:
+                picked = None
+                while picked is None:
+                    if not cls._active:
+                        cls._cond.wait()
+                        continue
+                    picked = cls._next()
+                    if picked is None:
+                        # Everyone queued is over rate: sleep until the soonest refill
+                        cls._cond.wait(min(1.0, min(cls._bucket(t).wait_time() for t in cls._active)))
+            tenant_id, (func, args, kwargs) = picked
+            try:
+                TenantContext.set_tenant(tenant_id)
+                func(*args, **kwargs)
+            except Exception as e:
+                print(f"[TenantAdmission] Task failed for tenant {tenant_id}: {e}")
+
+    @classmethod
+    def _ensure_started(cls):
+        # Caller holds cls._cond
+        if cls._running:
+            return
+        cls._running = True
+        for i in range(WORKER_COUNT):
+            worker = threading.Thread(target=cls._worker_loop, name=f"TenantAdmission-{i}", daemon=True)
+            worker.start()
+            cls._workers.append(worker)
+
+    # --- Introspection -----------------------------------------------------------
+
+    @classmethod
+    def stats(cls) -> Dict[str, Dict[str, Any]]:
+        with cls._cond:
+            result = {}
+            for tenant_id in set(cls._stats) | set(cls._queues):
+                row = dict(cls._stats.get(tenant_id, {"accepted": 0, "shed": 0, "queued": 0}))
+                queue = cls._queues.get(tenant_id)
+                row["queue_depth"] = len(queue.items) if queue else 0
+                bucket = cls._buckets.get(tenant_id)
+                row["tokens"] = round(bucket.tokens, 2) if bucket else None
+                result[tenant_id] = row
+            return result
+
+    @classmethod
+    def reset(cls):
+        """
+        Drops buckets (picks up changed limits), queued work and counters.
+        """
+        with cls._cond:
+            cls._buckets = OrderedDict()
+            cls._queues = {}
+            cls._active.clear()
+            cls._stats = {}
+
+def resolve_tenant(payload: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Tenant of an ingest request: the tenant the auth middleware established
+    (g.tenant_id), else "default". A raw X-Tenant-ID header or a tenant_id in
+    the body is never trusted on its own on request paths, so a client cannot
+    claim another tenant's quota; `payload` is only consulted outside a
+    request (background sources).
+    """
+    from flask import g, has_request_context
+    if has_request_context():
+        return getattr(g, "tenant_id", None) or "default"
+    if payload and payload.get("tenant_id"):
+        return str(payload["tenant_id"])
+    return TenantContext.get_tenant() or "default"
+
+def admit_tenant(f):
+    """
+    Route decorator: sheds the request with 429 when its tenant is over rate.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        from flask import jsonify
+        tenant_id = resolve_tenant()
+        if not TenantAdmission.admit(tenant_id):
+            response = jsonify({"error": "Tenant rate limit exceeded", "tenant_id": tenant_id})
+            response.status_code = 429
+            response.headers["Retry-After"] = str(max(1, int(TenantAdmission.retry_after(tenant_id) + 0.999)))
+            return response
+        TenantContext.set_tenant(tenant_id)
+        return f(*args, **kwargs)
+    return decorated
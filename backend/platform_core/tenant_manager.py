@@ -1,4 +1,5 @@
 
+import os
 from typing import Optional
 from threading import local
 
@@ -19,9 +20,12 @@ class TenantManager:
     """
     
     # Mock config store per tenant
+    # rate_per_sec / burst: ingestion token bucket (per tenant id); weight: fair-queue share
     _tenant_configs = {
-        "default": {"quota": 1000, "features": ["standard"]},
-        "org_Acme": {"quota": 5000, "features": ["premium"]}
+        "default": {"quota": 1000, "features": ["standard"],
+                    "rate_per_sec": float(os.getenv("TENANT_DEFAULT_RATE", "200")),
+                    "burst": float(os.getenv("TENANT_DEFAULT_BURST", "400")), "weight": 1},
+        "org_Acme": {"quota": 5000, "features": ["premium"], "rate_per_sec": 1000, "burst": 2000, "weight": 4}
     }
 
     @classmethod
@@ -29,6 +33,23 @@ class TenantManager:
         tid = TenantContext.get_tenant()
         return cls._tenant_configs.get(tid, cls._tenant_configs["default"])
         
+    @classmethod
+    def get_limits(cls, tenant_id: Optional[str] = None) -> dict:
+        """
+        Ingestion admission limits; unknown tenants get the default tier.
+        """
+        config = cls._tenant_configs.get(tenant_id or TenantContext.get_tenant(), cls._tenant_configs["default"])
+        default = cls._tenant_configs["default"]
+        return {key: config.get(key, default[key]) for key in ("rate_per_sec", "burst", "weight")}
+
+    @classmethod
+    def tier(cls, tenant_id: Optional[str]) -> str:
+        """
+        Config key a tenant's limits come from: its own, or "default" when
+        unconfigured. Used as the metric label so labels stay bounded.
+        """
+        return tenant_id if tenant_id in cls._tenant_configs else "default"
+
     @classmethod
     def enforce_quota(cls, current_usage: int):
         config = cls.get_config()
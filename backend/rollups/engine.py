@@ -0,0 +1,580 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy.dialects import postgresql, sqlite
+
+from backend.extensions import db
+from backend.db.models import Session, SessionMetric
+from backend.rollups.models import MetricsRollup
+
+MINUTE = "MINUTE"
+HOUR = "HOUR"
+GRANULARITIES = (MINUTE, HOUR)
+
+# MINUTE buckets only serve the short sliding windows (5m trust, 1h active sessions).
+MINUTE_RETENTION = timedelta(hours=24)
+
+FLUSH_INTERVAL_SEC = 1.0      # committed deltas are written to the rollup table this often
+PRUNE_INTERVAL_SEC = 3600
+_SESSION_INFO_KEY = "rollup_deltas"
+
+PK_COLUMNS = ("granularity", "bucket_start", "dimension", "key")
+VALUE_COLUMNS = (
+    "count", "sum_trust", "sum_risk", "sum_bot", "sum_attack",
+    "sum_web", "sum_api", "sum_network", "sum_infra"
+)
+
+# Rollup column -> SessionMetric column
+METRIC_FIELDS = {
+    "sum_risk": "risk_score",
+    "sum_bot": "bot_probability",
+    "sum_attack": "attack_probability",
+    "sum_web": "web_abuse_probability",
+    "sum_api": "api_abuse_probability",
+    "sum_network": "network_anomaly_score",
+    "sum_infra": "infra_stress_score"
+}
+
+# Rollup key used for NULL decisions/causes (PK columns cannot be NULL)
+NULL_KEY = ""
+
+# Session id prefix -> dashboard domain key
+DOMAIN_PREFIXES = {"WEB": "web", "API": "api", "NETWORK": "network", "SYSTEM": "infra"}
+
+# Sessions excluded from the sliding "live trust" average
+TERMINATED_DECISION = "TERMINATED"
+RESET_CAUSE = "Terminated (System Reset)"
+
+
+def floor_bucket(ts: datetime, granularity: str) -> datetime:
+    if granularity == MINUTE:
+        return ts.replace(second=0, microsecond=0)
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def _trust(value) -> float:
+    return float(value) if value is not None else 100.0
+
+
+def _num(value) -> float:
+    return float(value) if value is not None else 0.0
+
+
+class RollupDeltas:
+    """
+    Accumulates counter deltas for one flush, merged per rollup row so a
+    single upsert statement never touches the same row twice.
+    """
+
+    def __init__(self):
+        self.rows: Dict[Tuple, Dict[str, float]] = {}
+        # domain -> newest (last_seen, recommended_action) written in this transaction
+        self.domains: Dict[str, Tuple[datetime, Optional[str]]] = {}
+
+    def add(self, ts: datetime, dimension: str, key: Optional[str], **values):
+        key = key if key is not None else NULL_KEY
+        for granularity in GRANULARITIES:
+            pk = (granularity, floor_bucket(ts, granularity), dimension, key[:255])
+            row = self.rows.get(pk)
+            if row is None:
+                row = self.rows[pk] = dict.fromkeys(VALUE_COLUMNS, 0)
+            for column, value in values.items():
+                row[column] += value
+
+    def note_domain(self, domain: str, last_seen: datetime, action: Optional[str]):
+        current = self.domains.get(domain)
+        if current is None or last_seen >= current[0]:
+            self.domains[domain] = (last_seen, action)
+
+    def merge(self, other: "RollupDeltas"):
+        for pk, values in other.rows.items():
+            row = self.rows.get(pk)
+            if row is None:
+                self.rows[pk] = dict(values)
+            else:
+                for column, value in values.items():
+                    row[column] += value
+        for domain, (last_seen, action) in other.domains.items():
+            self.note_domain(domain, last_seen, action)
+
+    def to_params(self) -> List[Dict[str, Any]]:
+        # Sorted by primary key: concurrent upserts then lock rows in the same order
+        params = []
+        for pk, values in sorted(self.rows.items()):
+            if not any(values.values()):
+                continue  # e.g. decision A -> B -> A inside a single flush
+            row = dict(zip(PK_COLUMNS, pk))
+            row.update(values)
+            row["count"] = int(row["count"])
+            params.append(row)
+        return params
+
+    def __bool__(self):
+        return bool(self.rows or self.domains)
+
+
+class MetricsRollupEngine:
+    """
+    Incrementally maintained, time-bucketed counters for dashboard metrics.
+
+    Writers never call this directly: an ORM after_flush hook turns every
+    inserted/updated/deleted Session and SessionMetric into counter deltas,
+    kept on the ORM session until it commits (dropped on rollback). Committed
+    deltas are merged in memory and upserted by a background flusher every
+    FLUSH_INTERVAL_SEC, in its own short transaction and in primary-key order,
+    so writers never contend on the hot rollup rows. Readers add the
+    not-yet-flushed deltas to what they read, and aggregate over buckets, so
+    dashboard polling cost is O(buckets) instead of O(table size).
+
+    Dimensions (all bucketed per MINUTE and per HOUR):
+    - decision:   key=final_decision, count + sum_trust, bucketed by session created_at
+    - cause:      key=primary_cause, count, bucketed by session created_at
+    - metrics:    key="all", ML probability sums, bucketed by the session's last_seen
+    - trust_seen: key="all", current trust of each live session, bucketed by its last_seen
+                  (one observation per session, moved as the session is seen again)
+
+    Bulk deletes (query(...).delete()) bypass the ORM; run rebuild() afterwards.
+    """
+
+    # domain -> (last_seen, recommended_action), fed by committed transactions
+    _latest_by_domain: Dict[str, Tuple[datetime, Optional[str]]] = {}
+    # domain -> monotonic time of the last DB lookup; entries older than the TTL are re-read
+    _domain_lookups: Dict[str, float] = {}
+    DOMAIN_CACHE_TTL_SECONDS = 10.0
+    _lock = threading.Lock()
+    # Committed, not yet upserted deltas. _flush_lock makes "DB rows + pending" a consistent read.
+    _pending = RollupDeltas()
+    _flush_lock = threading.Lock()
+    _app = None
+    _thread: Optional[threading.Thread] = None
+
+    # --- Write Path ---
+
+    @classmethod
+    def collect_session(cls, deltas: RollupDeltas, obj, change: str, now: datetime):
+        """
+        change: "insert" | "update" | "delete"
+        """
+        created = obj.created_at or now
+        decision, trust, cause = obj.final_decision, _trust(obj.trust_score), obj.primary_cause
+        seen = obj.last_seen or created
+
+        if change == "insert":
+            deltas.add(created, "decision", decision, count=1, sum_trust=trust)
+            deltas.add(created, "cause", cause, count=1)
+            cls._observe_trust(deltas, seen, decision, cause, trust, 1)
+        elif change == "delete":
+            state = inspect(obj)
+            old_decision = cls._previous(state, "final_decision")
+            old_trust = _trust(cls._previous(state, "trust_score"))
+            old_cause = cls._previous(state, "primary_cause")
+            deltas.add(created, "decision", old_decision, count=-1, sum_trust=-old_trust)
+            deltas.add(created, "cause", old_cause, count=-1)
+            old_seen = cls._previous(state, "last_seen") or created
+            cls._observe_trust(deltas, old_seen, old_decision, old_cause, old_trust, -1)
+        else:
+            state = inspect(obj)
+            old_decision = cls._previous(state, "final_decision")
+            old_trust = _trust(cls._previous(state, "trust_score"))
+            old_cause = cls._previous(state, "primary_cause")
+            old_seen = cls._previous(state, "last_seen") or created
+
+            if (old_decision, old_trust) != (decision, trust):
+                deltas.add(created, "decision", old_decision, count=-1, sum_trust=-old_trust)
+                deltas.add(created, "decision", decision, count=1, sum_trust=trust)
+            if old_cause != cause:
+                deltas.add(created, "cause", old_cause, count=-1)
+                deltas.add(created, "cause", cause, count=1)
+
+            # Move the session's single trust observation to its new last_seen / trust
+            if (old_seen, old_trust, old_decision, old_cause) != (seen, trust, decision, cause):
+                cls._observe_trust(deltas, old_seen, old_decision, old_cause, old_trust, -1)
+                cls._observe_trust(deltas, seen, decision, cause, trust, 1)
+
+        if change != "delete":
+            cls._track_domain(deltas, obj)
+
+    @classmethod
+    def collect_metric(cls, deltas: RollupDeltas, metric, sign: int, now: datetime):
+        """
+        metric: SessionMetric instance or a dict keyed by SessionMetric column names.
+        """
+        get = metric.get if isinstance(metric, dict) else lambda name: getattr(metric, name)
+        values = {column: sign * _num(get(field)) for column, field in METRIC_FIELDS.items()}
+        deltas.add(now, "metrics", "all", count=sign, **values)
+
+    @staticmethod
+    def _previous(state, attr: str):
+        history = state.attrs[attr].history
+        if history.deleted:
+            return history.deleted[0]
+        if history.unchanged:
+            return history.unchanged[0]
+        return getattr(state.obj(), attr)
+
+    @staticmethod
+    def _observe_trust(deltas: RollupDeltas, seen: datetime, decision, cause, trust: float, sign: int):
+        if decision == TERMINATED_DECISION or cause == RESET_CAUSE:
+            return
+        deltas.add(seen, "trust_seen", "all", count=sign, sum_trust=sign * trust)
+
+    @staticmethod
+    def _track_domain(deltas: RollupDeltas, obj):
+        session_id = obj.session_id or ""
+        for prefix, domain in DOMAIN_PREFIXES.items():
+            if session_id.startswith(prefix):
+                deltas.note_domain(domain, obj.last_seen or datetime.utcnow(), obj.recommended_action)
+                return
+
+    @classmethod
+    def apply(cls, connection, deltas: RollupDeltas):
+        """
+        Upsert merged deltas: count = count + excluded.count, etc.
+        """
+        params = deltas.to_params()
+        if not params:
+            return
+
+        table = MetricsRollup.__table__
+        dialect = connection.dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(PK_COLUMNS),
+                set_={c: table.c[c] + stmt.excluded[c] for c in VALUE_COLUMNS}
+            )
+            connection.execute(stmt, params)
+            return
+
+        # Generic fallback: UPDATE, then INSERT when the bucket does not exist yet
+        for row in params:
+            where = [table.c[c] == row[c] for c in PK_COLUMNS]
+            result = connection.execute(
+                table.update().where(*where).values({c: table.c[c] + row[c] for c in VALUE_COLUMNS})
+            )
+            if result.rowcount == 0:
+                connection.execute(table.insert().values(**row))
+
+    @classmethod
+    def _commit_deltas(cls, deltas: RollupDeltas):
+        domains, deltas.domains = deltas.domains, {}
+        with cls._lock:
+            cls._pending.merge(deltas)
+            for domain, (last_seen, action) in domains.items():
+                current = cls._latest_by_domain.get(domain)
+                if current is None or last_seen >= current[0]:
+                    cls._latest_by_domain[domain] = (last_seen, action)
+
+    @classmethod
+    def flush_pending(cls) -> int:
+        """
+        Upserts committed deltas in one short transaction. Needs an app context.
+        On failure the deltas are put back for the next attempt.
+        """
+        with cls._flush_lock:
+            with cls._lock:
+                deltas, cls._pending = cls._pending, RollupDeltas()
+            if not deltas:
+                return 0
+            try:
+                with db.engine.begin() as connection:
+                    cls.apply(connection, deltas)
+            except Exception:
+                with cls._lock:
+                    deltas.merge(cls._pending)
+                    cls._pending = deltas
+                raise
+            return len(deltas.rows)
+
+    @classmethod
+    def start(cls, app):
+        """
+        Starts the background flusher (also prunes MINUTE buckets hourly).
+        """
+        with cls._lock:
+            if cls._thread is not None:
+                return
+            cls._app = app
+            cls._thread = threading.Thread(target=cls._run, name="MetricsRollupFlusher", daemon=True)
+            cls._thread.start()
+
+    @classmethod
+    def _run(cls):
+        next_prune = time.monotonic() + 60
+        while True:
+            time.sleep(FLUSH_INTERVAL_SEC)
+            with cls._app.app_context():
+                try:
+                    cls.flush_pending()
+                except Exception as e:
+                    print(f"[MetricsRollupEngine] Flush failed: {e}")
+                if time.monotonic() >= next_prune:
+                    next_prune = time.monotonic() + PRUNE_INTERVAL_SEC
+                    try:
+                        cls.prune()
+                    except Exception as e:
+                        db.session.rollback()
+                        print(f"[MetricsRollupEngine] Prune failed: {e}")
+                db.session.remove()
+
+    @classmethod
+    def reset(cls):
+        """
+        Drops unflushed deltas and the domain cache (tests / after wiping rollups).
+        """
+        with cls._lock:
+            cls._pending = RollupDeltas()
+            cls._latest_by_domain.clear()
+            cls._domain_lookups.clear()
+
+    @classmethod
+    def _pending_rows(cls, dimension: str, granularity: str, since: Optional[datetime]):
+        # Caller holds cls._flush_lock
+        start = floor_bucket(since, granularity) if since is not None else None
+        with cls._lock:
+            return [
+                (pk, dict(values)) for pk, values in cls._pending.rows.items()
+                if pk[0] == granularity and pk[2] == dimension and (start is None or pk[1] >= start)
+            ]
+
+    # --- Read Path ---
+
+    @classmethod
+    def totals(cls, dimension: str, since: Optional[datetime] = None, granularity: str = HOUR) -> Dict[str, Dict[str, float]]:
+        """
+        Per-key sums over all buckets >= since. Keys with a zero count are dropped.
+        """
+        query = db.session.query(
+            MetricsRollup.key, *[func.sum(getattr(MetricsRollup, c)) for c in VALUE_COLUMNS]
+        ).filter(
+            MetricsRollup.granularity == granularity,
+            MetricsRollup.dimension == dimension
+        )
+        if since is not None:
+            query = query.filter(MetricsRollup.bucket_start >= floor_bucket(since, granularity))
+
+        with cls._flush_lock:
+            rows = query.group_by(MetricsRollup.key).all()
+            pending = cls._pending_rows(dimension, granularity, since)
+
+        merged = {}
+        for row in rows:
+            merged[row[0]] = {c: float(v or 0) for c, v in zip(VALUE_COLUMNS, row[1:])}
+        for pk, values in pending:
+            target = merged.setdefault(pk[3], dict.fromkeys(VALUE_COLUMNS, 0.0))
+            for c in VALUE_COLUMNS:
+                target[c] += values[c]
+        return {key: values for key, values in merged.items() if values["count"]}
+
+    @classmethod
+    def combined(cls, dimension: str, since: Optional[datetime] = None, granularity: str = HOUR,
+                 exclude_keys: Tuple[str, ...] = ()) -> Dict[str, float]:
+        """
+        Sums across all keys of a dimension (optionally excluding some).
+        """
+        combined = dict.fromkeys(VALUE_COLUMNS, 0.0)
+        for key, values in cls.totals(dimension, since, granularity).items():
+            if key in exclude_keys:
+                continue
+            for c in VALUE_COLUMNS:
+                combined[c] += values[c]
+        return combined
+
+    @classmethod
+    def series(cls, dimension: str, since: datetime, granularity: str = HOUR,
+               exclude_keys: Tuple[str, ...] = ()) -> List[Tuple[datetime, Dict[str, float]]]:
+        """
+        Chronological per-bucket sums across keys.
+        """
+        query = db.session.query(
+            MetricsRollup.bucket_start, *[func.sum(getattr(MetricsRollup, c)) for c in VALUE_COLUMNS]
+        ).filter(
+            MetricsRollup.granularity == granularity,
+            MetricsRollup.dimension == dimension,
+            MetricsRollup.bucket_start >= floor_bucket(since, granularity)
+        )
+        if exclude_keys:
+            query = query.filter(MetricsRollup.key.notin_(exclude_keys))
+
+        with cls._flush_lock:
+            rows = query.group_by(MetricsRollup.bucket_start).all()
+            pending = cls._pending_rows(dimension, granularity, since)
+
+        merged = {}
+        for row in rows:
+            merged[row[0]] = {c: float(v or 0) for c, v in zip(VALUE_COLUMNS, row[1:])}
+        for pk, values in pending:
+            if pk[3] in exclude_keys:
+                continue
+            target = merged.setdefault(pk[1], dict.fromkeys(VALUE_COLUMNS, 0.0))
+            for c in VALUE_COLUMNS:
+                target[c] += values[c]
+        return [(bucket, merged[bucket]) for bucket in sorted(merged) if merged[bucket]["count"]]
+
+    @staticmethod
+    def average(values: Dict[str, float], column: str) -> Optional[float]:
+        if not values or values.get("count", 0) <= 0:
+            return None
+        return values[column] / values["count"]
+
+    @classmethod
+    def latest_domain_sessions(cls) -> Dict[str, Tuple[datetime, Optional[str]]]:
+        """
+        Latest (last_seen, recommended_action) per dashboard domain.
+        Served from the cache this process's commits keep current; each
+        domain is re-read from the DB once its entry is older than
+        DOMAIN_CACHE_TTL_SECONDS, which picks up other workers' writes and
+        deleted sessions.
+        """
+        now = time.monotonic()
+        for prefix, domain in DOMAIN_PREFIXES.items():
+            with cls._lock:
+                last_lookup = cls._domain_lookups.get(domain)
+            if last_lookup is not None and now - last_lookup < cls.DOMAIN_CACHE_TTL_SECONDS:
+                continue
+            latest = db.session.query(Session.last_seen, Session.recommended_action).filter(
+                Session.session_id.like(f'{prefix}%')
+            ).order_by(Session.last_seen.desc()).first()
+            with cls._lock:
+                cls._domain_lookups[domain] = now
+                if latest and latest[0]:
+                    cls._latest_by_domain[domain] = (latest[0], latest[1])
+                else:
+                    cls._latest_by_domain.pop(domain, None)
+
+        with cls._lock:
+            return dict(cls._latest_by_domain)
+
+    # --- Maintenance ---
+
+    @classmethod
+    def prune(cls, now: Optional[datetime] = None) -> int:
+        """
+        Drop MINUTE buckets past retention. HOUR buckets are kept.
+        """
+        cutoff = (now or datetime.utcnow()) - MINUTE_RETENTION
+        deleted = MetricsRollup.query.filter(
+            MetricsRollup.granularity == MINUTE,
+            MetricsRollup.bucket_start < floor_bucket(cutoff, MINUTE)
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+    @classmethod
+    def rebuild(cls, batch_size: int = 5000) -> Dict[str, int]:
+        """
+        Backfill: wipe all rollups and recompute them by streaming sessions
+        and metrics in batches. SessionMetric has no timestamp, so backfilled
+        metrics are bucketed by their session's last_seen.
+        """
+        with cls._lock:
+            cls._pending = RollupDeltas() # recomputed from the source tables below
+        MetricsRollup.query.delete(synchronize_session=False)
+        connection = db.session.connection()
+        now = datetime.utcnow()
+        stats = {"sessions": 0, "metrics": 0}
+
+        deltas = RollupDeltas()
+        sessions = db.session.query(
+            Session.created_at, Session.last_seen, Session.final_decision,
+            Session.trust_score, Session.primary_cause
+        ).execution_options(yield_per=batch_size)
+        for created_at, last_seen, decision, trust, cause in sessions:
+            created_at = created_at or now
+            deltas.add(created_at, "decision", decision, count=1, sum_trust=_trust(trust))
+            deltas.add(created_at, "cause", cause, count=1)
+            if decision != TERMINATED_DECISION and cause != RESET_CAUSE:
+                deltas.add(last_seen or created_at, "trust_seen", "all", count=1, sum_trust=_trust(trust))
+            stats["sessions"] += 1
+            if stats["sessions"] % batch_size == 0:
+                cls.apply(connection, deltas)
+                deltas = RollupDeltas()
+        cls.apply(connection, deltas)
+
+        deltas = RollupDeltas()
+        metric_columns = [getattr(SessionMetric, c) for c in METRIC_FIELDS.values()]
+        metrics = db.session.query(Session.last_seen, *metric_columns).outerjoin(
+            Session, Session.session_id == SessionMetric.session_id
+        ).execution_options(yield_per=batch_size)
+        for row in metrics:
+            cls.collect_metric(deltas, dict(zip(METRIC_FIELDS.values(), row[1:])), 1, row[0] or now)
+            stats["metrics"] += 1
+            if stats["metrics"] % batch_size == 0:
+                cls.apply(connection, deltas)
+                deltas = RollupDeltas()
+        cls.apply(connection, deltas)
+
+        db.session.commit()
+        with cls._lock:
+            cls._latest_by_domain.clear()
+            cls._domain_lookups.clear()
+        return stats
+
+
+# Load the previous value on assignment so flush-time deltas can subtract it,
+# even when the instance was expired by an earlier commit.
+for _attr in (Session.final_decision, Session.trust_score, Session.primary_cause, Session.last_seen):
+    event.listen(_attr, "set", lambda target, value, oldvalue, initiator: None, active_history=True)
+
+
+def _metric_times(db_session, metrics, now: datetime) -> Dict[str, datetime]:
+    """
+    session_id -> last_seen of the owning session (the metric's bucket time,
+    as in rebuild()). Looked up in the session first, then in the database.
+    """
+    wanted = {m.session_id for m in metrics}
+    deleted = {obj.session_id: obj for obj in db_session.deleted if isinstance(obj, Session)}
+    times = {}
+    for sid in wanted:
+        obj = deleted.get(sid) or db_session.identity_map.get(inspect(Session).identity_key_from_primary_key((sid,)))
+        if obj is not None:
+            value = inspect(obj).attrs.last_seen.loaded_value
+            if isinstance(value, datetime):
+                times[sid] = value
+    missing = wanted - set(times)
+    if missing:
+        rows = db_session.connection().execute(
+            select(Session.session_id, Session.last_seen).where(Session.session_id.in_(missing))
+        )
+        times.update({sid: ts for sid, ts in rows if ts is not None})
+    return times
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _rollup_after_flush(db_session, flush_context):
+    deltas = RollupDeltas()
+    now = datetime.utcnow()
+    metrics = [(obj, 1) for obj in db_session.new if isinstance(obj, SessionMetric)] + \
+              [(obj, -1) for obj in db_session.deleted if isinstance(obj, SessionMetric)]
+    times = _metric_times(db_session, [m for m, _ in metrics], now) if metrics else {}
+    for obj in db_session.new:
+        if isinstance(obj, Session):
+            MetricsRollupEngine.collect_session(deltas, obj, "insert", now)
+    for obj in db_session.dirty:
+        if isinstance(obj, Session) and db_session.is_modified(obj, include_collections=False):
+            MetricsRollupEngine.collect_session(deltas, obj, "update", now)
+    for obj in db_session.deleted:
+        if isinstance(obj, Session):
+            MetricsRollupEngine.collect_session(deltas, obj, "delete", now)
+    for metric, sign in metrics:
+        MetricsRollupEngine.collect_metric(deltas, metric, sign, times.get(metric.session_id, now))
+    if deltas:
+        # Held until the transaction commits; applied outside it by the flusher
+        db_session.info.setdefault(_SESSION_INFO_KEY, RollupDeltas()).merge(deltas)
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _rollup_after_commit(db_session):
+    deltas = db_session.info.pop(_SESSION_INFO_KEY, None)
+    if deltas:
+        MetricsRollupEngine._commit_deltas(deltas)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _rollup_after_rollback(db_session):
+    db_session.info.pop(_SESSION_INFO_KEY, None)
@@ -0,0 +1,41 @@
+from backend.extensions import db
+
+class MetricsRollup(db.Model):
+    """
+    Pre-aggregated dashboard counters.
+    One row per (granularity, bucket_start, dimension, key). Rows are only
+    ever incremented with deltas, so readers can SUM() any window of buckets.
+    """
+    __tablename__ = 'metrics_rollups'
+
+    # MINUTE | HOUR. Acts as the partition key for retention (MINUTE rows are pruned).
+    granularity = db.Column(db.String(8), primary_key=True)
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    # decision | cause | metrics | trust_seen
+    dimension = db.Column(db.String(32), primary_key=True)
+    key = db.Column(db.String(255), primary_key=True)
+
+    count = db.Column(db.Integer, nullable=False, default=0)
+    sum_trust = db.Column(db.Float, nullable=False, default=0.0)
+    sum_risk = db.Column(db.Float, nullable=False, default=0.0)
+    sum_bot = db.Column(db.Float, nullable=False, default=0.0)
+    sum_attack = db.Column(db.Float, nullable=False, default=0.0)
+    sum_web = db.Column(db.Float, nullable=False, default=0.0)
+    sum_api = db.Column(db.Float, nullable=False, default=0.0)
+    sum_network = db.Column(db.Float, nullable=False, default=0.0)
+    sum_infra = db.Column(db.Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        db.Index('ix_metrics_rollups_dim_bucket', 'granularity', 'dimension', 'bucket_start'),
+    )
+
+    def to_dict(self):
+        return {
+            "granularity": self.granularity,
+            "bucket_start": self.bucket_start.isoformat() + "Z" if self.bucket_start else None,
+            "dimension": self.dimension,
+            "key": self.key,
+            "count": self.count,
+            "sum_trust": self.sum_trust,
+            "sum_risk": self.sum_risk
+        }
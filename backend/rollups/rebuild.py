@@ -0,0 +1,26 @@
+"""
+Backfill / repair for dashboard metric rollups.
+
+Usage:
+    python -m backend.rollups.rebuild            # wipe + recompute + prune
+    python -m backend.rollups.rebuild --prune    # only drop expired MINUTE buckets
+"""
+import argparse
+
+from backend.app import app
+from backend.rollups.engine import MetricsRollupEngine
+
+parser = argparse.ArgumentParser(description="Rebuild metrics rollups from sessions and session_metrics.")
+parser.add_argument("--prune", action="store_true", help="Only prune expired MINUTE buckets")
+parser.add_argument("--batch-size", type=int, default=5000)
+args = parser.parse_args()
+
+with app.app_context():
+    try:
+        if not args.prune:
+            stats = MetricsRollupEngine.rebuild(batch_size=args.batch_size)
+            print(f"[OK] Rollups rebuilt from {stats['sessions']} sessions and {stats['metrics']} metrics.")
+        pruned = MetricsRollupEngine.prune()
+        print(f"[OK] Pruned {pruned} expired minute buckets.")
+    except Exception as e:
+        print(f"[ERROR] Rollup rebuild failed: {e}")
@@ -7,6 +7,7 @@ from backend.db.models import Incident
 from backend.extensions import db
 from sqlalchemy import func
 from backend.utils.logger import log_error
+from backend.rollups.engine import MetricsRollupEngine, MINUTE, NULL_KEY
 
 from datetime import datetime, timedelta
 
@@ -19,13 +20,17 @@ def get_dashboard_metrics():
     Get dashboard metrics in the format expected by frontend DashboardMetricsDTO
     """
     try:
+        # Session/metric aggregates come from pre-bucketed rollups (O(buckets), not O(rows))
+        now = datetime.utcnow()
+        decisions = MetricsRollupEngine.totals("decision")
+        all_sessions = MetricsRollupEngine.combined("decision")
+
         # Total sessions
-        total_sessions = Session.query.count()
+        total_sessions = int(all_sessions["count"])
         
         # Active sessions (sessions created in last hour)
-        from datetime import datetime, timedelta
-        one_hour_ago = datetime.utcnow() - timedelta(hours=1)
-        active_sessions = Session.query.filter(Session.created_at >= one_hour_ago).count()
+        one_hour_ago = now - timedelta(hours=1)
+        active_sessions = int(MetricsRollupEngine.combined("decision", since=one_hour_ago, granularity=MINUTE)["count"])
         
         # Incidents
         active_incidents = Incident.query.filter(Incident.status.in_(['OPEN', 'CONTAINED'])).count()
@@ -35,27 +40,23 @@ def get_dashboard_metrics():
         ).count()
         
         # Average risk score
-        avg_risk = db.session.query(func.avg(SessionMetric.risk_score)).scalar() or 0
+        ml_totals = MetricsRollupEngine.combined("metrics")
+        avg_risk = MetricsRollupEngine.average(ml_totals, "sum_risk") or 0
         
+        # Decision distribution
+        sessions_by_decision = {key: int(v["count"]) for key, v in decisions.items() if key != NULL_KEY}
+
         # Blocked sessions (REJECT decision)
-        blocked_sessions = Session.query.filter(Session.final_decision == 'REJECT').count()
+        blocked_sessions = sessions_by_decision.get('REJECT', 0)
         
         # Global trust score (average)
-        global_trust = db.session.query(func.avg(Session.trust_score)).scalar() or 0
+        global_trust = MetricsRollupEngine.average(all_sessions, "sum_trust") or 0
         
         # Bot vs attack ratio
-        bot_avg = db.session.query(func.avg(SessionMetric.bot_probability)).scalar() or 0
-        attack_avg = db.session.query(func.avg(SessionMetric.attack_probability)).scalar() or 0
+        bot_avg = MetricsRollupEngine.average(ml_totals, "sum_bot") or 0
+        attack_avg = MetricsRollupEngine.average(ml_totals, "sum_attack") or 0
         attack_ratio = round(bot_avg / attack_avg, 2) if attack_avg > 0 else round(bot_avg, 2)
         
-        # Decision distribution
-        decision_dist_query = db.session.query(
-            Session.final_decision, 
-            func.count(Session.final_decision)
-        ).group_by(Session.final_decision).all()
-        
-        sessions_by_decision = {res[0]: res[1] for res in decision_dist_query}
-        
         # Map to expected format
         decision_distribution = {
             'trusted': sessions_by_decision.get('ALLOW', 0),
@@ -72,57 +73,37 @@ def get_dashboard_metrics():
         sessions_by_severity = {res[0]: res[1] for res in severity_dist_query}
         
         
-        # 🧪 SIMULATION: Fetch latest recommendation per domain
+        # 🧪 SIMULATION: Fetch latest recommendation per domain (cached by the rollup flush hook)
         domain_recs = {}
-        for domain in ['WEB', 'API', 'NETWORK', 'SYSTEM']:
-            # Get absolute latest session for this domain (regardless of recommendation)
-            latest_session = Session.query.filter(
-                Session.session_id.like(f'{domain}%')
-            ).order_by(Session.last_seen.desc()).first()
-            
-            if latest_session and latest_session.recommended_action:
-                # Check for stale data (e.g., > 30 seconds old)
-                is_fresh = False
-                if latest_session.last_seen:
-                    # Handle both offset-naive and aware datetimes if necessary, but assuming UTC naive from DB
-                    time_diff = datetime.utcnow() - latest_session.last_seen
-                    if time_diff.total_seconds() < 30: # Only show active threats
-                        is_fresh = True
+        for key, (last_seen, recommended_action) in MetricsRollupEngine.latest_domain_sessions().items():
+            if not recommended_action:
+                continue
+            # Check for stale data (e.g., > 30 seconds old)
+            is_fresh = (now - last_seen).total_seconds() < 30 # Only show active threats
 
-                # Only show if fresh AND not generic/safe
-                if is_fresh and \
-                   latest_session.recommended_action.lower() not in ['monitor', 'none'] and \
-                   "no specific recovery action" not in latest_session.recommended_action.lower() and \
-                   "manual security review" not in latest_session.recommended_action.lower():
-                    key = 'infra' if domain == 'SYSTEM' else domain.lower()
-                    domain_recs[key] = latest_session.recommended_action
+            # Only show if fresh AND not generic/safe
+            if is_fresh and \
+               recommended_action.lower() not in ['monitor', 'none'] and \
+               "no specific recovery action" not in recommended_action.lower() and \
+               "manual security review" not in recommended_action.lower():
+                domain_recs[key] = recommended_action
 
 
         # 🛡️ Domain Risk Breakdown (Real-time)
-        domain_risk_res = db.session.query(
-            func.avg(SessionMetric.web_abuse_probability).label('web'),
-            func.avg(SessionMetric.api_abuse_probability).label('api'),
-            func.avg(SessionMetric.network_anomaly_score).label('network'),
-            func.avg(SessionMetric.infra_stress_score).label('infra')
-        ).first()
-        
         domain_risk = {
-            "web": round(float(domain_risk_res[0] or 0) * 100, 1),
-            "api": round(float(domain_risk_res[1] or 0) * 100, 1),
-            "network": round(float(domain_risk_res[2] or 0) * 100, 1),
-            "infra": round(float(domain_risk_res[3] or 0) * 100, 1)
+            "web": round(float(MetricsRollupEngine.average(ml_totals, "sum_web") or 0) * 100, 1),
+            "api": round(float(MetricsRollupEngine.average(ml_totals, "sum_api") or 0) * 100, 1),
+            "network": round(float(MetricsRollupEngine.average(ml_totals, "sum_network") or 0) * 100, 1),
+            "infra": round(float(MetricsRollupEngine.average(ml_totals, "sum_infra") or 0) * 100, 1)
         }
 
         # Calculate real primary risk vectors from causes in the last 24h
-        last_24h = datetime.utcnow() - timedelta(hours=24)
-        risk_vectors_query = db.session.query(
-            Session.primary_cause, 
-            func.count(Session.primary_cause)
-        ).filter(
-            Session.created_at >= last_24h,
-            Session.primary_cause != None,
-            Session.primary_cause != "Allow"
-        ).group_by(Session.primary_cause).order_by(func.count(Session.primary_cause).desc()).limit(5).all()
+        last_24h = now - timedelta(hours=24)
+        recent_causes = MetricsRollupEngine.totals("cause", since=last_24h)
+        risk_vectors_query = sorted(
+            ((key, int(v["count"])) for key, v in recent_causes.items() if key not in (NULL_KEY, "Allow")),
+            key=lambda kv: kv[1], reverse=True
+        )[:5]
         
         # Calculate total risk instances to get percentages
         total_risk_instances = sum(res[1] for res in risk_vectors_query) or 1
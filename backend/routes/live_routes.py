@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app, g
 from backend.services.ingestion_service import IngestionService
+from backend.platform_core.tenant_admission import admit_tenant
 from backend.services.observation_service import SessionStateEngine
 from backend.auth.decorators import require_access
 from backend.contracts.enums import Role
@@ -21,30 +22,35 @@ def block_platform_telemetry():
         return jsonify({"status": "ignored", "reason": "internal_platform_noise"}), 200
 
 @live_bp.route('/ingest/http', methods=['POST'])
+@admit_tenant
 def ingest_http():
     payload = request.json
     result = IngestionService.ingest_http_event(payload)
     return jsonify(result), 200
 
 @live_bp.route('/ingest/api', methods=['POST'])
+@admit_tenant
 def ingest_api():
     payload = request.json
     result = IngestionService.ingest_api_event(payload)
     return jsonify(result), 200
 
 @live_bp.route('/ingest/auth', methods=['POST'])
+@admit_tenant
 def ingest_auth():
     payload = request.json
     result = IngestionService.ingest_auth_event(payload)
     return jsonify(result), 200
 
 @live_bp.route('/ingest/network', methods=['POST'])
+@admit_tenant
 def ingest_network():
     payload = request.json
     result = IngestionService.ingest_network_event(payload)
     return jsonify(result), 200
     
 @live_bp.route('/ingest/infra', methods=['POST'])
+@admit_tenant
 def ingest_infra():
     payload = request.json
     result = IngestionService.ingest_infra_event(payload)
@@ -8,6 +8,7 @@ from backend.db.models import Incident
 from backend.extensions import db
 from sqlalchemy import func
 from backend.utils.logger import log_error
+from backend.rollups.engine import MetricsRollupEngine, MINUTE, NULL_KEY
 from datetime import datetime, timedelta
 import random
 
@@ -17,67 +18,59 @@ metrics_bp = Blueprint('metrics', __name__)
 @require_access(role=Role.ANALYST)
 def get_summary():
     try:
+        # All aggregates are served from pre-bucketed rollups (O(buckets), not O(rows))
+        now = datetime.utcnow()
+        decisions = MetricsRollupEngine.totals("decision")
+
         # Get decision distribution
-        dist_query = db.session.query(Session.final_decision, func.count(Session.final_decision)).group_by(Session.final_decision).all()
-        dist = {res[0]: res[1] for res in dist_query}
+        dist = {key: int(v["count"]) for key, v in decisions.items() if key != NULL_KEY}
         
         # Get average trust score (5-minute sliding window for better reactivity)
-        recent_window = datetime.utcnow() - timedelta(minutes=5)
-        avg_trust_val = db.session.query(func.avg(Session.trust_score))\
-            .filter(Session.last_seen >= recent_window)\
-            .filter(Session.final_decision != 'TERMINATED')\
-            .filter(Session.primary_cause != 'Terminated (System Reset)').scalar()
+        recent_window = now - timedelta(minutes=5)
+        avg_trust_val = MetricsRollupEngine.average(
+            MetricsRollupEngine.combined("trust_seen", since=recent_window, granularity=MINUTE), "sum_trust"
+        )
             
         if avg_trust_val is None:
             # Fallback to all sessions that haven't been resolved/terminated-out
-            avg_trust_val = db.session.query(func.avg(Session.trust_score))\
-                .filter(Session.final_decision != 'TERMINATED').scalar()
+            avg_trust_val = MetricsRollupEngine.average(
+                MetricsRollupEngine.combined("decision", exclude_keys=("TERMINATED",)), "sum_trust"
+            )
         
         avg_trust = float(avg_trust_val) if avg_trust_val is not None else 100.0
         
         # Get top causes
-        top_causes_query = db.session.query(Session.primary_cause, func.count(Session.primary_cause)).group_by(Session.primary_cause).order_by(func.count(Session.primary_cause).desc()).limit(5).all()
-        top_causes = [res[0] for res in top_causes_query]
+        causes = MetricsRollupEngine.totals("cause")
+        top_causes = [key for key, _ in sorted(
+            ((k, v) for k, v in causes.items() if k != NULL_KEY), key=lambda kv: kv[1]["count"], reverse=True
+        )[:5]]
         
         # Calculate bot vs attack ratio
-        bot_avg = db.session.query(func.avg(SessionMetric.bot_probability)).scalar() or 0
-        attack_avg = db.session.query(func.avg(SessionMetric.attack_probability)).scalar() or 0
+        ml_totals = MetricsRollupEngine.combined("metrics")
+        bot_avg = MetricsRollupEngine.average(ml_totals, "sum_bot") or 0
+        attack_avg = MetricsRollupEngine.average(ml_totals, "sum_attack") or 0
         ratio = round(bot_avg / attack_avg, 2) if attack_avg > 0 else 0
         
         # Get trust evolution over time (hourly avg for last 24 hours)
-        last_24h = datetime.utcnow() - timedelta(hours=24)
-        trend_query = db.session.query(
-            func.to_char(Session.created_at, 'HH24:00').label('hour'),
-            func.avg(Session.trust_score).label('avg_trust')
-        ).filter(Session.created_at >= last_24h).group_by('hour').order_by('hour').all()
-        
-        trust_evolution = [{"time": res[0], "value": float(res[1])} for res in trend_query]
+        last_24h = now - timedelta(hours=24)
+        trust_evolution = [
+            {"time": bucket.strftime('%H:00'), "value": v["sum_trust"] / v["count"]}
+            for bucket, v in MetricsRollupEngine.series("decision", since=last_24h)
+        ]
 
         # Domain Risk Breakdown
-        domain_risk_res = db.session.query(
-            func.avg(SessionMetric.web_abuse_probability).label('web'),
-            func.avg(SessionMetric.api_abuse_probability).label('api'),
-            func.avg(SessionMetric.network_anomaly_score).label('network'),
-            func.avg(SessionMetric.infra_stress_score).label('infra')
-        ).first()
-        
         domain_breakdown = {
-            "web": float(domain_risk_res[0] or 0) * 100,
-            "api": float(domain_risk_res[1] or 0) * 100,
-            "network": float(domain_risk_res[2] or 0) * 100,
-            "infra": float(domain_risk_res[3] or 0) * 100
+            "web": float(MetricsRollupEngine.average(ml_totals, "sum_web") or 0) * 100,
+            "api": float(MetricsRollupEngine.average(ml_totals, "sum_api") or 0) * 100,
+            "network": float(MetricsRollupEngine.average(ml_totals, "sum_network") or 0) * 100,
+            "infra": float(MetricsRollupEngine.average(ml_totals, "sum_infra") or 0) * 100
         }
 
-        # Risk Score Trend (Proxy for Velocity History), excluding TERMINATED
-        risk_trend_query = db.session.query(
-            func.to_char(Session.created_at, 'HH24:00').label('hour'),
-            func.avg(SessionMetric.risk_score).label('avg_risk')
-        ).join(SessionMetric, Session.session_id == SessionMetric.session_id)\
-         .filter(Session.created_at >= last_24h)\
-         .filter(Session.final_decision != 'TERMINATED')\
-         .group_by('hour').order_by('hour').all()
-         
-        risk_history = [{"time": res[0], "value": float(res[1])} for res in risk_trend_query]
+        # Risk Score Trend (Proxy for Velocity History), bucketed by evaluation hour
+        risk_history = [
+            {"time": bucket.strftime('%H:00'), "value": v["sum_risk"] / v["count"]}
+            for bucket, v in MetricsRollupEngine.series("metrics", since=last_24h)
+        ]
         
         # Enterprise Policy Decisions (Mocked/Aggregated from Session data)
         allow_count = dist.get('ALLOW', 0)
@@ -0,0 +1,403 @@
+"""
+Ingestion Load & Latency Benchmark
+Version: v1.0
+
+Drives the real ingestion blueprint in-process (Flask test client, SQLite)
+with a seeded, reproducible workload and reports:
+
+  - events/sec overall and per endpoint, with exact p50/p95/p99 request latency
+  - p50/p95/p99 per pipeline stage (from StageMetrics histograms)
+  - session-state memory growth, extrapolated to 100k sessions
+
+Results can be stored as a baseline and later runs compared against it;
+a latency (or throughput) regression beyond --tolerance exits non-zero, so
+the script can gate CI.
+
+    python -m backend.scripts.benchmark_ingestion --events 5000 --save-baseline
+    python -m backend.scripts.benchmark_ingestion --events 5000   # compare
+"""
+import os
+import sys
+import gc
+import math
+import json
+import time
+import atexit
+import random
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from typing import Dict, List, Any, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "benchmark_baseline.json")
+MIN_COMPARE_COUNT = 50 # series with fewer samples are too noisy to gate on
+DEFAULT_MIX = "web=0.45,api=0.25,auth=0.1,network=0.1,infra=0.1"
+
+# Event kind -> ingestion route. There is no dedicated auth route, so login
+# traffic goes through /web with an explicit event_type (as the web monitor sends it).
+ROUTES = {
+    "web": "/api/v1/ingest/web",
+    "api": "/api/v1/ingest/api",
+    "auth": "/api/v1/ingest/web",
+    "network": "/api/v1/ingest/network",
+    "infra": "/api/v1/ingest/system",
+}
+
+HEADERS = {"X-API-Key": os.getenv("API_KEY", "dev-api-key"), "X-Platform": "SECURITY_PLATFORM", "X-Role": "ADMIN"}
+
+BROWSER_UA = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 Chrome/120.0"
+
+# --- Workload ----------------------------------------------------------------
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in ROUTES:
+            raise ValueError(f"Unknown event kind '{kind}' (expected one of {sorted(ROUTES)})")
+        mix[kind] = float(weight)
+    if sum(mix.values()) <= 0:
+        raise ValueError("Workload mix weights must sum to > 0")
+    return mix
+
+class Workload:
+    """
+    Deterministic event generator: the same seed/mix/ratios always produce
+    the same sequence of (kind, payload) pairs.
+    """
+
+    def __init__(self, seed: int = 42, sessions: int = 500, mix: Optional[Dict[str, float]] = None,
+                 bot_ratio: float = 0.05, attack_ratio: float = 0.05):
+        self.rng = random.Random(seed)
+        self.sessions = sessions
+        self.mix = mix or parse_mix(DEFAULT_MIX)
+        self.kinds = list(self.mix)
+        self.weights = [self.mix[k] for k in self.kinds]
+        self.bot_ratio = bot_ratio
+        self.attack_ratio = attack_ratio
+
+    def events(self, count: int):
+        for i in range(count):
+            kind = self.rng.choices(self.kinds, self.weights)[0]
+            yield kind, self._payload(kind, i)
+
+    def _payload(self, kind: str, i: int) -> Dict[str, Any]:
+        rng = self.rng
+        sid = rng.randrange(self.sessions)
+        bot = rng.random() < self.bot_ratio
+        attack = rng.random() < self.attack_ratio
+        payload = {
+            "session_id": f"bench_s{sid:06d}",
+            "actor_id": f"bot_user_{sid}" if bot else f"user_{sid % 97}",
+            "tenant_id": f"tenant_{sid % 5}",
+            "ip_address": f"10.{sid // 65536 % 256}.{sid // 256 % 256}.{sid % 256}",
+            "user_agent": "python-requests/2.31" if bot else BROWSER_UA,
+        }
+
+        if kind == "web":
+            payload.update({
+                "method": "GET",
+                "route": rng.choice(["/", "/products", "/cart", "/account"]),
+                "status_code": rng.choice([403, 404, 500]) if attack else 200,
+                "response_time_ms": rng.randint(5, 400),
+                "js_fingerprint": None if bot else f"fp_{sid}",
+            })
+            if attack:
+                payload["path"] = "/search?q=' OR 1=1 --"
+        elif kind == "api":
+            payload.update({
+                "endpoint": rng.choice(["/v1/orders", "/v1/users", "/v1/export"]),
+                "token_id": f"tok_{sid}",
+                "usage_count": rng.randint(200, 2000) if attack else rng.randint(1, 50),
+                "status_code": 429 if attack else 200,
+            })
+        elif kind == "auth":
+            failed = attack or rng.random() < 0.1
+            payload.update({
+                "event_type": "LOGIN_ATTEMPT",
+                "route": "/login",
+                "auth_status": "failed" if failed else "ok",
+                "failed_attempts": rng.randint(5, 30) if attack else int(failed),
+                "mouse_events_logged": not bot,
+                "metrics": {"login_duration_ms": rng.randint(150, 900) if bot else rng.randint(2500, 12000)},
+            })
+        elif kind == "network":
+            payload.update({
+                "src_port": rng.randint(1024, 65535),
+                "dst_port": rng.choice([22, 80, 443, 3389]),
+                "features": {
+                    "unique_ports": rng.randint(100, 1000) if attack else rng.randint(1, 4),
+                    "packets_per_sec": rng.randint(5000, 50000) if attack else rng.randint(10, 500),
+                },
+            })
+        else: # infra
+            payload.update({
+                "host": f"node-{sid % 16}",
+                "features": {
+                    "cpu_percent": rng.uniform(92, 100) if attack else rng.uniform(5, 60),
+                    "memory_percent": rng.uniform(20, 80),
+                    "privileged_process": attack,
+                },
+            })
+        return payload
+
+# --- Harness -----------------------------------------------------------------
+
+def build_app(full_app: bool = False):
+    """
+    In-process app on a fresh SQLite file, removed at exit. Any DATABASE_URL
+    from the environment is replaced, and the run is refused if the app ends
+    up bound to anything else (e.g. backend.config imported earlier with a
+    real database). Anomaly baselines are checkpointed into the same temp
+    directory, never into the production ANOMALY_STATS_PATH. By default only the ingestion + monitoring blueprints are
+    mounted (create_app() pulls in every optional integration); --full-app
+    benchmarks the complete application instead.
+    """
+    workdir = tempfile.mkdtemp(prefix="trust_benchmark_")
+    atexit.register(shutil.rmtree, workdir, ignore_errors=True)
+    bench_url = "sqlite:///" + os.path.join(workdir, "benchmark.db")
+    os.environ["DATABASE_URL"] = bench_url
+    stats_path = os.path.join(workdir, "anomaly_stats.json")
+    os.environ["ANOMALY_STATS_PATH"] = stats_path
+    os.makedirs("logs", exist_ok=True)
+
+    if full_app:
+        from backend.app import create_app
+        app = create_app()
+    else:
+        from flask import Flask
+        from backend.config import Config
+        from backend.extensions import db, socketio
+        from backend.ingestion.ingestion_routes import ingestion_bp
+        from backend.api.monitoring_routes import monitoring_bp
+
+        app = Flask(__name__)
+        app.config.from_object(Config)
+        app.config["SQLALCHEMY_DATABASE_URI"] = bench_url
+        app.config["TESTING"] = True
+        db.init_app(app)
+        socketio.init_app(app)
+        app.register_blueprint(ingestion_bp, url_prefix="/api/v1/ingest")
+        app.register_blueprint(monitoring_bp, url_prefix="/api/v1/monitoring")
+
+    if app.config.get("SQLALCHEMY_DATABASE_URI") != bench_url:
+        raise RuntimeError(f"Refusing to benchmark against {app.config.get('SQLALCHEMY_DATABASE_URI')!r}; "
+                           "run the benchmark in a fresh process")
+    from backend.ml.registry.model_registry import ModelRegistry
+    anomaly = ModelRegistry.get_model("anomaly")
+    if anomaly is not None and getattr(anomaly, "stats_path", None) not in (None, stats_path):
+        raise RuntimeError(f"Refusing to benchmark with anomaly baselines persisted to {anomaly.stats_path!r}; "
+                           "run the benchmark in a fresh process")
+
+    with app.app_context():
+        from backend.extensions import db
+        db.create_all()
+    return app
+
+def reset_session_state():
+    """
+    Empties every in-memory session structure the ingest path fills, and the
+    anomaly baselines learned from them, so a phase starts from the same state
+    regardless of what ran before it.
+    """
+    from backend.services.observation_service import SessionStateEngine
+    from backend.services.session_reverse_index import SessionReverseIndex
+    from backend.ml.registry.model_registry import ModelRegistry
+
+    SessionStateEngine._sessions.clear()
+    SessionStateEngine._created_index = []
+    SessionStateEngine._global_history.clear()
+    SessionReverseIndex.reset()
+    anomaly = ModelRegistry.get_model("anomaly")
+    if anomaly is not None and hasattr(anomaly, "reset"):
+        anomaly.reset()
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """
+    Exact nearest-rank percentiles (milliseconds).
+    """
+    if not samples:
+        return {"count": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+    ordered = sorted(samples)
+    n = len(ordered)
+    pick = lambda q: ordered[max(0, math.ceil(q * n) - 1)] * 1000.0
+    return {"count": n, "p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+
+def run_load(app, workload: Workload, events: int, warmup: int = 200) -> Dict[str, Any]:
+    from backend.monitoring.stage_metrics import StageMetrics
+
+    client = app.test_client()
+    reset_session_state()
+
+    # Warm caches / lazy model loads so they don't land in the measured window
+    for kind, payload in workload.events(warmup):
+        client.post(ROUTES[kind], json=payload, headers=HEADERS)
+    StageMetrics.reset()
+
+    latencies: Dict[str, List[float]] = {kind: [] for kind in ROUTES}
+    errors = 0
+    started = time.perf_counter()
+    for kind, payload in workload.events(events):
+        t0 = time.perf_counter()
+        response = client.post(ROUTES[kind], json=payload, headers=HEADERS)
+        latencies[kind].append(time.perf_counter() - t0)
+        if response.status_code != 200:
+            errors += 1
+    elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for kind, samples in latencies.items():
+        if samples:
+            endpoints[kind] = percentiles(samples)
+            endpoints[kind]["events_per_sec"] = len(samples) / max(sum(samples), 1e-9)
+
+    stages = {
+        name: {k: (v * 1000.0 if k != "count" else v) for k, v in row.items()}
+        for name, row in StageMetrics.summary().items()
+    }
+    return {
+        "events": events,
+        "errors": errors,
+        "elapsed_sec": elapsed,
+        "events_per_sec": events / max(elapsed, 1e-9),
+        "overall": percentiles([s for samples in latencies.values() for s in samples]),
+        "endpoints": endpoints,
+        "stages_ms": stages,
+    }
+
+def measure_memory(workload: Workload, sessions: int) -> Dict[str, float]:
+    """
+    Session-state footprint: one event per fresh session through the real
+    normalize + state update path (no inference), measured with tracemalloc.
+    """
+    from backend.services.ingestion_service import IngestionService
+    from backend.services.observation_service import SessionStateEngine
+
+    reset_session_state()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for i, (kind, payload) in enumerate(workload.events(sessions)):
+        payload["session_id"] = f"mem_s{i:07d}"
+        IngestionService._update_state(IngestionService._normalize_event(payload, kind))
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    grown = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    tracked = len(SessionStateEngine._sessions)
+    reset_session_state()
+    per_session = grown / max(tracked, 1)
+    return {
+        "sessions": tracked,
+        "bytes_per_session": per_session,
+        "mb_per_100k_sessions": per_session * 100_000 / (1024 * 1024),
+    }
+
+# --- Baseline comparison -----------------------------------------------------
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.15) -> List[str]:
+    """
+    Returns human-readable regressions: any p95/p99 (overall, per endpoint,
+    per stage) or memory figure more than `tolerance` above baseline, or
+    throughput more than `tolerance` below it. Endpoints / stages with fewer
+    than MIN_COMPARE_COUNT samples are skipped.
+    """
+    regressions = []
+
+    def worse(label, current, previous, higher_is_worse=True):
+        if previous is None or current is None or previous <= 0:
+            return
+        change = (current - previous) / previous
+        if (change if higher_is_worse else -change) > tolerance:
+            regressions.append(f"{label}: {previous:.3f} -> {current:.3f} ({change:+.0%})")
+
+    worse("events_per_sec", report["events_per_sec"], baseline.get("events_per_sec"), higher_is_worse=False)
+    for q in ("p95", "p99"):
+        worse(f"overall.{q}", report["overall"][q], baseline.get("overall", {}).get(q))
+        for kind, row in report["endpoints"].items():
+            if row["count"] < MIN_COMPARE_COUNT:
+                continue
+            worse(f"endpoint.{kind}.{q}", row[q], baseline.get("endpoints", {}).get(kind, {}).get(q))
+        for stage, row in report["stages_ms"].items():
+            if row["count"] < MIN_COMPARE_COUNT:
+                continue
+            worse(f"stage.{stage}.{q}", row.get(q), baseline.get("stages_ms", {}).get(stage, {}).get(q))
+    if "memory" in report and "memory" in baseline:
+        worse("memory.mb_per_100k_sessions", report["memory"]["mb_per_100k_sessions"],
+              baseline["memory"].get("mb_per_100k_sessions"))
+    return regressions
+
+def print_report(report: Dict[str, Any]):
+    print(f"\n📊 {report['events']} events in {report['elapsed_sec']:.2f}s "
+          f"-> {report['events_per_sec']:.1f} events/sec ({report['errors']} errors)")
+    print(f"{'endpoint':<28}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for kind, row in [("overall", report["overall"])] + sorted(report["endpoints"].items()):
+        print(f"{kind:<28}{row['count']:>8}{row['p50']:>10.2f}{row['p95']:>10.2f}{row['p99']:>10.2f}")
+    print(f"\n{'stage':<28}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for stage, row in sorted(report["stages_ms"].items()):
+        print(f"{stage:<28}{row['count']:>8}{row['p50']:>10.3f}{row['p95']:>10.3f}{row['p99']:>10.3f}")
+    if "memory" in report:
+        mem = report["memory"]
+        print(f"\n🧠 Session state: {mem['bytes_per_session']:.0f} B/session "
+              f"(~{mem['mb_per_100k_sessions']:.1f} MB per 100k sessions, measured on {mem['sessions']})")
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Reproducible ingestion load / latency benchmark")
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--sessions", type=int, default=500, help="distinct sessions in the load phase")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="kind=weight list over web,api,auth,network,infra")
+    parser.add_argument("--bot-ratio", type=float, default=0.05)
+    parser.add_argument("--attack-ratio", type=float, default=0.05)
+    parser.add_argument("--memory-sessions", type=int, default=10000, help="0 skips the memory phase")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    parser.add_argument("--output", help="also write the JSON report here")
+    parser.add_argument("--full-app", action="store_true")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    app = build_app(args.full_app)
+    workload = lambda: Workload(args.seed, args.sessions, mix, args.bot_ratio, args.attack_ratio)
+
+    with app.app_context():
+        report = run_load(app, workload(), args.events)
+        if args.memory_sessions:
+            report["memory"] = measure_memory(workload(), args.memory_sessions)
+    report["config"] = {k: v for k, v in vars(args).items() if k not in ("baseline", "save_baseline", "output")}
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nℹ️ No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("config") != report["config"]:
+        print("\n⚠️ Baseline was recorded with a different workload config; comparison may be meaningless.")
+    regressions = compare(report, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print(f"\n✅ No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+import os
+import time
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, or_
+
+from backend.extensions import db
+from backend.db.models import User
+from backend.monitoring.stage_metrics import StageMetrics
+
+CACHE_TTL_SEC = float(os.getenv("USER_IDENTITY_CACHE_TTL", "300"))
+NEGATIVE_TTL_SEC = 30.0   # unknown identifiers (simulated / unseeded users) are re-checked sooner
+MAX_ENTRIES = 50000
+IN_CHUNK = 500            # identifiers per IN (...) list
+
+
+class UserIdentityCache:
+    """
+    Maps the free-form user identifier stored on sessions (a username, or a
+    User.user_id) to the User primary key.
+
+    The enforcement path resolves the same identifiers over and over during a
+    bot wave; hits are served from memory, misses for many identifiers are
+    resolved with one query. Entries expire after CACHE_TTL_SEC and the whole
+    cache is cleared whenever a User row is inserted, updated or deleted.
+    """
+    _entries: Dict[str, Tuple[float, Optional[str]]] = {}   # identifier -> (expires, user pk or None)
+    _lock = threading.Lock()
+    _stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    @classmethod
+    def resolve(cls, identifier: Optional[str]) -> Optional[str]:
+        if not identifier:
+            return None
+        return cls.resolve_many([identifier]).get(identifier)
+
+    @classmethod
+    def resolve_many(cls, identifiers: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        {identifier: user pk or None}. A username match wins over a user_id match.
+        """
+        now = time.monotonic()
+        resolved, missing = {}, []
+        with cls._lock:
+            for identifier in dict.fromkeys(i for i in identifiers if i):
+                hit = cls._entries.get(identifier)
+                if hit is not None and hit[0] > now:
+                    resolved[identifier] = hit[1]
+                else:
+                    missing.append(identifier)
+            cls._stats["hits"] += len(resolved)
+            cls._stats["misses"] += len(missing)
+        if not missing:
+            return resolved
+
+        found = cls._lookup(missing)
+        with cls._lock:
+            if len(cls._entries) + len(missing) > MAX_ENTRIES:
+                cls._entries = {k: v for k, v in cls._entries.items() if v[0] > now}
+                if len(cls._entries) + len(missing) > MAX_ENTRIES:
+                    cls._entries = {}
+            for identifier in missing:
+                pk = found.get(identifier)
+                cls._entries[identifier] = (now + (CACHE_TTL_SEC if pk else NEGATIVE_TTL_SEC), pk)
+                resolved[identifier] = pk
+        StageMetrics.inc("user_identity_lookups", len(missing))
+        return resolved
+
+    @staticmethod
+    def _lookup(identifiers: List[str]) -> Dict[str, str]:
+        by_username, by_user_id = {}, {}
+        for start in range(0, len(identifiers), IN_CHUNK):
+            chunk = identifiers[start:start + IN_CHUNK]
+            rows = (
+                db.session.query(User.user_id, User.username)
+                .filter(or_(User.username.in_(chunk), User.user_id.in_(chunk)))
+                .all()
+            )
+            for user_id, username in rows:
+                if username:
+                    by_username[username] = user_id
+                by_user_id[user_id] = user_id
+        return {i: by_username.get(i) or by_user_id.get(i) for i in identifiers
+                if i in by_username or i in by_user_id}
+
+    @classmethod
+    def invalidate(cls, identifier: Optional[str] = None):
+        with cls._lock:
+            if identifier is None:
+                cls._entries = {}
+            else:
+                cls._entries.pop(identifier, None)
+            cls._stats["invalidations"] += 1
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        with cls._lock:
+            return dict(cls._stats, size=len(cls._entries))
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._entries = {}
+            cls._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def mark_password_reset(user_ids: Iterable[str], commit: bool = False) -> int:
+    """
+    Flags many users for a password reset with one UPDATE per IN_CHUNK ids.
+    Users already flagged are left untouched. Runs in the caller's transaction
+    unless commit=True. Returns the number of rows changed.
+    """
+    ids = list(dict.fromkeys(i for i in user_ids if i))
+    updated = 0
+    for start in range(0, len(ids), IN_CHUNK):
+        updated += (
+            User.query
+            .filter(User.user_id.in_(ids[start:start + IN_CHUNK]), User.password_reset_required.isnot(True))
+            .update({"password_reset_required": True}, synchronize_session=False)
+        )
+    if commit:
+        db.session.commit()
+    return updated
+
+
+def force_password_reset(identifiers: Iterable[str], commit: bool = False) -> int:
+    """
+    Resolves session user identifiers through the cache and flags the matching users.
+    """
+    resolved = UserIdentityCache.resolve_many(identifiers)
+    return mark_password_reset([pk for pk in resolved.values() if pk], commit=commit)
+
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_user_write(mapper, connection, target):
+    # Usernames / ids can change or appear; user writes are rare, so drop everything
+    UserIdentityCache.invalidate()
@@ -0,0 +1,277 @@
+import base64
+import json
+import time
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, func
+
+from backend.extensions import db
+from backend.db.models import Incident, AuditLog
+from backend.incidents.enums import IncidentStatus, IncidentSeverity
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+COUNT_CACHE_TTL = 30 # seconds a cached total may lag behind the table
+COUNT_CACHE_SIZE = 256
+
+_INCIDENT_COLUMNS = (
+    Incident.incident_id, Incident.tenant_id, Incident.status, Incident.severity,
+    Incident.created_at, Incident.updated_at
+)
+_AUDIT_COLUMNS = (
+    AuditLog.id, AuditLog.tenant_id, AuditLog.action, AuditLog.actor,
+    AuditLog.incident_id, AuditLog.hash, AuditLog.created_at
+)
+
+# Covering keyset indexes: equality filters first, then the (created_at, id) sort
+# key; the remaining listed columns ride along (INCLUDE on Postgres) so a page is
+# an index-only scan.
+INCIDENT_INDEXES = (
+    db.Index("ix_incidents_tenant_status_created", Incident.tenant_id, Incident.status,
+             Incident.created_at, Incident.incident_id,
+             postgresql_include=["severity", "updated_at"]),
+    db.Index("ix_incidents_status_created", Incident.status, Incident.created_at, Incident.incident_id,
+             postgresql_include=["tenant_id", "severity", "updated_at"]),
+    db.Index("ix_incidents_created", Incident.created_at, Incident.incident_id,
+             postgresql_include=["tenant_id", "status", "severity", "updated_at"]),
+)
+AUDIT_INDEXES = (
+    db.Index("ix_audit_logs_tenant_created", AuditLog.tenant_id, AuditLog.created_at, AuditLog.id,
+             postgresql_include=["action", "actor", "incident_id", "hash"]),
+    db.Index("ix_audit_logs_action_created", AuditLog.action, AuditLog.created_at, AuditLog.id,
+             postgresql_include=["tenant_id", "actor", "incident_id", "hash"]),
+)
+
+
+def _iso(ts: Optional[datetime]) -> Optional[str]:
+    if ts is None:
+        return None
+    return ts.isoformat() + "Z" if ts.tzinfo is None else ts.isoformat()
+
+
+def _parse_ts(value: Optional[str]) -> Optional[datetime]:
+    """
+    ISO-8601 -> naive UTC (both tables store UTC).
+    """
+    if not value:
+        return None
+    try:
+        ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Invalid timestamp: {value}")
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def encode_cursor(created_at: Optional[datetime], key: str) -> str:
+    raw = json.dumps([created_at.isoformat() if created_at else None, key], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, str]]:
+    if not cursor:
+        return None
+    try:
+        created_at, key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return _parse_ts(created_at), str(key)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _enum(enum_cls, value: Optional[str], name: str):
+    if not value:
+        return None
+    try:
+        return enum_cls(value.upper())
+    except ValueError:
+        raise ValueError(f"Invalid {name}: {value}")
+
+
+class IncidentListingService:
+    """
+    SOC incident / audit listings: filtered, newest-first, keyset-paginated
+    reads that only select the listed columns (see the covering indexes above).
+    Count endpoints are served from a short-TTL cache per filter set.
+    """
+    _count_cache: Dict[Tuple, Tuple[float, Any]] = {}
+    _cache_lock = threading.Lock()
+
+    @staticmethod
+    def ensure_indexes():
+        """
+        Idempotent. Called at app startup (create_all does not add indexes to existing tables).
+        """
+        for index in INCIDENT_INDEXES + AUDIT_INDEXES:
+            index.create(bind=db.engine, checkfirst=True)
+
+    # --- Incidents -------------------------------------------------------------
+
+    @staticmethod
+    def _incident_conditions(filters: Dict[str, Any], with_status: bool = True) -> List[Any]:
+        conditions = []
+        if filters.get("tenant_id"):
+            conditions.append(Incident.tenant_id == filters["tenant_id"])
+        status = _enum(IncidentStatus, filters.get("status"), "status")
+        if status is not None and with_status:
+            conditions.append(Incident.status == status)
+        severity = _enum(IncidentSeverity, filters.get("severity"), "severity")
+        if severity is not None:
+            conditions.append(Incident.severity == severity)
+        if filters.get("since"):
+            conditions.append(Incident.created_at >= _parse_ts(filters["since"]))
+        if filters.get("until"):
+            conditions.append(Incident.created_at < _parse_ts(filters["until"]))
+        return conditions
+
+    @classmethod
+    def list_incidents(cls, filters: Dict[str, Any], cursor: Optional[str] = None,
+                       limit: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        conditions = cls._incident_conditions(filters)
+        after = decode_cursor(cursor)
+        if after is not None:
+            conditions.append(or_(
+                Incident.created_at < after[0],
+                and_(Incident.created_at == after[0], Incident.incident_id < after[1])
+            ))
+
+        rows = (
+            db.session.query(*_INCIDENT_COLUMNS)
+            .filter(*conditions)
+            .order_by(Incident.created_at.desc(), Incident.incident_id.desc())
+            .limit(limit + 1)
+            .all()
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].incident_id)
+
+        return {
+            "items": [
+                {
+                    "id": r.incident_id,
+                    "incident_id": r.incident_id,
+                    "tenant_id": r.tenant_id,
+                    "status": r.status.value,
+                    "severity": r.severity.value,
+                    "created_at": _iso(r.created_at),
+                    "updated_at": _iso(r.updated_at)
+                } for r in rows
+            ],
+            "next_cursor": next_cursor
+        }
+
+    @classmethod
+    def count_incidents(cls, filters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        {"total", "by_status"}. The cached GROUP BY ignores the status filter,
+        so every status tab's badge is served from the same entry.
+        """
+        conditions = cls._incident_conditions(filters, with_status=False)
+        status = _enum(IncidentStatus, filters.get("status"), "status")
+        key = ("incidents",) + tuple(sorted((k, v) for k, v in filters.items() if k != "status"))
+
+        def compute():
+            grouped = (
+                db.session.query(Incident.status, func.count())
+                .filter(*conditions)
+                .group_by(Incident.status)
+                .all()
+            )
+            return {"by_status": {s.value: n for s, n in grouped}}
+
+        counts = cls._cached(key, compute)
+        by_status = counts["by_status"]
+        total = by_status.get(status.value, 0) if status else sum(by_status.values())
+        return {"total": total, "by_status": by_status, "cached": counts["cached"]}
+
+    # --- Audit -----------------------------------------------------------------
+
+    @staticmethod
+    def _audit_conditions(filters: Dict[str, Any]) -> List[Any]:
+        conditions = []
+        for key, column in (("tenant_id", AuditLog.tenant_id), ("action", AuditLog.action),
+                            ("actor", AuditLog.actor), ("incident_id", AuditLog.incident_id)):
+            if filters.get(key):
+                conditions.append(column == filters[key])
+        if filters.get("since"):
+            conditions.append(AuditLog.created_at >= _parse_ts(filters["since"]))
+        if filters.get("until"):
+            conditions.append(AuditLog.created_at < _parse_ts(filters["until"]))
+        return conditions
+
+    @classmethod
+    def list_audit_logs(cls, filters: Dict[str, Any], cursor: Optional[str] = None,
+                        limit: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        conditions = cls._audit_conditions(filters)
+        after = decode_cursor(cursor)
+        if after is not None:
+            conditions.append(or_(
+                AuditLog.created_at < after[0],
+                and_(AuditLog.created_at == after[0], AuditLog.id < after[1])
+            ))
+
+        rows = (
+            db.session.query(*_AUDIT_COLUMNS)
+            .filter(*conditions)
+            .order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+            .limit(limit + 1)
+            .all()
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+        return {
+            "items": [
+                {
+                    "id": r.id,
+                    "action": r.action,
+                    "actor": r.actor,
+                    "tenant_id": r.tenant_id,
+                    "incident_id": r.incident_id,
+                    "timestamp": _iso(r.created_at),
+                    "hash": r.hash
+                } for r in rows
+            ],
+            "next_cursor": next_cursor
+        }
+
+    @classmethod
+    def count_audit_logs(cls, filters: Dict[str, Any]) -> Dict[str, Any]:
+        conditions = cls._audit_conditions(filters)
+        return cls._cached(
+            ("audit",) + tuple(sorted(filters.items())),
+            lambda: {"total": db.session.query(func.count(AuditLog.id)).filter(*conditions).scalar() or 0}
+        )
+
+    # --- Count cache -------------------------------------------------------------
+
+    @classmethod
+    def _cached(cls, key: Tuple, compute) -> Dict[str, Any]:
+        now = time.monotonic()
+        with cls._cache_lock:
+            hit = cls._count_cache.get(key)
+            if hit is not None and hit[0] > now:
+                return dict(hit[1], cached=True)
+
+        value = compute()
+        with cls._cache_lock:
+            if len(cls._count_cache) >= COUNT_CACHE_SIZE:
+                # Drop expired entries first; if none, the oldest insert
+                expired = [k for k, (exp, _) in cls._count_cache.items() if exp <= now]
+                for k in expired or [next(iter(cls._count_cache))]:
+                    del cls._count_cache[k]
+            cls._count_cache[key] = (now + COUNT_CACHE_TTL, value)
+        return dict(value, cached=False)
+
+    @classmethod
+    def invalidate_counts(cls):
+        with cls._cache_lock:
+            cls._count_cache = {}
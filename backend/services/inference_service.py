@@ -1,13 +1,14 @@
-from flask import current_app
 from backend.ml.inference_pipeline import evaluate_single_session
 from backend.extensions import db
 from backend.db.models import Session
 from backend.models.session_metric import SessionMetric
 from datetime import datetime
+import time
 
 from backend.services.observation_service import SessionStateEngine
 from backend.audit.audit_log import AuditLogger
 from backend.incidents.incident_manager import IncidentManager
+from backend.monitoring.stage_metrics import StageMetrics
 import json
 
 class InferenceService:
@@ -27,7 +28,8 @@ class InferenceService:
         features["is_simulation"] = True
         
         # 1. Run Pipeline
-        result = evaluate_single_session(features)
+        with StageMetrics.timer("inference"):
+            result = evaluate_single_session(features)
         
         # 🧪 SIMULATION: Apply forced risk score if present
         force_risk = request_data.get("force_risk_score")
@@ -112,8 +114,10 @@ class InferenceService:
              SessionStateEngine.mark_terminated(session_id)
         
         metrics_data = result.metadata.get("metrics", {})
+        StageMetrics.inc("decisions", decision=result.decision)
 
         # 3. Persist to Database
+        persist_started = time.perf_counter()
         try:
             import json
             
@@ -217,20 +221,14 @@ class InferenceService:
 
             # Terminate and force password reset if bot detected or risk is critical
             if (bot_detected or result.decision in ["TERMINATE", "TERMINATED", "BLOCK"]) and user_id:
-                from backend.db.models import User
-                user_record = User.query.filter_by(username=user_id).first()
-                if not user_record:
-                    # User table might not be seeded with simulated users, so lazily create/update
-                    user_record = User.query.filter_by(user_id=user_id).first()
-                if user_record:
-                    user_record.password_reset_required = True
+                # Simulated users may not exist in the User table; unknown ids resolve to nothing
+                from backend.services.identity_cache import force_password_reset
+                force_password_reset([user_id])
                 
-                # Also notify the target app immediately
-                try:
-                    import requests
-                    requests.post("http://localhost:3001/api/terminate", json={"session_id": session_id}, timeout=2.0)
-                except Exception as ex:
-                    print(f"Failed to call target app terminate webhook: {ex}")
+                # Notify the target app via the outbox: committed with this transaction,
+                # delivered by TerminationDispatcher off the request thread
+                from backend.enforcement.termination_dispatcher import TerminationDispatcher
+                TerminationDispatcher.enqueue(session_id, reason=f"Inference decision {result.decision}", commit=False)
 
             
             # Create Metrics (Always append new metrics for history)
@@ -253,46 +251,41 @@ class InferenceService:
             # Create Audit Log
             # 5. Persistent Audit (Unified Audit Logger)
             from backend.audit.audit_logger import AuditLogger
-            AuditLogger.log_action(
-                actor_id=user_id or "SYSTEM",
-                action="SESSION_EVALUATION",
-                target_id=session_id,
-                payload={
-                    "role": "ANALYST", # Default for evaluation logs
-                    "decision": result.decision,
-                    "primary_cause": result.explanation.get("primary_cause"),
-                    "risk_score": result.risk_score,
-                    "trust_score": 100.0 - result.risk_score
-                }
-            )
+            with StageMetrics.timer("audit"):
+                AuditLogger.log_action(
+                    actor_id=user_id or "SYSTEM",
+                    action="SESSION_EVALUATION",
+                    target_id=session_id,
+                    payload={
+                        "role": "ANALYST", # Default for evaluation logs
+                        "decision": result.decision,
+                        "primary_cause": result.explanation.get("primary_cause"),
+                        "risk_score": result.risk_score,
+                        "trust_score": 100.0 - result.risk_score
+                    }
+                )
 
             db.session.commit()
+            # Session/metrics upsert + audit + commit, as one stage
+            StageMetrics.observe("persistence", time.perf_counter() - persist_started)
 
             # 🧪 AUTO-TRIGGER INCIDENTS: If risk is critical, create/attach to incident
             # This ensures the SOC dashboard popup triggers correctly
             if result.risk_score >= 90:
                 try:
-                    import threading
-                    # Get the underlying app object to pass into the thread safely
-                    app = current_app._get_current_object()
-                    
-                    def trigger_inc(app_context_obj):
-                        with app_context_obj.app_context():
-                            try:
-                                IncidentManager.correlate({
-                                    "tenant_id": features.get("tenant_id", "default"),
-                                    "risk_score": result.risk_score,
-                                    "session_id": session_id,
-                                    "actor_id": user_id
-                                })
-                            except Exception as e:
-                                print(f"[Thread Error] Incident correlation failed: {e}")
-                    
-                    threading.Thread(target=trigger_inc, args=(app,), daemon=True).start()
+                    # In-memory attach; the DB write is coalesced by IncidentManager.flush()
+                    IncidentManager.correlate({
+                        "tenant_id": features.get("tenant_id", "default"),
+                        "risk_score": result.risk_score,
+                        "session_id": session_id,
+                        "actor_id": user_id,
+                        "ip_address": features.get("ip_address")
+                    })
                 except Exception as inc_err:
-                    print(f"Failed to offload incident trigger: {inc_err}")
+                    print(f"Incident correlation failed: {inc_err}")
         except Exception as e:
             db.session.rollback()
+            StageMetrics.inc("errors", stage="persistence")
             # We log the error but return the result to the user so the service isn't blocked by DB issues
             print(f"Database Persistence Error: {str(e)}")
         
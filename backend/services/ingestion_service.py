@@ -2,9 +2,11 @@
 from backend.services.observation_service import SessionStateEngine
 from backend.services.inference_service import InferenceService
 from backend.data.event_schema import Event
+from backend.monitoring.stage_metrics import StageMetrics
 import uuid
 import time
 import threading
+import dataclasses
 
 class IngestionService:
     """
@@ -22,6 +24,49 @@ class IngestionService:
             IngestionService._normalize_event(payload, "http", source="web")
         )
 
+    @staticmethod
+    def ingest_http_batch(payloads):
+        """
+        Batch variant for log tailers.
+        Session state is updated per event; inference runs once per session, on its latest event,
+        carrying the strongest override (risk score / bot flag) seen for that session in the batch.
+        """
+        latest, strongest, bots = {}, {}, {}
+        for payload in payloads:
+            event = IngestionService._normalize_event(payload, "http", source="web")
+            IngestionService._update_state(event)
+            session_id = event.session_id
+            latest[session_id] = event
+            if event.risk_score is not None and (session_id not in strongest or event.risk_score >= strongest[session_id].risk_score):
+                strongest[session_id] = event
+            if event.raw_features.get("bot_detected"):
+                bots[session_id] = event
+
+        for session_id, event in latest.items():
+            trigger = IngestionService._with_overrides(event, strongest.get(session_id), bots.get(session_id))
+            IngestionService._trigger_inference(session_id, trigger)
+
+        return {"status": "accepted", "events": len(payloads), "sessions": len(latest)}
+
+    @staticmethod
+    def _with_overrides(event: Event, strongest: Event = None, bot: Event = None) -> Event:
+        """
+        Copy of `event` with the forced fields of earlier events in the same batch,
+        so coalescing a session to one inference never drops a bot UA or risk override.
+        """
+        if (strongest is None or strongest is event) and (bot is None or bot is event):
+            return event
+        features = dict(event.raw_features)
+        if bot is not None:
+            features["bot_detected"] = True
+            features["bot_reason"] = bot.raw_features.get("bot_reason")
+        source = strongest or event
+        return dataclasses.replace(
+            event, raw_features=features, risk_score=source.risk_score,
+            recommendation=source.recommendation or event.recommendation,
+            primary_cause=source.primary_cause or event.primary_cause
+        )
+
     @staticmethod
     def ingest_api_event(payload):
         """
@@ -106,6 +151,7 @@ class IngestionService:
         return is_bot, risk_score, reason_text
 
     @staticmethod
+    @StageMetrics.timed("normalize")
     def _normalize_event(payload, event_type, source="unknown"):
         """
         Converts raw payload to standard Event Schema.
@@ -143,9 +189,10 @@ class IngestionService:
         )
         
         # 🧪 SIMULATION BYPASS: Allow injecting risk_score directly
-        bot_detected, risk_score_override, bot_reason = IngestionService._run_bot_detection(
-            session_id, actor_id, raw_features, event_type
-        )
+        with StageMetrics.timer("bot_rules"):
+            bot_detected, risk_score_override, bot_reason = IngestionService._run_bot_detection(
+                session_id, actor_id, raw_features, event_type
+            )
         
         if bot_detected:
             event.risk_score = risk_score_override
@@ -181,11 +228,7 @@ class IngestionService:
         
         # 1. Update State
         session_id = event.session_id
-        SessionStateEngine.update_session_state(session_id, event)
-        
-        # 1.5 Update Risk History (Essential for Frontend Trend/Velocity)
-        if hasattr(event, 'risk_score'):
-            SessionStateEngine.update_risk_history(session_id, event.risk_score)
+        IngestionService._update_state(event)
         
         # 2. Trigger Inference
         result = IngestionService._trigger_inference(session_id, event)
@@ -196,6 +239,16 @@ class IngestionService:
             "risk_assessment": result # Return for immediate feedback if compatible
         }
 
+    @staticmethod
+    def _update_state(event: Event):
+        StageMetrics.inc("events", type=event.event_type)
+        with StageMetrics.timer("state_update"):
+            SessionStateEngine.update_session_state(event.session_id, event)
+        
+        # Update Risk History (Essential for Frontend Trend/Velocity)
+        if hasattr(event, 'risk_score'):
+            SessionStateEngine.update_risk_history(event.session_id, event.risk_score)
+
     @staticmethod
     def _trigger_inference(session_id, triggering_event: Event):
         """
@@ -249,5 +302,6 @@ class IngestionService:
              result = InferenceService.evaluate_session(inference_payload)
              return result
         except Exception as e:
+            # Pipeline failures are already counted as errors{stage="inference"} by InferenceService's timer
             print(f"Inference trigger failed: {e}")
             return {"error": "inference_failed"}
@@ -1,9 +1,12 @@
 
 import time
+import bisect
 from collections import deque
 import statistics
 import queue
 import math
+from backend.monitoring.stage_metrics import StageMetrics
+from backend.services.session_reverse_index import SessionReverseIndex
 
 def calculate_entropy(data_list):
     if not data_list:
@@ -39,6 +42,10 @@ class SessionStateEngine:
     # Global Event History (for persistence on refresh)
     _global_history = deque(maxlen=500)
 
+    # Secondary index: [(created_at, session_id)] sorted ascending.
+    # Sessions are created in wall-clock order, so insort is effectively an append.
+    _created_index = []
+
     @classmethod
     def listen(cls):
         """
@@ -126,6 +133,7 @@ class SessionStateEngine:
                 "risk_history": deque(maxlen=MAX_WINDOW_SIZE), # (timestamp, score)
                 "infra_stress_window": deque(maxlen=MAX_WINDOW_SIZE),
             }
+            bisect.insort(cls._created_index, (current_time, session_id))
         
         
         session = cls._sessions[session_id]
@@ -144,6 +152,7 @@ class SessionStateEngine:
         # For now, we store the Event object but in get_session_features we rely on simple types.
         session["events"].append(event) 
         session["total_requests"] += 1
+        SessionReverseIndex.track(session_id, event, current_time)
         
         # Notify Listeners (Live Stream)
         cls._notify_listeners(event)
@@ -165,7 +174,8 @@ class SessionStateEngine:
                  "suggestion": "None"
              }
              
-             socketio.emit(evt_name, socket_payload)
+             with StageMetrics.timer("socket_emit"):
+                 socketio.emit(evt_name, socket_payload)
         except Exception as e:
             print(f"[Socket Error] Failed to emit {evt_name}: {e}")
         
@@ -392,6 +402,7 @@ class SessionStateEngine:
         """
         if session_id in cls._sessions:
             cls._sessions[session_id]["is_terminated"] = True
+            SessionReverseIndex.remove(session_id)
 
     @classmethod
     def prune_expired_sessions(cls):
@@ -406,3 +417,24 @@ class SessionStateEngine:
         
         for sid in to_remove:
             del cls._sessions[sid]
+            SessionReverseIndex.remove(sid)
+
+        if to_remove:
+            cls._created_index = [
+                (ts, sid) for ts, sid in cls._created_index if sid in cls._sessions
+            ]
+
+    @classmethod
+    def iter_sessions_by_created_desc(cls, before=None):
+        """
+        Yields (created_at, session_id, state) newest first, strictly before the
+        (created_at, session_id) keyset cursor when given. O(log n) to seek,
+        then O(1) per yielded session.
+        """
+        index = cls._created_index
+        pos = bisect.bisect_left(index, before) if before is not None else len(index)
+        for i in range(min(pos, len(index)) - 1, -1, -1):
+            created_at, sid = index[i]
+            state = cls._sessions.get(sid)
+            if state is not None:
+                yield created_at, sid, state
@@ -0,0 +1,196 @@
+import base64
+import heapq
+import json
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, text
+
+from backend.extensions import db
+from backend.db.models import Session
+from backend.services.observation_service import SessionStateEngine
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Live sessions always report these (see list row builder below)
+LIVE_SOURCE = "LIVE"
+LIVE_DECISION = "ALLOW"
+
+# Composite keyset index used by the explorer's ORDER BY created_at DESC, session_id DESC
+KEYSET_INDEX = db.Index("ix_sessions_created_keyset", Session.created_at, Session.session_id)
+
+# Postgres-only trigram indexes so ILIKE '%term%' search is an index scan
+TRIGRAM_INDEX_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_sessions_session_id_trgm ON sessions USING gin (session_id gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_sessions_user_id_trgm ON sessions USING gin (user_id gin_trgm_ops)",
+)
+
+
+def _epoch(dt: Optional[datetime]) -> float:
+    if dt is None:
+        return 0.0
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def encode_cursor(created_at: float, session_id: str) -> str:
+    raw = json.dumps([created_at, session_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[float, str]]:
+    if not cursor:
+        return None
+    try:
+        created_at, session_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(created_at), str(session_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+class SessionListingService:
+    """
+    Session Explorer listing: persisted + live sessions in one keyset-paginated stream.
+
+    Both sources are read newest-first from an index (DB composite index /
+    SessionStateEngine._created_index), each bounded to one page, and merged
+    with a single heapq.merge pass. A live session that is already persisted
+    is shown once, as the DB row flagged is_active.
+    """
+
+    @staticmethod
+    def ensure_indexes():
+        """
+        Idempotent. Called at app startup (create_all does not add indexes to existing tables).
+        """
+        KEYSET_INDEX.create(bind=db.engine, checkfirst=True)
+        if db.engine.dialect.name != "postgresql":
+            return
+        try:
+            with db.engine.begin() as conn:
+                for ddl in TRIGRAM_INDEX_DDL:
+                    conn.execute(text(ddl))
+        except Exception as e:
+            # pg_trgm needs CREATE privilege; search still works, just unindexed
+            print(f"[WARN] Session search trigram indexes unavailable: {e}")
+
+    @classmethod
+    def list_sessions(cls, source: Optional[str] = None, decision: Optional[str] = None,
+                      search: Optional[str] = None, cursor: Optional[str] = None,
+                      limit: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        after = decode_cursor(cursor)
+
+        db_rows = cls._db_page(source, decision, search, after, limit + 1)
+        live_rows = cls._live_page(source, decision, search, after, limit + 1)
+
+        merged = heapq.merge(db_rows, live_rows, key=lambda r: (r[0], r[1]), reverse=True)
+        page = list(islice(merged, limit + 1))
+
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = encode_cursor(page[-1][0], page[-1][1])
+
+        return {"items": [row[2] for row in page], "next_cursor": next_cursor}
+
+    @staticmethod
+    def _db_page(source, decision, search, after, size) -> List[Tuple[float, str, Dict[str, Any]]]:
+        query = Session.query
+        if source:
+            query = query.filter_by(source=source)
+        if decision:
+            query = query.filter_by(final_decision=decision)
+        if search:
+            query = query.filter(
+                (Session.user_id.ilike(f"%{search}%")) |
+                (Session.session_id.ilike(f"%{search}%"))
+            )
+        if after is not None:
+            after_dt = datetime.fromtimestamp(after[0], tz=timezone.utc).replace(tzinfo=None)
+            query = query.filter(or_(
+                Session.created_at < after_dt,
+                and_(Session.created_at == after_dt, Session.session_id < after[1])
+            ))
+
+        sessions = query.order_by(Session.created_at.desc(), Session.session_id.desc()).limit(size).all()
+
+        rows = []
+        for s in sessions:
+            d = s.to_dict()
+            if d.get("risk_score") == 0 and d.get("trust_score") is not None:
+                d["risk_score"] = 100.0 - d["trust_score"]
+            d["is_active"] = s.session_id in SessionStateEngine._sessions
+            rows.append((_epoch(s.created_at), s.session_id, d))
+        return rows
+
+    @classmethod
+    def _live_page(cls, source, decision, search, after, size) -> List[Tuple[float, str, Dict[str, Any]]]:
+        if (source and source.upper() != LIVE_SOURCE) or (decision and decision.upper() != LIVE_DECISION):
+            return []
+
+        s_lower = search.lower() if search else None
+        candidates = SessionStateEngine.iter_sessions_by_created_desc(before=after)
+        rows = []
+        while len(rows) < size:
+            chunk = []
+            for created_at, sid, data in candidates:
+                if s_lower and s_lower not in sid.lower() and s_lower not in str(data.get("user_id", "")).lower():
+                    continue
+                chunk.append((created_at, sid, data))
+                if len(chunk) >= size - len(rows):
+                    break
+            if not chunk:
+                break
+
+            # Persisted sessions are listed from the DB side; one IN query per chunk
+            persisted = {
+                sid for (sid,) in db.session.query(Session.session_id).filter(
+                    Session.session_id.in_([c[1] for c in chunk])
+                )
+            }
+            rows.extend(
+                (created_at, sid, cls._live_row(sid, data))
+                for created_at, sid, data in chunk if sid not in persisted
+            )
+        return rows
+
+    @staticmethod
+    def _live_row(sid: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        # Calculate current risk from history or fallback
+        risk_hist = data.get("risk_history")
+        if risk_hist:
+            current_risk = risk_hist[-1][1]
+        elif data.get("trust_score") is not None:
+            current_risk = 100.0 - data.get("trust_score")
+        else:
+            current_risk = data.get("current_risk_score", 0)
+
+        # Infer dominant domain from the first event
+        domain = "WEB"
+        events_seq = data.get("events", [])
+        if events_seq:
+            etype = getattr(events_seq[0], 'event_type', 'http')
+            if etype == 'api': domain = 'API'
+            elif etype == 'network': domain = 'NETWORK'
+            elif etype == 'infra': domain = 'SYSTEM'
+
+        return {
+            "session_id": sid,
+            "user_id": data.get("user_id", "simulated-user"),
+            "ip_address": data.get("ip_address", "127.0.0.1"),
+            "source": LIVE_SOURCE,
+            "risk_score": current_risk,
+            "created_at": data.get("created_at"),
+            "event_count": len(events_seq),
+            "anomaly_count": len(events_seq),
+            "signal_count": 0,
+            "status": "ACTIVE",
+            "final_decision": LIVE_DECISION,
+            "domain": domain,
+            "is_active": True
+        }
@@ -0,0 +1,215 @@
+import time
+import ipaddress
+import threading
+from typing import Dict, Set, Iterable, Optional, Any
+
+# Raw-feature fields that carry each asset, first match wins
+IP_FIELDS = ("ip", "source_ip", "src_ip", "ip_address", "client_ip")
+TOKEN_FIELDS = ("token_id", "api_key_id", "token")
+USER_FIELDS = ("user_id",)
+
+IPV4_SUBNET_PREFIX = 24
+IPV6_SUBNET_PREFIX = 64
+
+def subnet_of(ip: str) -> Optional[str]:
+    try:
+        addr = ipaddress.ip_address(ip)
+    except ValueError:
+        return None
+    prefix = IPV4_SUBNET_PREFIX if addr.version == 4 else IPV6_SUBNET_PREFIX
+    return str(ipaddress.ip_network(f"{addr}/{prefix}", strict=False))
+
+class _SessionKeys:
+    __slots__ = ("ips", "users", "tokens", "last_ip", "last_token", "last_seen")
+
+    def __init__(self):
+        self.ips = set()
+        self.users = set()
+        self.tokens = set()
+        self.last_ip = None
+        self.last_token = None
+        self.last_seen = 0.0
+
+class SessionReverseIndex:
+    """
+    Reverse indexes over live sessions in SessionStateEngine:
+    IP -> sessions, user -> sessions, token -> sessions, subnet -> IPs.
+
+    Updated incrementally on every event (track) and dropped when the session
+    is pruned or terminated (remove), so "who else is behind this IP / token /
+    user" is a dict lookup plus O(k) over the k sessions involved. Sessions
+    idle longer than the session TTL but not yet pruned are filtered out of
+    lookups.
+    """
+    _by_ip: Dict[str, Set[str]] = {}
+    _by_user: Dict[str, Set[str]] = {}
+    _by_token: Dict[str, Set[str]] = {}
+    _by_subnet: Dict[str, Set[str]] = {}
+    _sessions: Dict[str, _SessionKeys] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _first(features: Dict[str, Any], fields: Iterable[str]) -> Optional[str]:
+        for field in fields:
+            value = features.get(field)
+            if value:
+                return str(value)
+        return None
+
+    @classmethod
+    def track(cls, session_id: str, event, now: Optional[float] = None):
+        features = getattr(event, "raw_features", None) or {}
+        ip = cls._first(features, IP_FIELDS)
+        token = cls._first(features, TOKEN_FIELDS)
+        user = getattr(event, "actor_id", None)
+        if not user or user == "anonymous":
+            user = cls._first(features, USER_FIELDS)
+
+        with cls._lock:
+            keys = cls._sessions.get(session_id)
+            if keys is None:
+                keys = cls._sessions[session_id] = _SessionKeys()
+            keys.last_seen = time.time() if now is None else now
+
+            if ip:
+                keys.last_ip = ip
+                if ip not in keys.ips:
+                    keys.ips.add(ip)
+                    sessions = cls._by_ip.get(ip)
+                    if sessions is None:
+                        sessions = cls._by_ip[ip] = set()
+                        subnet = subnet_of(ip)
+                        if subnet:
+                            cls._by_subnet.setdefault(subnet, set()).add(ip)
+                    sessions.add(session_id)
+            if token:
+                keys.last_token = token
+                if token not in keys.tokens:
+                    keys.tokens.add(token)
+                    cls._by_token.setdefault(token, set()).add(session_id)
+            if user and user not in keys.users:
+                keys.users.add(user)
+                cls._by_user.setdefault(user, set()).add(session_id)
+
+    @classmethod
+    def remove(cls, session_id: str):
+        with cls._lock:
+            keys = cls._sessions.pop(session_id, None)
+            if keys is None:
+                return
+            for ip in keys.ips:
+                if cls._discard(cls._by_ip, ip, session_id):
+                    subnet = subnet_of(ip)
+                    if subnet:
+                        cls._discard(cls._by_subnet, subnet, ip)
+            for token in keys.tokens:
+                cls._discard(cls._by_token, token, session_id)
+            for user in keys.users:
+                cls._discard(cls._by_user, user, session_id)
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[str]], key: str, member: str) -> bool:
+        # Caller holds cls._lock. True if the key's last member was removed.
+        members = index.get(key)
+        if members is None:
+            return False
+        members.discard(member)
+        if not members:
+            del index[key]
+            return True
+        return False
+
+    # --- Lookups -----------------------------------------------------------------
+
+    @classmethod
+    def _live(cls, session_ids: Iterable[str]) -> Set[str]:
+        # Caller holds cls._lock
+        from backend.services.observation_service import SESSION_TTL_SECONDS
+        horizon = time.time() - SESSION_TTL_SECONDS
+        return {sid for sid in session_ids if cls._sessions[sid].last_seen >= horizon}
+
+    @classmethod
+    def sessions_for_ip(cls, ip: str) -> Set[str]:
+        with cls._lock:
+            return cls._live(cls._by_ip.get(ip, ()))
+
+    @classmethod
+    def sessions_for_user(cls, user_id: str) -> Set[str]:
+        with cls._lock:
+            return cls._live(cls._by_user.get(user_id, ()))
+
+    @classmethod
+    def sessions_for_token(cls, token: str) -> Set[str]:
+        with cls._lock:
+            return cls._live(cls._by_token.get(token, ()))
+
+    @classmethod
+    def ips_in_network(cls, cidr: str) -> Set[str]:
+        """
+        Tracked IPs inside cidr. Networks at or inside the tracked subnet size
+        are one subnet lookup; wider ones scan the subnet keys, not the IPs.
+        """
+        network = ipaddress.ip_network(cidr, strict=False)
+        prefix = IPV4_SUBNET_PREFIX if network.version == 4 else IPV6_SUBNET_PREFIX
+        with cls._lock:
+            if network.prefixlen >= prefix:
+                candidates = cls._by_subnet.get(str(network.supernet(new_prefix=prefix)), ())
+            else:
+                candidates = []
+                for subnet, ips in cls._by_subnet.items():
+                    subnet = ipaddress.ip_network(subnet)
+                    if subnet.version == network.version and subnet.subnet_of(network):
+                        candidates.extend(ips)
+            return {ip for ip in candidates if ipaddress.ip_address(ip) in network}
+
+    @classmethod
+    def sessions_for_network(cls, target: str) -> Set[str]:
+        """
+        Sessions behind an IP or CIDR.
+        """
+        if "/" not in target:
+            return cls.sessions_for_ip(target)
+        ips = cls.ips_in_network(target)
+        with cls._lock:
+            return cls._live(sid for ip in ips for sid in cls._by_ip.get(ip, ()))
+
+    @classmethod
+    def users_for_sessions(cls, session_ids: Iterable[str]) -> Set[str]:
+        with cls._lock:
+            users = set()
+            for sid in session_ids:
+                keys = cls._sessions.get(sid)
+                if keys is not None:
+                    users |= keys.users
+            return users
+
+    @classmethod
+    def is_session(cls, session_id: str) -> bool:
+        with cls._lock:
+            return session_id in cls._sessions
+
+    @classmethod
+    def last_ip(cls, session_id: str) -> Optional[str]:
+        with cls._lock:
+            keys = cls._sessions.get(session_id)
+            return keys.last_ip if keys else None
+
+    @classmethod
+    def last_token(cls, session_id: str) -> Optional[str]:
+        with cls._lock:
+            keys = cls._sessions.get(session_id)
+            return keys.last_token if keys else None
+
+    @classmethod
+    def live_user_count(cls) -> int:
+        with cls._lock:
+            return sum(1 for sessions in cls._by_user.values() if cls._live(sessions))
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._by_ip = {}
+            cls._by_user = {}
+            cls._by_token = {}
+            cls._by_subnet = {}
+            cls._sessions = {}
@@ -78,18 +78,11 @@ class SOCIncidentSimulator:
         print(f"[SIM] Status: {my_proposal['status']}")
         
         # 2. Verify Incident Linking
-        # We need to find the incident ID. 
-        # IncidentManager doesn't have a public list method easily exposed, 
-        # but we can check if Proposal has incident_id or check IncidentManager internal
-        # Actually ProposalRegistry stores it? No, IncidentManager links it.
-        # Let's inspect IncidentManager internals for verification
-        self.incident_id = IncidentManager._ACTIVE_GROUPS.get(self.user_id)
-        if not self.incident_id:
-             # Try Session ID
-             self.incident_id = IncidentManager._ACTIVE_GROUPS.get(self.session_id)
+        # Look the incident up in the correlation index (by session, then user)
+        self.incident_id = IncidentManager.find_incident(session_id=self.session_id, user_id=self.user_id)
         
         if not self.incident_id:
-             print("[WARN] Incident ID not found in Active Groups (Maybe delayed link?)")
+             print("[WARN] Incident ID not found in correlation index (Maybe delayed link?)")
         else:
              print(f"[SIM] Incident Linked: {self.incident_id}")
 
@@ -1,36 +1,222 @@
-from typing import Dict, Any, List
+import bisect
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 from backend.enforcement.state.proposal_registry import ProposalRegistry
+from backend.enforcement.state_machine.enforcement_state_machine import EnforcementState
 from backend.threat_model.threat_taxonomy import ThreatSeverity
+from backend.threat_model.blast_radius import BlastRadiusCalculator
+
+SEVERITY_MULTIPLIERS = {
+    ThreatSeverity.LOW: 1.0,
+    ThreatSeverity.MEDIUM: 1.5,
+    ThreatSeverity.HIGH: 2.0,
+    ThreatSeverity.CRITICAL: 3.0
+}
+MAX_BLAST_MULTIPLIER = 3.0
+
+# Sort key: highest priority first, then oldest first, proposal id as tie-break
+QueueKey = Tuple[float, float, str]
+
+def _status_key(status) -> str:
+    return getattr(status, "value", status)
 
 class QueueManager:
     """
     Manages the SOC Enforcement Queue.
     Prioritizes items based on SOCPriorityScore.
+
+    The queue is a per-status sorted index kept in sync by ProposalRegistry change
+    events (register / status transition / expiry), so reads are a slice of an
+    already-ordered list instead of a full sort per poll. Pages are addressed by an
+    opaque cursor (the last key seen), which stays stable while items come and go.
+    Every change is pushed to SOC clients as a `soc_queue_update` Socket.IO event.
     """
-    
+
+    PUSH_EVENT = "soc_queue_update"
+
+    _keys: Dict[str, QueueKey] = {} # pid -> key
+    _status_of: Dict[str, str] = {} # pid -> status bucket
+    _queues: Dict[str, List[QueueKey]] = {} # status -> ascending keys
+    _lock = threading.RLock()
+
     @staticmethod
     def calculate_priority(proposal: Dict[str, Any]) -> float:
         """
         Priority = RiskScore * BlastMultiplier * SeverityMultiplier
         """
-        risk = proposal.get("risk_score", 0)
-        
-        # Get threat assessment from proposal context or lookup
-        # (Assuming it's stored in registry via context or separate field)
-        # For this stub, we default.
-        severity_mult = 1.0
-        # If High Severity Threat -> Higher Priority
-        
-        return risk * severity_mult
+        risk = float(proposal.get("risk_score") or 0)
+        context = proposal.get("context") or {}
+        assessment = context.get("threat_assessment") or {}
+
+        radius = assessment.get("blast_radius")
+        if not radius:
+            # Proposal registered without threat modeling: estimate it here
+            radius = BlastRadiusCalculator.calculate(
+                proposal.get("suggested_action", ""), proposal.get("session_id") or "", context
+            ).to_dict()
+
+        severity_mult = SEVERITY_MULTIPLIERS.get(assessment.get("severity"), 1.0)
+        return round(risk * QueueManager.blast_multiplier(radius) * severity_mult, 4)
 
     @staticmethod
-    def get_prioritized_queue(status_filter: str = "PENDING_APPROVAL") -> List[Dict[str, Any]]:
-        proposals = ProposalRegistry.list_proposals(status_filter)
-        # Sort by priority desc
-        # Note: proposals is a dict {id: prop}
-        sorted_props = sorted(
-            proposals.values(), 
-            key=lambda p: QueueManager.calculate_priority(p), 
-            reverse=True
+    def blast_multiplier(radius: Dict[str, Any]) -> float:
+        """
+        1.0 for a single session; grows with affected sessions/users, shared assets
+        and irreversibility. Tenant-wide actions get the maximum.
+        """
+        if radius.get("tenant_scope"):
+            return MAX_BLAST_MULTIPLIER
+        mult = 1.0
+        mult += 0.1 * max(0, (radius.get("affected_sessions") or 1) - 1)
+        mult += 0.1 * max(0, (radius.get("affected_users") or 1) - 1)
+        if radius.get("shared_asset"):
+            mult += 0.5
+        mult += 1.0 - float(radius.get("reversibility_score", 1.0))
+        return min(MAX_BLAST_MULTIPLIER, mult)
+
+    # --- Reads --------------------------------------------------------------
+
+    @classmethod
+    def get_prioritized_queue(cls, status_filter: str = EnforcementState.PENDING.value,
+                              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Proposals in `status_filter`, highest priority first (top-k when limit is set).
+        """
+        return cls.get_page(status_filter, limit=limit)["items"]
+
+    @classmethod
+    def top_k(cls, k: int, status_filter: str = EnforcementState.PENDING.value) -> List[Dict[str, Any]]:
+        return cls.get_page(status_filter, limit=k)["items"]
+
+    @classmethod
+    def get_page(cls, status_filter: str = EnforcementState.PENDING.value, limit: Optional[int] = 50,
+                 cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Returns {"items", "next_cursor", "total"}; pass next_cursor back for the next page.
+        Raises ValueError for a malformed cursor.
+        """
+        ProposalRegistry.expire_due() # expiry events prune the index
+        with cls._lock:
+            queue = cls._queues.get(_status_key(status_filter), [])
+            start = bisect.bisect_right(queue, cls._decode_cursor(cursor)) if cursor else 0
+            end = len(queue) if limit is None else start + max(0, int(limit))
+            keys = queue[start:end]
+            next_cursor = cls._encode_cursor(keys[-1]) if keys and end < len(queue) else None
+            total = len(queue)
+
+        items = []
+        for neg_priority, _, pid in keys:
+            proposal = ProposalRegistry.get_proposal(pid)
+            if proposal is not None:
+                items.append({**proposal, "priority_score": -neg_priority})
+        return {"items": items, "next_cursor": next_cursor, "total": total}
+
+    @classmethod
+    def position_of(cls, pid: str) -> Optional[int]:
+        """
+        0-based rank of the proposal within its status queue.
+        """
+        with cls._lock:
+            key = cls._keys.get(pid)
+            if key is None:
+                return None
+            return bisect.bisect_left(cls._queues[cls._status_of[pid]], key)
+
+    # --- Index maintenance (ProposalRegistry listener) ------------------------
+
+    @classmethod
+    def on_registry_event(cls, event: str, proposal: Dict[str, Any], previous_status):
+        if event == "reset":
+            with cls._lock:
+                cls._keys, cls._status_of, cls._queues = {}, {}, {}
+            return
+
+        pid = proposal["id"]
+        with cls._lock:
+            if event in ("registered", "replayed"):
+                cls._remove(pid)
+                key = (-cls.calculate_priority(proposal), proposal["created_at"], pid)
+                cls._keys[pid] = key
+                cls._insert(pid, _status_key(proposal["status"]))
+            elif event == "status":
+                if pid not in cls._keys:
+                    return
+                cls._remove_from_queue(pid)
+                cls._insert(pid, _status_key(proposal["status"]))
+            elif event == "expired":
+                cls._remove(pid)
+            else:
+                return
+            if event == "replayed":
+                return # startup backfill, nothing changed for clients
+            position = cls.position_of(pid)
+            priority = -cls._keys[pid][0] if pid in cls._keys else None
+
+        cls._push({
+            "event": event,
+            "proposal_id": pid,
+            "status": _status_key(proposal.get("status")),
+            "previous_status": _status_key(previous_status),
+            "priority_score": priority,
+            "position": position
+        })
+
+    @classmethod
+    def _insert(cls, pid: str, status: str):
+        cls._status_of[pid] = status
+        bisect.insort(cls._queues.setdefault(status, []), cls._keys[pid])
+
+    @classmethod
+    def _remove_from_queue(cls, pid: str):
+        status = cls._status_of.pop(pid, None)
+        queue = cls._queues.get(status)
+        if queue is None:
+            return
+        key = cls._keys[pid]
+        i = bisect.bisect_left(queue, key)
+        if i < len(queue) and queue[i] == key:
+            del queue[i]
+        if not queue:
+            del cls._queues[status]
+
+    @classmethod
+    def _remove(cls, pid: str):
+        if pid in cls._keys:
+            cls._remove_from_queue(pid)
+            del cls._keys[pid]
+
+    # --- Push ---------------------------------------------------------------
+
+    @classmethod
+    def _push(cls, update: Dict[str, Any]):
+        # Emitted off the enforcement path; bursts on one proposal collapse to its latest state
+        from backend.orchestration.async_dispatcher import AsyncDispatcher
+        AsyncDispatcher.fire_and_forget(
+            "soc_queue_push", cls._emit, update,
+            _priority=2, _coalesce_key=("soc_queue", update["proposal_id"])
         )
-        return sorted_props
+
+    @classmethod
+    def _emit(cls, update: Dict[str, Any]):
+        from backend.extensions import socketio
+        try:
+            socketio.emit(cls.PUSH_EVENT, update)
+        except Exception as e:
+            print(f"[Socket Error] Failed to emit {cls.PUSH_EVENT}: {e}")
+
+    # --- Cursor -------------------------------------------------------------
+
+    @staticmethod
+    def _encode_cursor(key: QueueKey) -> str:
+        return f"{key[0]!r}|{key[1]!r}|{key[2]}"
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> QueueKey:
+        try:
+            neg_priority, created_at, pid = cursor.split("|", 2)
+            return (float(neg_priority), float(created_at), pid)
+        except (AttributeError, ValueError):
+            raise ValueError(f"Invalid queue cursor: {cursor!r}")
+
+# Backfills from proposals registered before this module was imported
+ProposalRegistry.subscribe(QueueManager.on_registry_event, replay=True)
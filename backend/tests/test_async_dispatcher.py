@@ -0,0 +1,98 @@
+import sys
+import os
+import threading
+import unittest
+
+# Add root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.orchestration.async_dispatcher import AsyncDispatcher
+from backend.orchestration.soc_priority import SOCQueuePriority
+
+class TestAsyncDispatcher(unittest.TestCase):
+
+    def setUp(self):
+        AsyncDispatcher.shutdown()
+        self._saved = (AsyncDispatcher.WORKER_COUNT, AsyncDispatcher.LANE_CAPACITY)
+        AsyncDispatcher.WORKER_COUNT = 1
+        AsyncDispatcher.LANE_CAPACITY = 3
+
+    def tearDown(self):
+        AsyncDispatcher.shutdown()
+        AsyncDispatcher.WORKER_COUNT, AsyncDispatcher.LANE_CAPACITY = self._saved
+
+    def _block_worker(self):
+        gate = threading.Event()
+        started = threading.Event()
+        def blocker():
+            started.set()
+            gate.wait(5)
+        AsyncDispatcher.fire_and_forget("blocker", blocker, _priority=SOCQueuePriority.P0)
+        started.wait(5)
+        return gate
+
+    def test_priority_lanes_and_backpressure(self):
+        print("=== Test: Dispatcher Priority Lanes ===")
+        order = []
+        gate = self._block_worker()
+
+        for i in range(3):
+            self.assertTrue(AsyncDispatcher.fire_and_forget("monitor", order.append, f"monitor-{i}", _priority=SOCQueuePriority.P4))
+        # Lane P4 is full -> shed
+        self.assertFalse(AsyncDispatcher.fire_and_forget("monitor", order.append, "monitor-3", _priority=SOCQueuePriority.P4))
+        self.assertTrue(AsyncDispatcher.fire_and_forget("enforce", order.append, "enforce", _priority=SOCQueuePriority.P0))
+
+        metrics = AsyncDispatcher.get_metrics()
+        self.assertEqual(metrics["queue_depth"]["P4"], 3)
+        self.assertGreaterEqual(metrics["dropped_by_lane"]["P4"], 1)
+
+        gate.set()
+        self.assertTrue(AsyncDispatcher.wait_idle())
+        self.assertEqual(order, ["enforce", "monitor-0", "monitor-1", "monitor-2"])
+        print(">>> PASS: High priority served first, full lane sheds.")
+
+    def test_coalescing_per_session(self):
+        print("=== Test: Dispatcher Coalescing ===")
+        seen = []
+        coalesced_before = AsyncDispatcher.get_metrics()["coalesced"]
+        gate = self._block_worker()
+
+        AsyncDispatcher.fire_and_forget("infer", seen.append, ("sess", 10), _priority=SOCQueuePriority.P3, _coalesce_key="sess")
+        AsyncDispatcher.fire_and_forget("infer", seen.append, ("sess", 20), _priority=SOCQueuePriority.P3, _coalesce_key="sess")
+        # Upgraded urgency moves the pending work to the P0 lane
+        AsyncDispatcher.fire_and_forget("infer", seen.append, ("sess", 95), _priority=SOCQueuePriority.P0, _coalesce_key="sess")
+
+        metrics = AsyncDispatcher.get_metrics()
+        self.assertEqual(metrics["queue_depth"]["P3"], 0)
+        self.assertEqual(metrics["queue_depth"]["P0"], 1)
+
+        gate.set()
+        self.assertTrue(AsyncDispatcher.wait_idle())
+        self.assertEqual(seen, [("sess", 95)])
+        self.assertEqual(AsyncDispatcher.get_metrics()["coalesced"] - coalesced_before, 2)
+        print(">>> PASS: Only the latest session state is processed.")
+
+    def test_coalescing_never_downgrades(self):
+        print("=== Test: Less urgent work does not replace pending urgent work ===")
+        seen = []
+        gate = self._block_worker()
+
+        AsyncDispatcher.fire_and_forget("infer", seen.append, "ESCALATE", _priority=SOCQueuePriority.P0, _coalesce_key="s2")
+        AsyncDispatcher.fire_and_forget("infer", seen.append, "ALLOW", _priority=SOCQueuePriority.P4, _coalesce_key="s2")
+        self.assertEqual(AsyncDispatcher.get_metrics()["queue_depth"]["P4"], 0)
+
+        gate.set()
+        self.assertTrue(AsyncDispatcher.wait_idle())
+        self.assertEqual(seen, ["ESCALATE"])
+        print(">>> PASS: ESCALATE kept.")
+
+    def test_priority_kwarg_reaches_task(self):
+        print("=== Test: priority / coalesce_key are passed through to the task ===")
+        seen = []
+        AsyncDispatcher.fire_and_forget("kw", lambda **kw: seen.append(kw), priority="HIGH", coalesce_key="k")
+        self.assertTrue(AsyncDispatcher.wait_idle())
+        self.assertEqual(seen, [{"priority": "HIGH", "coalesce_key": "k"}])
+        print(">>> PASS: task kwargs untouched.")
+
+if __name__ == '__main__':
+    unittest.main()
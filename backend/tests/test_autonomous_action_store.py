@@ -0,0 +1,70 @@
+import sys
+import os
+import time
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.autonomous_response.engine import AutonomousResponseEngine
+from backend.autonomous_response.action import ActionType
+from backend.autonomous_response.action_store import JsonlActionStore
+
+class TestAutonomousActionStore(unittest.TestCase):
+
+    def setUp(self):
+        AutonomousResponseEngine.configure_store(None)
+        AutonomousResponseEngine.reset()
+
+    def tearDown(self):
+        AutonomousResponseEngine.configure_store(None)
+        AutonomousResponseEngine.reset()
+
+    def _propose(self, target, confidence=0.95):
+        return AutonomousResponseEngine.propose_action(ActionType.CAPTCHA, target, "test", confidence)
+
+    def test_one_active_action_per_target_until_expiry(self):
+        print("=== Test: Indexed Autonomous Actions ===")
+        first = self._propose("u1")
+        self.assertIsNotNone(first)
+        self.assertIsNone(self._propose("u1"), "No stacking on an active target")
+        self.assertIsNone(self._propose("u2", confidence=0.5))
+        self.assertIsNotNone(self._propose("u2"))
+        self.assertEqual(AutonomousResponseEngine.get_active_action("u1"), first)
+
+        # Jump past the 15 minute expiry: retired from the heap, target free again
+        with patch("backend.autonomous_response.engine.time.time", return_value=time.time() + 16 * 60):
+            self.assertEqual(AutonomousResponseEngine.get_active_actions(), [])
+            self.assertFalse(first.is_active)
+            self.assertIsNotNone(self._propose("u1"))
+        self.assertEqual(len(AutonomousResponseEngine._actions), 1)
+        print(">>> PASS: Expired actions retired; targets freed.")
+
+    def test_revocation_and_durable_reload(self):
+        print("=== Test: Durable Action Journal ===")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "actions.jsonl")
+            AutonomousResponseEngine.configure_store(JsonlActionStore(path))
+            kept = self._propose("u1")
+            revoked = self._propose("u2")
+            self.assertTrue(AutonomousResponseEngine.revoke_action(revoked.action_id, "analyst", "false positive"))
+            self.assertFalse(AutonomousResponseEngine.revoke_action(revoked.action_id, "analyst", "again"))
+            self.assertIsNotNone(self._propose("u2"), "Revocation frees the target")
+            self.assertEqual(AutonomousResponseEngine.get_recent_history()[0].revoked_by, "analyst")
+
+            # "Restart": fresh in-memory state, reload from the journal
+            AutonomousResponseEngine.configure_store(None)
+            AutonomousResponseEngine.reset()
+            AutonomousResponseEngine.configure_store(JsonlActionStore(path))
+            active = {a.target_entity: a for a in AutonomousResponseEngine.get_active_actions()}
+            self.assertEqual(set(active), {"u1", "u2"})
+            self.assertEqual(active["u1"].action_id, kept.action_id)
+            self.assertNotEqual(active["u2"].action_id, revoked.action_id)
+            with open(path) as f:
+                self.assertEqual(len(f.readlines()), 2, "Journal compacted on load")
+        print(">>> PASS: Active actions survive a restart.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import sys
+import os
+import unittest
+
+# Add root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.scripts.benchmark_ingestion import Workload, parse_mix, percentiles, compare, reset_session_state
+
+class TestBenchmarkIngestion(unittest.TestCase):
+
+    def test_workload_is_deterministic(self):
+        print("=== Test: Benchmark Workload Determinism ===")
+        mix = parse_mix("web=1,auth=1,network=1")
+        first = list(Workload(7, 50, mix, bot_ratio=0.2, attack_ratio=0.2).events(300))
+        second = list(Workload(7, 50, mix, bot_ratio=0.2, attack_ratio=0.2).events(300))
+        self.assertEqual(first, second)
+        self.assertEqual({kind for kind, _ in first}, {"web", "auth", "network"})
+        self.assertTrue(any(p["actor_id"].startswith("bot_user") for _, p in first))
+        self.assertNotEqual(first, list(Workload(8, 50, mix).events(300)))
+        with self.assertRaises(ValueError):
+            parse_mix("smtp=1")
+        print(">>> PASS: Same seed, same workload.")
+
+    def test_compare_flags_regressions_beyond_tolerance(self):
+        print("=== Test: Benchmark Baseline Comparison ===")
+        self.assertEqual(percentiles([i / 1000.0 for i in range(1, 101)])["p95"], 95.0)
+
+        def report(eps, p99, stage_p99, count=100):
+            return {
+                "events_per_sec": eps,
+                "overall": {"p95": 5.0, "p99": p99},
+                "endpoints": {"web": {"count": count, "p95": 5.0, "p99": p99}},
+                "stages_ms": {"fusion": {"count": count, "p95": 0.1, "p99": stage_p99}},
+            }
+
+        baseline = report(200.0, 10.0, 0.2)
+        self.assertEqual(compare(report(190.0, 11.0, 0.22), baseline, 0.15), [])
+        regressions = compare(report(150.0, 10.0, 0.5), baseline, 0.15)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith("events_per_sec"))
+        self.assertTrue(regressions[1].startswith("stage.fusion.p99"))
+        # Too few samples to gate on
+        self.assertEqual(compare(report(200.0, 10.0, 0.5, count=10), baseline, 0.15), [])
+        print(">>> PASS: Regressions flagged, noise tolerated.")
+
+    def test_reset_clears_all_session_state(self):
+        print("=== Test: Benchmark phases start from empty session state ===")
+        from backend.services.ingestion_service import IngestionService
+        from backend.services.observation_service import SessionStateEngine
+        from backend.services.session_reverse_index import SessionReverseIndex
+        from backend.ml.registry.model_registry import ModelRegistry
+        from backend.ml import inference_pipeline # registers the anomaly model
+
+        for kind, payload in Workload(3, 10).events(20):
+            IngestionService._update_state(IngestionService._normalize_event(payload, kind))
+        self.assertTrue(SessionStateEngine._sessions and SessionStateEngine._created_index)
+        self.assertTrue(SessionReverseIndex._sessions)
+        ModelRegistry.get_model("anomaly").predict({"failed_login_attempts": 3}, tenant_id="t1")
+        self.assertTrue(ModelRegistry.get_model("anomaly").snapshot()["tenants"])
+
+        reset_session_state()
+        self.assertEqual(SessionStateEngine._sessions, {})
+        self.assertEqual(SessionStateEngine._created_index, [])
+        self.assertEqual(SessionReverseIndex._sessions, {})
+        self.assertEqual(SessionReverseIndex._by_ip, {})
+        self.assertEqual(ModelRegistry.get_model("anomaly").snapshot()["tenants"], {})
+        print(">>> PASS: Sessions, created index, reverse index and anomaly baselines emptied.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import sys
+import os
+import gzip
+import json
+import time
+import tempfile
+import threading
+import unittest
+
+# Add root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from flask import Flask
+from backend.extensions import db
+from backend.db.models import AuditLog
+from backend.audit.audit_log import AuditLogger
+from backend.institutional_memory.storage import MemoryRecorder, MemoryRetriever
+from backend.institutional_memory.models import MemoryType
+from backend.compliance import export_engine
+from backend.compliance.export_engine import ComplianceExportEngine
+from backend.compliance.exporter import AuditExporter
+
+class TestComplianceExport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.app = Flask(__name__)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(self.tmp.name, 'export.db')}"
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.metadata.create_all(bind=db.engine, tables=[AuditLog.__table__])
+
+        self._saved = (MemoryRecorder._memory_store, MemoryRecorder._by_entity, MemoryRecorder._by_type, export_engine.EXPORT_DIR)
+        MemoryRecorder._memory_store, MemoryRecorder._by_entity, MemoryRecorder._by_type = [], {}, {}
+        export_engine.EXPORT_DIR = os.path.join(self.tmp.name, "exports")
+
+        logger = AuditLogger()
+        for i in range(7):
+            logger.append({"action": f"STEP_{i}", "actor": "alice" if i % 2 else "bob", "details": {"i": i}})
+        for i in range(4):
+            MemoryRecorder.record_decision("alice", "ALLOW", 10.0 * i, {"i": i})
+        MemoryRecorder.record_override("alice", "BLOCK", "ALLOW", "analyst_1")
+        MemoryRecorder.record_decision("bob", "BLOCK", 90.0, {})
+
+    def tearDown(self):
+        MemoryRecorder._memory_store, MemoryRecorder._by_entity, MemoryRecorder._by_type, export_engine.EXPORT_DIR = self._saved
+        db.session.remove()
+        db.engine.dispose()
+        self.ctx.pop()
+        self.tmp.cleanup()
+
+    def _wait(self, job_id):
+        deadline = time.time() + 10
+        while time.time() < deadline:
+            job = ComplianceExportEngine.get_job(job_id)
+            if job["status"] != "RUNNING":
+                return job
+            time.sleep(0.02)
+        self.fail("export job did not finish")
+
+    def test_stream_pages_and_counts(self):
+        print("=== Test: Streaming Compliance Export ===")
+        pages = list(ComplianceExportEngine.iter_audit_pages({}, page_size=3))
+        self.assertEqual([len(records) for _, records in pages], [3, 3, 1])
+        self.assertEqual([r["action"] for _, rs in pages for r in rs], [f"STEP_{i}" for i in range(7)])
+
+        body = gzip.decompress(b"".join(AuditExporter.stream_decision_history("alice", fmt="gzip")))
+        records = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual(sum(r["kind"] == "audit" for r in records), 3)
+        self.assertEqual(sum(r["kind"] == "memory" for r in records), 5)
+
+        counts = ComplianceExportEngine.counts({"entity_id": "alice"})
+        self.assertEqual((counts["audit"], counts["memory"]), (3, 5))
+        self.assertEqual(MemoryRetriever.count_memories(memory_type=MemoryType.OVERRIDE), 1)
+        self.assertEqual(json.loads(AuditExporter.generate_policy_report())["total_overrides"], 1)
+        self.assertEqual([m.entity_id for m in MemoryRetriever.get_memories(limit=2)], ["bob", "alice"])
+        print(">>> PASS: Pages, filters and aggregate counts agree.")
+
+    def test_job_resumes_from_checkpoint(self):
+        print("=== Test: Resumable Compliance Export Job ===")
+        job = self._wait(ComplianceExportEngine.start_job({}, fmt="ndjson")["job_id"])
+        self.assertEqual(job["status"], "COMPLETED")
+        self.assertEqual(job["progress"], 1.0)
+        with open(job["output_path"], "rb") as f:
+            complete = f.read()
+        lines = complete.splitlines(keepends=True)
+        self.assertEqual(len(lines), 7 + 6)
+
+        # Simulate a crash after the first 3 audit rows, with a torn write behind the checkpoint
+        third = json.loads(lines[2])
+        state_path = ComplianceExportEngine._state_path(job["job_id"])
+        with open(state_path) as f:
+            state = json.load(f)
+        state.update(status="RUNNING", phase="audit", audit_cursor=[third["created_at"], third["id"]],
+                     memory_cursor=-1, records_exported=3, bytes_written=len(b"".join(lines[:3])))
+        with open(state_path, "w") as f:
+            json.dump(state, f)
+        with open(job["output_path"], "wb") as f:
+            f.write(b"".join(lines[:4]) + b'{"kind": "aud')
+        ComplianceExportEngine._jobs.clear()
+
+        resumed = self._wait(ComplianceExportEngine.resume_job(job["job_id"])["job_id"])
+        self.assertEqual(resumed["status"], "COMPLETED")
+        self.assertEqual(resumed["records_exported"], 13)
+        with open(job["output_path"], "rb") as f:
+            self.assertEqual(f.read(), complete)
+        print(">>> PASS: Resumed export is byte-identical to an uninterrupted one.")
+
+    def test_concurrent_records_keep_indexes_consistent(self):
+        print("=== Test: Concurrent MemoryRecorder writers ===")
+        def writer(n):
+            for i in range(500):
+                MemoryRecorder.record_decision(f"w{n}", "ALLOW", 1.0, {"i": i})
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for n in range(4):
+            positions = MemoryRecorder._by_entity[f"w{n}"]
+            self.assertEqual(len(positions), 500)
+            self.assertTrue(all(MemoryRecorder._memory_store[p].entity_id == f"w{n}" for p in positions))
+        print(">>> PASS: Every indexed position points at its own memory.")
+
+    def test_cursor_from_another_process_restarts_memory_phase(self):
+        print("=== Test: Memory cursor is scoped to its store ===")
+        job = self._wait(ComplianceExportEngine.start_job({}, fmt="ndjson")["job_id"])
+        state_path = ComplianceExportEngine._state_path(job["job_id"])
+        with open(state_path) as f:
+            state = json.load(f)
+        with open(job["output_path"], "rb") as f:
+            audit_bytes = sum(len(line) for line in f.readlines()[:7])
+        state.update(status="FAILED", phase="memory", memory_cursor=3, memory_store_id="previous-process",
+                     records_exported=7, bytes_written=audit_bytes)
+        with open(state_path, "w") as f:
+            json.dump(state, f)
+        ComplianceExportEngine._jobs.clear()
+
+        resumed = self._wait(ComplianceExportEngine.resume_job(job["job_id"])["job_id"])
+        self.assertEqual(resumed["records_exported"], 13) # all 6 memories, not the 2 after position 3
+        self.assertEqual(resumed["memory_store_id"], MemoryRecorder.STORE_ID)
+        print(">>> PASS: Foreign cursor discarded.")
+
+    def test_finished_jobs_leave_memory(self):
+        print("=== Test: Finished export jobs are not kept in memory ===")
+        job = self._wait(ComplianceExportEngine.start_job({}, fmt="ndjson")["job_id"])
+        deadline = time.time() + 5
+        while job["job_id"] in ComplianceExportEngine._jobs and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertNotIn(job["job_id"], ComplianceExportEngine._jobs)
+        self.assertEqual(ComplianceExportEngine.get_job(job["job_id"])["status"], "COMPLETED") # from its state file
+        self.assertNotIn(job["job_id"], ComplianceExportEngine._jobs)
+        print(">>> PASS: Job served from disk after completion.")
+
+if __name__ == '__main__':
+    unittest.main()
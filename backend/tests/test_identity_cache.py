@@ -0,0 +1,64 @@
+import sys
+import os
+import unittest
+
+# Add root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from flask import Flask
+from backend.extensions import db
+from backend.db.models import User
+from backend.services.identity_cache import UserIdentityCache, mark_password_reset, force_password_reset
+
+
+class TestUserIdentityCache(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.metadata.create_all(bind=db.engine, tables=[User.__table__])
+        for n in range(3):
+            db.session.add(User(user_id=f"u{n}", username=f"alice{n}", role="USER", platform="TARGET_APP"))
+        db.session.commit()
+        UserIdentityCache.reset()
+
+    def tearDown(self):
+        UserIdentityCache.reset()
+        db.session.remove()
+        db.metadata.drop_all(bind=db.engine, tables=[User.__table__])
+        self.ctx.pop()
+
+    def test_resolves_username_or_user_id_once(self):
+        print("=== Test: Identifiers resolve by username or user_id and are cached ===")
+        resolved = UserIdentityCache.resolve_many(["alice0", "u1", "ghost", "alice0"])
+        self.assertEqual(resolved, {"alice0": "u0", "u1": "u1", "ghost": None})
+        self.assertEqual(UserIdentityCache.stats()["misses"], 3)
+
+        self.assertEqual(UserIdentityCache.resolve("alice0"), "u0")
+        self.assertIsNone(UserIdentityCache.resolve("ghost")) # negative result cached too
+        self.assertEqual(UserIdentityCache.stats()["hits"], 2)
+        print(">>> PASS: one lookup for three identifiers")
+
+    def test_user_update_invalidates(self):
+        print("=== Test: Renaming a user drops cached identities ===")
+        self.assertEqual(UserIdentityCache.resolve("alice2"), "u2")
+        db.session.get(User, "u2").username = "bob"
+        db.session.commit()
+        self.assertIsNone(UserIdentityCache.resolve("alice2"))
+        self.assertEqual(UserIdentityCache.resolve("bob"), "u2")
+        print(">>> PASS: stale username not served")
+
+    def test_bulk_password_reset(self):
+        print("=== Test: mark_password_reset flags many users in one UPDATE ===")
+        self.assertEqual(mark_password_reset(["u0", "u1", "u0"], commit=True), 2)
+        self.assertEqual(mark_password_reset(["u0", "u1", "u2"], commit=True), 1) # already flagged skipped
+        self.assertEqual(force_password_reset(["alice0", "ghost"], commit=True), 0)
+        self.assertTrue(all(u.password_reset_required for u in User.query.all()))
+        print(">>> PASS: 3 users flagged")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import sys
+import os
+import unittest
+
+# Add root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.incidents.correlation_index import CorrelationIndex
+from backend.incidents.enums import IncidentSeverity
+
+class TestIncidentCorrelationIndex(unittest.TestCase):
+
+    def setUp(self):
+        CorrelationIndex.reset()
+
+    def tearDown(self):
+        CorrelationIndex.reset()
+
+    def test_signals_correlate_by_key_not_by_tenant(self):
+        print("=== Test: Keyed Incident Correlation ===")
+        a, created_a = CorrelationIndex.attach({"tenant_id": "t1", "session_id": "s1", "actor_id": "u1"}, IncidentSeverity.HIGH, now=100)
+        b, created_b = CorrelationIndex.attach({"tenant_id": "t1", "session_id": "s2", "actor_id": "u1"}, IncidentSeverity.CRITICAL, now=101)
+        c, created_c = CorrelationIndex.attach({"tenant_id": "t1", "session_id": "s3", "actor_id": "u2"}, IncidentSeverity.HIGH, now=102)
+        d, _ = CorrelationIndex.attach({"tenant_id": "t2", "session_id": "s1"}, IncidentSeverity.HIGH, now=103)
+
+        self.assertTrue(created_a and created_c)
+        self.assertFalse(created_b)
+        self.assertEqual(a, b, "Same actor should join the open incident")
+        self.assertNotEqual(a, c, "Unrelated sessions must not be lumped together")
+        self.assertNotEqual(a, d, "Tenants are isolated")
+        self.assertEqual(CorrelationIndex.get(a)["severity"], "CRITICAL")
+        self.assertEqual(CorrelationIndex.find("t1", ("session", "s2")), a)
+        print(">>> PASS: Signals grouped per session/actor within tenant.")
+
+    def test_pending_writes_coalesce_per_incident(self):
+        print("=== Test: Coalesced Correlation Writes ===")
+        for i in range(50):
+            CorrelationIndex.attach({"tenant_id": "t1", "ip_address": "10.0.0.9", "session_id": f"s{i}"}, IncidentSeverity.HIGH, now=100 + i)
+        pending = CorrelationIndex.drain()
+        self.assertEqual(len(pending), 1)
+        change = next(iter(pending.values()))
+        self.assertTrue(change["created"])
+        self.assertEqual(change["signals"], 50)
+        self.assertEqual(len(change["keys"]), 51) # ip + 50 sessions
+        self.assertEqual(CorrelationIndex.drain(), {})
+
+        CorrelationIndex.requeue(pending)
+        self.assertEqual(next(iter(CorrelationIndex.drain().values()))["signals"], 50)
+        print(">>> PASS: One pending write per incident.")
+
+    def test_keys_expire_and_index_rebuilds(self):
+        print("=== Test: Correlation Window Expiry & Rebuild ===")
+        window = CorrelationIndex.WINDOW_SEC
+        a, _ = CorrelationIndex.attach({"session_id": "s1"}, IncidentSeverity.HIGH, now=0)
+        CorrelationIndex.attach({"session_id": "s9"}, IncidentSeverity.HIGH, now=window + 1)
+        self.assertIsNone(CorrelationIndex.find("default", ("session", "s1")))
+        self.assertIsNone(CorrelationIndex.get(a))
+        b, created = CorrelationIndex.attach({"session_id": "s1"}, IncidentSeverity.HIGH, now=window + 2)
+        self.assertTrue(created)
+        self.assertNotEqual(a, b)
+
+        CorrelationIndex.close(b)
+        self.assertIsNone(CorrelationIndex.find("default", ("session", "s1")))
+
+        count = CorrelationIndex.load([
+            ("inc-1", "t1", IncidentSeverity.HIGH, [(("session", "s1"), window + 100.0), (("user", "u1"), 10.0)])
+        ], now=window + 160.0)
+        self.assertEqual(count, 1)
+        self.assertEqual(CorrelationIndex.find("t1", ("session", "s1")), "inc-1")
+        self.assertIsNone(CorrelationIndex.find("t1", ("user", "u1")), "Stale key skipped on rebuild")
+        print(">>> PASS: Stale keys expire; index rebuilt from persisted keys.")
+
+if __name__ == '__main__':
+    unittest.main()
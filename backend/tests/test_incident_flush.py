@@ -0,0 +1,76 @@
+import sys
+import os
+import unittest
+
+# Add root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from flask import Flask
+from backend.extensions import db
+from backend.db.models import Session, Incident, Signal
+from backend.incidents import incident_manager
+from backend.incidents.incident_manager import IncidentManager, MAX_FLUSH_ATTEMPTS
+from backend.incidents.correlation_index import CorrelationIndex
+from backend.incidents.enums import IncidentSeverity
+
+TABLES = [Session.__table__, Incident.__table__, Signal.__table__]
+
+
+class TestIncidentFlush(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.metadata.create_all(bind=db.engine, tables=TABLES)
+        db.session.add(Session(session_id="S1"))
+        db.session.commit()
+        CorrelationIndex.reset()
+        IncidentManager._dead_letters.clear()
+        self._delay = incident_manager.RETRY_DELAY_SEC
+        incident_manager.RETRY_DELAY_SEC = 3600 # retries are driven by hand below
+
+    def tearDown(self):
+        incident_manager.RETRY_DELAY_SEC = self._delay
+        if IncidentManager._retry_timer is not None:
+            IncidentManager._retry_timer.cancel()
+            IncidentManager._retry_timer = None
+        CorrelationIndex.reset()
+        db.session.remove()
+        db.metadata.drop_all(bind=db.engine, tables=TABLES)
+        self.ctx.pop()
+
+    def test_bad_change_does_not_block_others(self):
+        print("=== Test: A failing incident change is retried alone, then dead-lettered ===")
+        good, _ = CorrelationIndex.attach({"tenant_id": "t1", "session_id": "S1"}, IncidentSeverity.HIGH)
+        CorrelationIndex.requeue({"bad": {"created": True, "tenant_id": None, "severity": None,
+                                          "keys": [], "signals": 1}}) # tenant_id is NOT NULL
+
+        self.assertEqual(IncidentManager.flush(), 1)
+        self.assertIsNotNone(db.session.get(Incident, good))
+        self.assertEqual(Signal.query.filter_by(incident_id=good).count(), 1)
+
+        for _ in range(MAX_FLUSH_ATTEMPTS - 1):
+            IncidentManager.flush()
+        self.assertEqual([d["incident_id"] for d in IncidentManager.dead_letters()], ["bad"])
+        self.assertEqual(CorrelationIndex.drain(), {})
+        print(">>> PASS: good incident persisted, bad one dead-lettered")
+
+    def test_uncommitted_session_is_bound_later(self):
+        print("=== Test: Correlation keys wait for their session row ===")
+        incident_id, _ = CorrelationIndex.attach({"tenant_id": "t1", "session_id": "S2"}, IncidentSeverity.HIGH)
+        self.assertEqual(IncidentManager.flush(), 1)
+        self.assertIsNotNone(db.session.get(Incident, incident_id))
+        self.assertEqual(Signal.query.count(), 0) # S2 not committed: no FK-bound row yet
+
+        db.session.add(Session(session_id="S2"))
+        db.session.commit()
+        IncidentManager.flush()
+        self.assertEqual(Signal.query.filter_by(incident_id=incident_id, session_id="S2").count(), 1)
+        print(">>> PASS: signal row written once the session exists")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import sys
+import os
+import unittest
+from datetime import datetime, timedelta
+
+# Add root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from flask import Flask
+from backend.extensions import db
+from backend.db.models import Incident, AuditLog
+from backend.incidents.enums import IncidentStatus, IncidentSeverity
+from backend.services.incident_listing_service import IncidentListingService
+
+class TestIncidentListing(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.metadata.create_all(bind=db.engine, tables=[Incident.__table__, AuditLog.__table__])
+        IncidentListingService.ensure_indexes()
+        IncidentListingService.invalidate_counts()
+
+        base = datetime(2026, 1, 1, 12, 0, 0)
+        statuses = [IncidentStatus.OPEN, IncidentStatus.CONTAINED, IncidentStatus.RESOLVED]
+        for i in range(9):
+            db.session.add(Incident(
+                incident_id=f"inc-{i}", tenant_id="t1" if i % 2 == 0 else "t2",
+                status=statuses[i % 3],
+                severity=IncidentSeverity.CRITICAL if i == 4 else IncidentSeverity.HIGH,
+                # Two incidents share a timestamp to exercise the id tie-break
+                created_at=base + timedelta(minutes=min(i, 7))
+            ))
+        for i in range(5):
+            db.session.add(AuditLog(
+                id=f"log-{i}", prev_hash=f"h{i - 1}", hash=f"h{i}", actor="analyst", role="ANALYST",
+                platform="SECURITY_PLATFORM", tenant_id="t1", request_id=f"r{i}",
+                action="INCIDENT_CONTAINED" if i % 2 else "LOGIN", details={},
+                created_at=base + timedelta(minutes=i)
+            ))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.metadata.drop_all(bind=db.engine, tables=[AuditLog.__table__, Incident.__table__])
+        IncidentListingService.invalidate_counts()
+        self.ctx.pop()
+
+    def test_incident_keyset_pages_and_filters(self):
+        print("=== Test: Incident Keyset Pagination ===")
+        seen, cursor = [], None
+        while True:
+            page = IncidentListingService.list_incidents({}, cursor=cursor, limit=4)
+            seen.extend(item["incident_id"] for item in page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(seen, ["inc-8", "inc-7", "inc-6", "inc-5", "inc-4", "inc-3", "inc-2", "inc-1", "inc-0"])
+
+        items = IncidentListingService.list_incidents({"tenant_id": "t1", "status": "open"})["items"]
+        self.assertEqual([i["incident_id"] for i in items], ["inc-6", "inc-0"])
+        items = IncidentListingService.list_incidents({"severity": "CRITICAL"})["items"]
+        self.assertEqual([i["incident_id"] for i in items], ["inc-4"])
+        items = IncidentListingService.list_incidents({"since": "2026-01-01T12:05:00Z", "until": "2026-01-01T12:07:00"})["items"]
+        self.assertEqual([i["incident_id"] for i in items], ["inc-6", "inc-5"])
+
+        with self.assertRaises(ValueError):
+            IncidentListingService.list_incidents({"status": "EXPLODED"})
+        with self.assertRaises(ValueError):
+            IncidentListingService.list_incidents({}, cursor="not-a-cursor")
+        print(">>> PASS: Pages are stable and filters applied.")
+
+    def test_counts_are_cached_and_audit_pages(self):
+        print("=== Test: Cached Counts & Audit Listing ===")
+        first = IncidentListingService.count_incidents({"tenant_id": "t1"})
+        self.assertEqual(first["total"], 5)
+        self.assertFalse(first["cached"])
+        open_only = IncidentListingService.count_incidents({"tenant_id": "t1", "status": "OPEN"})
+        self.assertTrue(open_only["cached"], "Status tabs share one cached GROUP BY")
+        self.assertEqual(open_only["total"], 2)
+
+        db.session.add(Incident(incident_id="inc-new", tenant_id="t1"))
+        db.session.commit()
+        self.assertEqual(IncidentListingService.count_incidents({"tenant_id": "t1"})["total"], 5)
+        IncidentListingService.invalidate_counts()
+        self.assertEqual(IncidentListingService.count_incidents({"tenant_id": "t1"})["total"], 6)
+
+        page = IncidentListingService.list_audit_logs({"action": "LOGIN"}, limit=2)
+        self.assertEqual([l["id"] for l in page["items"]], ["log-4", "log-2"])
+        rest = IncidentListingService.list_audit_logs({"action": "LOGIN"}, cursor=page["next_cursor"], limit=2)
+        self.assertEqual([l["id"] for l in rest["items"]], ["log-0"])
+        self.assertIsNone(rest["next_cursor"])
+        self.assertEqual(IncidentListingService.count_audit_logs({"tenant_id": "t1"})["total"], 5)
+        print(">>> PASS: Counts cached; audit log keyset pages.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import sys
+import os
+import unittest
+from unittest import mock
+
+# Add root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.adapters.infra_sampling import FileFeedSampler, WindowAggregator
+from backend.adapters.infra_collector import InfraCollector
+
+class TestInfraCollector(unittest.TestCase):
+
+    def test_shed_window_holds_back_feed_checkpoint(self):
+        print("=== Test: A shed window keeps feed offsets from passing it ===")
+        feed = mock.Mock(spec=FileFeedSampler)
+        InfraCollector._samplers = [feed]
+        InfraCollector._aggregator = WindowAggregator(window_seconds=5)
+        InfraCollector._shed.clear()
+        InfraCollector._replay_floor = None
+        accepting = []
+        def dispatch(name, func, event):
+            if accepting:
+                func(event)
+            return bool(accepting)
+
+        with mock.patch("backend.adapters.infra_collector.AsyncDispatcher.fire_and_forget", side_effect=dispatch), \
+             mock.patch("backend.adapters.infra_collector.IngestionService.ingest_infra_event"):
+            InfraCollector._emit_event({"timestamp": 10.0, "session_id": "edge-07"})
+            InfraCollector._commit_feeds(100.0)
+            feed.commit_through.assert_called_with(5.0) # not past the shed window
+
+            accepting.append(True)
+            InfraCollector._retry_shed()
+            InfraCollector._commit_feeds(100.0)
+            feed.commit_through.assert_called_with(100.0)
+
+            # Past MAX_SHED_WINDOWS the oldest is given up on; a restart must replay it
+            accepting.clear()
+            with mock.patch.object(InfraCollector, "MAX_SHED_WINDOWS", 1):
+                InfraCollector._emit_event({"timestamp": 110.0, "session_id": "edge-07"})
+                InfraCollector._emit_event({"timestamp": 115.0, "session_id": "edge-07"})
+            accepting.append(True)
+            InfraCollector._retry_shed()
+            InfraCollector._commit_feeds(200.0)
+            feed.commit_through.assert_called_with(105.0)
+        self.assertEqual(InfraCollector._inflight, {})
+        InfraCollector._samplers, InfraCollector._replay_floor = [], None
+        print(">>> PASS: Checkpoint waits for re-dispatch, stays behind a dropped window.")
+
+if __name__ == '__main__':
+    unittest.main()
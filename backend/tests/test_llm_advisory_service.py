@@ -0,0 +1,105 @@
+import unittest
+import sys
+import os
+import threading
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.llm.advisory_service import AdvisoryService
+from backend.llm.backends import AdvisoryBackend, LocalAdvisoryBackend
+
+
+class _RecordingBackend(LocalAdvisoryBackend):
+    name = "recording"
+
+    def __init__(self, delay_sec=0.0):
+        super().__init__(delay_sec)
+        self.batches = []
+
+    def advise(self, contexts):
+        self.batches.append(len(contexts))
+        return super().advise(contexts)
+
+
+class _BrokenBackend(AdvisoryBackend):
+    name = "broken"
+
+    def advise(self, contexts):
+        return [{"risk_summary": "x", "recommended_actions": "not-a-list", "confidence": 7}] * len(contexts)
+
+
+class TestAdvisoryService(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = _RecordingBackend()
+        AdvisoryService.configure(self.backend)
+        AdvisoryService.reset()
+
+    def tearDown(self):
+        AdvisoryService.configure(LocalAdvisoryBackend())
+        AdvisoryService.reset()
+
+    def _parallel(self, contexts, deadline=2.0):
+        results = [None] * len(contexts)
+        def call(i):
+            results[i] = AdvisoryService.get_advice(contexts[i], deadline=deadline)
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(len(contexts))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results
+
+    def test_repeated_context_served_from_cache(self):
+        print("\n=== Test: Repeated context hits the cache ===")
+        first = AdvisoryService.get_advice({"risk": "HIGH", "incident_id": "i1", "timestamp": 1})
+        second = AdvisoryService.get_advice({"incident_id": "i1", "risk": "HIGH", "timestamp": 2})
+        self.assertEqual(first, second)
+        self.assertEqual(self.backend.calls, 1)
+        self.assertEqual(AdvisoryService.stats()["hit"], 1)
+        print(">>> PASS: One backend call for two requests")
+
+    def test_concurrent_identical_requests_coalesce(self):
+        print("\n=== Test: Concurrent identical requests share one call ===")
+        self.backend.delay_sec = 0.1
+        results = self._parallel([{"risk": "LOW", "incident_id": "i2"}] * 8)
+        self.assertEqual(sum(self.backend.batches), 1)
+        self.assertTrue(all(r == results[0] for r in results))
+        self.assertEqual(AdvisoryService.stats()["coalesced"], 7)
+        print(">>> PASS: 8 callers, 1 context sent")
+
+    def test_distinct_requests_are_batched(self):
+        print("\n=== Test: Distinct concurrent misses are batched ===")
+        self.backend.delay_sec = 0.05
+        self._parallel([{"risk": "LOW", "incident_id": f"i{n}"} for n in range(6)])
+        self.assertEqual(sum(self.backend.batches), 6)
+        self.assertLess(len(self.backend.batches), 6)
+        print(f">>> PASS: 6 contexts in {len(self.backend.batches)} backend calls")
+
+    def test_deadline_returns_fallback_then_late_result_is_cached(self):
+        print("\n=== Test: Deadline falls back; late result fills the cache ===")
+        self.backend.delay_sec = 0.3
+        context = {"risk": "HIGH", "incident_id": "slow"}
+        advice = AdvisoryService.get_advice(context, deadline=0.05)
+        self.assertEqual(advice["confidence"], 0.0)
+        self.assertIn("deadline", advice["reason"])
+
+        AdvisoryService.get_advice(context, deadline=2.0) # joins the in-flight call
+        advice = AdvisoryService.get_advice(context, deadline=0.01)
+        self.assertNotIn("reason", advice)
+        self.assertEqual(self.backend.calls, 1)
+        print(">>> PASS: Fallback within deadline, no duplicate call")
+
+    def test_schema_violation_is_not_cached(self):
+        print("\n=== Test: Invalid backend output falls back and is not cached ===")
+        AdvisoryService.configure(_BrokenBackend())
+        advice = AdvisoryService.get_advice({"risk": "HIGH"})
+        self.assertEqual(advice["confidence"], 0.0)
+        self.assertIn("schema", advice["reason"])
+        self.assertEqual(AdvisoryService.stats()["cache_size"], 0)
+        print(">>> PASS: Guarded fallback, cache empty")
+
+
+if __name__ == '__main__':
+    unittest.main()
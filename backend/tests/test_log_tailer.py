@@ -0,0 +1,129 @@
+import sys
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+# Add root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.adapters import log_tailer
+from backend.adapters.log_tailer import LogTailer, OffsetCheckpointStore
+from backend.adapters.nginx_adapter import NginxAdapter
+from backend.services.ingestion_service import IngestionService
+
+LINE = '10.0.0.{i} - - [01/Feb/2026:10:00:00 +0000] "GET /item/{i}?q=a b HTTP/1.1" 200 {i}12 "https://ref/{i}" "Mozilla/5.0 (X11; Linux)"'
+
+class TestLogTailer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.tmp.name, "access.log")
+        self.offsets = os.path.join(self.tmp.name, "offsets.json")
+        self.received = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, path, start, count, mode="a"):
+        with open(path, mode) as f:
+            for i in range(start, start + count):
+                f.write(LINE.format(i=i) + "\n")
+
+    def _tailer(self, batch_lines=4):
+        return LogTailer(self.log, self.received.extend, OffsetCheckpointStore(self.offsets),
+                         batch_lines=batch_lines, start_at_end=False)
+
+    def test_checkpoint_resume_and_rotation(self):
+        print("=== Test: Log Tailer Checkpoints & Rotation ===")
+        self._write(self.log, 0, 10)
+        with open(self.log, "a") as f:
+            f.write('10.0.0.99 - - [01/Feb/2026:10:00:00 +0000] "GET /partial')  # no newline yet
+
+        tailer = self._tailer()
+        self.assertEqual(tailer.poll(), 10)
+        tailer._close()
+
+        # Restart: resumes at the checkpoint, completes the partial line
+        with open(self.log, "a") as f:
+            f.write(' HTTP/1.1" 200 1 "-" "curl"\n')
+        tailer = self._tailer()
+        self.assertEqual(tailer.poll(), 1)
+        self.assertTrue(self.received[-1].startswith("10.0.0.99"))
+
+        # Rename rotation: late writes to the old file are drained, then the new file is read from 0
+        self._write(self.log, 10, 2)
+        os.rename(self.log, self.log + ".1")
+        self._write(self.log + ".1", 12, 1)
+        self._write(self.log, 100, 3, mode="w")
+        tailer.poll()
+        tailer._check_rotation()
+        tailer.poll()
+        self.assertEqual(len(self.received), 10 + 1 + 3 + 3)
+        self.assertEqual(list(OffsetCheckpointStore(self.offsets)._offsets), [tailer._key])
+
+        # copytruncate rotation: same inode, truncated
+        open(self.log, "w").close()
+        tailer._check_rotation()
+        self._write(self.log, 200, 2)
+        self.assertEqual(tailer.poll(), 2)
+        self.assertTrue(self.received[-1].startswith("10.0.0.201"))
+        tailer._close()
+        print(">>> PASS: No lines lost or duplicated across restarts and rotations.")
+
+    def test_rotation_finishes_partial_line(self):
+        print("=== Test: A line split across rotation is finished from the old inode ===")
+        self._write(self.log, 0, 2)
+        with open(self.log, "a") as f:
+            f.write('10.0.0.77 - - [01/Feb/2026:10:00:00 +0000] "GET /split')
+        tailer = self._tailer()
+        self.assertEqual(tailer.poll(), 2)
+
+        os.rename(self.log, self.log + ".1")
+        self._write(self.log, 100, 1, mode="w")
+        tailer._check_rotation() # unfinished line: stays on the old file
+        with open(self.log + ".1", "a") as f:
+            f.write(' HTTP/1.1" 200 1 "-" "curl"\n')
+        self.assertEqual(tailer.step(), 1)
+        self.assertEqual(tailer.step(), 0) # idle: now switches
+        self.assertEqual(tailer.poll(), 1)
+        self.assertTrue(self.received[2].startswith("10.0.0.77") and self.received[2].endswith('"curl"'))
+
+        # A line that never completes is delivered as-is once the grace period is over
+        with open(self.log, "a") as f:
+            f.write("10.0.0.88 truncated")
+        tailer.poll()
+        os.rename(self.log, self.log + ".2")
+        self._write(self.log, 200, 1, mode="w")
+        with mock.patch.object(log_tailer, "ROTATION_GRACE", 0):
+            tailer._check_rotation()
+        self.assertEqual(tailer.poll(), 1)
+        self.assertEqual(self.received[-2:], ["10.0.0.88 truncated", LINE.format(i=200)])
+        tailer._close()
+        print(">>> PASS: Split line delivered whole.")
+
+    def test_batch_keeps_forced_flags(self):
+        print("=== Test: Per-session batching keeps overrides from earlier events ===")
+        bot_line = '10.0.0.5 - - [01/Feb/2026:10:00:00 +0000] "GET / HTTP/1.1" 200 1 "-" "python-requests/2.31"'
+        payloads = [NginxAdapter.parse_line(bot_line)] + [NginxAdapter.parse_line(LINE.format(i=5))] * 2
+        triggered = []
+        with mock.patch.object(IngestionService, "_update_state"), \
+             mock.patch.object(IngestionService, "_trigger_inference", side_effect=lambda sid, e: triggered.append(e)):
+            result = IngestionService.ingest_http_batch(payloads)
+        self.assertEqual(result["sessions"], 1)
+        self.assertTrue(triggered[0].raw_features["bot_detected"])
+        self.assertEqual(triggered[0].risk_score, 98.0)
+        self.assertIn("Mozilla", triggered[0].raw_features["user_agent"]) # still the latest event
+        print(">>> PASS: Bot flag survives coalescing.")
+
+    def test_fast_parser_matches_regex(self):
+        print("=== Test: NGINX Fast-Path Parser ===")
+        for i in range(5):
+            line = LINE.format(i=i)
+            self.assertEqual(NginxAdapter.parse_line(line), NginxAdapter._parse_slow(line))
+        self.assertEqual(NginxAdapter.parse_line(LINE.format(i=3))["path"], "/item/3?q=a b")
+        self.assertIsNone(NginxAdapter.parse_line("2026/02/01 10:00:00 [error] 12#0: upstream timed out"))
+        print(">>> PASS: Fast path agrees with LOG_PATTERN.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import sys
+import os
+import unittest
+from datetime import datetime, timedelta
+
+# Add root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from flask import Flask
+from backend.extensions import db
+from backend.db.models import Session, SessionMetric
+from backend.rollups.models import MetricsRollup
+from backend.rollups.engine import MetricsRollupEngine, MINUTE
+
+class TestMetricsRollups(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.metadata.create_all(
+            bind=db.engine,
+            tables=[Session.__table__, SessionMetric.__table__, MetricsRollup.__table__]
+        )
+        MetricsRollupEngine.reset()
+
+    def tearDown(self):
+        db.session.remove()
+        db.metadata.drop_all(
+            bind=db.engine,
+            tables=[MetricsRollup.__table__, SessionMetric.__table__, Session.__table__]
+        )
+        self.ctx.pop()
+
+    def _snapshot(self):
+        return (
+            MetricsRollupEngine.totals("decision"),
+            MetricsRollupEngine.totals("cause"),
+            MetricsRollupEngine.combined("metrics")
+        )
+
+    def test_incremental_counters(self):
+        print("=== Test: Incremental Rollups ===")
+        db.session.add(Session(session_id="WEB_1", trust_score=80.0, final_decision="ALLOW", primary_cause="Routine"))
+        db.session.add(Session(session_id="API_1", trust_score=20.0, final_decision="ESCALATE", primary_cause="SQLi"))
+        db.session.add(SessionMetric(session_id="WEB_1", risk_score=20.0, bot_probability=0.2, attack_probability=0.4))
+        db.session.commit()
+
+        decisions = MetricsRollupEngine.totals("decision")
+        self.assertEqual(decisions["ALLOW"]["count"], 1)
+        self.assertEqual(decisions["ESCALATE"]["count"], 1)
+        self.assertAlmostEqual(MetricsRollupEngine.average(MetricsRollupEngine.combined("decision"), "sum_trust"), 50.0)
+
+        # Expired instance (post-commit) transitions ALLOW -> TERMINATED
+        session = db.session.get(Session, "WEB_1")
+        db.session.commit()
+        session.final_decision = "TERMINATED"
+        session.trust_score = 0.0
+        db.session.commit()
+
+        decisions = MetricsRollupEngine.totals("decision")
+        self.assertNotIn("ALLOW", decisions)
+        self.assertEqual(decisions["TERMINATED"]["count"], 1)
+        self.assertAlmostEqual(decisions["TERMINATED"]["sum_trust"], 0.0)
+
+        recent = MetricsRollupEngine.combined("decision", since=datetime.utcnow() - timedelta(hours=1), granularity=MINUTE)
+        self.assertEqual(recent["count"], 2)
+
+        metrics = MetricsRollupEngine.combined("metrics")
+        self.assertEqual(metrics["count"], 1)
+        self.assertAlmostEqual(MetricsRollupEngine.average(metrics, "sum_risk"), 20.0)
+
+        # Domain recommendation cache is fed by the flush hook
+        self.assertIn("web", MetricsRollupEngine.latest_domain_sessions())
+        print(">>> PASS: Rollups track inserts and transitions.")
+
+    def test_domain_cache_follows_commits(self):
+        print("=== Test: Latest-by-domain cache only sees committed sessions, expires after its TTL ===")
+        seen = datetime.utcnow().replace(microsecond=0)
+        db.session.add(Session(session_id="WEB_1", last_seen=seen, recommended_action="MONITOR"))
+        db.session.commit()
+        self.assertEqual(MetricsRollupEngine.latest_domain_sessions()["web"], (seen, "MONITOR"))
+
+        db.session.add(Session(session_id="WEB_2", last_seen=seen + timedelta(minutes=1), recommended_action="BLOCK"))
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(MetricsRollupEngine.latest_domain_sessions()["web"], (seen, "MONITOR"))
+
+        # Written by another worker: no hook fires here, the TTL re-read picks it up
+        later = seen + timedelta(minutes=2)
+        db.session.execute(Session.__table__.insert().values(
+            session_id="WEB_3", tenant_id="default", last_seen=later, recommended_action="CHALLENGE"))
+        db.session.commit()
+        self.assertEqual(MetricsRollupEngine.latest_domain_sessions()["web"], (seen, "MONITOR"))
+        MetricsRollupEngine._domain_lookups["web"] -= MetricsRollupEngine.DOMAIN_CACHE_TTL_SECONDS + 1
+        self.assertEqual(MetricsRollupEngine.latest_domain_sessions()["web"], (later, "CHALLENGE"))
+        print(">>> PASS: Rolled-back write ignored, stale entry refreshed.")
+
+    def test_rebuild_matches_incremental(self):
+        print("=== Test: Rollup Rebuild ===")
+        for i in range(7):
+            db.session.add(Session(session_id=f"S{i}", trust_score=10.0 * i,
+                                   final_decision="ALLOW" if i % 2 else "REJECT", primary_cause=f"cause-{i % 3}"))
+            db.session.add(SessionMetric(session_id=f"S{i}", risk_score=float(i), web_abuse_probability=0.25))
+        db.session.commit()
+        db.session.get(Session, "S0").primary_cause = "cause-2"
+        db.session.commit()
+
+        incremental = self._snapshot()
+        stats = MetricsRollupEngine.rebuild(batch_size=3)
+        self.assertEqual(stats, {"sessions": 7, "metrics": 7})
+        self.assertEqual(self._snapshot(), incremental)
+        print(">>> PASS: Rebuild reproduces incremental rollups.")
+
+    def test_trust_seen_and_deferred_flush(self):
+        print("=== Test: One trust observation per session, flushed after commit ===")
+        session = Session(session_id="S1", trust_score=90.0, final_decision="ALLOW")
+        db.session.add(session)
+        db.session.commit()
+        for trust in (80.0, 70.0, 60.0):
+            session.trust_score = trust
+            session.last_seen = datetime.utcnow()
+            db.session.commit()
+
+        trust_seen = MetricsRollupEngine.combined("trust_seen")
+        self.assertEqual(trust_seen["count"], 1)
+        self.assertAlmostEqual(trust_seen["sum_trust"], 60.0)
+
+        # Nothing was written inside the writers' transactions
+        self.assertEqual(MetricsRollup.query.count(), 0)
+        db.session.commit()
+        self.assertGreater(MetricsRollupEngine.flush_pending(), 0)
+        self.assertGreater(MetricsRollup.query.count(), 0)
+        self.assertEqual(MetricsRollupEngine.combined("trust_seen"), trust_seen)
+
+        # Rolled-back writes never reach the rollups
+        session.final_decision = "BLOCK"
+        db.session.flush()
+        db.session.rollback()
+        self.assertIn("ALLOW", MetricsRollupEngine.totals("decision"))
+        print(">>> PASS: trust_seen counts sessions, not flushes.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import sys
+import os
+import uuid
+import unittest
+from datetime import datetime, timedelta, timezone
+
+# Add root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from flask import Flask
+from backend.extensions import db
+from backend.db.models import MonitoringEvent
+from backend.monitoring import event_sink
+from backend.monitoring.event_sink import MonitoringEventSink
+from backend.monitoring.consumers.domain_consumer import DomainConsumer
+
+
+def _row(event_id, ts=None):
+    return {"event_id": event_id, "session_id": "s1", "risk_score": 10.0, "decision": "ALLOW",
+            "timestamp": ts or datetime.utcnow(), "payload": {"n": event_id}}
+
+
+class TestMonitoringEventSink(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.metadata.create_all(bind=db.engine, tables=[MonitoringEvent.__table__])
+        MonitoringEventSink.reset()
+
+    def tearDown(self):
+        MonitoringEventSink.reset()
+        db.session.remove()
+        db.metadata.drop_all(bind=db.engine, tables=[MonitoringEvent.__table__])
+        self.ctx.pop()
+
+    def test_buffered_events_flush_in_bulk(self):
+        print("=== Test: Buffered events are written by flush() with per-domain counts ===")
+        ids = [MonitoringEventSink.add("WEB", _row(f"w{n}")) for n in range(5)]
+        MonitoringEventSink.add("API", _row("a0"))
+        self.assertTrue(all(ids))
+        self.assertEqual(MonitoringEvent.query.count(), 0) # nothing written before the flush
+
+        self.assertEqual(MonitoringEventSink.flush(), 6)
+        self.assertEqual(MonitoringEvent.query.count(), 6)
+        self.assertEqual(MonitoringEvent.query.filter_by(event_id="w3").one().domain, "WEB")
+
+        counts = MonitoringEventSink.domain_counts()
+        self.assertEqual(counts["domains"], {"WEB": 5, "API": 1})
+        self.assertEqual(counts["total"], 6)
+        self.assertFalse(counts["partitioned"])
+        print(">>> PASS: 6 events, one flush")
+
+    def test_bad_row_does_not_block_the_batch(self):
+        print("=== Test: A rejected row is dropped, the rest of its batch is stored ===")
+        ts = datetime.utcnow().replace(microsecond=0) - timedelta(hours=1)
+        MonitoringEventSink.add("WEB", _row("dup", ts=ts))
+        MonitoringEventSink.flush()
+        MonitoringEventSink._recent_ids.clear() # as after a restart: only the table knows "dup"
+        MonitoringEventSink.add("WEB", _row("x1"))
+        MonitoringEventSink.add("WEB", _row("dup", ts=ts)) # violates (event_id, timestamp) uniqueness
+        MonitoringEventSink.add("WEB", _row("x2"))
+        self.assertEqual(MonitoringEventSink.flush(), 2)
+        self.assertEqual(MonitoringEvent.query.count(), 3)
+        self.assertEqual(MonitoringEventSink.stats()["dropped"], 1)
+        print(">>> PASS: duplicate isolated")
+
+    def test_sheds_when_buffer_full(self):
+        print("=== Test: add() sheds once MAX_BUFFERED events are waiting ===")
+        original = event_sink.MAX_BUFFERED
+        event_sink.MAX_BUFFERED = 2
+        try:
+            self.assertIsNotNone(MonitoringEventSink.add("WEB", _row("a")))
+            self.assertIsNotNone(MonitoringEventSink.add("WEB", _row("b")))
+            self.assertIsNone(MonitoringEventSink.add("WEB", _row("c")))
+        finally:
+            event_sink.MAX_BUFFERED = original
+        self.assertEqual(MonitoringEventSink.stats()["dropped"], 1)
+        print(">>> PASS: third event shed")
+
+    def test_untrusted_timestamps_are_clamped(self):
+        print("=== Test: Far-future / expired payload timestamps are clamped to now ===")
+        now = datetime.utcnow()
+        MonitoringEventSink.add("WEB", _row("future", ts=now + timedelta(days=30)))
+        MonitoringEventSink.add("WEB", _row("ancient", ts=now - timedelta(days=event_sink.RETENTION_DAYS + 5)))
+        MonitoringEventSink.add("WEB", _row("fine", ts=now - timedelta(hours=1)))
+        MonitoringEventSink.flush()
+        stored = {e.event_id: e.timestamp for e in MonitoringEvent.query.all()}
+        self.assertLess(abs((stored["future"] - now).total_seconds()), 60)
+        self.assertLess(abs((stored["ancient"] - now).total_seconds()), 60)
+        self.assertEqual(stored["fine"], now - timedelta(hours=1))
+        self.assertEqual(MonitoringEventSink.stats()["clamped"], 2)
+        print(">>> PASS: 2 timestamps clamped")
+
+    def test_aware_timestamps_stored_as_naive_utc(self):
+        print("=== Test: Offset-bearing payload timestamps are normalized to naive UTC ===")
+        local = datetime.utcnow().replace(microsecond=0) - timedelta(hours=1)
+        aware = local.replace(tzinfo=timezone.utc).astimezone(timezone(timedelta(hours=2)))
+        self.assertIsNotNone(MonitoringEventSink.add("WEB", _row("aware", ts=aware)))
+        MonitoringEventSink.flush()
+        self.assertEqual(MonitoringEvent.query.one().timestamp, local)
+        self.assertEqual(MonitoringEventSink.stats()["clamped"], 0)
+        print(">>> PASS: +02:00 timestamp stored as UTC")
+
+    def test_redelivery_with_clamped_timestamp_is_deduped(self):
+        print("=== Test: A redelivered event_id is not stored twice even when its timestamp is clamped ===")
+        future = datetime.utcnow() + timedelta(days=30)
+        first = MonitoringEventSink.add("WEB", _row("again", ts=future))
+        MonitoringEventSink.flush()
+        self.assertEqual(MonitoringEventSink.add("WEB", _row("again", ts=future)), first)
+        self.assertEqual(MonitoringEventSink.add("WEB", _row("again")), first) # no timestamp at all
+        MonitoringEventSink.flush()
+        self.assertEqual(MonitoringEvent.query.filter_by(event_id="again").count(), 1)
+        self.assertEqual(MonitoringEventSink.stats()["duplicates"], 2)
+        print(">>> PASS: one row, first id returned")
+
+    def test_consumer_rejects_missing_columns(self):
+        print("=== Test: DomainConsumer fails synchronously on events the table would reject ===")
+        consumer = DomainConsumer("WEB")
+        for event in ({"domain": "WEB"}, {"event_id": "x" * 37}, {"event_id": "e1", "timestamp": "yesterday"}):
+            with self.assertRaises(ValueError):
+                consumer.process_event(event)
+        self.assertEqual(MonitoringEventSink.stats()["buffered"], 0)
+        self.assertEqual(DomainConsumer.validate({"event_id": "e1", "timestamp": "2026-01-01T00:00:00Z"}).utcoffset(),
+                         timedelta(0))
+        print(">>> PASS: 3 bad events refused before buffering")
+
+    def test_retention_on_unpartitioned_table(self):
+        print("=== Test: maintain() expires rows older than the retention window ===")
+        today = datetime.utcnow().date()
+        old = datetime.combine(today, datetime.min.time()) - timedelta(days=event_sink.RETENTION_DAYS + 1)
+        # add() would clamp an expired timestamp, so the old row is written directly
+        db.session.execute(MonitoringEvent.__table__.insert(), [dict(_row("old", ts=old), id=uuid.uuid4(), domain="SYSTEM")])
+        MonitoringEventSink.add("SYSTEM", _row("new", ts=datetime.combine(today, datetime.min.time())))
+        MonitoringEventSink.flush()
+
+        result = MonitoringEventSink.maintain(today=today)
+        self.assertEqual(result, {"partitioned": False, "deleted": 1})
+        self.assertEqual([e.event_id for e in MonitoringEvent.query.all()], ["new"])
+        print(">>> PASS: old row deleted")
+
+
+if __name__ == '__main__':
+    unittest.main()
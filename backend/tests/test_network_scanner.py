@@ -0,0 +1,77 @@
+import sys
+import os
+import subprocess
+import unittest
+from unittest import mock
+
+# Add root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.adapters.network_scanner import NetworkScanner
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "nmap_scan.xml")
+
+class TestNetworkScanner(unittest.TestCase):
+
+    def test_iter_host_events(self):
+        print("=== Test: One event per <host> from recorded nmap XML ===")
+        with open(FIXTURE, "rb") as f:
+            events = list(NetworkScanner.iter_host_events(f, "fast"))
+        self.assertEqual([e["features"]["target"] for e in events], ["10.0.0.1", "10.0.0.2", "10.0.0.3"])
+        self.assertEqual([e["severity"] for e in events], ["high", "low", "info"]) # 22 is a critical port
+        self.assertEqual(events[0]["features"]["open_ports"], [22, 80, 443])
+        self.assertEqual(events[1]["features"]["details"], [{"port": 8080, "state": "open", "service": "http-proxy"}])
+        self.assertEqual(events[0]["session_id"], "net_scan_10.0.0.1")
+        print(">>> PASS: 3 hosts parsed")
+
+    def test_scan_file_feeds_sink(self):
+        print("=== Test: scan_file streams every host into the sink ===")
+        received = []
+        summary = NetworkScanner.scan_file(FIXTURE, mode="fast", sink=received.append)
+        self.assertEqual(summary["status"], "success")
+        self.assertEqual(summary["scanned_hosts"], 3)
+        self.assertEqual(len(received), 3)
+        self.assertEqual(NetworkScanner.scan_file(os.path.join(os.path.dirname(FIXTURE), "missing.xml"))["error"][:9], "[Errno 2]")
+        print(">>> PASS: 3 events ingested")
+
+    def test_failing_sink_reaps_nmap(self):
+        print("=== Test: A sink error kills and reaps the scan process ===")
+        # Stand-in for nmap: writes the fixture (padded past iterparse's read size), then keeps running
+        fake = [sys.executable, "-c",
+                f"import sys, time; sys.stdout.buffer.write(open({FIXTURE!r}, 'rb').read() + b' ' * 65536); "
+                "sys.stdout.flush(); time.sleep(60)"]
+        procs = []
+        real_popen = subprocess.Popen
+        def popen(*args, **kwargs):
+            procs.append(real_popen(*args, **kwargs))
+            return procs[-1]
+
+        def sink(event):
+            raise RuntimeError("ingestion down")
+
+        with mock.patch.object(NetworkScanner, "_build_cmd", return_value=fake), \
+             mock.patch("backend.adapters.network_scanner.subprocess.Popen", side_effect=popen):
+            result = NetworkScanner._scan_one("10.0.0.0/30", "fast", sink)
+        self.assertEqual(result, {"error": "ingestion down"})
+        self.assertIsNotNone(procs[0].returncode)
+        print(">>> PASS: process killed and waited")
+    def test_parallel_scan_runs_in_app_context(self):
+        print("=== Test: scan_network(workers>1) gives worker threads the caller's app context ===")
+        from flask import Flask, has_app_context
+        fake = [sys.executable, "-c", f"import sys; sys.stdout.buffer.write(open({FIXTURE!r}, 'rb').read())"]
+        contexts = []
+        def sink(event):
+            contexts.append(has_app_context())
+
+        app = Flask(__name__)
+        with app.app_context(), \
+             mock.patch.object(NetworkScanner, "_check_nmap", return_value=True), \
+             mock.patch.object(NetworkScanner, "_build_cmd", return_value=fake):
+            summary = NetworkScanner.scan_network(["10.0.0.0/30", "10.0.1.0/30"], "fast", workers=2, sink=sink)
+        self.assertEqual(summary["status"], "success")
+        self.assertEqual(summary["scanned_hosts"], 6)
+        self.assertEqual(contexts, [True] * 6)
+        print(">>> PASS: 6 hosts ingested inside the app context")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import sys
+import os
+import time
+import tempfile
+import unittest
+
+# Add root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.enforcement.state.proposal_registry import ProposalRegistry
+from backend.enforcement.state.proposal_store import SqlProposalStore
+from backend.enforcement.state_machine.enforcement_state_machine import EnforcementState
+from backend.orchestration.execution_context import ExecutionContext
+
+class TestProposalRegistryIndex(unittest.TestCase):
+
+    def setUp(self):
+        ProposalRegistry.reset()
+        ProposalRegistry.configure_store(None)
+
+    def tearDown(self):
+        ProposalRegistry.PROPOSAL_TTL = 3600
+        ProposalRegistry.configure_store(None)
+        ProposalRegistry.reset()
+
+    def test_secondary_indexes_follow_status_and_expiry(self):
+        print("=== Test: Proposal Registry Indexes ===")
+        a = ProposalRegistry.register_proposal(ExecutionContext(session_id="S1", user_id="alice", risk_score=80), "BLOCK")
+        b = ProposalRegistry.register_proposal(ExecutionContext(session_id="S2", user_id="alice", risk_score=90), "CAPTCHA")
+        self.assertEqual(ProposalRegistry.register_proposal(ExecutionContext(session_id="S1", user_id="alice", risk_score=80.4), "BLOCK"), a)
+
+        self.assertEqual({p["id"] for p in ProposalRegistry.list_by_user("alice")}, {a, b})
+        self.assertEqual(ProposalRegistry.find_active("S1", "BLOCK"), a)
+        self.assertIsNone(ProposalRegistry.find_active("S1", "CAPTCHA"))
+
+        ProposalRegistry.update_status(a, EnforcementState.PENDING)
+        self.assertEqual([p["id"] for p in ProposalRegistry.list_proposals(EnforcementState.CREATED)], [b])
+        self.assertEqual([p["id"] for p in ProposalRegistry.list_proposals("PENDING")], [a])
+
+        ProposalRegistry.PROPOSAL_TTL = -1
+        c = ProposalRegistry.register_proposal(ExecutionContext(session_id="S3", user_id="bob", risk_score=10), "BLOCK")
+        self.assertIsNone(ProposalRegistry.get_proposal(c))
+        self.assertEqual(ProposalRegistry.list_by_user("bob"), [])
+        self.assertNotIn("bob", ProposalRegistry._by_user)
+        self.assertEqual(len(ProposalRegistry.list_proposals()), 2)
+        print(">>> PASS: Indexes stay consistent through transitions and expiry.")
+
+    def test_durable_store_reload(self):
+        print("=== Test: Proposal Registry Durable Store ===")
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'proposals.db')}"
+            ProposalRegistry.configure_store(SqlProposalStore(url))
+            pid = ProposalRegistry.register_proposal(ExecutionContext(session_id="S9", user_id="carol", risk_score=70), "BLOCK")
+            ProposalRegistry.update_status(pid, EnforcementState.PENDING)
+
+            # Simulated restart
+            ProposalRegistry.reset()
+            store = SqlProposalStore(url)
+            ProposalRegistry.configure_store(store)
+            reloaded = ProposalRegistry.get_proposal(pid)
+            self.assertEqual(reloaded["status"], EnforcementState.PENDING)
+            self.assertEqual(ProposalRegistry.find_active("S9", "BLOCK"), pid)
+            self.assertEqual(ProposalRegistry.register_proposal(ExecutionContext(session_id="S9", user_id="carol", risk_score=70), "BLOCK"), pid)
+            store.engine.dispose()
+        print(">>> PASS: Open proposals survive a restart.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import sys
+import os
+import bisect
+import unittest
+from collections import deque
+from datetime import datetime, timedelta
+
+# Add root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from flask import Flask
+from backend.extensions import db
+from backend.db.models import Session
+from backend.rollups.models import MetricsRollup
+from backend.services.observation_service import SessionStateEngine
+from backend.services.session_listing_service import SessionListingService, _epoch
+
+class TestSessionListing(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.metadata.create_all(bind=db.engine, tables=[Session.__table__, MetricsRollup.__table__])
+        SessionListingService.ensure_indexes()
+
+        self._saved = (SessionStateEngine._sessions, SessionStateEngine._created_index)
+        SessionStateEngine._sessions = {}
+        SessionStateEngine._created_index = []
+
+        base = datetime(2026, 1, 1, 12, 0, 0)
+        # DB sessions at even minutes, live sessions at odd minutes
+        for i in range(0, 10, 2):
+            db.session.add(Session(session_id=f"DB_{i}", user_id=f"user_{i}", created_at=base + timedelta(minutes=i)))
+        db.session.commit()
+        for i in range(1, 10, 2):
+            self._add_live(f"LIVE_{i}", _epoch(base + timedelta(minutes=i)))
+        # Live session that is also persisted: listed once, as the DB row
+        self._add_live("DB_4", _epoch(base + timedelta(minutes=4, seconds=30)))
+
+    def tearDown(self):
+        SessionStateEngine._sessions, SessionStateEngine._created_index = self._saved
+        db.session.remove()
+        db.metadata.drop_all(bind=db.engine, tables=[MetricsRollup.__table__, Session.__table__])
+        self.ctx.pop()
+
+    def _add_live(self, sid, created_at):
+        SessionStateEngine._sessions[sid] = {
+            "user_id": "live_user", "created_at": created_at,
+            "events": deque(), "risk_history": deque([(created_at, 42.0)])
+        }
+        bisect.insort(SessionStateEngine._created_index, (created_at, sid))
+
+    def test_keyset_pages_merge_live_and_db(self):
+        print("=== Test: Session Explorer Keyset Pagination ===")
+        seen, cursor = [], None
+        while True:
+            page = SessionListingService.list_sessions(cursor=cursor, limit=3)
+            seen.extend(item["session_id"] for item in page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+
+        expected = ["LIVE_9", "DB_8", "LIVE_7", "DB_6", "LIVE_5", "DB_4", "LIVE_3", "DB_2", "LIVE_1", "DB_0"]
+        self.assertEqual(seen, expected)
+        print(">>> PASS: Pages are ordered, complete and de-duplicated.")
+
+    def test_filters_and_active_flag(self):
+        print("=== Test: Session Explorer Filters ===")
+        items = SessionListingService.list_sessions(search="user_4")["items"]
+        self.assertEqual([i["session_id"] for i in items], ["DB_4"])
+        self.assertTrue(items[0]["is_active"])
+
+        live_only = SessionListingService.list_sessions(source="LIVE")["items"]
+        self.assertTrue(all(i["source"] == "LIVE" for i in live_only))
+        self.assertEqual(len(live_only), 5)
+
+        with self.assertRaises(ValueError):
+            SessionListingService.list_sessions(cursor="not-a-cursor")
+        print(">>> PASS: Filters apply to both sources.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import sys
+import os
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.data.event_schema import Event
+from backend.services.session_reverse_index import SessionReverseIndex
+from backend.services.observation_service import SessionStateEngine, SESSION_TTL_SECONDS
+from backend.threat_model.blast_radius import BlastRadiusCalculator
+from backend.threat_model.threat_analyzer import ThreatAnalyzer
+from backend.orchestration.execution_context import ExecutionContext
+
+
+def _event(session_id, actor, **features):
+    return Event(session_id=session_id, actor_id=actor, event_type="api", raw_features=features)
+
+
+class TestSessionReverseIndex(unittest.TestCase):
+
+    def setUp(self):
+        SessionReverseIndex.reset()
+        SessionStateEngine._sessions = {}
+        SessionStateEngine._created_index = []
+
+    def tearDown(self):
+        SessionReverseIndex.reset()
+        SessionStateEngine._sessions = {}
+        SessionStateEngine._created_index = []
+
+    def _ingest(self, session_id, actor, **features):
+        SessionStateEngine.update_session_state(session_id, _event(session_id, actor, **features))
+
+    def test_indexes_follow_session_lifecycle(self):
+        print("\n=== Test: Reverse indexes track and expire with sessions ===")
+        self._ingest("s1", "alice", ip="10.0.0.5", token_id="t1")
+        self._ingest("s2", "bob", ip="10.0.0.5")
+        self._ingest("s3", "carol", ip="10.0.0.9", token_id="t1")
+        self._ingest("s4", "dave", ip="10.0.1.1")
+
+        self.assertEqual(SessionReverseIndex.sessions_for_ip("10.0.0.5"), {"s1", "s2"})
+        self.assertEqual(SessionReverseIndex.sessions_for_token("t1"), {"s1", "s3"})
+        self.assertEqual(SessionReverseIndex.sessions_for_user("bob"), {"s2"})
+        self.assertEqual(SessionReverseIndex.ips_in_network("10.0.0.0/24"), {"10.0.0.5", "10.0.0.9"})
+        self.assertEqual(SessionReverseIndex.sessions_for_network("10.0.0.0/16"), {"s1", "s2", "s3", "s4"})
+
+        SessionStateEngine.mark_terminated("s2")
+        self.assertEqual(SessionReverseIndex.sessions_for_ip("10.0.0.5"), {"s1"})
+
+        SessionStateEngine._sessions["s4"]["last_active"] -= SESSION_TTL_SECONDS + 1
+        SessionStateEngine.prune_expired_sessions()
+        self.assertEqual(SessionReverseIndex.ips_in_network("10.0.1.0/24"), set())
+        self.assertEqual(SessionReverseIndex.sessions_for_user("dave"), set())
+        print(">>> PASS: Terminated and pruned sessions leave the indexes")
+
+    def test_idle_sessions_excluded_before_prune(self):
+        print("\n=== Test: Idle sessions are filtered from lookups ===")
+        stale = time.time() - SESSION_TTL_SECONDS - 5
+        SessionReverseIndex.track("old", _event("old", "eve", ip="172.16.0.1"), now=stale)
+        SessionReverseIndex.track("new", _event("new", "fay", ip="172.16.0.1"))
+        self.assertEqual(SessionReverseIndex.sessions_for_ip("172.16.0.1"), {"new"})
+        print(">>> PASS: Only live sessions counted")
+
+    def test_blast_radius_uses_real_fan_out(self):
+        print("\n=== Test: Blast radius counts sessions and users sharing the asset ===")
+        for n in range(6):
+            self._ingest(f"proxy_{n}", f"user_{n % 3}", ip="203.0.113.7", token_id=f"tok_{n}")
+        self._ingest("solo", "zed", ip="198.51.100.2", token_id="tok_solo")
+
+        radius = BlastRadiusCalculator.calculate("BLOCK_IP", "proxy_0", {"session_id": "proxy_0"})
+        self.assertEqual(radius.shared_asset, "203.0.113.7")
+        self.assertEqual(radius.affected_sessions, 6)
+        self.assertEqual(radius.affected_users, 3)
+
+        radius = BlastRadiusCalculator.calculate("REVOKE_TOKEN", "solo", {"session_id": "solo"})
+        self.assertEqual((radius.affected_sessions, radius.affected_users), (1, 1))
+
+        assessment = ThreatAnalyzer.assess("BLOCK_IP", "proxy_0", ExecutionContext(session_id="proxy_0", risk_score=90))
+        self.assertEqual(assessment.blast_radius.affected_users, 3)
+        self.assertEqual(assessment.required_approval_level, "ADMIN")
+        print(">>> PASS: 6 sessions / 3 users behind the proxy IP")
+
+    def test_blast_radius_for_asset_targets(self):
+        print("\n=== Test: IP, CIDR and token targets count only the sessions behind them ===")
+        self._ingest("a", "alice", ip="10.1.1.1", token_id="tok_shared")
+        self._ingest("b", "bob", ip="10.1.1.1", token_id="tok_shared")
+
+        self.assertEqual(BlastRadiusCalculator.calculate("BLOCK_IP", "10.1.1.1", {}).affected_sessions, 2)
+        self.assertEqual(BlastRadiusCalculator.calculate("BLOCK_IP", "10.1.1.0/24", {}).affected_sessions, 2)
+        radius = BlastRadiusCalculator.calculate("REVOKE_TOKEN", "tok_shared", {})
+        self.assertEqual((radius.affected_sessions, radius.affected_users), (2, 2))
+        self.assertEqual(BlastRadiusCalculator.calculate("REVOKE_TOKEN", "a", {}).affected_sessions, 2)
+        print(">>> PASS: the asset itself is not counted as a session")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import sys
+import os
+import threading
+import unittest
+from unittest.mock import patch
+
+# Add root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.orchestration.async_dispatcher import AsyncDispatcher
+from backend.ml.side_channel import SideChannelExecutor, PHASE3_LANE
+from backend.ml import phase3_runner, phase4_runner
+from backend.adaptive_policy.batcher import PolicySimulationBatcher
+from backend.adaptive_policy.engine import AdaptivePolicyEngine
+
+class TestSideChannelExecutor(unittest.TestCase):
+
+    def setUp(self):
+        SideChannelExecutor.shutdown()
+        self._saved = (SideChannelExecutor.WORKER_COUNT, SideChannelExecutor.LANE_CAPACITY)
+        SideChannelExecutor.WORKER_COUNT = 1
+        SideChannelExecutor.LANE_CAPACITY = 3
+        PolicySimulationBatcher.reset()
+        AdaptivePolicyEngine._proposals = []
+
+    def tearDown(self):
+        SideChannelExecutor.shutdown()
+        SideChannelExecutor.WORKER_COUNT, SideChannelExecutor.LANE_CAPACITY = self._saved
+        PolicySimulationBatcher.reset()
+        AdaptivePolicyEngine._proposals = []
+
+    def _block_worker(self):
+        gate = threading.Event()
+        started = threading.Event()
+        def blocker():
+            started.set()
+            gate.wait(5)
+        SideChannelExecutor.fire_and_forget("blocker", blocker, _priority=0)
+        started.wait(5)
+        return gate
+
+    def test_coalesces_per_session_and_sheds(self):
+        print("=== Test: Side channel coalesces per session and sheds when full ===")
+        seen = []
+        gate = self._block_worker()
+        with patch.object(phase4_runner, "_execute_phase4", lambda sid, decision, *a: seen.append((sid, decision))):
+            for decision in ("ALLOW", "MONITOR", "RESTRICT"):
+                self.assertTrue(phase4_runner.run_phase4_learning_async("s1", decision, 50.0, {}))
+            self.assertTrue(phase4_runner.run_phase4_learning_async("s2", "ALLOW", 10.0, {}))
+            self.assertTrue(phase4_runner.run_phase4_learning_async("s3", "ALLOW", 10.0, {}))
+            # Lane full (3 distinct sessions) -> shed
+            self.assertFalse(phase4_runner.run_phase4_learning_async("s4", "ALLOW", 10.0, {}))
+
+            metrics = SideChannelExecutor.get_metrics()
+            self.assertEqual(metrics["queue_depth"]["P4"], 3)
+            self.assertEqual(metrics["coalesced"], 2)
+            self.assertEqual(metrics["dropped_by_lane"]["P4"], 1)
+            # Orchestration pool is untouched
+            self.assertEqual(AsyncDispatcher.get_metrics()["queue_depth"]["P4"], 0)
+
+            gate.set()
+            self.assertTrue(SideChannelExecutor.wait_idle())
+        self.assertEqual(seen, [("s1", "RESTRICT"), ("s2", "ALLOW"), ("s3", "ALLOW")])
+        print(">>> PASS: Latest state per session, bounded queue")
+
+    def test_policy_simulation_is_batched(self):
+        print("=== Test: Policy simulation runs once per interval over the batch ===")
+        current, proposed = phase3_runner.CURRENT_THRESHOLDS, phase3_runner.PROPOSED_THRESHOLDS
+        gate = self._block_worker()
+        scheduled = [PolicySimulationBatcher.add({"risk_score": n}, current, proposed, now=1000.0 + n) for n in range(50)]
+        self.assertEqual(scheduled.count(True), 1)
+        gate.set()
+        self.assertTrue(SideChannelExecutor.wait_idle())
+        self.assertEqual(PolicySimulationBatcher.stats()["runs"], 1)
+        self.assertEqual(len(AdaptivePolicyEngine._proposals), 1)
+
+        # Next interval: same thresholds refresh the pending proposal instead of appending
+        PolicySimulationBatcher.add({"risk_score": 90}, current, proposed, now=2000.0)
+        self.assertTrue(SideChannelExecutor.wait_idle())
+        self.assertEqual(PolicySimulationBatcher.stats()["runs"], 2)
+        self.assertEqual(len(AdaptivePolicyEngine._proposals), 1)
+        print(">>> PASS: 51 samples, 2 simulations, 1 proposal")
+
+if __name__ == '__main__':
+    unittest.main()
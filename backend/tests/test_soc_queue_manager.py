@@ -0,0 +1,79 @@
+import sys
+import os
+import unittest
+
+# Add root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.enforcement.state.proposal_registry import ProposalRegistry
+from backend.enforcement.state_machine.enforcement_state_machine import EnforcementState
+from backend.orchestration.execution_context import ExecutionContext
+from backend.soc.queue_manager import QueueManager
+
+def _context(session_id, risk, severity="LOW", tenant_scope=False):
+    ctx = ExecutionContext(session_id=session_id, user_id="u1", risk_score=risk)
+    object.__setattr__(ctx, "threat_assessment", {
+        "severity": severity,
+        "blast_radius": {"affected_users": 1, "affected_sessions": 1, "shared_asset": None,
+                         "tenant_scope": tenant_scope, "reversibility_score": 1.0}
+    })
+    return ctx
+
+class TestSOCQueueManager(unittest.TestCase):
+
+    def setUp(self):
+        ProposalRegistry.reset()
+        self.pushed = []
+        self._push = QueueManager.__dict__["_push"]
+        QueueManager._push = classmethod(lambda cls, update: self.pushed.append(update))
+
+    def tearDown(self):
+        QueueManager._push = self._push
+        ProposalRegistry.PROPOSAL_TTL = 3600
+        ProposalRegistry.reset()
+
+    def _pending(self, ctx, action="CAPTCHA"):
+        pid = ProposalRegistry.register_proposal(ctx, action)
+        ProposalRegistry.update_status(pid, EnforcementState.PENDING)
+        return pid
+
+    def test_priority_ordering_and_pagination(self):
+        print("=== Test: Indexed SOC Queue ===")
+        low = self._pending(_context("S1", 90))
+        critical = self._pending(_context("S2", 50, severity="CRITICAL"))
+        tenant = self._pending(_context("S3", 40, tenant_scope=True))
+        ProposalRegistry.register_proposal(_context("S4", 99), "CAPTCHA") # still CREATED
+
+        self.assertEqual(QueueManager.calculate_priority(ProposalRegistry.get_proposal(critical)), 150.0)
+        self.assertEqual([p["id"] for p in QueueManager.get_prioritized_queue()], [critical, tenant, low])
+        self.assertEqual([p["id"] for p in QueueManager.top_k(1)], [critical])
+
+        first = QueueManager.get_page(limit=2)
+        self.assertEqual(first["total"], 3)
+        # A higher-priority arrival must not shift the next page
+        self._pending(_context("S5", 100, severity="CRITICAL"))
+        second = QueueManager.get_page(limit=2, cursor=first["next_cursor"])
+        self.assertEqual([p["id"] for p in second["items"]], [low])
+        self.assertIsNone(second["next_cursor"])
+        with self.assertRaises(ValueError):
+            QueueManager.get_page(cursor="garbage")
+        print(">>> PASS: Queue ordered by risk x blast x severity with stable cursors.")
+
+    def test_transitions_expiry_and_push(self):
+        print("=== Test: SOC Queue Incremental Updates ===")
+        a = self._pending(_context("S1", 80))
+        b = self._pending(_context("S2", 70))
+        ProposalRegistry.update_status(a, EnforcementState.APPROVED)
+        self.assertEqual([p["id"] for p in QueueManager.get_prioritized_queue()], [b])
+        self.assertEqual([p["id"] for p in QueueManager.get_prioritized_queue("APPROVED")], [a])
+
+        ProposalRegistry.PROPOSAL_TTL = -1
+        self._pending(_context("S3", 99))
+        self.assertEqual([p["id"] for p in QueueManager.get_prioritized_queue()], [b])
+        self.assertEqual(self.pushed[-1]["event"], "expired")
+        self.assertIn({"event": "status", "proposal_id": a, "status": "APPROVED", "previous_status": "PENDING",
+                       "priority_score": 80.0, "position": 0}, self.pushed)
+        print(">>> PASS: Registry events keep the queue and clients in sync.")
+
+if __name__ == '__main__':
+    unittest.main()
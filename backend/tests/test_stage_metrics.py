@@ -0,0 +1,81 @@
+import sys
+import os
+import unittest
+
+# Add root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.monitoring.stage_metrics import StageMetrics
+
+class TestStageMetrics(unittest.TestCase):
+
+    def setUp(self):
+        StageMetrics.reset()
+        StageMetrics.configure(enabled=True, sample_rate=1.0)
+
+    def tearDown(self):
+        StageMetrics.configure(enabled=True, sample_rate=1.0)
+        StageMetrics.reset()
+
+    def test_histograms_and_counters_render_as_prometheus_text(self):
+        print("=== Test: Stage Metrics Exposition ===")
+        StageMetrics.observe("fusion", 0.003)
+        StageMetrics.observe("fusion", 0.3)
+        with StageMetrics.timer("model", model="web"):
+            pass
+        StageMetrics.inc("decisions", decision="ALLOW")
+        StageMetrics.inc("decisions", decision="ALLOW")
+
+        text = StageMetrics.render()
+        self.assertIn('trust_stage_latency_seconds_bucket{stage="fusion",le="0.005"} 1', text)
+        self.assertIn('trust_stage_latency_seconds_bucket{stage="fusion",le="0.5"} 2', text)
+        self.assertIn('trust_stage_latency_seconds_bucket{stage="fusion",le="+Inf"} 2', text)
+        self.assertIn('trust_stage_latency_seconds_count{model="web",stage="model"} 1', text)
+        self.assertIn('trust_decisions_total{decision="ALLOW"} 2', text)
+        self.assertIn("# TYPE trust_stage_latency_seconds histogram", text)
+
+        StageMetrics.inc("user_identity_lookups", 1234567)
+        StageMetrics.inc("bytes", 0.1)
+        StageMetrics.inc("bytes", 0.2)
+        text = StageMetrics.render()
+        self.assertIn("trust_user_identity_lookups_total 1234567\n", text) # not 1.23457e+06
+        self.assertIn(f"trust_bytes_total {0.1 + 0.2!r}\n", text)
+        print(">>> PASS: Histograms are cumulative and counters labelled.")
+
+    def test_sampling_skips_timers_but_counts_errors(self):
+        print("=== Test: Stage Metrics Sampling ===")
+        StageMetrics.configure(sample_rate=0.0)
+        with self.assertRaises(RuntimeError):
+            with StageMetrics.timer("persistence"):
+                raise RuntimeError("db down")
+        text = StageMetrics.render()
+        self.assertNotIn("stage_latency_seconds_count", text)
+        self.assertIn('trust_errors_total{stage="persistence"} 1', text)
+        self.assertIn("trust_metrics_sample_rate 0", text)
+
+        StageMetrics.configure(enabled=False)
+        StageMetrics.inc("events", type="http")
+        self.assertNotIn("trust_events_total", StageMetrics.render())
+        with self.assertRaises(ValueError):
+            StageMetrics.configure(sample_rate=2)
+        print(">>> PASS: Sampling and kill switch behave.")
+
+    def test_summary_interpolates_quantiles_within_buckets(self):
+        print("=== Test: Stage Metrics Summary ===")
+        for _ in range(90):
+            StageMetrics.observe("fusion", 0.003) # (0.0025, 0.005] bucket
+        for _ in range(10):
+            StageMetrics.observe("fusion", 0.3)   # (0.2, 0.5] bucket
+        StageMetrics.observe("model", 0.001, model="web")
+
+        summary = StageMetrics.summary()
+        fusion = summary["fusion"]
+        self.assertEqual(fusion["count"], 100)
+        self.assertAlmostEqual(fusion["mean"], 0.0327)
+        self.assertTrue(0.0025 < fusion["p50"] <= 0.005)
+        self.assertTrue(0.2 < fusion["p95"] <= 0.5)
+        self.assertIn("model{model=web}", summary)
+        print(">>> PASS: Quantiles estimated from histogram buckets.")
+
+if __name__ == '__main__':
+    unittest.main()
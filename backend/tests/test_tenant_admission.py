@@ -0,0 +1,146 @@
+import unittest
+import sys
+import os
+import time
+import threading
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.platform_core import tenant_admission
+from backend.platform_core.tenant_admission import TenantAdmission, TokenBucket, admit_tenant
+from backend.platform_core.tenant_manager import TenantManager
+
+
+class TestTenantAdmission(unittest.TestCase):
+
+    def setUp(self):
+        TenantAdmission.reset()
+        self._saved = {t: dict(TenantManager._tenant_configs[t]) for t in TenantManager._tenant_configs}
+        TenantManager._tenant_configs["noisy"] = {"name": "Noisy", "rate_per_sec": 1, "burst": 5, "weight": 1}
+        TenantManager._tenant_configs["quiet"] = {"name": "Quiet", "rate_per_sec": 1000, "burst": 1000, "weight": 1}
+
+    def tearDown(self):
+        TenantManager._tenant_configs = self._saved
+        TenantAdmission.reset()
+
+    def test_token_bucket_refill(self):
+        print("\n=== Test: Token bucket refills at its rate up to burst ===")
+        bucket = TokenBucket(rate=10, burst=2)
+        t0 = bucket.updated
+        self.assertTrue(bucket.take(now=t0))
+        self.assertTrue(bucket.take(now=t0))
+        self.assertFalse(bucket.take(now=t0))
+        self.assertAlmostEqual(bucket.wait_time(now=t0), 0.1)
+        self.assertTrue(bucket.take(now=t0 + 0.11))
+        bucket.take(now=t0 + 100)
+        self.assertLessEqual(bucket.tokens, 2)
+        print(">>> PASS: Refill bounded by burst")
+
+    def test_noisy_tenant_shed_without_affecting_others(self):
+        print("\n=== Test: Over-rate tenant is shed, others unaffected ===")
+        noisy = [TenantAdmission.admit("noisy") for _ in range(20)]
+        quiet = [TenantAdmission.admit("quiet") for _ in range(20)]
+        self.assertEqual(sum(noisy), 5)
+        self.assertTrue(all(quiet))
+        stats = TenantAdmission.stats()
+        self.assertEqual(stats["noisy"]["shed"], 15)
+        self.assertEqual(stats["quiet"]["shed"], 0)
+        self.assertGreater(TenantAdmission.retry_after("noisy"), 0)
+        print(">>> PASS: Noisy shed 15, quiet shed 0")
+
+    def test_weighted_round_robin(self):
+        print("\n=== Test: Deficit round robin interleaves tenants by weight ===")
+        TenantManager._tenant_configs["heavy"] = {"name": "Heavy", "rate_per_sec": 1000, "burst": 1000, "weight": 2}
+        noop = lambda: None
+        with TenantAdmission._cond:
+            TenantAdmission._running = True # keep workers out of the way
+            for _ in range(100):
+                for tenant in ("quiet", "heavy"):
+                    queue = TenantAdmission._queues.setdefault(
+                        tenant, tenant_admission._TenantQueue(TenantManager.get_limits(tenant)["weight"]))
+                    if not queue.items:
+                        TenantAdmission._active.append(tenant)
+                    queue.items.append((noop, (), {}))
+            order = [TenantAdmission._next()[0] for _ in range(60)]
+            TenantAdmission._running = False
+
+        self.assertEqual(order[:10], ["quiet"] * 10)
+        self.assertEqual(order[10:30], ["heavy"] * 20)
+        self.assertEqual(order.count("heavy"), 2 * order.count("quiet"))
+        print(">>> PASS: Heavy tenant served twice as often")
+
+    def test_queued_backlog_does_not_block_other_tenant(self):
+        print("\n=== Test: One tenant's backlog does not delay another ===")
+        done = threading.Event()
+        for _ in range(50):
+            TenantAdmission.submit("noisy", time.sleep, 0)
+        self.assertTrue(TenantAdmission.submit("quiet", done.set))
+        self.assertTrue(done.wait(2.0))
+        self.assertGreater(TenantAdmission.stats()["noisy"]["queue_depth"], 30)
+        print(">>> PASS: Quiet tenant served while noisy is rate limited")
+
+    def test_acquire_times_out(self):
+        print("\n=== Test: acquire() blocks then gives up at timeout ===")
+        self.assertTrue(TenantAdmission.acquire("noisy", cost=50, timeout=0.1)) # capped at burst
+        start = time.monotonic()
+        self.assertFalse(TenantAdmission.acquire("noisy", cost=5, timeout=0.2))
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+        print(">>> PASS: Timed out after waiting")
+
+    def test_route_decorator_returns_429(self):
+        print("\n=== Test: admit_tenant returns 429 with Retry-After ===")
+        from flask import Flask, jsonify, g, request
+        app = Flask(__name__)
+
+        @app.before_request
+        def authenticate():
+            # Stand-in for the auth middleware establishing the caller's tenant
+            if request.headers.get("X-API-Key") == "key":
+                g.tenant_id = request.headers.get("X-Tenant-ID")
+
+        @app.route("/ingest", methods=["POST"])
+        @admit_tenant
+        def ingest():
+            return jsonify({"ok": True})
+
+        client = app.test_client()
+        auth = {"X-API-Key": "key", "X-Tenant-ID": "noisy"}
+        codes = [client.post("/ingest", json={}, headers=auth).status_code for _ in range(6)]
+        self.assertEqual(codes, [200] * 5 + [429])
+        resp = client.post("/ingest", json={}, headers=auth)
+        self.assertEqual(resp.status_code, 429)
+        self.assertGreaterEqual(int(resp.headers["Retry-After"]), 1)
+        # A body tenant_id can't move the request into another tenant's bucket
+        resp = client.post("/ingest", json={"tenant_id": "quiet"}, headers=auth)
+        self.assertEqual(resp.status_code, 429)
+        # Nor can a bare header without an authenticated tenant
+        TenantManager._tenant_configs["default"] = dict(self._saved["default"], rate_per_sec=1, burst=1)
+        codes = [client.post("/ingest", json={}, headers={"X-Tenant-ID": "quiet"}).status_code for _ in range(2)]
+        self.assertEqual(codes, [200, 429])
+        self.assertNotIn("quiet", TenantAdmission.stats())
+        print(">>> PASS: Sixth request shed, unauthenticated header ignored")
+
+    def test_unknown_tenants_get_own_default_tier_buckets(self):
+        print("\n=== Test: Unconfigured tenant ids get separate default-tier buckets ===")
+        TenantManager._tenant_configs["default"] = dict(self._saved["default"], rate_per_sec=1, burst=3)
+        flood = [TenantAdmission.admit("tenant_1") for _ in range(10)]
+        self.assertEqual(sum(flood), 3)
+        self.assertTrue(TenantAdmission.admit("tenant_2")) # not starved by tenant_1
+        self.assertEqual(TenantManager.tier("tenant_2"), "default")
+
+        original = tenant_admission.MAX_TENANTS
+        tenant_admission.MAX_TENANTS = 5
+        try:
+            for n in range(20):
+                TenantAdmission.admit(f"made-up-{n}")
+        finally:
+            tenant_admission.MAX_TENANTS = original
+        self.assertEqual(len(TenantAdmission._buckets), 5)
+        self.assertIn("made-up-19", TenantAdmission._buckets)
+        self.assertNotIn("tenant_1", TenantAdmission.stats()) # least recently used evicted
+        print(">>> PASS: per-id buckets, bounded by LRU eviction")
+
+
+if __name__ == '__main__':
+    unittest.main()
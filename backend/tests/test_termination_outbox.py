@@ -0,0 +1,155 @@
+import sys
+import os
+import unittest
+from datetime import datetime, timedelta
+
+# Add root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from flask import Flask
+from backend.extensions import db
+from backend.db.models import TerminationOutbox
+from backend.enforcement import termination_dispatcher
+from backend.enforcement.termination_dispatcher import TerminationDispatcher, MAX_ATTEMPTS
+from sqlalchemy.exc import IntegrityError
+from target_app import app as target_app
+
+
+class _TargetAppHttp:
+    """
+    The local target app's test client behind a requests-style post().
+    """
+    def __init__(self):
+        self.client = target_app.app.test_client()
+        self.bodies = []
+
+    def post(self, url, json=None, timeout=None):
+        self.bodies.append(json)
+        return self.client.post("/api/terminate", json=json)
+
+
+class _Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class _DownHttp:
+    def __init__(self, status_code=503):
+        self.status_code = status_code
+        self.calls = 0
+
+    def post(self, url, json=None, timeout=None):
+        self.calls += 1
+        return _Response(self.status_code)
+
+
+class TestTerminationOutbox(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.metadata.create_all(bind=db.engine, tables=[TerminationOutbox.__table__])
+        TerminationDispatcher._batch_supported = True
+        target_app.ACTIVE_SESSIONS.clear()
+
+    def tearDown(self):
+        db.session.remove()
+        db.metadata.drop_all(bind=db.engine, tables=[TerminationOutbox.__table__])
+        self.ctx.pop()
+
+    def test_batched_delivery_to_target_app(self):
+        print("=== Test: Outbox delivers terminations in one batched request ===")
+        for n in range(3):
+            target_app.ACTIVE_SESSIONS[f"s{n}"] = "ACTIVE"
+            TerminationDispatcher.enqueue(f"s{n}", reason="test")
+        TerminationDispatcher.enqueue("s0", reason="duplicate") # already pending
+        self.assertTrue(TerminationDispatcher._wake.is_set()) # woken on commit
+
+        http = _TargetAppHttp()
+        self.assertEqual(TerminationDispatcher.dispatch_once(http), 3)
+        self.assertEqual(len(http.bodies), 1)
+        self.assertEqual(sorted(http.bodies[0]["session_ids"]), ["s0", "s1", "s2"])
+        self.assertTrue(all(state == "TERMINATED" for state in target_app.ACTIVE_SESSIONS.values()))
+        self.assertEqual(TerminationDispatcher.stats(), {"SENT": 3})
+        self.assertEqual(TerminationDispatcher.dispatch_once(http), 0)
+        print(">>> PASS: 3 sessions, 1 webhook request")
+
+    def test_uncommitted_row_not_visible(self):
+        print("=== Test: Row rides on the caller's transaction ===")
+        TerminationDispatcher.enqueue("s_tx", commit=False)
+        db.session.rollback()
+        self.assertEqual(TerminationOutbox.query.count(), 0)
+        print(">>> PASS: Rolled back with the caller")
+
+    def test_backoff_then_dead_letter(self):
+        print("=== Test: Retries back off exponentially, then dead-letter ===")
+        TerminationDispatcher.enqueue("s_retry")
+        http = _DownHttp()
+        now = datetime.utcnow()
+
+        self.assertEqual(TerminationDispatcher.dispatch_once(http, now=now), 1)
+        row = TerminationOutbox.query.one()
+        self.assertEqual((row.status, row.attempts, row.last_error), ("PENDING", 1, "HTTP 503"))
+        first_delay = row.next_attempt_at - now
+        # Not due yet
+        self.assertEqual(TerminationDispatcher.dispatch_once(http, now=now), 0)
+
+        for _ in range(MAX_ATTEMPTS - 1):
+            due = TerminationOutbox.query.one().next_attempt_at
+            TerminationDispatcher.dispatch_once(http, now=due + timedelta(seconds=1))
+        row = TerminationOutbox.query.one()
+        self.assertEqual(row.status, "DEAD")
+        self.assertEqual(http.calls, MAX_ATTEMPTS)
+        self.assertGreaterEqual(termination_dispatcher.backoff_seconds(3), 2 * termination_dispatcher.backoff_seconds(2))
+        self.assertLess(first_delay, timedelta(seconds=5))
+        self.assertEqual(len(TerminationDispatcher.dead_letters()), 1)
+
+        self.assertEqual(TerminationDispatcher.retry_dead(), 1)
+        self.assertEqual(TerminationDispatcher.dispatch_once(_TargetAppHttp()), 1)
+        self.assertEqual(TerminationOutbox.query.one().status, "SENT")
+        print(">>> PASS: Dead-lettered after max attempts and re-queued")
+
+    def test_client_error_is_not_retried(self):
+        print("=== Test: Non-retryable 4xx dead-letters immediately ===")
+        TerminationDispatcher.enqueue("s_bad")
+        TerminationDispatcher.dispatch_once(_DownHttp(status_code=400))
+        self.assertEqual(TerminationOutbox.query.one().status, "DEAD")
+        print(">>> PASS: No retries for 400")
+
+    def test_one_pending_row_per_session(self):
+        print("=== Test: The database rejects a second PENDING row for a session ===")
+        first = TerminationDispatcher.enqueue("s_dup")
+        db.session.add(TerminationOutbox(session_id="s_dup"))
+        with self.assertRaises(IntegrityError):
+            db.session.commit()
+        db.session.rollback()
+        db.session.add(TerminationOutbox(session_id="s_dup", status="SENT")) # history rows are not constrained
+        db.session.commit()
+        self.assertEqual(TerminationDispatcher.enqueue("s_dup"), first)
+        print(">>> PASS: duplicate insert refused")
+
+    def test_retry_dead_revives_one_row_per_session(self):
+        print("=== Test: retry_dead() skips sessions that are already pending ===")
+        for status in ("DEAD", "DEAD"):
+            db.session.add(TerminationOutbox(session_id="s_dead", status=status))
+        db.session.add(TerminationOutbox(session_id="s_live", status="DEAD"))
+        db.session.commit()
+        TerminationDispatcher.enqueue("s_live")
+
+        self.assertEqual(TerminationDispatcher.retry_dead(), 1)
+        self.assertEqual(TerminationOutbox.query.filter_by(session_id="s_dead", status="PENDING").count(), 1)
+        self.assertEqual(TerminationOutbox.query.filter_by(session_id="s_live", status="PENDING").count(), 1)
+        print(">>> PASS: no duplicate pending rows")
+
+    def test_lease_outlives_slowest_batch(self):
+        print("=== Test: The claim lease covers a full per-id fallback batch ===")
+        worst = (termination_dispatcher.BATCH_SIZE + 1) * termination_dispatcher.REQUEST_TIMEOUT_SEC * 2
+        self.assertGreater(termination_dispatcher.LEASE_SEC, worst)
+        print(">>> PASS: lease longer than batch x timeout")
+
+
+if __name__ == '__main__':
+    unittest.main()
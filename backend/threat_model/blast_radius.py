@@ -1,5 +1,7 @@
 from dataclasses import dataclass
-from typing import Dict, Any, Optional
+import ipaddress
+from typing import Dict, Any, Optional, Set
+from backend.services.session_reverse_index import SessionReverseIndex
 
 @dataclass
 class BlastRadius:
@@ -18,39 +20,62 @@ class BlastRadius:
             "reversibility_score": self.reversibility_score
         }
 
+NETWORK_ACTIONS = ("BLOCK_IP", "ISOLATE_HOST", "SYSTEM_ISOLATE", "QUARANTINE_HOST", "BLOCK_TENANT_IP_RANGE")
+
+def _network_target(target: str) -> Optional[str]:
+    try:
+        return str(ipaddress.ip_network(target, strict=False)) if "/" in target else str(ipaddress.ip_address(target))
+    except ValueError:
+        return None
+
 class BlastRadiusCalculator:
     """
-    Estimates the impact scope of an action.
+    Estimates the impact scope of an action from the live session reverse
+    indexes (SessionReverseIndex): the sessions actually sharing the IP /
+    subnet / token being acted on, and the distinct users behind them.
     """
     
     @staticmethod
     def calculate(action: str, target: str, context_data: Dict[str, Any]) -> BlastRadius:
         """
-        Heuristic calculation of blast radius.
-        In a real system, this would query session stores/IP reputation DBs.
+        target is the asset (IP, CIDR, token) or, as enforcement passes it,
+        the session id; in that case the session's latest IP / token is used.
         """
         radius = BlastRadius()
+        target = target or ""
+        network = _network_target(target)
+        session_id = context_data.get("session_id")
+        if not session_id and not network and SessionReverseIndex.is_session(target):
+            session_id = target
+        sessions: Set[str] = {session_id} if session_id else set()
         
         # 1. Check Shared Assets (e.g. IP Blocking)
-        if action in ["BLOCK_IP", "ISOLATE_HOST", "SYSTEM_ISOLATE"]:
-            # Mock lookup: check if IP is shared (e.g., NAT, Corporate Proxy)
-            # For now, if target looks like a CIDR or generic IP, assume potential shared impact.
-            radius.shared_asset = target
-            # Heuristic: System actions usually affect machine, so multiple sessions possible
-            radius.affected_sessions = 5 # Placeholder estimate
+        if action in NETWORK_ACTIONS:
+            asset = network or (SessionReverseIndex.last_ip(session_id) if session_id else None)
+            radius.shared_asset = asset or target
+            if asset:
+                sessions |= SessionReverseIndex.sessions_for_network(asset)
             radius.reversibility_score = 0.8 # Requires admin to undo
             
         elif action == "REVOKE_TOKEN":
-            radius.affected_users = 1
-            radius.affected_sessions = 1
+            token = context_data.get("token_id")
+            if not token and target and target != session_id:
+                token = target # the token itself is the target
+            elif not token and session_id:
+                token = SessionReverseIndex.last_token(session_id)
+            if token:
+                sessions |= SessionReverseIndex.sessions_for_token(token)
             radius.reversibility_score = 0.5 # User must login again (high friction)
             
         elif action in ["CAPTCHA", "RATE_LIMIT"]:
              radius.reversibility_score = 1.0 # Auto-expires
+        
+        radius.affected_sessions = max(1, len(sessions))
+        radius.affected_users = max(1, len(SessionReverseIndex.users_for_sessions(sessions)))
              
         # 2. Check Tenant Scope
         if context_data.get("is_admin_user") or "tenant" in target:
              radius.tenant_scope = True
-             radius.affected_users = 100 # Placeholder for "Everyone"
+             radius.affected_users = max(radius.affected_users, SessionReverseIndex.live_user_count())
              
         return radius
@@ -1,15 +1,18 @@
 from flask import jsonify
 from typing import Any, Dict, Optional
 
-def success_response(data: Any = None, message: str = "Success", status_code: int = 200):
+def success_response(data: Any = None, message: str = "Success", status_code: int = 200, meta: Optional[Dict[str, Any]] = None):
     """
     Standard Success Response.
+    `meta` carries out-of-band info such as pagination cursors.
     """
     response = {
         "status": "success",
         "message": message,
         "data": data
     }
+    if meta is not None:
+        response["meta"] = meta
     return jsonify(response), status_code
 
 def error_response(message: str, status_code: int = 400, details: Optional[Any] = None):
@@ -710,20 +710,30 @@ def keepalive():
 
 
 # ENFORCEMENT HOOK (Trust Engine calls this)
+# Accepts {"session_id": "..."} or a batch {"session_ids": ["...", ...]}
 @app.route("/api/terminate", methods=["POST"])
 def terminate_session():
     data = request.json or {}
-    sess_id = data.get("session_id")
-    if not sess_id:
+    sess_ids = data.get("session_ids") or ([data["session_id"]] if data.get("session_id") else [])
+    if not sess_ids:
         return jsonify({"status": "error", "message": "Missing session_id"}), 400
         
-    if sess_id in ACTIVE_SESSIONS:
-        ACTIVE_SESSIONS[sess_id] = "TERMINATED"
-        print(f"🚨 TERMINATED SESSION {sess_id} via Webhook!")
-        return jsonify({"status": "success", "message": f"Session {sess_id} terminated"}), 200
-        
-    # Return 200 even if missing to reduce log noise for anonymous bot detections
-    return jsonify({"status": "ignored", "message": "Session not found or already terminated"}), 200
+    results = {}
+    for sess_id in sess_ids:
+        if sess_id in ACTIVE_SESSIONS:
+            ACTIVE_SESSIONS[sess_id] = "TERMINATED"
+            print(f"🚨 TERMINATED SESSION {sess_id} via Webhook!")
+            results[sess_id] = "terminated"
+        else:
+            # Not an error: reduces log noise for anonymous bot detections
+            results[sess_id] = "ignored"
+
+    if "session_ids" not in data:
+        sess_id = sess_ids[0]
+        if results[sess_id] == "terminated":
+            return jsonify({"status": "success", "message": f"Session {sess_id} terminated"}), 200
+        return jsonify({"status": "ignored", "message": "Session not found or already terminated"}), 200
+    return jsonify({"status": "success", "results": results}), 200
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=3001, debug=True)